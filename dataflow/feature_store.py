@@ -0,0 +1,132 @@
+"""
+Step 45 → 49: 팀별 온라인 특징 저장소 (스트리밍 파이프라인이 쓰고 step49 품질 예측 API가 읽음)
+
+- 저장소 URL: sqlite:///경로/features.db (로컬 내장, 단일 호스트) 또는 redis://호스트:포트/DB (Memorystore 등 공유)
+- 키: 팀 ID, 값: 특징 dict JSON
+  - SQLite: team_features(team_id PRIMARY KEY, features TEXT, updated_ts REAL), WAL 모드라 읽기가 쓰기를 막지 않음
+  - Redis: 문자열 키 team_features:{team_id}
+- 특징: 최신 리포트 값(coverage, gaps, overlaps, overallScore, avgDur) + 같은 지표의 지수 이동 평균(*_ewma),
+  누적 건수(count, 그중 늦게 도착해 반영하지 않은 건수 late_count), 마지막 이벤트 시각/리포트 ID,
+  저장 시각(updated_ts, epoch 초)
+
+step49-quality-predictor/app.py의 TeamFeatureStore가 같은 형식을 읽으므로, 형식을 바꾸면 두 곳을 함께 바꿔야 합니다.
+"""
+
+import json
+import sqlite3
+import time
+
+from quality_row import parse_ts
+
+FEATURE_KEY_PREFIX = 'team_features:'
+FEATURE_METRICS = ('coverage', 'gaps', 'overlaps', 'overallScore', 'avgDur')
+
+
+def event_time(value):
+    """event_ts 문자열 → UTC datetime (비었거나 형식이 틀리면 None)"""
+    try:
+        return parse_ts(value)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def is_late(prev, row) -> bool:
+    """
+    이미 반영한 마지막 이벤트보다 event_ts가 이른(또는 event_ts를 해석할 수 없는) 이벤트인지
+    ISO 문자열은 시간대 표기(Z / +09:00)나 소수 초 자릿수가 다르면 사전순이 시각 순서와 다르므로 datetime으로 비교
+    """
+    if prev is None:
+        return False
+    ts = event_time(row.event_ts)
+    last = event_time(prev.get('last_event_ts'))
+    return ts is None or (last is not None and ts < last)
+
+
+def update_features(prev, row, alpha: float) -> dict:
+    """
+    이전 특징(없으면 None) + QualityRow → 새 특징 dict
+    늦게 도착한 이벤트(is_late)는 건수(count / late_count)만 세고 EWMA와 최신 값에는 반영하지 않음
+    (도착 순서가 아니라 event_ts 순서로 갱신, 늦은 이벤트가 최신 값을 덮어쓰거나 EWMA에서 최근 값처럼 가중되지 않도록)
+    """
+    if prev is None:
+        features = {'team_id': row.team_id, 'count': 0, 'late_count': 0, 'last_event_ts': '', 'last_report_id': ''}
+        for name in FEATURE_METRICS:
+            features[f'{name}_ewma'] = getattr(row, name)
+    else:
+        features = dict(prev)
+        features.setdefault('late_count', 0)
+
+    features['count'] += 1
+    if is_late(prev, row):
+        features['late_count'] += 1
+        return features
+
+    if prev is not None:
+        for name in FEATURE_METRICS:
+            features[f'{name}_ewma'] += alpha * (getattr(row, name) - features[f'{name}_ewma'])
+    features['last_event_ts'] = row.event_ts
+    features['last_report_id'] = row.report_id
+    for name in FEATURE_METRICS:
+        features[name] = getattr(row, name)
+    return features
+
+
+class SqliteFeatureStore:
+    """SQLite 특징 저장소 (한 트랜잭션에 여러 팀 upsert)"""
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS team_features ('
+            'team_id TEXT PRIMARY KEY, features TEXT NOT NULL, updated_ts REAL NOT NULL)'
+        )
+        self.conn.commit()
+
+    def put_many(self, features_by_team: dict):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                'INSERT INTO team_features (team_id, features, updated_ts) VALUES (?, ?, ?) '
+                'ON CONFLICT(team_id) DO UPDATE SET features = excluded.features, updated_ts = excluded.updated_ts',
+                [(team, json.dumps({**f, 'updated_ts': now}), now) for team, f in features_by_team.items()],
+            )
+
+    def get(self, team_id: str):
+        row = self.conn.execute('SELECT features FROM team_features WHERE team_id = ?', (team_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self):
+        self.conn.close()
+
+
+class RedisFeatureStore:
+    """Redis 특징 저장소 (파이프라인 한 번으로 여러 팀 SET)"""
+
+    def __init__(self, url: str):
+        import redis  # 선택 의존성 (redis:// URL을 쓸 때만 필요)
+        self.client = redis.Redis.from_url(url)
+
+    def put_many(self, features_by_team: dict):
+        now = time.time()
+        pipe = self.client.pipeline(transaction=False)
+        for team, f in features_by_team.items():
+            pipe.set(FEATURE_KEY_PREFIX + team, json.dumps({**f, 'updated_ts': now}))
+        pipe.execute()
+
+    def get(self, team_id: str):
+        value = self.client.get(FEATURE_KEY_PREFIX + team_id)
+        return json.loads(value) if value is not None else None
+
+    def close(self):
+        self.client.close()
+
+
+def open_feature_store(url: str):
+    """저장소 URL → SqliteFeatureStore / RedisFeatureStore"""
+    if url.startswith('sqlite:///'):
+        return SqliteFeatureStore(url[len('sqlite:///'):])
+    if url.startswith(('redis://', 'rediss://')):
+        return RedisFeatureStore(url)
+    raise ValueError(f'지원하지 않는 특징 저장소 URL: {url} (sqlite:///경로 또는 redis://호스트:포트/DB)')
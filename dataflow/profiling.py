@@ -0,0 +1,155 @@
+"""
+파이프라인 프로파일링 (--profile)
+DoFn을 ProfiledDoFn으로 감싸 단계별로
+- wall / CPU 시간, 처리 건수 카운터 (번들마다 Beam 메트릭으로 합산, Dataflow 콘솔 / DirectRunner 결과에서 조회)
+- cProfile 통계를 --profile_dump_interval_sec마다 --profile_dir에 .prof 파일로 덤프 (구간마다 새로 시작)
+을 남깁니다. --profile이 없으면 profiled()가 DoFn을 그대로 반환하므로 비용이 없습니다.
+
+덤프 확인: python -m pstats /tmp/beam_profile/Detect-*.prof  (여러 구간 합산: pstats.Stats(*파일 목록))
+"""
+
+import cProfile
+import inspect
+import os
+import re
+import socket
+import time
+import types
+
+import apache_beam as beam
+from apache_beam.metrics import Metrics
+from apache_beam.transforms import userstate
+
+
+def add_profile_arguments(parser):
+    """프로파일링 인자 (step45_stream / step45_backfill / step46_anomaly / step45_46_fused 공유)"""
+    parser.add_argument('--profile', action='store_true',
+                        help='DoFn 단계별 wall/CPU 시간 카운터와 주기적 cProfile 덤프 (기본 끔)')
+    parser.add_argument('--profile_dir', default='/tmp/beam_profile', help='--profile: cProfile 덤프 디렉터리 (워커 로컬)')
+    parser.add_argument('--profile_dump_interval_sec', type=float, default=60.0,
+                        help='--profile: cProfile 덤프 주기 (초)')
+
+
+def profiled(dofn, stage, args):
+    """--profile이면 dofn을 ProfiledDoFn으로 감싸고, 아니면 그대로 반환 (args가 없거나 플래그가 없으면 끔)"""
+    if not getattr(args, 'profile', False):
+        return dofn
+    if userstate.get_dofn_specs(dofn)[1]:
+        # 타이머 콜백(on_timer)은 감싼 DoFn에서 노출하지 않으므로 타이머가 있는 DoFn은 측정하지 않음
+        return dofn
+    return ProfiledDoFn(dofn, stage, args.profile_dir, args.profile_dump_interval_sec)
+
+
+class _DelegatedProcess:
+    """
+    감싼 DoFn의 process 시그니처(WindowParam / PaneInfoParam / StateParam 등 기본값 포함)를 그대로 노출하는 process
+    Beam은 process의 시그니처로 주입할 인자와 상태 스펙을 찾으므로, 인스턴스마다 감싼 DoFn의 시그니처를 붙여 바인딩
+    """
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+
+        def process(self, *args, **kwargs):
+            return self._process(args, kwargs)
+
+        process.__signature__ = inspect.signature(type(obj.fn).process)
+        return types.MethodType(process, obj)
+
+
+class ProfiledDoFn(beam.DoFn):
+    """
+    DoFn 래퍼: process / finish_bundle 호출과 출력 이터레이터의 next()마다 시간을 재고 그 구간만 cProfile에 기록
+    출력은 하류 단계가 처리하는 동안(yield 사이)은 재지 않으므로 같은 스테이지로 합쳐진(fused) 하류 DoFn 시간은 섞이지 않음
+    """
+
+    process = _DelegatedProcess()
+
+    def __init__(self, fn, stage, profile_dir, dump_interval_sec=60.0):
+        self.fn = fn
+        self.stage = stage
+        self.profile_dir = profile_dir
+        self.dump_interval_sec = dump_interval_sec
+        self.elements = Metrics.counter(self.__class__, f'{stage}_elements')
+        self.wall_us = Metrics.counter(self.__class__, f'{stage}_wall_us')
+        self.cpu_us = Metrics.counter(self.__class__, f'{stage}_cpu_us')
+
+    def default_type_hints(self):
+        # 감싼 DoFn의 출력 타입(with_output_types 등)을 유지해야 하류 코더(QualityRow RowCoder 등)가 바뀌지 않음
+        return self.fn.get_type_hints()
+
+    def infer_output_type(self, input_type):
+        return self.fn.infer_output_type(input_type)
+
+    def setup(self):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        stage = re.sub(r'[^\w.-]', '_', self.stage)
+        self._prefix = f"{stage}-{socket.gethostname()}-{os.getpid()}-{id(self):x}"
+        self._dumps = 0
+        self._profiler = cProfile.Profile()
+        self._profiled_calls = 0
+        self._next_dump = time.monotonic() + self.dump_interval_sec
+        self._count, self._wall_ns, self._cpu_ns = 0, 0, 0
+        self.fn.setup()
+
+    def start_bundle(self):
+        self._run(self.fn.start_bundle)
+
+    def _process(self, args, kwargs):
+        self._count += 1
+        results = self._run(self.fn.process, *args, **kwargs)
+        if time.monotonic() >= self._next_dump:
+            self._dump()
+        return None if results is None else self._iterate(iter(results))
+
+    def finish_bundle(self):
+        results = self._run(self.fn.finish_bundle)
+        if results is not None:
+            yield from self._iterate(iter(results))
+        self.elements.inc(self._count)
+        self.wall_us.inc(self._wall_ns // 1000)
+        self.cpu_us.inc(self._cpu_ns // 1000)
+        self._count, self._wall_ns, self._cpu_ns = 0, 0, 0
+
+    def teardown(self):
+        try:
+            self.fn.teardown()
+        finally:
+            self._dump()
+
+    def _run(self, method, *args, **kwargs):
+        wall, cpu = time.perf_counter_ns(), time.thread_time_ns()
+        try:
+            # Python 3.12+는 프로파일러가 프로세스 전역이라 다른 스레드의 단계가 측정 중이면 enable이 실패함 → 시간만 잼
+            self._profiler.enable()
+            profiling = True
+        except ValueError:
+            profiling = False
+        try:
+            return method(*args, **kwargs)
+        finally:
+            if profiling:
+                self._profiler.disable()
+                self._profiled_calls += 1
+            self._cpu_ns += time.thread_time_ns() - cpu
+            self._wall_ns += time.perf_counter_ns() - wall
+
+    def _iterate(self, results):
+        while True:
+            try:
+                output = self._run(next, results)
+            except StopIteration:
+                return
+            yield output
+
+    def _dump(self):
+        """지난 덤프 이후 구간의 cProfile 통계를 파일로 쓰고 프로파일러를 새로 시작"""
+        self._next_dump = time.monotonic() + self.dump_interval_sec
+        if not self._profiled_calls:
+            return
+        path = os.path.join(self.profile_dir, f"{self._prefix}-{time.strftime('%Y%m%dT%H%M%S')}-{self._dumps:04d}.prof")
+        self._profiler.dump_stats(path + '.tmp')
+        os.replace(path + '.tmp', path)
+        self._profiler = cProfile.Profile()
+        self._profiled_calls = 0
+        self._dumps += 1
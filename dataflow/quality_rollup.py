@@ -0,0 +1,184 @@
+"""
+Step 45: 팀별 분/시간 단위 품질 롤업 (Beam CombineFn)
+
+- 입력: (team_id, QualityRow), 출력: 롤업 테이블(yago_reports.quality_rollup) 행 dict
+- 집계: 건수, overallScore / coverage의 평균·최소·최대, gaps / overlaps 합계, avgDur 평균
+- 분위수 스케치: overallScore / coverage는 [0, 1] 범위로 검증되므로 SKETCH_BINS개 고정 구간 히스토그램 사용
+  (병합은 구간별 합이라 누산기 병합이 정확하고, 테이블에 히스토그램을 그대로 저장하므로
+   분 → 시간 → 일 단위 재집계도 SQL에서 구간별 SUM으로 가능, 분위수 오차는 구간 폭 1/SKETCH_BINS 이내)
+  히스토그램은 비어 있지 않은 구간만 {구간: 건수}로 보관/저장 (이벤트가 적은 분 단위 윈도우에서 행 크기 최소화)
+- 조기 발화 트리거 + 누적 모드로 같은 윈도우의 행이 여러 번(EARLY / ON_TIME / LATE) 기록되며,
+  읽을 때는 (team_id, granularity, window_start)별 pane_index가 가장 큰 행을 사용 (quality_rollup_latest 뷰)
+"""
+
+from datetime import datetime
+
+import apache_beam as beam
+from apache_beam.utils.windowed_value import PaneInfoTiming
+
+SKETCH_BINS = 100
+
+# 롤업 단위 이름 → 윈도우 크기 (초)
+GRANULARITIES = {'minute': 60, 'hour': 3600}
+
+ROLLUP_SCHEMA = {
+    'fields': [
+        {'name': 'team_id', 'type': 'STRING', 'mode': 'REQUIRED'},
+        {'name': 'granularity', 'type': 'STRING', 'mode': 'REQUIRED'},
+        {'name': 'window_start', 'type': 'TIMESTAMP', 'mode': 'REQUIRED'},
+        {'name': 'window_end', 'type': 'TIMESTAMP', 'mode': 'REQUIRED'},
+        {'name': 'pane_timing', 'type': 'STRING', 'mode': 'NULLABLE'},
+        {'name': 'pane_index', 'type': 'INTEGER', 'mode': 'NULLABLE'},
+        {'name': 'count', 'type': 'INTEGER', 'mode': 'REQUIRED'},
+        {'name': 'score_mean', 'type': 'FLOAT', 'mode': 'NULLABLE'},
+        {'name': 'score_min', 'type': 'FLOAT', 'mode': 'NULLABLE'},
+        {'name': 'score_max', 'type': 'FLOAT', 'mode': 'NULLABLE'},
+        {'name': 'score_p50', 'type': 'FLOAT', 'mode': 'NULLABLE'},
+        {'name': 'score_p90', 'type': 'FLOAT', 'mode': 'NULLABLE'},
+        {'name': 'score_p99', 'type': 'FLOAT', 'mode': 'NULLABLE'},
+        {'name': 'coverage_mean', 'type': 'FLOAT', 'mode': 'NULLABLE'},
+        {'name': 'coverage_min', 'type': 'FLOAT', 'mode': 'NULLABLE'},
+        {'name': 'coverage_max', 'type': 'FLOAT', 'mode': 'NULLABLE'},
+        {'name': 'coverage_p50', 'type': 'FLOAT', 'mode': 'NULLABLE'},
+        {'name': 'coverage_p90', 'type': 'FLOAT', 'mode': 'NULLABLE'},
+        {'name': 'coverage_p99', 'type': 'FLOAT', 'mode': 'NULLABLE'},
+        {'name': 'gaps_sum', 'type': 'INTEGER', 'mode': 'NULLABLE'},
+        {'name': 'overlaps_sum', 'type': 'INTEGER', 'mode': 'NULLABLE'},
+        {'name': 'avg_dur_mean', 'type': 'FLOAT', 'mode': 'NULLABLE'},
+        {'name': 'score_hist', 'type': 'RECORD', 'mode': 'REPEATED', 'fields': [
+            {'name': 'bin', 'type': 'INTEGER', 'mode': 'REQUIRED'},
+            {'name': 'n', 'type': 'INTEGER', 'mode': 'REQUIRED'},
+        ]},
+        {'name': 'coverage_hist', 'type': 'RECORD', 'mode': 'REPEATED', 'fields': [
+            {'name': 'bin', 'type': 'INTEGER', 'mode': 'REQUIRED'},
+            {'name': 'n', 'type': 'INTEGER', 'mode': 'REQUIRED'},
+        ]},
+        {'name': 'emitted_ts', 'type': 'TIMESTAMP', 'mode': 'NULLABLE'},
+    ]
+}
+
+
+def sketch_bin(value: float) -> int:
+    """
+    [0, 1] 값 → 히스토그램 구간 번호 (범위 밖 값은 양 끝 구간)
+    구간 경계 값(0.29 등)은 value * SKETCH_BINS가 부동소수점 오차로 경계보다 조금 작아지므로 1e-9만큼 올려서 내림
+    """
+    return min(SKETCH_BINS - 1, max(0, int(value * SKETCH_BINS + 1e-9)))
+
+
+def sketch_quantile(hist: dict, q: float) -> float:
+    """고정 구간 히스토그램({구간: 건수})의 q 분위수 (구간 안에서는 선형 보간)"""
+    total = sum(hist.values())
+    if not total:
+        return None
+    target = q * total
+    cumulative = 0
+    for i in sorted(hist):
+        n = hist[i]
+        if cumulative + n >= target:
+            return (i + (target - cumulative) / n) / SKETCH_BINS
+        cumulative += n
+    return 1.0
+
+
+def merge_sketch(into: dict, other: dict) -> dict:
+    """히스토그램 병합 (into에 구간별로 더함)"""
+    for i, n in other.items():
+        into[i] = into.get(i, 0) + n
+    return into
+
+
+def sketch_rows(hist: dict) -> list:
+    """{구간: 건수} → 테이블 REPEATED RECORD 값"""
+    return [{'bin': i, 'n': hist[i]} for i in sorted(hist)]
+
+
+class QualityRollupFn(beam.CombineFn):
+    """
+    QualityRow → 롤업 누산기
+    누산기: [count, score_sum, score_min, score_max, cov_sum, cov_min, cov_max, gaps_sum, overlaps_sum, dur_sum,
+             score_hist, cov_hist]
+    """
+
+    def create_accumulator(self):
+        inf = float('inf')
+        return [0, 0.0, inf, -inf, 0.0, inf, -inf, 0, 0, 0.0, {}, {}]
+
+    def add_input(self, acc, row):
+        acc[0] += 1
+        acc[1] += row.overallScore
+        acc[2] = min(acc[2], row.overallScore)
+        acc[3] = max(acc[3], row.overallScore)
+        acc[4] += row.coverage
+        acc[5] = min(acc[5], row.coverage)
+        acc[6] = max(acc[6], row.coverage)
+        acc[7] += row.gaps
+        acc[8] += row.overlaps
+        acc[9] += row.avgDur
+        score_bin, cov_bin = sketch_bin(row.overallScore), sketch_bin(row.coverage)
+        acc[10][score_bin] = acc[10].get(score_bin, 0) + 1
+        acc[11][cov_bin] = acc[11].get(cov_bin, 0) + 1
+        return acc
+
+    def merge_accumulators(self, accumulators):
+        accumulators = iter(accumulators)
+        merged = next(accumulators)
+        for acc in accumulators:
+            merged[0] += acc[0]
+            merged[1] += acc[1]
+            merged[2] = min(merged[2], acc[2])
+            merged[3] = max(merged[3], acc[3])
+            merged[4] += acc[4]
+            merged[5] = min(merged[5], acc[5])
+            merged[6] = max(merged[6], acc[6])
+            merged[7] += acc[7]
+            merged[8] += acc[8]
+            merged[9] += acc[9]
+            merge_sketch(merged[10], acc[10])
+            merge_sketch(merged[11], acc[11])
+        return merged
+
+    def extract_output(self, acc):
+        count = acc[0]
+        if not count:
+            return {'count': 0}
+        return {
+            'count': count,
+            'score_mean': acc[1] / count,
+            'score_min': acc[2],
+            'score_max': acc[3],
+            'score_p50': sketch_quantile(acc[10], 0.5),
+            'score_p90': sketch_quantile(acc[10], 0.9),
+            'score_p99': sketch_quantile(acc[10], 0.99),
+            'coverage_mean': acc[4] / count,
+            'coverage_min': acc[5],
+            'coverage_max': acc[6],
+            'coverage_p50': sketch_quantile(acc[11], 0.5),
+            'coverage_p90': sketch_quantile(acc[11], 0.9),
+            'coverage_p99': sketch_quantile(acc[11], 0.99),
+            'gaps_sum': acc[7],
+            'overlaps_sum': acc[8],
+            'avg_dur_mean': acc[9] / count,
+            'score_hist': sketch_rows(acc[10]),
+            'coverage_hist': sketch_rows(acc[11]),
+        }
+
+
+class FormatRollup(beam.DoFn):
+    """(team_id, 집계) + 윈도우/페인 정보 → 롤업 테이블 행"""
+
+    def __init__(self, granularity):
+        self.granularity = granularity
+
+    def process(self, element, window=beam.DoFn.WindowParam, pane=beam.DoFn.PaneInfoParam):
+        team_id, stats = element
+        yield {
+            'team_id': team_id,
+            'granularity': self.granularity,
+            'window_start': window.start.to_utc_datetime().isoformat() + 'Z',
+            'window_end': window.end.to_utc_datetime().isoformat() + 'Z',
+            'pane_timing': PaneInfoTiming.to_string(pane.timing),
+            'pane_index': pane.index,
+            **stats,
+            'emitted_ts': datetime.utcnow().isoformat() + 'Z',
+        }
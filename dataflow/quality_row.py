@@ -0,0 +1,106 @@
+"""
+Step 45/46 공통: 품질 이벤트 행 타입과 Beam 코더
+
+- QualityRow: 파이프라인 단계 사이에서 dict 대신 쓰는 고정 필드 행 (BigQuery 스키마와 같은 순서)
+- QualityPoint: 이상 탐지 GroupByKey 전에 필요한 열만 남긴 행 (team_id는 키로 빠짐)
+- 두 타입 모두 Beam 스키마 행(RowCoder)으로 등록하여, 셔플 시 키 문자열/타입 태그 없이 값만 직렬화
+- BigQuery 싱크 직전에만 to_bq()로 dict 변환 (Avro 임시 파일을 쓰는 백필은 to_bq_avro())
+
+Dataflow 워커에는 setup.py(--setup_file)로 이 모듈이 함께 배포됩니다.
+"""
+
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+import apache_beam as beam
+from apache_beam.io.gcp.pubsub import PubsubMessage
+
+
+def message_data(element) -> bytes:
+    """
+    Pub/Sub 입력 요소의 본문 bytes
+    ReadFromPubSub(with_attributes=True)는 PubsubMessage, with_attributes=False는 bytes를 내보냄
+    ((data, attributes) 튜플도 허용)
+    """
+    if isinstance(element, PubsubMessage):
+        return element.data
+    if isinstance(element, tuple):
+        return element[0]
+    return element
+
+
+def parse_ts(value: str) -> datetime:
+    """ISO 형식 문자열(Z 접미사 허용) → UTC datetime (시간대 없으면 UTC로 간주)"""
+    dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+class QualityRow(NamedTuple):
+    insert_id: str
+    team_id: str
+    report_id: str
+    event_ts: str  # ISO 형식 문자열
+    overallScore: float
+    coverage: float
+    gaps: int
+    overlaps: int
+    avgDur: float
+    source: str
+    load_ts: str
+
+    @classmethod
+    def from_payload(cls, payload: dict, source: str = 'stream') -> 'QualityRow':
+        """메시지 dict → QualityRow (타입 변환, 누락 지표는 0, load_ts는 현재 시각)"""
+        return cls(
+            insert_id=str(payload['insert_id']),
+            team_id=str(payload['team_id']),
+            report_id=str(payload['report_id']),
+            event_ts=payload['event_ts'],
+            overallScore=float(payload.get('overallScore', 0)),
+            coverage=float(payload.get('coverage', 0)),
+            gaps=int(payload.get('gaps', 0)),
+            overlaps=int(payload.get('overlaps', 0)),
+            avgDur=float(payload.get('avgDur', 0)),
+            source=str(payload.get('source', source)),
+            load_ts=datetime.utcnow().isoformat() + 'Z',
+        )
+
+    def to_bq(self) -> dict:
+        """BigQuery 싱크용 dict"""
+        return self._asdict()
+
+    def to_bq_avro(self) -> dict:
+        """BigQuery Avro 임시 파일용 dict (TIMESTAMP 열은 timestamp-micros로 쓰이도록 datetime, 파싱 실패 시 ValueError)"""
+        row = self._asdict()
+        row['event_ts'] = parse_ts(self.event_ts)
+        row['load_ts'] = parse_ts(self.load_ts)
+        return row
+
+    def point(self) -> 'QualityPoint':
+        return QualityPoint(self.report_id, self.event_ts, self.overallScore, self.coverage, self.gaps, self.overlaps)
+
+
+class QualityPoint(NamedTuple):
+    report_id: str
+    event_ts: str
+    overallScore: float
+    coverage: float
+    gaps: int
+    overlaps: int
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> 'QualityPoint':
+        """검증 전 메시지 dict → QualityPoint (누락 값은 빈 문자열 / 0)"""
+        return cls(
+            report_id=str(payload.get('report_id', '')),
+            event_ts=str(payload.get('event_ts', '')),
+            overallScore=float(payload.get('overallScore', 0)),
+            coverage=float(payload.get('coverage', 0)),
+            gaps=int(payload.get('gaps', 0)),
+            overlaps=int(payload.get('overlaps', 0)),
+        )
+
+
+# Beam 스키마 행으로 등록: 필드 순서대로 고정 레이아웃(null 비트맵 + 값)으로 직렬화하는 RowCoder 사용
+beam.coders.registry.register_coder(QualityRow, beam.coders.RowCoder)
+beam.coders.registry.register_coder(QualityPoint, beam.coders.RowCoder)
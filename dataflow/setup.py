@@ -0,0 +1,15 @@
+"""
+Dataflow 워커에 공통 모듈(quality_row.py 등)을 배포하기 위한 패키지 정의
+step45_46_fused는 step45_stream / step46_anomaly의 DoFn을 가져다 쓰므로 두 모듈도 함께 배포합니다.
+파이프라인 스크립트가 DataflowRunner로 실행될 때 --setup_file로 자동 지정됩니다.
+"""
+
+import setuptools
+
+setuptools.setup(
+    name='yago-dataflow',
+    version='0.1.0',
+    # --feature_store redis://... 일 때 워커에서 필요 (sqlite:///는 표준 라이브러리)
+    install_requires=['redis==5.0.4'],
+    py_modules=['feature_store', 'profiling', 'quality_row', 'quality_rollup', 'step45_stream', 'step46_anomaly'],
+)
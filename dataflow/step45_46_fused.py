@@ -0,0 +1,94 @@
+"""
+Step 45 + 46: 적재 + 이상 탐지 통합 스트리밍 파이프라인 (Apache Beam)
+Pub/Sub 구독을 한 번만 읽고, 파싱/검증/중복제거 단계를 공유한 뒤
+  ├─ BigQuery 싱크 (step45_stream과 동일: Storage Write API, Dead Letter, 팀별 롤업, 온라인 특징 저장소)
+  └─ Sliding Window 이상 탐지 → Pub/Sub 알림 (step46_anomaly와 동일)
+으로 분기합니다. 이벤트당 디코딩/파싱은 한 번, Dataflow 작업과 워커 풀도 하나입니다.
+
+step45_stream / step46_anomaly를 따로 띄우는 대신 쓰는 선택적 진입점이며, 인자는 두 스크립트의 인자를 합친 것입니다.
+이상 탐지 입력은 검증/중복제거를 거친 행이므로, 재전송된 중복 메시지가 윈도우 통계에 두 번 들어가지 않습니다.
+"""
+
+import argparse
+import os
+from typing import Tuple
+
+import apache_beam as beam
+from apache_beam.options.pipeline_options import PipelineOptions, GoogleCloudOptions, SetupOptions, StandardOptions
+from apache_beam.io.gcp.pubsub import ReadFromPubSub, WriteToPubSub
+
+from profiling import add_profile_arguments, profiled
+from quality_row import QualityPoint
+from step45_stream import add_sink_arguments, check_sink_arguments, ingest, write_features, write_rollups, write_rows
+from step46_anomaly import add_detector_arguments, detect_anomalies
+
+
+@beam.typehints.with_output_types(Tuple[str, QualityPoint])
+class KeyRowByTeam(beam.DoFn):
+    """QualityRow → (team_id, QualityPoint) (이미 검증된 행이므로 변환 실패 없음)"""
+
+    def process(self, row):
+        yield (row.team_id, row.point())
+
+
+def build_pipeline(messages, args):
+    """Pub/Sub 메시지 → 공유 ingest → (BigQuery 싱크 + 롤업 + 특징 저장소, 이상 탐지 알림) 갈래, 알림 PCollection 반환"""
+    rows = ingest(messages, args)
+    write_rows(rows, args)
+    write_rollups(rows, args)
+    write_features(rows, args)
+    return detect_anomalies(rows | 'KeyByTeam' >> beam.ParDo(profiled(KeyRowByTeam(), 'KeyByTeam', args)), args)
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--project', required=True, help='GCP 프로젝트 ID')
+    parser.add_argument('--region', default='asia-northeast3', help='GCP 리전')
+    parser.add_argument('--runner', default='DataflowRunner', help='Beam Runner')
+    parser.add_argument('--temp_location', required=True, help='GCS 임시 파일 위치')
+    parser.add_argument('--staging_location', required=True, help='GCS 스테이징 위치')
+    parser.add_argument('--input_subscription', required=True, help='Pub/Sub 구독 경로')
+    parser.add_argument('--max_num_workers', type=int, default=10, help='최대 워커 수')
+    parser.add_argument('--num_workers', type=int, default=1, help='초기 워커 수')
+    add_sink_arguments(parser)
+    add_detector_arguments(parser)
+    add_profile_arguments(parser)
+
+    args, beam_args = parser.parse_known_args(argv)
+    check_sink_arguments(parser, args)
+
+    # Pipeline Options 설정
+    options = PipelineOptions(beam_args, save_main_session=True, streaming=True)
+
+    # GCP 옵션
+    gcp = options.view_as(GoogleCloudOptions)
+    gcp.project = args.project
+    gcp.region = args.region
+    gcp.staging_location = args.staging_location
+    gcp.temp_location = args.temp_location
+
+    # 표준 옵션
+    std_options = options.view_as(StandardOptions)
+    std_options.runner = args.runner
+    std_options.streaming = True
+
+    # 워커 옵션
+    options.view_as(beam.options.pipeline_options.WorkerOptions).max_num_workers = args.max_num_workers
+    options.view_as(beam.options.pipeline_options.WorkerOptions).num_workers = args.num_workers
+
+    # 공통 모듈(quality_row.py, feature_store.py, step45_stream.py, step46_anomaly.py, profiling.py)을 Dataflow 워커에 배포
+    setup = options.view_as(SetupOptions)
+    if args.runner == 'DataflowRunner' and not setup.setup_file:
+        setup.setup_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'setup.py')
+
+    # 파이프라인 실행
+    with beam.Pipeline(options=options) as p:
+        messages = p | 'ReadFromPubSub' >> ReadFromPubSub(
+            subscription=args.input_subscription,
+            with_attributes=True
+        )
+        build_pipeline(messages, args) | 'PublishAlerts' >> WriteToPubSub(topic=args.output_topic)
+
+
+if __name__ == '__main__':
+    run()
@@ -1,16 +1,25 @@
 """
 Step 45: 백필 배치 파이프라인 (Apache Beam)
-GCS Firestore Export → BigQuery 배치 적재
+GCS Firestore Export → BigQuery 배치 적재 (FILE_LOADS)
+
+- 임시 파일은 기본 Avro (JSON보다 작고, 적재 시 파싱 비용이 낮음)
+- event_ts 기준 일 단위 파티션(table$YYYYMMDD)을 목적지로 나누어, 파티션별 적재 작업이 병렬로 실행됨
+- --sink local: GCS/BigQuery 대신 로컬 파일 시스템에 같은 형식의 임시 파일을 쓰고 파티션별 적재를 흉내냄
 """
 
 import json
 import argparse
-from datetime import datetime
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timezone
 
 import apache_beam as beam
-from apache_beam.options.pipeline_options import PipelineOptions, GoogleCloudOptions, StandardOptions
+from apache_beam.io.filesystems import FileSystems
+from apache_beam.io.gcp import bigquery_tools
+from apache_beam.options.pipeline_options import PipelineOptions, GoogleCloudOptions, SetupOptions, StandardOptions
 from apache_beam.io.gcp.bigquery import WriteToBigQuery, BigQueryDisposition
-from apache_beam.io.gcp.gcsfilesystem import GCSFileSystem
 
 try:
     from dateutil import parser as date_parser
@@ -18,9 +27,15 @@ except ImportError:
     # dateutil이 없으면 기본 datetime 사용
     date_parser = None
 
+from profiling import add_profile_arguments, profiled
+from quality_row import QualityRow, parse_ts
+
+logger = logging.getLogger(__name__)
+
 
+@beam.typehints.with_output_types(QualityRow)
 class ParseFirestoreExport(beam.DoFn):
-    """Firestore Export JSON 파일 파싱"""
+    """Firestore Export JSON 파일 파싱 → QualityRow"""
     
     def process(self, element):
         """
@@ -31,9 +46,8 @@ class ParseFirestoreExport(beam.DoFn):
             # GCS 파일 경로인 경우
             if isinstance(element, str) and element.startswith('gs://'):
                 # 파일 시스템에서 읽기
-                fs = GCSFileSystem()
-                with fs.open(element, 'r') as f:
-                    content = f.read()
+                with FileSystems.open(element) as f:
+                    content = f.read().decode('utf-8')
             else:
                 content = element
             
@@ -54,7 +68,7 @@ class ParseFirestoreExport(beam.DoFn):
                 yield from self._parse_document(data)
                 
         except Exception as e:
-            print(f"❌ 파싱 오류: {e}, 파일: {element}")
+            logger.warning('파싱 오류: %s, 파일: %s', e, element)
     
     def _parse_document(self, doc):
         """Firestore 문서를 파이프라인 형식으로 변환"""
@@ -116,24 +130,24 @@ class ParseFirestoreExport(beam.DoFn):
             insert_id = f"{team_id}-{report_id}-{ts}"
             
             # 출력 형식
-            output = {
-                'insert_id': insert_id,
-                'team_id': team_id,
-                'report_id': report_id,
-                'event_ts': createdAt,
-                'overallScore': float(metrics.get('overallScore', 0)),
-                'coverage': float(metrics.get('coverage', 0)),
-                'gaps': int(metrics.get('gaps', 0)),
-                'overlaps': int(metrics.get('overlaps', 0)),
-                'avgDur': float(metrics.get('avgDur', 0)),
-                'source': 'backfill',
-                'load_ts': datetime.utcnow().isoformat() + 'Z',
-            }
+            output = QualityRow(
+                insert_id=insert_id,
+                team_id=team_id,
+                report_id=report_id,
+                event_ts=createdAt,
+                overallScore=float(metrics.get('overallScore', 0)),
+                coverage=float(metrics.get('coverage', 0)),
+                gaps=int(metrics.get('gaps', 0)),
+                overlaps=int(metrics.get('overlaps', 0)),
+                avgDur=float(metrics.get('avgDur', 0)),
+                source='backfill',
+                load_ts=datetime.utcnow().isoformat() + 'Z',
+            )
             
             yield output
             
         except Exception as e:
-            print(f"❌ 문서 파싱 오류: {e}, 문서: {doc.get('name', 'unknown')}")
+            logger.warning('문서 파싱 오류: %s, 문서: %s', e, doc.get('name', 'unknown'))
     
     def _extract_value(self, field):
         """Firestore 필드 값 추출"""
@@ -186,6 +200,7 @@ class ParseFirestoreExport(beam.DoFn):
             return datetime.utcnow().isoformat() + 'Z'
 
 
+@beam.typehints.with_output_types(QualityRow)
 class DeduplicateByInsertId(beam.DoFn):
     """insert_id 기반 중복 제거 (배치용)"""
     
@@ -196,7 +211,7 @@ class DeduplicateByInsertId(beam.DoFn):
         self.seen = set()
     
     def process(self, row):
-        key = row['insert_id']
+        key = row.insert_id
         
         if key in self.seen:
             # 중복된 메시지, 무시
@@ -224,6 +239,189 @@ SCHEMA = {
 }
 
 
+TEMP_FILE_FORMATS = (bigquery_tools.FileFormat.AVRO, bigquery_tools.FileFormat.JSON)
+
+
+def to_bq_row(row, temp_file_format):
+    """QualityRow → 싱크 dict (Avro 임시 파일이면 TIMESTAMP 열을 datetime으로), 시각 변환 실패 행은 건너뜀"""
+    if temp_file_format != bigquery_tools.FileFormat.AVRO:
+        yield row.to_bq()
+        return
+    try:
+        yield row.to_bq_avro()
+    except ValueError as e:
+        logger.warning('시각 변환 오류: %s, insert_id: %s', e, row.insert_id)
+
+
+class DayPartition:
+    """행 → 목적지 테이블 (event_ts의 UTC 날짜 파티션 데코레이터, 시각을 알 수 없으면 기본 테이블)"""
+
+    def __init__(self, table):
+        self.table = table
+
+    def __call__(self, row):
+        ts = row['event_ts']
+        try:
+            day = (ts if isinstance(ts, datetime) else parse_ts(ts)).astimezone(timezone.utc).strftime('%Y%m%d')
+        except (TypeError, ValueError):
+            return self.table
+        return f"{self.table}${day}"
+
+
+class WriteTempFiles(beam.DoFn):
+    """
+    번들 안의 행을 목적지별 임시 파일(Avro/JSON)로 기록 (WriteToBigQuery FILE_LOADS의 임시 파일 단계와 같은 writer 사용)
+    출력: (목적지, (파일 경로, 행 수, 바이트))
+    """
+
+    def __init__(self, temp_dir, temp_file_format, schema, destination):
+        self.temp_dir = temp_dir
+        self.temp_file_format = temp_file_format
+        self.schema = schema
+        self.destination = destination
+
+    def start_bundle(self):
+        self.writers = {}
+
+    def _writer(self, dest):
+        if dest not in self.writers:
+            directory = FileSystems.join(self.temp_dir, dest.replace(':', '.'))
+            if not FileSystems.exists(directory):
+                try:
+                    FileSystems.mkdirs(directory)
+                except IOError:
+                    # 다른 워커가 먼저 만든 경우
+                    if not FileSystems.exists(directory):
+                        raise
+            path = FileSystems.join(directory, str(uuid.uuid4()))
+            if self.temp_file_format == bigquery_tools.FileFormat.AVRO:
+                writer = bigquery_tools.AvroRowWriter(FileSystems.create(path, 'application/avro'), self.schema)
+            else:
+                writer = bigquery_tools.JsonRowWriter(FileSystems.create(path, 'application/text'))
+            self.writers[dest] = [writer, path, 0]
+        return self.writers[dest]
+
+    def process(self, row):
+        entry = self._writer(self.destination(row))
+        entry[0].write(row)
+        entry[2] += 1
+
+    def finish_bundle(self):
+        for dest, (writer, path, rows) in self.writers.items():
+            writer.close()
+            size = FileSystems.match([path])[0].metadata_list[0].size_in_bytes
+            yield beam.transforms.window.GlobalWindows.windowed_value((dest, (path, rows, size)))
+        self.writers = {}
+
+
+class LocalLoadJob(beam.DoFn):
+    """
+    목적지 하나의 임시 파일 목록 → 적재 작업 1개를 흉내냄
+    - 임시 파일을 다시 읽어 {output_dir}/{테이블}/{파티션}.jsonl에 기록하고 임시 파일 삭제
+    - 작업 시간 = load_latency_ms + 바이트 / load_mb_per_sec (BigQuery 적재 작업의 고정 비용 + 처리량 흉내)
+    - 작업마다 {output_dir}/_load_jobs.jsonl에 목적지/파일 수/행 수/임시 바이트/소요 시간 기록
+    """
+
+    def __init__(self, output_dir, temp_file_format, load_latency_ms=0.0, load_mb_per_sec=0.0):
+        self.output_dir = output_dir
+        self.temp_file_format = temp_file_format
+        self.load_latency_ms = load_latency_ms
+        self.load_mb_per_sec = load_mb_per_sec
+
+    def _read(self, path):
+        import fastavro
+
+        with FileSystems.open(path) as f:
+            if self.temp_file_format == bigquery_tools.FileFormat.AVRO:
+                return list(fastavro.reader(f))
+            return [json.loads(line) for line in f.read().splitlines() if line]
+
+    def process(self, element):
+        dest, files = element
+        files = list(files)
+        t0 = time.perf_counter()
+        temp_bytes = sum(size for _, _, size in files)
+        delay = self.load_latency_ms / 1000 + (temp_bytes / (self.load_mb_per_sec * 1e6) if self.load_mb_per_sec else 0)
+        if delay:
+            time.sleep(delay)
+
+        table, _, partition = dest.partition('$')
+        table_dir = os.path.join(self.output_dir, table.replace(':', '.'))
+        os.makedirs(table_dir, exist_ok=True)
+        loaded = 0
+        with open(os.path.join(table_dir, f"{partition or '_base'}.jsonl"), 'a') as out:
+            for path, _, _ in files:
+                for row in self._read(path):
+                    out.write(json.dumps(row, ensure_ascii=False, default=str) + '\n')
+                    loaded += 1
+        FileSystems.delete([path for path, _, _ in files])
+
+        report = {
+            'destination': dest, 'files': len(files), 'rows': loaded,
+            'temp_bytes': temp_bytes, 'seconds': round(time.perf_counter() - t0, 3),
+        }
+        with open(os.path.join(self.output_dir, '_load_jobs.jsonl'), 'a') as f:
+            f.write(json.dumps(report) + '\n')
+        yield report
+
+
+class LocalFileLoads(beam.PTransform):
+    """
+    WriteToBigQuery(method=FILE_LOADS)의 로컬 대용: 임시 파일 기록 → 목적지별 GroupByKey → 목적지별 적재 작업
+    temp_dir에 로컬 경로를 주면 GCS 없이 임시 파일 형식/크기와 파티션별 병렬 적재를 확인할 수 있음
+    """
+
+    def __init__(self, table, schema, temp_dir, output_dir, temp_file_format=bigquery_tools.FileFormat.AVRO,
+                 partition_by_day=True, load_latency_ms=0.0, load_mb_per_sec=0.0):
+        super().__init__()
+        self.table = table
+        self.schema = schema
+        self.temp_dir = temp_dir
+        self.output_dir = output_dir
+        self.temp_file_format = temp_file_format
+        self.partition_by_day = partition_by_day
+        self.load_latency_ms = load_latency_ms
+        self.load_mb_per_sec = load_mb_per_sec
+
+    def expand(self, rows):
+        destination = DayPartition(self.table) if self.partition_by_day else (lambda _row, table=self.table: table)
+        return (
+            rows
+            | 'WriteTempFiles' >> beam.ParDo(
+                WriteTempFiles(self.temp_dir, self.temp_file_format, self.schema, destination)
+            )
+            | 'GroupFilesByDestination' >> beam.GroupByKey()
+            | 'LoadJobs' >> beam.ParDo(
+                LocalLoadJob(self.output_dir, self.temp_file_format, self.load_latency_ms, self.load_mb_per_sec)
+            )
+        )
+
+
+def build_sink(args):
+    """--sink에 따라 FILE_LOADS 싱크 또는 로컬 대용 싱크 생성"""
+    if args.sink == 'local':
+        return LocalFileLoads(
+            table=args.bq_table,
+            schema=SCHEMA,
+            temp_dir=args.temp_location,
+            output_dir=args.local_sink_dir,
+            temp_file_format=args.temp_file_format,
+            partition_by_day=args.partition_by_day,
+            load_latency_ms=args.local_load_latency_ms,
+            load_mb_per_sec=args.local_load_mb_per_sec,
+        )
+    return WriteToBigQuery(
+        # 파티션 목적지마다 별도 적재 작업이 만들어지고 병렬로 실행됨 (테이블은 event_ts 일 단위 파티션이어야 함)
+        table=DayPartition(args.bq_table) if args.partition_by_day else args.bq_table,
+        schema=SCHEMA,
+        write_disposition=BigQueryDisposition.WRITE_APPEND,
+        create_disposition=BigQueryDisposition.CREATE_NEVER,
+        custom_gcs_temp_location=args.temp_location,
+        method='FILE_LOADS',  # 배치는 FILE_LOADS 사용
+        temp_file_format=args.temp_file_format,
+    )
+
+
 def run(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument('--project', required=True, help='GCP 프로젝트 ID')
@@ -235,6 +433,19 @@ def run(argv=None):
     parser.add_argument('--bq_table', default='yago_reports.quality_stream', help='BigQuery 테이블')
     parser.add_argument('--max_num_workers', type=int, default=10, help='최대 워커 수')
     parser.add_argument('--num_workers', type=int, default=2, help='초기 워커 수')
+    # FILE_LOADS 옵션
+    parser.add_argument('--temp_file_format', default=bigquery_tools.FileFormat.AVRO, choices=TEMP_FILE_FORMATS,
+                        help='적재용 임시 파일 형식')
+    parser.add_argument('--partition_by_day', action=argparse.BooleanOptionalAction, default=True,
+                        help='event_ts 일 단위 파티션별로 목적지/적재 작업 분리 (--no-partition_by_day: 테이블 하나로 적재)')
+    # 로컬 대용 싱크 (--temp_location에 로컬 경로 사용)
+    parser.add_argument('--sink', default='bigquery', choices=['bigquery', 'local'], help='싱크 종류')
+    parser.add_argument('--local_sink_dir', default='/tmp/bq_local_loads', help='--sink local: 적재 결과 디렉터리')
+    parser.add_argument('--local_load_latency_ms', type=float, default=0.0,
+                        help='--sink local: 적재 작업당 고정 지연 (ms)')
+    parser.add_argument('--local_load_mb_per_sec', type=float, default=0.0,
+                        help='--sink local: 적재 작업 처리량 (MB/s, 0: 제한 없음)')
+    add_profile_arguments(parser)
     
     args, beam_args = parser.parse_known_args(argv)
     
@@ -256,6 +467,11 @@ def run(argv=None):
     # 워커 옵션
     options.view_as(beam.options.pipeline_options.WorkerOptions).max_num_workers = args.max_num_workers
     options.view_as(beam.options.pipeline_options.WorkerOptions).num_workers = args.num_workers
+
+    # 공통 모듈(quality_row.py, profiling.py)을 Dataflow 워커에 배포
+    setup = options.view_as(SetupOptions)
+    if args.runner == 'DataflowRunner' and not setup.setup_file:
+        setup.setup_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'setup.py')
     
     # 파이프라인 실행
     with beam.Pipeline(options=options) as p:
@@ -265,16 +481,10 @@ def run(argv=None):
                 args.input_pattern,
                 coder=beam.coders.StrUtf8Coder()
             )
-            | 'ParseFirestoreExport' >> beam.ParDo(ParseFirestoreExport())
-            | 'DedupInsertId' >> beam.ParDo(DeduplicateByInsertId())
-            | 'WriteToBQ' >> WriteToBigQuery(
-                table=args.bq_table,
-                schema=SCHEMA,
-                write_disposition=BigQueryDisposition.WRITE_APPEND,
-                create_disposition=BigQueryDisposition.CREATE_NEVER,
-                custom_gcs_temp_location=args.temp_location,
-                method='FILE_LOADS',  # 배치는 FILE_LOADS 사용
-            )
+            | 'ParseFirestoreExport' >> beam.ParDo(profiled(ParseFirestoreExport(), 'ParseFirestoreExport', args))
+            | 'DedupInsertId' >> beam.ParDo(profiled(DeduplicateByInsertId(), 'DedupInsertId', args))
+            | 'ToBQRow' >> beam.FlatMap(to_bq_row, args.temp_file_format)
+            | 'WriteToBQ' >> build_sink(args)
         )
 
 
@@ -1,36 +1,57 @@
 """
 Step 45: Dataflow 파이프라인 (Apache Beam)
-Pub/Sub → 변환/검증/중복제거 → BigQuery 스트리밍
+Pub/Sub → 변환/검증/중복제거 → BigQuery 스트리밍 (Storage Write API) + 팀별 분/시간 롤업 테이블
+                                + 팀별 온라인 특징 저장소 (--feature_store, step49 /predict_for_team이 읽음)
+싱크에서 실패한 행은 Dead Letter 토픽으로 보내고, --sink local로 같은 인터페이스의 로컬 대용 싱크를 쓸 수 있습니다.
 """
 
 import json
 import argparse
 import hashlib
+import logging
+import os
+import threading
 import time
+import typing
+import zlib
+from collections import OrderedDict
 from datetime import datetime
 
 import apache_beam as beam
-from apache_beam.options.pipeline_options import PipelineOptions, GoogleCloudOptions, StandardOptions
-from apache_beam.io.gcp.bigquery import WriteToBigQuery, BigQueryDisposition
-from apache_beam.io.gcp.pubsub import ReadFromPubSub
+from apache_beam.coders import PickleCoder
+from apache_beam.metrics import Metrics
+from apache_beam.transforms.trigger import AccumulationMode, AfterCount, AfterProcessingTime, AfterWatermark
+from apache_beam.options.pipeline_options import PipelineOptions, GoogleCloudOptions, SetupOptions, StandardOptions
+from apache_beam.io.gcp.bigquery import WriteToBigQuery, BigQueryDisposition, WriteResult
+from apache_beam.io.gcp.pubsub import PubsubMessage, ReadFromPubSub, WriteToPubSub
+from apache_beam.transforms.userstate import ReadModifyWriteStateSpec
 
+from feature_store import is_late, open_feature_store, update_features
+from profiling import add_profile_arguments, profiled
+from quality_row import QualityRow, message_data, parse_ts
+from quality_rollup import GRANULARITIES, ROLLUP_SCHEMA, FormatRollup, QualityRollupFn
 
+logger = logging.getLogger(__name__)
+
+
+@beam.typehints.with_output_types(QualityRow)
 class ParseAndValidate(beam.DoFn):
-    """Pub/Sub 메시지 파싱 및 검증"""
+    """
+    Pub/Sub 메시지 파싱 및 검증 → QualityRow
+    파싱/검증에 실패한 메시지는 싱크 실패 행과 같은 형식({'error_message', 'failed_row'})으로 failed 출력
+    (failed_row는 JSON 객체로 파싱되었으면 payload dict, 아니면 원본 bytes)
+    """
+
+    FAILED = 'failed'
     
     def process(self, element):
+        data = message_data(element)
+        payload = None
         try:
-            # Pub/Sub 메시지 파싱
-            if isinstance(element, tuple):
-                # (data, attributes) 형식
-                data_bytes, attributes = element
-                data_str = data_bytes.decode('utf-8')
-            else:
-                data_str = element.decode('utf-8')
-                attributes = {}
-            
             # JSON 파싱
-            payload = json.loads(data_str)
+            payload = json.loads(data.decode('utf-8'))
+            if not isinstance(payload, dict):
+                raise ValueError(f"JSON 객체가 아님: {type(payload).__name__}")
             
             # 필수 필드 검증
             required_fields = ['insert_id', 'team_id', 'report_id', 'event_ts']
@@ -38,35 +59,26 @@ class ParseAndValidate(beam.DoFn):
                 if field not in payload:
                     raise ValueError(f"필수 필드 누락: {field}")
             
-            # 타입 검증 및 변환
-            validated = {
-                'insert_id': str(payload['insert_id']),
-                'team_id': str(payload['team_id']),
-                'report_id': str(payload['report_id']),
-                'event_ts': payload['event_ts'],  # ISO 형식 문자열
-                'overallScore': float(payload.get('overallScore', 0)),
-                'coverage': float(payload.get('coverage', 0)),
-                'gaps': int(payload.get('gaps', 0)),
-                'overlaps': int(payload.get('overlaps', 0)),
-                'avgDur': float(payload.get('avgDur', 0)),
-                'source': str(payload.get('source', 'stream')),
-                'load_ts': datetime.utcnow().isoformat() + 'Z',  # 현재 시간
-            }
+            # 타입 검증 및 변환 (load_ts는 현재 시간)
+            validated = QualityRow.from_payload(payload, source='stream')
             
             # 값 범위 검증
-            if not (0 <= validated['overallScore'] <= 1):
-                raise ValueError(f"overallScore 범위 오류: {validated['overallScore']}")
-            if not (0 <= validated['coverage'] <= 1):
-                raise ValueError(f"coverage 범위 오류: {validated['coverage']}")
+            if not (0 <= validated.overallScore <= 1):
+                raise ValueError(f"overallScore 범위 오류: {validated.overallScore}")
+            if not (0 <= validated.coverage <= 1):
+                raise ValueError(f"coverage 범위 오류: {validated.coverage}")
             
             yield validated
             
         except Exception as e:
-            # 오류 로깅 (실제 운영에서는 Dead Letter Queue로 전송)
-            print(f"❌ 파싱/검증 오류: {e}, 데이터: {data_str if 'data_str' in locals() else element}")
-            # 오류 메시지는 무시하고 계속 진행
+            # 버리지 않고 Dead Letter로 (원인 수정 후 재처리)
+            yield beam.pvalue.TaggedOutput(self.FAILED, {
+                'error_message': f"파싱/검증 오류: {type(e).__name__}: {e}",
+                'failed_row': payload if isinstance(payload, dict) else data,
+            })
 
 
+@beam.typehints.with_output_types(QualityRow)
 class DeduplicateByInsertId(beam.DoFn):
     """insert_id 기반 중복 제거 (메모리 캐시)"""
     
@@ -75,18 +87,20 @@ class DeduplicateByInsertId(beam.DoFn):
         self.seen = None
     
     def setup(self):
-        # 단순 메모리 캐시 (작은 규모)
+        # 단순 메모리 캐시 (작은 규모, 삽입 순서 = 시간 순서)
         # 운영 환경에서는 Redis/Spanner/Bigtable 기반 Bloom/Cache로 교체 권장
-        self.seen = {}
+        self.seen = OrderedDict()
     
     def process(self, row):
-        key = row['insert_id']
+        key = row.insert_id
         now = time.time()
         
-        # TTL 청소
-        for k, v in list(self.seen.items()):
-            if now - v > self.ttl_sec:
-                del self.seen[k]
+        # TTL 청소 (가장 오래된 항목부터 만료된 것만 제거, 요소당 상각 O(1))
+        while self.seen:
+            oldest, seen_at = next(iter(self.seen.items()))
+            if now - seen_at <= self.ttl_sec:
+                break
+            self.seen.popitem(last=False)
         
         # 중복 체크
         if key in self.seen:
@@ -116,6 +130,465 @@ SCHEMA = {
 }
 
 
+# 로컬 대용 싱크: 한 번의 append 요청에 담는 최대 행 수 (Storage Write API append 요청 10MB 제한에 대응)
+LOCAL_APPEND_MAX_ROWS = 10000
+
+
+class ValidateAgainstSchema(beam.DoFn):
+    """BigQuery 스키마 기준 행 검증 (로컬 싱크용), 실패 행은 Storage Write API와 같은 형식으로 failed 출력"""
+
+    FAILED = 'failed'
+
+    def __init__(self, schema):
+        self.fields = [(f['name'], f['type'], f['mode']) for f in schema['fields']]
+
+    @staticmethod
+    def _type_error(value, bq_type):
+        if bq_type == 'STRING':
+            ok = isinstance(value, str)
+        elif bq_type == 'INTEGER':
+            ok = isinstance(value, int) and not isinstance(value, bool)
+        elif bq_type == 'FLOAT':
+            ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+        elif bq_type == 'TIMESTAMP':
+            try:
+                datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+                ok = True
+            except ValueError:
+                ok = False
+        else:
+            ok = True
+        return None if ok else f"{bq_type} 형식이 아님: {value!r}"
+
+    def _error(self, value, bq_type, mode):
+        if value is None:
+            return "필수 필드 누락" if mode == 'REQUIRED' else None
+        if mode == 'REPEATED':
+            if not isinstance(value, list):
+                return f"REPEATED 필드가 목록이 아님: {value!r}"
+            return next((e for e in (self._type_error(v, bq_type) for v in value) if e), None)
+        return self._type_error(value, bq_type)
+
+    def process(self, row):
+        for name, bq_type, mode in self.fields:
+            error = self._error(row.get(name), bq_type, mode)
+            if error:
+                yield beam.pvalue.TaggedOutput(self.FAILED, {'error_message': f"{name}: {error}", 'failed_row': row})
+                return
+        yield row
+
+
+class LocalAppend(beam.DoFn):
+    """
+    로컬 파일을 Storage Write API 쓰기 스트림처럼 사용
+    - 입력: (스트림 키, 행 목록) 배치 → 스트림 파일에 append 1회
+    - exactly-once 모드가 아니면(at-least-once) 번들 단위로 모아 기본 스트림에 append
+    - append마다 append_latency_ms만큼 대기하여 요청 왕복 비용을 흉내냄
+    - append마다 {table}/_appends.jsonl에 스트림/행 수/바이트 기록
+    """
+
+    _locks: dict = {}
+    _locks_guard = threading.Lock()
+
+    def __init__(self, output_dir, table, append_latency_ms=0.0, batched=True):
+        self.output_dir = output_dir
+        self.table = table
+        self.append_latency_ms = append_latency_ms
+        self.batched = batched
+        self.appends = Metrics.counter(self.__class__, 'appends')
+        self.rows = Metrics.counter(self.__class__, 'rows')
+        self.bytes = Metrics.counter(self.__class__, 'bytes')
+        self.append_rows = Metrics.distribution(self.__class__, 'append_rows')
+
+    def start_bundle(self):
+        self.buffer = []
+
+    def _append(self, stream, rows):
+        table_dir = os.path.join(self.output_dir, self.table.replace(':', '.'))
+        path = os.path.join(table_dir, f"stream-{stream}.jsonl")
+        data = ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode('utf-8')
+        with LocalAppend._locks_guard:
+            lock = LocalAppend._locks.setdefault(path, threading.Lock())
+        with lock:
+            os.makedirs(table_dir, exist_ok=True)
+            with open(path, 'ab') as f:
+                f.write(data)
+        # append 기록 (DirectRunner는 타이머로 방출된 번들의 메트릭을 누락하므로 벤치마크는 이 로그를 집계)
+        entry = json.dumps({'stream': str(stream), 'rows': len(rows), 'bytes': len(data), 'ts': time.time()})
+        with open(os.path.join(table_dir, '_appends.jsonl'), 'a') as f:
+            f.write(entry + '\n')
+        if self.append_latency_ms:
+            time.sleep(self.append_latency_ms / 1000)
+        self.appends.inc()
+        self.rows.inc(len(rows))
+        self.bytes.inc(len(data))
+        self.append_rows.update(len(rows))
+
+    def process(self, element):
+        if self.batched:
+            key, rows = element
+            stream = key if isinstance(key, int) else f"auto-{zlib.crc32(repr(key).encode()) % 10000:04d}"
+            self._append(stream, list(rows))
+        else:
+            self.buffer.append(element)
+            if len(self.buffer) >= LOCAL_APPEND_MAX_ROWS:
+                self._append('default', self.buffer)
+                self.buffer = []
+
+    def finish_bundle(self):
+        if not self.batched and self.buffer:
+            self._append('default', self.buffer)
+            self.buffer = []
+
+
+class LocalStorageWrite(beam.PTransform):
+    """
+    WriteToBigQuery(method=STORAGE_WRITE_API)의 로컬 대용 (같은 옵션, 같은 failed_rows_with_errors 출력)
+    BigQuery 없이 배치/샤딩 설정에 따른 append 횟수와 처리량을 벤치마크하는 용도
+    - exactly-once: 스트림(num_streams개 고정 또는 auto-sharding)별로 모아 triggering_frequency마다 또는 가득 차면 append
+    - at-least-once: 셔플 없이 번들 단위로 기본 스트림에 append
+    """
+
+    def __init__(self, table, schema, output_dir, triggering_frequency=5, num_streams=0,
+                 auto_sharding=False, at_least_once=False, append_latency_ms=0.0):
+        super().__init__()
+        self.table = table
+        self.schema = schema
+        self.output_dir = output_dir
+        self.triggering_frequency = triggering_frequency
+        self.num_streams = num_streams
+        self.auto_sharding = auto_sharding
+        self.at_least_once = at_least_once
+        self.append_latency_ms = append_latency_ms
+
+    def expand(self, rows):
+        checked = rows | 'Validate' >> beam.ParDo(ValidateAgainstSchema(self.schema)).with_outputs(
+            ValidateAgainstSchema.FAILED, main='valid'
+        )
+        valid = checked.valid
+        if self.at_least_once:
+            valid | 'AppendDefaultStream' >> beam.ParDo(
+                LocalAppend(self.output_dir, self.table, self.append_latency_ms, batched=False)
+            )
+        else:
+            if self.auto_sharding:
+                batches = (
+                    valid
+                    | 'KeyByTable' >> beam.WithKeys(lambda _row, table=self.table: table).with_output_types(
+                        typing.Tuple[str, dict]
+                    )
+                    | 'BatchAutoSharded' >> beam.GroupIntoBatches.WithShardedKey(
+                        LOCAL_APPEND_MAX_ROWS, max_buffering_duration_secs=self.triggering_frequency
+                    )
+                )
+            else:
+                streams = max(1, self.num_streams)
+                batches = (
+                    valid
+                    | 'KeyByStream' >> beam.WithKeys(
+                        lambda row, n=streams: zlib.crc32(row['insert_id'].encode('utf-8')) % n
+                    ).with_output_types(typing.Tuple[int, dict])
+                    | 'BatchPerStream' >> beam.GroupIntoBatches(
+                        LOCAL_APPEND_MAX_ROWS, max_buffering_duration_secs=self.triggering_frequency
+                    )
+                )
+            batches | 'AppendStream' >> beam.ParDo(LocalAppend(self.output_dir, self.table, self.append_latency_ms))
+
+        failed = checked[ValidateAgainstSchema.FAILED]
+        return WriteResult(
+            method=WriteToBigQuery.Method.STORAGE_WRITE_API,
+            failed_rows=failed | 'FailedRows' >> beam.Map(lambda f: f['failed_row']),
+            failed_rows_with_errors=failed,
+        )
+
+
+def build_sink(args, table=None, schema=SCHEMA):
+    """--sink에 따라 Storage Write API 싱크 또는 로컬 대용 싱크 생성 (둘 다 failed_rows_with_errors 제공)"""
+    table = table or args.bq_table
+    if args.sink == 'local':
+        return LocalStorageWrite(
+            table=table,
+            schema=schema,
+            output_dir=args.local_sink_dir,
+            triggering_frequency=args.triggering_frequency,
+            num_streams=args.num_storage_api_streams,
+            auto_sharding=args.with_auto_sharding,
+            at_least_once=args.use_at_least_once,
+            append_latency_ms=args.local_append_latency_ms,
+        )
+    return WriteToBigQuery(
+        table=table,
+        schema=schema,
+        write_disposition=BigQueryDisposition.WRITE_APPEND,
+        create_disposition=BigQueryDisposition.CREATE_NEVER,
+        custom_gcs_temp_location=args.temp_location,
+        method='STORAGE_WRITE_API',
+        triggering_frequency=args.triggering_frequency,
+        with_auto_sharding=args.with_auto_sharding,
+        num_storage_api_streams=args.num_storage_api_streams,
+        use_at_least_once=args.use_at_least_once,
+    )
+
+
+class FormatDeadLetter(beam.DoFn):
+    """
+    파싱/검증 실패 메시지, 싱크 실패 행 → Dead Letter Pub/Sub 메시지
+    data는 원본 행 JSON(입력 메시지와 같은 필드, JSON이 아니었던 메시지는 원본 bytes 그대로)이라,
+    원인 수정 후 DLQ 구독을 --input_subscription으로 다시 흘려 재처리 가능
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.dead_letters = Metrics.counter(self.__class__, 'dead_letter_rows')
+
+    def process(self, failed):
+        self.dead_letters.inc()
+        row = failed['failed_row']
+        error = str(failed['error_message'])
+        insert_id = row.get('insert_id') if isinstance(row, dict) else None
+        logger.warning('Dead Letter: %s, insert_id: %s', error, insert_id)
+        yield PubsubMessage(
+            data=row if isinstance(row, bytes) else json.dumps(row, ensure_ascii=False, default=str).encode('utf-8'),
+            attributes={
+                'error_message': error[:1024],
+                'table': self.table,
+                'failed_at': datetime.utcnow().isoformat() + 'Z',
+            },
+        )
+
+
+class UpdateTeamFeatures(beam.DoFn):
+    """
+    (team_id, QualityRow) → (team_id, 특징 dict)
+    팀별 상태(최신 값 + EWMA)를 Beam 상태로 유지하므로 워커 재시작/리밸런싱 후에도 이어서 갱신됨
+    이미 반영한 이벤트보다 event_ts가 이른 이벤트는 건수만 상태에 세고(feature_late_events) 저장소에 쓰지 않음
+    """
+
+    FEATURES = ReadModifyWriteStateSpec('features', PickleCoder())
+
+    def __init__(self, alpha=0.1):
+        self.alpha = alpha
+        self.late_events = Metrics.counter(self.__class__, 'feature_late_events')
+
+    def process(self, element, state=beam.DoFn.StateParam(FEATURES)):
+        team_id, row = element
+        prev = state.read()
+        features = update_features(prev, row, self.alpha)
+        state.write(features)
+        if is_late(prev, row):
+            self.late_events.inc()
+            return
+        yield team_id, features
+
+
+class WriteFeatureStore(beam.DoFn):
+    """
+    (team_id, 특징 dict) → 온라인 특징 저장소 (feature_store.py)
+    번들 안에서는 팀별 마지막 값만 남겨 finish_bundle에서 한 번에 upsert (이벤트마다 왕복하지 않음)
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.writes = Metrics.counter(self.__class__, 'feature_store_writes')
+        self.teams = Metrics.counter(self.__class__, 'feature_store_teams')
+
+    def setup(self):
+        self.store = open_feature_store(self.url)
+
+    def start_bundle(self):
+        self.pending = {}
+
+    def process(self, element):
+        team_id, features = element
+        self.pending[team_id] = features
+
+    def finish_bundle(self):
+        if self.pending:
+            self.store.put_many(self.pending)
+            self.writes.inc()
+            self.teams.inc(len(self.pending))
+            self.pending = {}
+
+    def teardown(self):
+        self.store.close()
+
+
+def add_sink_arguments(parser):
+    """BigQuery 싱크 / Dead Letter / 로컬 대용 싱크 인자 (step45_46_fused와 공유)"""
+    parser.add_argument('--bq_table', default='yago_reports.quality_stream', help='BigQuery 테이블')
+    # Storage Write API 싱크 튜닝
+    parser.add_argument('--triggering_frequency', type=int, default=5,
+                        help='exactly-once 모드에서 스트림을 커밋하는 주기 (초)')
+    parser.add_argument('--num_storage_api_streams', type=int, default=0,
+                        help='쓰기 스트림 수 (0: 러너 기본값, --with_auto_sharding과 함께 쓰지 않음)')
+    parser.add_argument('--with_auto_sharding', action='store_true', help='쓰기 스트림 수를 러너가 동적으로 결정')
+    parser.add_argument('--use_at_least_once', action='store_true',
+                        help='at-least-once 모드 (기본 스트림, 더 싸고 지연이 짧지만 중복 가능)')
+    parser.add_argument('--dead_letter_topic', help='파싱/검증 실패 메시지와 싱크 실패 행을 보낼 Pub/Sub 토픽 (없으면 로그만)')
+    # 로컬 대용 싱크 (오프라인 벤치마크)
+    parser.add_argument('--sink', default='bigquery', choices=['bigquery', 'local'], help='싱크 종류')
+    parser.add_argument('--local_sink_dir', default='/tmp/bq_local_sink', help='--sink local: 스트림 파일 디렉터리')
+    parser.add_argument('--local_append_latency_ms', type=float, default=0.0,
+                        help='--sink local: append 요청당 흉내낼 지연 (ms)')
+    # 팀별 롤업 (scripts/create_bigquery_rollup_table.sql)
+    parser.add_argument('--rollup_table', default='yago_reports.quality_rollup', help='롤업 BigQuery 테이블')
+    parser.add_argument('--rollup_granularities', default='minute,hour',
+                        help=f"롤업 단위 (쉼표 구분, {'/'.join(GRANULARITIES)}, 빈 값이면 롤업 끔)")
+    parser.add_argument('--rollup_early_firing_sec', type=int, default=30,
+                        help='윈도우가 닫히기 전 중간 결과를 내보내는 주기 (초, 0이면 조기 발화 없음)')
+    parser.add_argument('--rollup_allowed_lateness_sec', type=int, default=3600,
+                        help='윈도우가 닫힌 뒤 늦은 데이터를 반영하는 기간 (초)')
+    # 온라인 특징 저장소 (feature_store.py, step49 /predict_for_team이 읽음)
+    parser.add_argument('--feature_store', default='',
+                        help='팀별 특징 저장소 URL (sqlite:///경로 또는 redis://호스트:포트/DB, 빈 값이면 끔)')
+    parser.add_argument('--feature_ewma_alpha', type=float, default=0.1,
+                        help='특징 지수 이동 평균 가중치 (0~1, 클수록 최근 리포트 비중이 큼)')
+
+
+def check_sink_arguments(parser, args):
+    """싱크 인자 조합 검증"""
+    if args.with_auto_sharding and args.num_storage_api_streams:
+        parser.error('--with_auto_sharding과 --num_storage_api_streams는 함께 쓸 수 없습니다')
+    unknown = [g for g in args.rollup_granularities.split(',') if g and g not in GRANULARITIES]
+    if unknown:
+        parser.error(f"알 수 없는 롤업 단위: {', '.join(unknown)}")
+    if args.feature_store and not args.feature_store.startswith(('sqlite:///', 'redis://', 'rediss://')):
+        parser.error('--feature_store는 sqlite:///경로 또는 redis://호스트:포트/DB 형식이어야 합니다')
+    if not 0 < args.feature_ewma_alpha <= 1:
+        parser.error('--feature_ewma_alpha는 0보다 크고 1 이하여야 합니다')
+
+
+def dead_letter(failed, table, args, label=''):
+    """{'error_message', 'failed_row'} → Dead Letter 메시지 (args.dead_letter_topic이 있으면 게시), 메시지 PCollection 반환"""
+    messages = failed | f'Format{label}DeadLetter' >> beam.ParDo(FormatDeadLetter(table))
+    topic = getattr(args, 'dead_letter_topic', None)
+    if topic:
+        messages | f'Publish{label}DeadLetter' >> WriteToPubSub(topic=topic, with_attributes=True)
+    return messages
+
+
+def ingest(messages, args=None):
+    """
+    Pub/Sub 메시지 → 파싱/검증 → insert_id 중복 제거 → QualityRow (args.profile이면 단계별 프로파일링)
+    파싱/검증 실패 메시지는 싱크 실패 행과 같은 Dead Letter 토픽으로
+    """
+    parsed = messages | 'ParseValidate' >> beam.ParDo(
+        profiled(ParseAndValidate(), 'ParseValidate', args)
+    ).with_outputs(ParseAndValidate.FAILED, main='rows')
+    dead_letter(parsed[ParseAndValidate.FAILED], getattr(args, 'bq_table', ''), args, 'Parse')
+    return parsed.rows | 'DedupInsertId' >> beam.ParDo(
+        profiled(DeduplicateByInsertId(ttl_sec=3600), 'DedupInsertId', args)
+    )
+
+
+def write_rows(rows, args):
+    """QualityRow → BigQuery(또는 로컬 대용) 싱크, 싱크 실패 행 → Dead Letter"""
+    result = (
+        rows
+        | 'ToBQRow' >> beam.Map(QualityRow.to_bq)
+        | 'WriteToBQ' >> build_sink(args)
+    )
+
+    # 싱크 실패 행 → Dead Letter (일시 오류는 싱크 내부에서 재시도되므로 여기로 오는 것은 스키마/값 오류)
+    dead_letter(result.failed_rows_with_errors, args.bq_table, args)
+    return result
+
+
+class RollupEventTime(beam.DoFn):
+    """
+    QualityRow의 타임스탬프를 event_ts로 교체 (ReadFromPubSub의 기본 타임스탬프는 게시 시각, 파싱할 수 없으면 유지)
+    단 롤업 윈도우가 이미 닫혔을 행은 TOO_LATE 출력으로 분리
+    - 닫힘 기준: 윈도우 끝 + allowed_lateness가 입력 타임스탬프(게시 시각, 워터마크는 이보다 앞설 수 없음) 이전
+    - WindowInto / CombinePerKey는 지연 허용을 넘긴 데이터를 세지 않고 버리므로, 버려질 행을 여기서 먼저 세어 둠
+      (rollup_dropped_late_<단위> 카운터, 원본 테이블에는 이미 기록되므로 롤업에서만 빠짐)
+    """
+
+    TOO_LATE = 'too_late'
+
+    def __init__(self, granularity, allowed_lateness_sec):
+        self.window_sec = GRANULARITIES[granularity]
+        self.allowed_lateness_sec = allowed_lateness_sec
+        self.dropped = Metrics.counter(self.__class__, f'rollup_dropped_late_{granularity}')
+
+    def process(self, row, timestamp=beam.DoFn.TimestampParam):
+        try:
+            event_sec = parse_ts(row.event_ts).timestamp()
+        except (AttributeError, ValueError):
+            yield beam.window.TimestampedValue(row, timestamp)
+            return
+        window_end = event_sec - event_sec % self.window_sec + self.window_sec
+        if window_end + self.allowed_lateness_sec <= float(timestamp):
+            self.dropped.inc()
+            yield beam.pvalue.TaggedOutput(self.TOO_LATE, row)
+            return
+        yield beam.window.TimestampedValue(row, event_sec)
+
+
+def write_rollups(rows, args):
+    """
+    QualityRow → 팀별 분/시간 롤업 → 롤업 테이블
+    - 이벤트 시각(event_ts) 기준 고정 윈도우이므로 지연 허용(rollup_allowed_lateness_sec)도 이벤트 시각 기준
+      (게시가 늦은 이벤트는 워터마크 뒤에 도착한 늦은 데이터로 처리되어 해당 윈도우를 다시 발화,
+       지연 허용을 넘긴 이벤트는 RollupEventTime이 롤업에서 빼고 카운터로 셈)
+    - 고정 윈도우 + 조기 발화(rollup_early_firing_sec마다, 0이면 없음) + 늦은 데이터마다 재발화, 누적 모드
+    - CombinePerKey는 셔플 전에 부분 집계(combiner lifting)하므로 셔플되는 것은 워커별 누산기뿐
+    """
+    granularities = [g for g in args.rollup_granularities.split(',') if g]
+    if not granularities:
+        return None
+
+    rollups = []
+    for granularity in granularities:
+        timed = rows | f'RollupEventTime-{granularity}' >> beam.ParDo(
+            RollupEventTime(granularity, args.rollup_allowed_lateness_sec)
+        ).with_outputs(RollupEventTime.TOO_LATE, main='rows')
+        rollups.append(
+            timed.rows
+            | f'KeyRollupByTeam-{granularity}' >> beam.Map(lambda row: (row.team_id, row)).with_output_types(
+                typing.Tuple[str, QualityRow]
+            )
+            | f'RollupWindow-{granularity}' >> beam.WindowInto(
+                beam.window.FixedWindows(GRANULARITIES[granularity]),
+                trigger=AfterWatermark(
+                    early=AfterProcessingTime(args.rollup_early_firing_sec) if args.rollup_early_firing_sec else None,
+                    late=AfterCount(1),
+                ),
+                accumulation_mode=AccumulationMode.ACCUMULATING,
+                allowed_lateness=args.rollup_allowed_lateness_sec,
+            )
+            | f'Rollup-{granularity}' >> beam.CombinePerKey(QualityRollupFn())
+            | f'FormatRollup-{granularity}' >> beam.ParDo(
+                profiled(FormatRollup(granularity), f'FormatRollup-{granularity}', args)
+            )
+        )
+
+    result = (
+        rollups
+        | 'FlattenRollups' >> beam.Flatten()
+        | 'RollupGlobalWindow' >> beam.WindowInto(beam.window.GlobalWindows())
+        | 'WriteRollups' >> build_sink(args, args.rollup_table, ROLLUP_SCHEMA)
+    )
+    # 롤업 행은 입력 메시지 형식이 아니므로 재처리용 DLQ로 보내지 않고 로그/카운터만 남김
+    result.failed_rows_with_errors | 'FormatRollupDeadLetter' >> beam.ParDo(FormatDeadLetter(args.rollup_table))
+    return result
+
+
+def write_features(rows, args):
+    """QualityRow → 팀별 최신/EWMA 특징 → 온라인 특징 저장소 (--feature_store가 없으면 생략)"""
+    if not args.feature_store:
+        return None
+    return (
+        rows
+        | 'KeyFeaturesByTeam' >> beam.Map(lambda row: (row.team_id, row)).with_output_types(
+            typing.Tuple[str, QualityRow]
+        )
+        | 'UpdateTeamFeatures' >> beam.ParDo(
+            profiled(UpdateTeamFeatures(args.feature_ewma_alpha), 'UpdateTeamFeatures', args)
+        )
+        | 'WriteFeatureStore' >> beam.ParDo(profiled(WriteFeatureStore(args.feature_store), 'WriteFeatureStore', args))
+    )
+
+
 def run(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument('--project', required=True, help='GCP 프로젝트 ID')
@@ -124,11 +597,13 @@ def run(argv=None):
     parser.add_argument('--temp_location', required=True, help='GCS 임시 파일 위치')
     parser.add_argument('--staging_location', required=True, help='GCS 스테이징 위치')
     parser.add_argument('--input_subscription', required=True, help='Pub/Sub 구독 경로')
-    parser.add_argument('--bq_table', default='yago_reports.quality_stream', help='BigQuery 테이블')
     parser.add_argument('--max_num_workers', type=int, default=10, help='최대 워커 수')
     parser.add_argument('--num_workers', type=int, default=1, help='초기 워커 수')
+    add_sink_arguments(parser)
+    add_profile_arguments(parser)
     
     args, beam_args = parser.parse_known_args(argv)
+    check_sink_arguments(parser, args)
     
     # Pipeline Options 설정
     options = PipelineOptions(beam_args, save_main_session=True, streaming=True)
@@ -148,27 +623,22 @@ def run(argv=None):
     # 워커 옵션
     options.view_as(beam.options.pipeline_options.WorkerOptions).max_num_workers = args.max_num_workers
     options.view_as(beam.options.pipeline_options.WorkerOptions).num_workers = args.num_workers
+
+    # 공통 모듈(quality_row.py, quality_rollup.py, feature_store.py, profiling.py)을 Dataflow 워커에 배포
+    setup = options.view_as(SetupOptions)
+    if args.runner == 'DataflowRunner' and not setup.setup_file:
+        setup.setup_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'setup.py')
     
     # 파이프라인 실행
     with beam.Pipeline(options=options) as p:
-        (
-            p
-            | 'ReadFromPubSub' >> ReadFromPubSub(
-                subscription=args.input_subscription,
-                with_attributes=True
-            )
-            | 'ParseValidate' >> beam.ParDo(ParseAndValidate())
-            | 'DedupInsertId' >> beam.ParDo(DeduplicateByInsertId(ttl_sec=3600))
-            | 'WriteToBQ' >> WriteToBigQuery(
-                table=args.bq_table,
-                schema=SCHEMA,
-                write_disposition=BigQueryDisposition.WRITE_APPEND,
-                create_disposition=BigQueryDisposition.CREATE_NEVER,
-                custom_gcs_temp_location=args.temp_location,
-                method='STORAGE_WRITE_API',
-                insert_retry_strategy='RETRY_NEVER',  # 중복 제거는 insert_id로 처리
-            )
+        messages = p | 'ReadFromPubSub' >> ReadFromPubSub(
+            subscription=args.input_subscription,
+            with_attributes=True
         )
+        rows = ingest(messages, args)
+        write_rows(rows, args)
+        write_rollups(rows, args)
+        write_features(rows, args)
 
 
 if __name__ == '__main__':
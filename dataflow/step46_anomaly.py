@@ -5,39 +5,49 @@ Sliding Window + Z-Score/MAD 기반 이상 탐지
 
 import json
 import argparse
+import logging
+import os
 import statistics
 from datetime import datetime
+from typing import Tuple
 
 import apache_beam as beam
-from apache_beam.options.pipeline_options import PipelineOptions, GoogleCloudOptions, StandardOptions
+from apache_beam.options.pipeline_options import PipelineOptions, GoogleCloudOptions, SetupOptions, StandardOptions
 from apache_beam.io.gcp.pubsub import ReadFromPubSub, WriteToPubSub
 
+from profiling import add_profile_arguments, profiled
+from quality_row import QualityPoint, message_data
+
+logger = logging.getLogger(__name__)
+
 
 class ParseJson(beam.DoFn):
     """Pub/Sub 메시지 JSON 파싱"""
     
     def process(self, element):
         try:
-            # Pub/Sub 메시지 파싱
-            if isinstance(element, tuple):
-                data_bytes, attributes = element
-                data_str = data_bytes.decode('utf-8')
-            else:
-                data_str = element.decode('utf-8')
+            # Pub/Sub 메시지 파싱 (PubsubMessage / bytes)
+            data_str = message_data(element).decode('utf-8')
             
             payload = json.loads(data_str)
             yield payload
         except Exception as e:
-            print(f"❌ JSON 파싱 오류: {e}")
+            logger.warning('JSON 파싱 오류: %s', e)
             return []
 
 
+@beam.typehints.with_output_types(Tuple[str, QualityPoint])
 class KeyByTeam(beam.DoFn):
-    """팀 ID로 키 생성"""
+    """팀 ID로 키 생성 (셔플 전에 이상 탐지에 필요한 열만 남긴 QualityPoint로 변환)"""
     
     def process(self, element):
         team_id = element.get('team_id', 'unknown')
-        yield (team_id, element)
+        try:
+            point = QualityPoint.from_payload(element)
+        except (TypeError, ValueError) as e:
+            logger.warning('지표 변환 오류: %s, 팀: %s', e, team_id)
+            return
+        yield (str(team_id), point)
 
 
 class ComputeAnomaly(beam.DoFn):
@@ -69,10 +79,10 @@ class ComputeAnomaly(beam.DoFn):
             window_end = datetime.utcnow().isoformat() + 'Z'
         
         # 값 추출
-        scores = [float(r.get('overallScore', 0)) for r in rows_list]
-        coverages = [float(r.get('coverage', 0)) for r in rows_list]
-        gaps = [int(r.get('gaps', 0)) for r in rows_list]
-        overlaps = [int(r.get('overlaps', 0)) for r in rows_list]
+        scores = [r.overallScore for r in rows_list]
+        coverages = [r.coverage for r in rows_list]
+        gaps = [r.gaps for r in rows_list]
+        overlaps = [r.overlaps for r in rows_list]
         
         alerts = []
         
@@ -129,12 +139,12 @@ class ComputeAnomaly(beam.DoFn):
         if alerts:
             yield {
                 'team_id': team_id,
-                'report_id': latest.get('report_id', ''),
-                'event_ts': latest.get('event_ts', ''),
-                'overallScore': float(latest.get('overallScore', 0)),
-                'coverage': float(latest.get('coverage', 0)),
-                'gaps': int(latest.get('gaps', 0)),
-                'overlaps': int(latest.get('overlaps', 0)),
+                'report_id': latest.report_id,
+                'event_ts': latest.event_ts,
+                'overallScore': latest.overallScore,
+                'coverage': latest.coverage,
+                'gaps': latest.gaps,
+                'overlaps': latest.overlaps,
                 'window': {
                     'start': window_start,
                     'end': window_end,
@@ -153,6 +163,38 @@ class ToJson(beam.DoFn):
         yield json.dumps(obj).encode('utf-8')
 
 
+def add_detector_arguments(parser):
+    """이상 탐지 임계치 / 윈도우 / 출력 토픽 인자 (step45_46_fused와 공유)"""
+    parser.add_argument('--output_topic', required=True, help='Pub/Sub 출력 토픽 경로')
+    parser.add_argument('--z_threshold', type=float, default=2.5, help='Z-Score 임계치')
+    parser.add_argument('--cov_min', type=float, default=0.9, help='커버리지 최소값')
+    parser.add_argument('--gaps_max', type=int, default=10, help='Gaps 최대값')
+    parser.add_argument('--overlaps_max', type=int, default=8, help='Overlaps 최대값')
+    parser.add_argument('--window_size', type=int, default=900, help='윈도우 크기 (초, 기본 15분)')
+    parser.add_argument('--window_period', type=int, default=300, help='윈도우 주기 (초, 기본 5분)')
+
+
+def detect_anomalies(keyed_points, args):
+    """(team_id, QualityPoint) → Sliding Window → 팀별 이상 탐지 → JSON bytes"""
+    return (
+        keyed_points
+        | 'Window' >> beam.WindowInto(
+            beam.window.SlidingWindows(
+                size=args.window_size,
+                period=args.window_period
+            )
+        )
+        | 'Group' >> beam.GroupByKey()
+        | 'Detect' >> beam.ParDo(profiled(ComputeAnomaly(
+            z_threshold=args.z_threshold,
+            cov_min=args.cov_min,
+            gaps_max=args.gaps_max,
+            overlaps_max=args.overlaps_max
+        ), 'Detect', args))
+        | 'ToJson' >> beam.ParDo(profiled(ToJson(), 'ToJson', args))
+    )
+
+
 def run(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument('--project', required=True, help='GCP 프로젝트 ID')
@@ -161,15 +203,10 @@ def run(argv=None):
     parser.add_argument('--temp_location', required=True, help='GCS 임시 파일 위치')
     parser.add_argument('--staging_location', required=True, help='GCS 스테이징 위치')
     parser.add_argument('--input_subscription', required=True, help='Pub/Sub 구독 경로')
-    parser.add_argument('--output_topic', required=True, help='Pub/Sub 출력 토픽 경로')
-    parser.add_argument('--z_threshold', type=float, default=2.5, help='Z-Score 임계치')
-    parser.add_argument('--cov_min', type=float, default=0.9, help='커버리지 최소값')
-    parser.add_argument('--gaps_max', type=int, default=10, help='Gaps 최대값')
-    parser.add_argument('--overlaps_max', type=int, default=8, help='Overlaps 최대값')
-    parser.add_argument('--window_size', type=int, default=900, help='윈도우 크기 (초, 기본 15분)')
-    parser.add_argument('--window_period', type=int, default=300, help='윈도우 주기 (초, 기본 5분)')
     parser.add_argument('--max_num_workers', type=int, default=10, help='최대 워커 수')
     parser.add_argument('--num_workers', type=int, default=1, help='초기 워커 수')
+    add_detector_arguments(parser)
+    add_profile_arguments(parser)
     
     args, beam_args = parser.parse_known_args(argv)
     
@@ -191,33 +228,24 @@ def run(argv=None):
     # 워커 옵션
     options.view_as(beam.options.pipeline_options.WorkerOptions).max_num_workers = args.max_num_workers
     options.view_as(beam.options.pipeline_options.WorkerOptions).num_workers = args.num_workers
+
+    # 공통 모듈(quality_row.py, profiling.py)을 Dataflow 워커에 배포
+    setup = options.view_as(SetupOptions)
+    if args.runner == 'DataflowRunner' and not setup.setup_file:
+        setup.setup_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'setup.py')
     
     # 파이프라인 실행
     with beam.Pipeline(options=options) as p:
-        (
+        keyed = (
             p
             | 'Read' >> ReadFromPubSub(
                 subscription=args.input_subscription,
                 with_attributes=True
             )
-            | 'Parse' >> beam.ParDo(ParseJson())
-            | 'KeyByTeam' >> beam.ParDo(KeyByTeam())
-            | 'Window' >> beam.WindowInto(
-                beam.window.SlidingWindows(
-                    size=args.window_size,
-                    period=args.window_period
-                )
-            )
-            | 'Group' >> beam.GroupByKey()
-            | 'Detect' >> beam.ParDo(ComputeAnomaly(
-                z_threshold=args.z_threshold,
-                cov_min=args.cov_min,
-                gaps_max=args.gaps_max,
-                overlaps_max=args.overlaps_max
-            ))
-            | 'ToJson' >> beam.ParDo(ToJson())
-            | 'Publish' >> WriteToPubSub(topic=args.output_topic)
+            | 'Parse' >> beam.ParDo(profiled(ParseJson(), 'Parse', args))
+            | 'KeyByTeam' >> beam.ParDo(profiled(KeyByTeam(), 'KeyByTeam', args))
         )
+        detect_anomalies(keyed, args) | 'Publish' >> WriteToPubSub(topic=args.output_topic)
 
 
 if __name__ == '__main__':
@@ -10,10 +10,13 @@ import pandas as pd
 import lightgbm as lgb
 import joblib
 import json
+import logging
 import tempfile
 import os
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 
 class LoadAndJoin(beam.DoFn):
     """BigQuery에서 실제 품질 데이터와 시뮬레이션 결과를 조인"""
@@ -64,7 +67,7 @@ class LoadAndJoin(beam.DoFn):
                     'delta_error': float(row.delta_error) if row.delta_error else 0.0,
                 }
         except Exception as e:
-            print(f"❌ BigQuery 쿼리 오류: {e}")
+            logger.error('BigQuery 쿼리 오류: %s', e)
             return []
 
 
@@ -76,7 +79,7 @@ class TrainModel(beam.DoFn):
         
         rows_list = list(rows)
         if len(rows_list) < 10:
-            print(f"⚠️ 데이터가 부족합니다 (최소 10개 필요): {len(rows_list)}개")
+            logger.warning('데이터가 부족합니다 (최소 10개 필요): %d개', len(rows_list))
             return []
         
         try:
@@ -111,7 +114,7 @@ class TrainModel(beam.DoFn):
             rmse = np.sqrt(np.mean((y - y_pred) ** 2))
             mae = np.mean(np.abs(y - y_pred))
             
-            print(f"✅ 모델 학습 완료: RMSE={rmse:.4f}, MAE={mae:.4f}, 데이터 수={len(df)}")
+            logger.info('모델 학습 완료: RMSE=%.4f, MAE=%.4f, 데이터 수=%d', rmse, mae, len(df))
             
             # 임시 파일에 모델 저장
             with tempfile.NamedTemporaryFile(delete=False, suffix='.pkl') as f:
@@ -127,7 +130,7 @@ class TrainModel(beam.DoFn):
             }
             
         except Exception as e:
-            print(f"❌ 모델 학습 오류: {e}")
+            logger.error('모델 학습 오류: %s', e)
             return []
 
 
@@ -160,7 +163,7 @@ class UploadToGCS(beam.DoFn):
             blob.metadata = metadata
             blob.patch()
             
-            print(f"✅ 모델 업로드 완료: gs://{self.bucket_name}/{model_name}")
+            logger.info('모델 업로드 완료: gs://%s/%s', self.bucket_name, model_name)
             
             # 임시 파일 삭제
             try:
@@ -177,7 +180,7 @@ class UploadToGCS(beam.DoFn):
             }
             
         except Exception as e:
-            print(f"❌ GCS 업로드 오류: {e}")
+            logger.error('GCS 업로드 오류: %s', e)
             return []
 
 
@@ -0,0 +1,106 @@
+"""
+feature_store 테스트: event_ts 순서 기준 특징 갱신(늦게 도착한 이벤트), SQLite 저장소, UpdateTeamFeatures (DirectRunner)
+
+실행:
+    cd dataflow && python -m pytest -q
+"""
+
+import apache_beam as beam
+import pytest
+from apache_beam.options.pipeline_options import PipelineOptions
+from apache_beam.testing.util import assert_that, equal_to
+
+from feature_store import FEATURE_METRICS, is_late, open_feature_store, update_features
+from quality_row import QualityRow
+from step45_stream import UpdateTeamFeatures
+
+
+def row(i: int, event_ts: str, coverage: float) -> QualityRow:
+    return QualityRow.from_payload({
+        "insert_id": f"team-a-{i}", "team_id": "team-a", "report_id": f"report-{i}", "event_ts": event_ts,
+        "overallScore": 0.8, "coverage": coverage, "gaps": i, "overlaps": 0, "avgDur": 2.0,
+    })
+
+
+def replay(rows, alpha=0.5) -> dict:
+    features = None
+    for r in rows:
+        features = update_features(features, r, alpha)
+    return features
+
+
+def test_in_order_events_update_latest_and_ewma():
+    f = replay([row(1, "2024-06-01T00:00:00Z", 1.0), row(2, "2024-06-01T00:01:00Z", 0.5)])
+    assert f["count"] == 2 and f["late_count"] == 0
+    assert f["coverage"] == 0.5 and f["last_report_id"] == "report-2"
+    assert f["coverage_ewma"] == pytest.approx(0.75)
+    assert set(FEATURE_METRICS) <= set(f) and all(f"{m}_ewma" in f for m in FEATURE_METRICS)
+
+
+def test_late_event_is_counted_but_not_applied():
+    in_order = replay([row(1, "2024-06-01T00:00:00Z", 1.0), row(3, "2024-06-01T00:02:00Z", 0.5)])
+    f = update_features(in_order, row(2, "2024-06-01T00:01:00Z", 0.0), 0.5)
+    assert f["count"] == 3 and f["late_count"] == 1
+    assert {k: v for k, v in f.items() if k not in ("count", "late_count")} == {
+        k: v for k, v in in_order.items() if k not in ("count", "late_count")
+    }
+
+
+def test_event_order_uses_parsed_timestamps():
+    # 사전순으로는 "...00:00:30+09:00" < "...00:00:00Z"가 아니지만 실제로는 9시간 이전 이벤트
+    first = row(1, "2024-06-01T00:00:00Z", 1.0)
+    earlier = row(2, "2024-06-01T00:00:30+09:00", 0.0)
+    assert earlier.event_ts > first.event_ts
+    assert is_late(update_features(None, first, 0.5), earlier)
+
+    # 소수 초 자릿수가 달라도 시각 순서로 비교 ("...00.5Z" < "...00Z"는 사전순으로만 성립)
+    f = replay([row(1, "2024-06-01T00:00:00Z", 1.0), row(2, "2024-06-01T00:00:00.5Z", 0.5)])
+    assert f["late_count"] == 0 and f["coverage"] == 0.5
+
+
+def test_equal_timestamps_and_unparsable_event_ts():
+    f = replay([row(1, "2024-06-01T00:00:00Z", 1.0), row(2, "2024-06-01T00:00:00Z", 0.5)])
+    assert f["late_count"] == 0 and f["last_report_id"] == "report-2"
+
+    f = update_features(f, row(3, "yesterday", 0.0), 0.5)
+    assert f["late_count"] == 1 and f["coverage"] == 0.5
+
+    # 첫 이벤트는 event_ts와 무관하게 초기값, 이후 정상 이벤트가 이어서 갱신
+    f = replay([row(1, "yesterday", 1.0), row(2, "2024-06-01T00:00:00Z", 0.5)])
+    assert f["late_count"] == 0 and f["last_event_ts"] == "2024-06-01T00:00:00Z"
+
+
+def test_state_without_late_count_is_upgraded():
+    prev = update_features(None, row(1, "2024-06-01T00:00:00Z", 1.0), 0.5)
+    del prev["late_count"]  # 이전 버전 상태
+    f = update_features(prev, row(2, "2024-05-31T00:00:00Z", 0.0), 0.5)
+    assert f["late_count"] == 1
+
+
+def test_sqlite_store_round_trip(tmp_path):
+    store = open_feature_store("sqlite:///" + str(tmp_path / "features.db"))
+    try:
+        f = replay([row(1, "2024-06-01T00:00:00Z", 1.0)])
+        store.put_many({"team-a": f})
+        stored = store.get("team-a")
+        assert stored.pop("updated_ts") > 0
+        assert stored == f
+        assert store.get("team-b") is None
+    finally:
+        store.close()
+
+
+def test_update_team_features_skips_late_events():
+    rows = [
+        row(1, "2024-06-01T00:00:00Z", 1.0),
+        row(3, "2024-06-01T00:02:00Z", 0.5),
+        row(2, "2024-06-01T00:01:00Z", 0.0),  # 늦게 도착: 상태에는 세지만 저장소로 내보내지 않음
+    ]
+    with beam.Pipeline(options=PipelineOptions(flags=[], runner="DirectRunner")) as p:
+        out = (
+            p
+            | beam.Create([("team-a", r) for r in rows], reshuffle=False)
+            | beam.ParDo(UpdateTeamFeatures(alpha=0.5))
+            | beam.Map(lambda kv: (kv[0], kv[1]["last_report_id"], kv[1]["count"]))
+        )
+        assert_that(out, equal_to([("team-a", "report-1", 1), ("team-a", "report-3", 2)]))
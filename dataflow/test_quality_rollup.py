@@ -0,0 +1,144 @@
+"""
+quality_rollup 테스트: QualityRollupFn 누산기(create/add/merge/extract), 히스토그램 분위수, 지연 허용을 넘긴 행 분리
+
+실행:
+    cd dataflow && python -m pytest -q
+"""
+
+import random
+
+import apache_beam as beam
+import pytest
+from apache_beam.options.pipeline_options import PipelineOptions
+from apache_beam.testing.util import assert_that, equal_to
+from apache_beam.utils.timestamp import Timestamp
+
+from quality_rollup import SKETCH_BINS, QualityRollupFn, sketch_bin, sketch_quantile
+from quality_row import QualityRow
+from step45_stream import RollupEventTime
+
+START_TS = 1717200000  # 2024-06-01T00:00:00Z
+
+
+def row(score: float, coverage: float, gaps: int = 1, overlaps: int = 0, avg_dur: float = 2.0,
+        event_ts: str = "2024-06-01T00:00:30Z") -> QualityRow:
+    return QualityRow.from_payload({
+        "insert_id": "i", "team_id": "team-a", "report_id": "r", "event_ts": event_ts,
+        "overallScore": score, "coverage": coverage, "gaps": gaps, "overlaps": overlaps, "avgDur": avg_dur,
+    })
+
+
+def combine(fn: QualityRollupFn, rows) -> list:
+    acc = fn.create_accumulator()
+    for r in rows:
+        acc = fn.add_input(acc, r)
+    return acc
+
+
+def test_empty_accumulator():
+    fn = QualityRollupFn()
+    assert fn.extract_output(fn.create_accumulator()) == {"count": 0}
+    assert fn.extract_output(fn.merge_accumulators([fn.create_accumulator(), fn.create_accumulator()])) == {"count": 0}
+
+
+def test_add_and_extract():
+    fn = QualityRollupFn()
+    out = fn.extract_output(combine(fn, [row(0.2, 0.9, 1, 0, 1.0), row(0.6, 0.5, 2, 3, 3.0), row(1.0, 1.0, 0, 1, 2.0)]))
+    assert out["count"] == 3
+    assert out["score_mean"] == pytest.approx(0.6)
+    assert (out["score_min"], out["score_max"]) == (0.2, 1.0)
+    assert out["coverage_mean"] == pytest.approx(0.8)
+    assert (out["coverage_min"], out["coverage_max"]) == (0.5, 1.0)
+    assert (out["gaps_sum"], out["overlaps_sum"]) == (3, 4)
+    assert out["avg_dur_mean"] == pytest.approx(2.0)
+    # 비어 있지 않은 구간만, 구간 순서로
+    assert out["score_hist"] == [{"bin": 20, "n": 1}, {"bin": 60, "n": 1}, {"bin": SKETCH_BINS - 1, "n": 1}]
+    assert out["coverage_hist"] == [{"bin": 50, "n": 1}, {"bin": 90, "n": 1}, {"bin": SKETCH_BINS - 1, "n": 1}]
+
+
+def test_merge_matches_single_accumulator():
+    rng = random.Random(45)
+    rows = [row(rng.random(), rng.random(), rng.randint(0, 5), rng.randint(0, 5), rng.uniform(1, 4)) for _ in range(500)]
+    fn = QualityRollupFn()
+    whole = fn.extract_output(combine(fn, rows))
+    # 워커별 부분 집계(빈 누산기 포함)를 병합해도 같은 결과
+    parts = [combine(fn, rows[i:i + 70]) for i in range(0, len(rows), 70)] + [fn.create_accumulator()]
+    merged = fn.extract_output(fn.merge_accumulators(parts))
+    assert merged.keys() == whole.keys()
+    for key, value in whole.items():
+        assert merged[key] == (pytest.approx(value) if isinstance(value, float) else value), key
+
+
+@pytest.mark.parametrize("i", range(SKETCH_BINS + 1))
+def test_sketch_bin_at_edges(i):
+    """경계 값 i / SKETCH_BINS는 부동소수점 곱셈 오차와 무관하게 i번 구간 (1.0은 마지막 구간)"""
+    value = float(f"{i / SKETCH_BINS:.2f}")
+    assert sketch_bin(value) == min(i, SKETCH_BINS - 1)
+
+
+def test_sketch_bin_clamps_out_of_range():
+    assert sketch_bin(-0.5) == 0
+    assert sketch_bin(1.5) == SKETCH_BINS - 1
+
+
+def test_sketch_quantile_at_bin_edges():
+    assert sketch_quantile({}, 0.5) is None
+    # 한 구간에 몰린 값: 분위수는 구간 안에서 선형 보간
+    hist = {29: 4}
+    assert sketch_quantile(hist, 0.0) == pytest.approx(0.29)
+    assert sketch_quantile(hist, 0.5) == pytest.approx(0.295)
+    assert sketch_quantile(hist, 1.0) == pytest.approx(0.30)
+    # 누적 건수가 목표와 정확히 같으면 그 구간의 끝
+    hist = {10: 5, 90: 5}
+    assert sketch_quantile(hist, 0.5) == pytest.approx(0.11)
+    assert sketch_quantile(hist, 1.0) == pytest.approx(0.91)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_quantiles_within_one_bin(seed):
+    rng = random.Random(seed)
+    # 구간 경계 값 섞기 (경계 값이 한 구간 아래로 들어가면 오차가 커짐)
+    scores = [rng.choice([rng.random(), rng.randint(0, SKETCH_BINS) / SKETCH_BINS]) for _ in range(2000)]
+    fn = QualityRollupFn()
+    out = fn.extract_output(combine(fn, [row(s, s) for s in scores]))
+    ordered = sorted(scores)
+    for q, key in [(0.5, "score_p50"), (0.9, "score_p90"), (0.99, "score_p99")]:
+        exact = ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+        assert abs(out[key] - exact) <= 1 / SKETCH_BINS, key
+        assert out[key.replace("score", "coverage")] == out[key]
+
+
+def test_rollup_event_time_splits_rows_past_allowed_lateness():
+    fn = RollupEventTime("minute", allowed_lateness_sec=600)
+    on_time = row(0.5, 0.5, event_ts="2024-06-01T00:00:30Z")  # 윈도우 [00:00, 00:01), 닫힘 00:11
+
+    (out,) = fn.process(on_time, Timestamp(START_TS + 60 * 10))
+    assert out.value is on_time and out.timestamp == Timestamp(START_TS + 30)
+
+    (out,) = fn.process(on_time, Timestamp(START_TS + 60 * 11))
+    assert isinstance(out, beam.pvalue.TaggedOutput) and out.tag == RollupEventTime.TOO_LATE
+
+    # event_ts를 파싱할 수 없으면 게시 시각 타임스탬프 유지 (롤업에서 빼지 않음)
+    bad = row(0.5, 0.5, event_ts="yesterday")
+    (out,) = fn.process(bad, Timestamp(START_TS + 86400))
+    assert out.value is bad and out.timestamp == Timestamp(START_TS + 86400)
+
+
+def test_rollup_event_time_in_pipeline():
+    rows = [
+        beam.window.TimestampedValue(row(0.5, 0.5, event_ts="2024-06-01T00:00:30Z"), START_TS + 60),
+        beam.window.TimestampedValue(row(0.6, 0.5, event_ts="2024-06-01T00:00:40Z"), START_TS + 3600 * 2),
+    ]
+    with beam.Pipeline(options=PipelineOptions(flags=[], runner="DirectRunner")) as p:
+        timed = (
+            p
+            | beam.Create(rows, reshuffle=False)
+            | beam.ParDo(RollupEventTime("hour", allowed_lateness_sec=600)).with_outputs(
+                RollupEventTime.TOO_LATE, main="rows",
+            )
+        )
+        assert_that(timed.rows | "Scores" >> beam.Map(lambda r: r.overallScore), equal_to([0.5]), label="OnTime")
+        assert_that(
+            timed[RollupEventTime.TOO_LATE] | "LateScores" >> beam.Map(lambda r: r.overallScore),
+            equal_to([0.6]), label="TooLate",
+        )
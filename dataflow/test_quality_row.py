@@ -0,0 +1,90 @@
+"""
+quality_row 테스트: QualityRow/QualityPoint RowCoder 직렬화, from_payload 타입 변환/누락 필드, to_bq_avro 시각 변환
+
+실행:
+    cd dataflow && python -m pytest -q
+"""
+
+from datetime import datetime, timezone
+
+import apache_beam as beam
+import pytest
+from apache_beam.io.gcp.pubsub import PubsubMessage
+
+from quality_row import QualityPoint, QualityRow, message_data, parse_ts
+
+PAYLOAD = {
+    "insert_id": "team-a-1", "team_id": "team-a", "report_id": "report-1", "event_ts": "2024-06-01T00:00:30Z",
+    "overallScore": 0.8, "coverage": 0.95, "gaps": 2, "overlaps": 1, "avgDur": 2.5,
+}
+
+
+def round_trip(value):
+    coder = beam.coders.registry.get_coder(type(value))
+    assert isinstance(coder, beam.coders.RowCoder)
+    return coder.decode(coder.encode(value))
+
+
+def test_quality_row_coder_round_trip():
+    row = QualityRow.from_payload({**PAYLOAD, "team_id": "팀-가", "source": "backfill"})
+    decoded = round_trip(row)
+    assert type(decoded) is QualityRow
+    assert decoded == row
+
+
+def test_quality_point_coder_round_trip():
+    point = QualityRow.from_payload(PAYLOAD).point()
+    decoded = round_trip(point)
+    assert type(decoded) is QualityPoint
+    assert decoded == QualityPoint("report-1", "2024-06-01T00:00:30Z", 0.8, 0.95, 2, 1)
+    # 검증 전 메시지에서 만든 빈 값도 직렬화 가능
+    assert round_trip(QualityPoint.from_payload({})) == QualityPoint("", "", 0.0, 0.0, 0, 0)
+
+
+def test_from_payload_converts_types_and_defaults():
+    row = QualityRow.from_payload({
+        "insert_id": 7, "team_id": "team-a", "report_id": 123, "event_ts": "2024-06-01T00:00:30Z",
+        "overallScore": "0.5", "gaps": "3",
+    })
+    assert (row.insert_id, row.report_id) == ("7", "123")
+    assert (row.overallScore, row.coverage, row.gaps, row.overlaps, row.avgDur) == (0.5, 0.0, 3, 0, 0.0)
+    assert isinstance(row.gaps, int) and isinstance(row.coverage, float)
+    assert row.source == "stream"
+    assert parse_ts(row.load_ts).tzinfo is not None
+
+    assert QualityRow.from_payload(PAYLOAD, source="backfill").source == "backfill"
+    assert QualityRow.from_payload({**PAYLOAD, "source": "replay"}, source="backfill").source == "replay"
+
+
+@pytest.mark.parametrize("field", ["insert_id", "team_id", "report_id", "event_ts"])
+def test_from_payload_requires_identity_fields(field):
+    payload = {k: v for k, v in PAYLOAD.items() if k != field}
+    with pytest.raises(KeyError, match=field):
+        QualityRow.from_payload(payload)
+
+
+def test_to_bq_avro_converts_timestamps():
+    row = QualityRow.from_payload({**PAYLOAD, "event_ts": "2024-06-01T09:00:30+09:00"})._replace(
+        load_ts="2024-06-01T00:01:00.250000",
+    )
+    out = row.to_bq_avro()
+    assert out["event_ts"] == datetime(2024, 6, 1, 0, 0, 30, tzinfo=timezone.utc)
+    assert out["load_ts"] == datetime(2024, 6, 1, 0, 1, 0, 250000, tzinfo=timezone.utc)  # 시간대 없으면 UTC
+    assert {k: v for k, v in out.items() if not k.endswith("_ts")} == {
+        k: v for k, v in row.to_bq().items() if not k.endswith("_ts")
+    }
+    assert row.to_bq()["event_ts"] == "2024-06-01T09:00:30+09:00"  # to_bq는 문자열 그대로
+
+
+@pytest.mark.parametrize("field", ["event_ts", "load_ts"])
+@pytest.mark.parametrize("value", ["yesterday", "", "2024-13-01T00:00:00Z"])
+def test_to_bq_avro_rejects_bad_timestamps(field, value):
+    row = QualityRow.from_payload(PAYLOAD)._replace(**{field: value})
+    with pytest.raises(ValueError):
+        row.to_bq_avro()
+
+
+def test_message_data():
+    assert message_data(b"{}") == b"{}"
+    assert message_data((b"{}", {"k": "v"})) == b"{}"
+    assert message_data(PubsubMessage(b"{}", {"k": "v"})) == b"{}"
@@ -0,0 +1,84 @@
+"""
+step45_46_fused 파이프라인 테스트 (DirectRunner, 로컬 싱크 / SQLite 특징 저장소)
+
+ReadFromPubSub(with_attributes=True)와 같은 PubsubMessage 입력을 build_pipeline에 그대로 넣어 확인
+
+실행:
+    cd dataflow && python -m pytest -q
+"""
+
+import glob
+import json
+import os
+from types import SimpleNamespace
+
+import apache_beam as beam
+import pytest
+from apache_beam.io.gcp.pubsub import PubsubMessage
+from apache_beam.options.pipeline_options import PipelineOptions
+from apache_beam.testing.util import assert_that
+
+import step45_46_fused
+
+START_TS = 1717200000  # 2024-06-01T00:00:00Z
+
+
+def pipeline_args(tmp, profile=False) -> SimpleNamespace:
+    return SimpleNamespace(
+        bq_table="test:yago_reports.quality_stream", temp_location=str(tmp), sink="local",
+        local_sink_dir=str(tmp / "sink"), local_append_latency_ms=0.0, triggering_frequency=5,
+        num_storage_api_streams=0, with_auto_sharding=False, use_at_least_once=True, dead_letter_topic=None,
+        rollup_table="test:yago_reports.quality_rollup", rollup_granularities="minute", rollup_early_firing_sec=0,
+        rollup_allowed_lateness_sec=3600, feature_store="sqlite:///" + str(tmp / "features.db"),
+        feature_ewma_alpha=0.1, z_threshold=2.5, cov_min=0.9, gaps_max=10, overlaps_max=8, window_size=900,
+        window_period=300, profile=profile, profile_dir=str(tmp / "profile"), profile_dump_interval_sec=10.0,
+    )
+
+
+def message(i: int, coverage: float = 0.95, team: str = "team-a", ts: float = None):
+    ts = START_TS + i * 10 if ts is None else ts
+    payload = {
+        "insert_id": f"{team}-{i}", "team_id": team, "report_id": f"report-{i}",
+        "event_ts": f"2024-06-01T00:{int(ts - START_TS) // 60:02d}:{int(ts - START_TS) % 60:02d}Z",
+        "overallScore": 0.8, "coverage": coverage, "gaps": 1, "overlaps": 0, "avgDur": 2.0,
+    }
+    data = json.dumps(payload).encode("utf-8")
+    return beam.window.TimestampedValue(PubsubMessage(data, {"source": "test"}), ts)
+
+
+def run_fused(messages, args, check_alerts):
+    p = beam.Pipeline(options=PipelineOptions(flags=[], runner="DirectRunner"))
+    alerts = step45_46_fused.build_pipeline(p | beam.Create(messages, reshuffle=False), args)
+    assert_that(alerts, check_alerts)
+    p.run().wait_until_finish()
+
+
+def sink_rows(args, table):
+    rows = []
+    for path in glob.glob(os.path.join(args.local_sink_dir, table.replace(":", "."), "stream-*.jsonl")):
+        with open(path) as f:
+            rows.extend(json.loads(line) for line in f)
+    return rows
+
+
+@pytest.mark.parametrize("profile", [False, True])
+def test_pubsub_messages_reach_sink_and_detector(tmp_path, profile):
+    args = pipeline_args(tmp_path, profile)
+    messages = [message(i) for i in range(4)] + [message(4, coverage=0.5)]
+    # 같은 insert_id 재전송은 한 번만 적재, 파싱 실패 메시지는 Dead Letter로 빠지고 나머지는 계속 처리
+    messages.append(message(4, coverage=0.5))
+    messages.append(beam.window.TimestampedValue(PubsubMessage(b"{not json", {}), START_TS))
+
+    def check_alerts(actual):
+        alerts = [json.loads(a) for a in actual]
+        assert alerts, "coverage_low 알림이 없음"
+        assert {a["team_id"] for a in alerts} == {"team-a"}
+        assert all("coverage_low" in {x["type"] for x in a["alerts"]} for a in alerts)
+        assert all(a["window"]["count"] == 5 for a in alerts)
+
+    run_fused(messages, args, check_alerts)
+
+    rows = sink_rows(args, args.bq_table)
+    assert sorted(r["insert_id"] for r in rows) == [f"team-a-{i}" for i in range(5)]
+    assert {r["source"] for r in rows} == {"stream"}
+    assert sink_rows(args, args.rollup_table)
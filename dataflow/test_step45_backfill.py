@@ -0,0 +1,94 @@
+"""
+step45_backfill 테스트: DayPartition 파티션 라우팅, to_bq_row 임시 파일 형식별 변환, LocalFileLoads (DirectRunner)
+
+실행:
+    cd dataflow && python -m pytest -q
+"""
+
+import json
+import logging
+from datetime import datetime, timezone
+
+import apache_beam as beam
+import pytest
+from apache_beam.io.gcp import bigquery_tools
+from apache_beam.options.pipeline_options import PipelineOptions
+
+from quality_row import QualityRow
+from step45_backfill import SCHEMA, DayPartition, LocalFileLoads, to_bq_row
+
+AVRO = bigquery_tools.FileFormat.AVRO
+JSON = bigquery_tools.FileFormat.JSON
+TABLE = "proj:yago_reports.quality_stream"
+
+
+def row(i: int, event_ts: str) -> QualityRow:
+    return QualityRow(
+        insert_id=f"team-a-report-{i}-{i}", team_id="team-a", report_id=f"report-{i}", event_ts=event_ts,
+        overallScore=0.8, coverage=0.9, gaps=i, overlaps=0, avgDur=2.0, source="backfill",
+        load_ts="2024-06-03T00:00:00Z",
+    )
+
+
+@pytest.mark.parametrize("event_ts, partition", [
+    ("2024-06-01T00:00:00Z", "20240601"),
+    ("2024-06-01T23:59:59.999999Z", "20240601"),
+    ("2024-06-01T08:00:00+09:00", "20240531"),  # UTC 날짜 기준
+    ("2024-06-01T12:00:00", "20240601"),  # 시간대 없으면 UTC
+    (datetime(2024, 6, 2, 1, 0, tzinfo=timezone.utc), "20240602"),  # Avro 행은 datetime
+])
+def test_day_partition(event_ts, partition):
+    assert DayPartition(TABLE)({"event_ts": event_ts}) == f"{TABLE}${partition}"
+
+
+@pytest.mark.parametrize("event_ts", ["", "yesterday", "2024-13-01T00:00:00Z", "1717200000"])
+def test_day_partition_falls_back_to_base_table(event_ts):
+    assert DayPartition(TABLE)({"event_ts": event_ts}) == TABLE
+
+
+def test_to_bq_row_json_keeps_strings():
+    r = row(1, "2024-06-01T08:00:00+09:00")
+    assert list(to_bq_row(r, JSON)) == [r.to_bq()]
+    assert list(to_bq_row(row(2, "yesterday"), JSON))[0]["event_ts"] == "yesterday"  # JSON은 BigQuery가 파싱
+
+
+def test_to_bq_row_avro_converts_timestamps():
+    (out,) = to_bq_row(row(1, "2024-06-01T08:00:00+09:00"), AVRO)
+    assert out["event_ts"] == datetime(2024, 5, 31, 23, 0, tzinfo=timezone.utc)
+    assert out["load_ts"] == datetime(2024, 6, 3, tzinfo=timezone.utc)
+    assert list(out) == [f["name"] for f in SCHEMA["fields"]]
+
+
+def test_to_bq_row_avro_skips_bad_timestamps(caplog):
+    with caplog.at_level(logging.WARNING, logger="step45_backfill"):
+        assert list(to_bq_row(row(1, "yesterday"), AVRO)) == []
+        assert list(to_bq_row(row(2, "2024-06-01T00:00:00Z")._replace(load_ts=""), AVRO)) == []
+    assert "team-a-report-1-1" in caplog.text and "team-a-report-2-2" in caplog.text
+
+
+@pytest.mark.parametrize("temp_file_format", [AVRO, JSON])
+def test_local_file_loads_routes_rows_to_day_partitions(tmp_path, temp_file_format):
+    rows = [
+        row(1, "2024-06-01T00:00:00Z"),
+        row(2, "2024-06-01T23:00:00Z"),
+        row(3, "2024-06-02T08:00:00+09:00"),  # UTC 6/1
+        row(4, "2024-06-02T10:00:00Z"),
+    ]
+    out_dir = tmp_path / "loads"
+    with beam.Pipeline(options=PipelineOptions(flags=[], runner="DirectRunner")) as p:
+        (
+            p
+            | beam.Create(rows, reshuffle=False)
+            | beam.FlatMap(to_bq_row, temp_file_format)
+            | LocalFileLoads(TABLE, SCHEMA, str(tmp_path / "temp"), str(out_dir), temp_file_format)
+        )
+
+    table_dir = out_dir / TABLE.replace(":", ".")
+    loaded = {
+        path.stem: sorted(json.loads(line)["report_id"] for line in path.read_text().splitlines())
+        for path in table_dir.glob("*.jsonl")
+    }
+    assert loaded == {"20240601": ["report-1", "report-2", "report-3"], "20240602": ["report-4"]}
+    jobs = [json.loads(line) for line in (out_dir / "_load_jobs.jsonl").read_text().splitlines()]
+    assert sorted((j["destination"], j["rows"]) for j in jobs) == [(f"{TABLE}$20240601", 3), (f"{TABLE}$20240602", 1)]
+    assert not any((tmp_path / "temp").rglob("*-*"))  # 적재 후 임시 파일 삭제
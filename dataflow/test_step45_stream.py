@@ -0,0 +1,157 @@
+"""
+step45_stream 테스트: 파싱/검증 실패와 싱크 실패 행의 Dead Letter 경로 (DirectRunner, 로컬 싱크)
+
+실행:
+    cd dataflow && python -m pytest -q
+"""
+
+import glob
+import json
+import os
+
+import apache_beam as beam
+import pytest
+from apache_beam.io.gcp.pubsub import PubsubMessage
+from apache_beam.options.pipeline_options import PipelineOptions
+from apache_beam.pvalue import TaggedOutput
+from apache_beam.testing.util import assert_that, equal_to
+
+from quality_row import QualityRow
+from step45_stream import SCHEMA, FormatDeadLetter, LocalStorageWrite, ParseAndValidate, ValidateAgainstSchema, dead_letter
+
+TABLE = "test:yago_reports.quality_stream"
+
+
+def payload(**overrides) -> dict:
+    p = {
+        "insert_id": "team-a-1", "team_id": "team-a", "report_id": "report-1", "event_ts": "2024-06-01T00:00:00Z",
+        "overallScore": 0.8, "coverage": 0.95, "gaps": 1, "overlaps": 0, "avgDur": 2.0,
+    }
+    p.update(overrides)
+    return p
+
+
+def bq_row(**overrides) -> dict:
+    row = QualityRow.from_payload(payload(), source="stream")._replace(load_ts="2024-06-01T00:00:05Z").to_bq()
+    row.update(overrides)
+    return row
+
+
+def pipeline():
+    return beam.Pipeline(options=PipelineOptions(flags=[], runner="DirectRunner"))
+
+
+def parse(data: bytes) -> list:
+    return list(ParseAndValidate().process(PubsubMessage(data, {})))
+
+
+def test_parse_valid_message():
+    (row,) = parse(json.dumps(payload()).encode())
+    assert isinstance(row, QualityRow)
+    assert row.insert_id == "team-a-1" and row.source == "stream"
+
+
+@pytest.mark.parametrize("data, error", [
+    (b"{not json", "JSONDecodeError"),
+    (b"\xff\xfe", "UnicodeDecodeError"),
+    (b"[1, 2]", "JSON 객체가 아님"),
+    (json.dumps({k: v for k, v in payload().items() if k != "event_ts"}).encode(), "필수 필드 누락: event_ts"),
+    (json.dumps(payload(overallScore=1.5)).encode(), "overallScore 범위 오류"),
+    (json.dumps(payload(coverage=-0.1)).encode(), "coverage 범위 오류"),
+    (json.dumps(payload(gaps="many")).encode(), "ValueError"),
+])
+def test_parse_failures_go_to_failed_output(data, error):
+    (out,) = parse(data)
+    assert isinstance(out, TaggedOutput) and out.tag == ParseAndValidate.FAILED
+    assert error in out.value["error_message"]
+    failed_row = out.value["failed_row"]
+    # JSON 객체면 payload, 아니면 원본 bytes (재처리 시 그대로 다시 게시)
+    if isinstance(failed_row, dict):
+        assert failed_row == json.loads(data)
+    else:
+        assert failed_row == data
+
+
+def test_validate_against_schema():
+    validate = ValidateAgainstSchema(SCHEMA)
+    assert list(validate.process(bq_row())) == [bq_row()]
+
+    for row, error in [
+        (bq_row(team_id=None), "team_id: 필수 필드 누락"),
+        (bq_row(gaps=1.5), "gaps: INTEGER 형식이 아님"),
+        (bq_row(gaps=True), "gaps: INTEGER 형식이 아님"),
+        (bq_row(coverage="0.9"), "coverage: FLOAT 형식이 아님"),
+        (bq_row(event_ts="yesterday"), "event_ts: TIMESTAMP 형식이 아님"),
+    ]:
+        (out,) = validate.process(row)
+        assert isinstance(out, TaggedOutput) and out.tag == ValidateAgainstSchema.FAILED
+        assert out.value["error_message"].startswith(error)
+        assert out.value["failed_row"] is row
+
+    # NULLABLE 필드는 없어도 통과
+    assert list(validate.process(bq_row(avgDur=None))) == [bq_row(avgDur=None)]
+
+    repeated = ValidateAgainstSchema({"fields": [{"name": "tags", "type": "STRING", "mode": "REPEATED"}]})
+    assert list(repeated.process({"tags": ["a", "b"]})) == [{"tags": ["a", "b"]}]
+    (out,) = repeated.process({"tags": "a"})
+    assert "REPEATED 필드가 목록이 아님" in out.value["error_message"]
+    (out,) = repeated.process({"tags": ["a", 1]})
+    assert "STRING 형식이 아님" in out.value["error_message"]
+
+
+@pytest.mark.parametrize("at_least_once", [True, False])
+def test_local_storage_write_routes_failed_rows(tmp_path, at_least_once):
+    good = [bq_row(insert_id=f"team-a-{i}") for i in range(3)]
+    bad = bq_row(insert_id="team-a-bad", event_ts="not a timestamp")
+
+    with pipeline() as p:
+        result = p | beam.Create(good + [bad]) | LocalStorageWrite(
+            TABLE, SCHEMA, str(tmp_path), triggering_frequency=1, num_streams=2, at_least_once=at_least_once,
+        )
+        assert_that(result.failed_rows, equal_to([bad]), label="FailedRows")
+        assert_that(
+            result.failed_rows_with_errors | beam.Map(lambda f: (f["failed_row"]["insert_id"], f["error_message"])),
+            equal_to([("team-a-bad", "event_ts: TIMESTAMP 형식이 아님: 'not a timestamp'")]),
+            label="FailedRowsWithErrors",
+        )
+
+    written = []
+    for path in glob.glob(os.path.join(str(tmp_path), TABLE.replace(":", "."), "stream-*.jsonl")):
+        with open(path) as f:
+            written.extend(json.loads(line) for line in f)
+    assert sorted(r["insert_id"] for r in written) == ["team-a-0", "team-a-1", "team-a-2"]
+
+
+def test_format_dead_letter():
+    row = bq_row(gaps=1.5)
+    (msg,) = FormatDeadLetter(TABLE).process({"error_message": "gaps: INTEGER 형식이 아님: 1.5", "failed_row": row})
+    assert isinstance(msg, PubsubMessage)
+    # data는 입력 메시지와 같은 필드의 JSON (DLQ 구독을 입력으로 다시 흘려 재처리)
+    assert json.loads(msg.data) == row
+    assert msg.attributes["error_message"] == "gaps: INTEGER 형식이 아님: 1.5"
+    assert msg.attributes["table"] == TABLE
+    assert msg.attributes["failed_at"].endswith("Z")
+
+    # JSON이 아니었던 메시지는 원본 bytes 그대로, 긴 오류는 속성 크기 제한에 맞춰 자름
+    (msg,) = FormatDeadLetter(TABLE).process({"error_message": "x" * 5000, "failed_row": b"\xff\xfe"})
+    assert msg.data == b"\xff\xfe"
+    assert len(msg.attributes["error_message"]) == 1024
+
+
+def test_parse_failures_reach_dead_letter():
+    good = json.dumps(payload()).encode()
+    bad = json.dumps(payload(insert_id="team-a-2", coverage=2.0)).encode()
+
+    with pipeline() as p:
+        parsed = (
+            p
+            | beam.Create([PubsubMessage(good, {}), PubsubMessage(bad, {}), PubsubMessage(b"oops", {})])
+            | beam.ParDo(ParseAndValidate()).with_outputs(ParseAndValidate.FAILED, main="rows")
+        )
+        messages = dead_letter(parsed[ParseAndValidate.FAILED], TABLE, None, "Parse")
+        assert_that(parsed.rows | beam.Map(lambda r: r.insert_id), equal_to(["team-a-1"]), label="Rows")
+        assert_that(
+            messages | beam.Map(lambda m: (m.data, m.attributes["table"])),
+            equal_to([(json.dumps(json.loads(bad)).encode(), TABLE), (b"oops", TABLE)]),
+            label="DeadLetters",
+        )
@@ -0,0 +1,115 @@
+"""
+Step 35: 문장 정렬(align_sentences) 벤치마크
+합성 2시간 분량 리포트(문장 / 단어 타임스탬프)에 ASR 오류(치환, 삭제, 삽입, 조사 변형, 긴 누락 구간)를 주입하고
+이전 그리디 정렬과 앵커 + 밴드 DP 정렬의 실행 시간과 문장 시작 시각 오차를 비교
+
+사용법:
+    python perf/bench_align.py --minutes 120 --sub 0.08 --dele 0.05 --ins 0.03 --soft 0.05 --dropouts 5
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import statistics
+import time
+
+from bench_common import ROOT
+
+SYLLABLES = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추쿠투푸후기니디리미비시이지치키티피히"
+PARTICLES = ["은", "는", "을", "를", "이", "가", "에", "의", "도"]
+
+
+def load_step35():
+    path = os.path.join(ROOT, "scripts", "Step35_ForcedAlignment.py")
+    spec = importlib.util.spec_from_file_location("step35", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def synth_report(minutes: float, rng: random.Random, vocab_size: int = 3000):
+    """Zipf 분포 어휘로 문장/단어 타임스탬프 생성 (평균 약 150 단어/분)"""
+    vocab = sorted({
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(vocab_size)
+    })
+    weights = [1 / (k + 1) for k in range(len(vocab))]
+    sentences, words, truth = [], [], []
+    t = 0.0
+    while t < minutes * 60:
+        n = rng.randint(6, 18)
+        toks = rng.choices(vocab, weights, k=n)
+        toks = [tok + rng.choice(PARTICLES) if rng.random() < 0.3 else tok for tok in toks]
+        start = t
+        for tok in toks:
+            dur = 0.25 + 0.05 * len(tok)
+            words.append({"word": tok, "start": round(t, 3), "end": round(t + dur, 3), "probability": 0.9})
+            t += dur + 0.05
+        truth.append((start, words[-1]["end"]))
+        sentences.append(" ".join(toks) + ".")
+        t += 0.4
+    return sentences, words, truth, vocab
+
+
+def inject_errors(words: list[dict], vocab: list[str], rng: random.Random, args) -> list[dict]:
+    out = []
+    skip_until = -1
+    dropout_at = set(rng.sample(range(len(words)), args.dropouts))
+    for idx, w in enumerate(words):
+        if idx in dropout_at:
+            skip_until = idx + rng.randint(20, 60)  # 긴 누락 구간 (잡음/음량 저하)
+        if idx <= skip_until:
+            continue
+        r = rng.random()
+        if r < args.dele:
+            continue
+        w = dict(w)
+        if r < args.dele + args.sub:
+            w["word"] = rng.choice(vocab)
+        elif r < args.dele + args.sub + args.soft:
+            word = w["word"]
+            w["word"] = word[:-1] if word[-1] in PARTICLES and len(word) > 2 else word + rng.choice(PARTICLES)
+        out.append(w)
+        if rng.random() < args.ins:
+            out.append({"word": "음", "start": w["end"], "end": w["end"] + 0.1, "probability": 0.3})
+    return out
+
+
+def evaluate(result: list[dict], truth: list[tuple]) -> dict:
+    errs = [abs(r["start"] - t[0]) for r, t in zip(result, truth)]
+    errs.sort()
+    return {
+        "mean_err_s": statistics.mean(errs),
+        "p95_err_s": errs[int(len(errs) * 0.95)],
+        "within_0.5s": sum(e <= 0.5 for e in errs) / len(errs),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Step 35 문장 정렬 벤치마크")
+    ap.add_argument("--minutes", type=float, default=120)
+    ap.add_argument("--sub", type=float, default=0.08, help="치환 비율")
+    ap.add_argument("--dele", type=float, default=0.05, help="삭제 비율")
+    ap.add_argument("--ins", type=float, default=0.03, help="삽입 비율")
+    ap.add_argument("--soft", type=float, default=0.05, help="조사 변형 비율")
+    ap.add_argument("--dropouts", type=int, default=5, help="긴 누락 구간 수")
+    ap.add_argument("--seed", type=int, default=36)
+    args = ap.parse_args()
+
+    mod = load_step35()
+    rng = random.Random(args.seed)
+    sentences, words, truth, vocab = synth_report(args.minutes, rng)
+    asr = inject_errors(words, vocab, rng, args)
+    print(f"합성 리포트: {args.minutes:g}분, {len(sentences)} 문장, 단어 {len(words)} → ASR {len(asr)}")
+
+    print(f"{'aligner':>8} {'time_s':>8} {'mean_err_s':>11} {'p95_err_s':>10} {'within_0.5s':>12}")
+    for name, fn in (("greedy", mod.align_sentences_greedy), ("dp", mod.align_sentences)):
+        t0 = time.perf_counter()
+        result = fn(sentences, asr)
+        elapsed = time.perf_counter() - t0
+        m = evaluate(result, truth)
+        print(f"{name:>8} {elapsed:>8.2f} {m['mean_err_s']:>11.2f} {m['p95_err_s']:>10.2f} {m['within_0.5s']:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
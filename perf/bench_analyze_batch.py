@@ -0,0 +1,135 @@
+"""
+Step 47: /analyze_batch 처리량 벤치마크
+짧은 합성 WAV 코퍼스(기본 1,000개)를 로컬 HTTP 서버로 제공하고,
+순차 /analyze 호출과 /analyze_batch (배치 크기 지정) 호출의 처리량(files/s)을 비교
+
+사용법:
+    python perf/bench_analyze_batch.py --files 1000 --seconds 5 --batch-size 50 --workers 4
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+import requests
+
+from bench_common import ROOT
+from bench_streaming_analyze import QuietHandler
+
+
+class KeepAliveHandler(QuietHandler):
+    # 오브젝트 스토리지처럼 keep-alive 허용 (커넥션 풀 효과 측정)
+    protocol_version = "HTTP/1.1"
+
+
+def serve_dir(directory: str) -> int:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(KeepAliveHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+
+
+def write_corpus(directory: str, n: int, seconds: float, sr: int = 16000) -> list[str]:
+    """길이/톤이 조금씩 다른 짧은 WAV n개 생성"""
+    import soundfile as sf
+
+    rng = np.random.default_rng(31)
+    names = []
+    for i in range(n):
+        dur = seconds * rng.uniform(0.8, 1.2)
+        t = np.arange(int(dur * sr)) / sr
+        voiced = np.sin(2 * np.pi * rng.uniform(0.3, 0.6) * t) > 0
+        y = 0.3 * np.sin(2 * np.pi * rng.uniform(120, 260) * t) * voiced + 0.01 * rng.standard_normal(len(t))
+        name = f"clip_{i:04d}.wav"
+        sf.write(os.path.join(directory, name), y.astype(np.float32), sr, subtype="PCM_16")
+        names.append(name)
+    return names
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_service(workers: int) -> tuple[subprocess.Popen, str]:
+    port = free_port()
+    env = dict(
+        os.environ, METRICS_ENABLED="0", ANALYZE_WORKERS=str(workers),
+        ANALYZE_MAX_PENDING="100000", ANALYZE_BATCH_MAX="100000",
+    )
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.join(ROOT, "step47-audio-features"), env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base}/health", timeout=1).ok:
+                return proc, base
+        except requests.RequestException:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("step47 서비스 시작 실패")
+
+
+def run_sequential(base: str, urls: list[str]) -> float:
+    session = requests.Session()
+    t0 = time.perf_counter()
+    for url in urls:
+        session.post(f"{base}/analyze", json={"audio_url": url}, timeout=120).raise_for_status()
+    return len(urls) / (time.perf_counter() - t0)
+
+
+def run_batch(base: str, urls: list[str], batch_size: int) -> float:
+    session = requests.Session()
+    t0 = time.perf_counter()
+    for i in range(0, len(urls), batch_size):
+        r = session.post(f"{base}/analyze_batch", json={"audio_urls": urls[i:i + batch_size]}, timeout=600)
+        r.raise_for_status()
+        errors = [item for item in r.json()["results"] if "error" in item]
+        if errors:
+            raise RuntimeError(f"배치 항목 실패: {errors[0]}")
+    return len(urls) / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Step 47 배치 분석 처리량 벤치마크")
+    ap.add_argument("--files", type=int, default=1000)
+    ap.add_argument("--seconds", type=float, default=5.0, help="파일당 평균 길이 (초)")
+    ap.add_argument("--batch-size", type=int, default=50)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="ANALYZE_WORKERS")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        names = write_corpus(tmp, args.files, args.seconds)
+        port = serve_dir(tmp)
+        urls = [f"http://127.0.0.1:{port}/{name}" for name in names]
+
+        proc, base = start_service(args.workers)
+        try:
+            run_sequential(base, urls[:10])  # 워밍업 (프로세스 풀 / 커넥션 풀 생성)
+            run_batch(base, urls[:10], 10)
+            seq = run_sequential(base, urls)
+            batch = run_batch(base, urls, args.batch_size)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    print(f"코퍼스: {args.files}개 x ~{args.seconds:g}초, workers={args.workers}, batch={args.batch_size}")
+    print(f"순차 /analyze      : {seq:7.1f} files/s")
+    print(f"/analyze_batch     : {batch:7.1f} files/s ({batch / seq:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Step 45: 백필 FILE_LOADS 임시 파일 형식 / 파티션별 적재 벤치마크 (GCS·BigQuery 대신 로컬 파일 시스템)
+합성 Firestore Export(문서당 한 줄)를 만들어 step45_backfill.run()을 --sink local로 실행하고,
+임시 파일 형식(JSON / AVRO) × 목적지(테이블 하나 / 일 단위 파티션)별로 적재 행 수, 임시 파일 바이트, 적재 작업 수, 소요 시간 비교
+
+적재 작업 시간은 --load-latency-ms(작업당 고정 비용) + 바이트 / --load-mb-per-sec 로 흉내냅니다.
+
+사용법:
+    python perf/bench_backfill_loads.py --docs 50000 --days 30 --workers 4
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from bench_common import ROOT
+
+sys.path.insert(0, os.path.join(ROOT, "dataflow"))
+
+import step45_backfill  # noqa: E402
+
+TABLE = "bench:yago_reports.quality_stream"
+
+
+def write_export(path: str, docs: int, days: int, files: int = 8, seed: int = 45):
+    """Firestore Export 문서(JSON 한 줄에 하나)를 files개 파일로 나누어 기록"""
+    rng = random.Random(seed)
+    start = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    handles = [open(os.path.join(path, f"export-{i:03d}.json"), "w") for i in range(files)]
+    try:
+        for i in range(docs):
+            ts = start + timedelta(seconds=rng.randrange(days * 86400))
+            team, report = f"team-{rng.randrange(200):04d}", f"report-{i:07d}"
+            num = lambda v: {"doubleValue": v}  # noqa: E731
+            doc = {
+                "name": f"projects/p/databases/(default)/documents/teams/{team}/reports/{report}"
+                        f"/qualityReports/{int(ts.timestamp() * 1000)}",
+                "fields": {
+                    "metrics": {"mapValue": {"fields": {
+                        "overallScore": num(rng.random()), "coverage": num(rng.uniform(0.8, 1.0)),
+                        "gaps": {"integerValue": str(rng.randrange(12))},
+                        "overlaps": {"integerValue": str(rng.randrange(8))}, "avgDur": num(rng.uniform(1, 4)),
+                    }}},
+                    "createdAt": {"timestampValue": ts.strftime("%Y-%m-%dT%H:%M:%S.%fZ")},
+                },
+            }
+            handles[i % files].write(json.dumps(doc) + "\n")
+    finally:
+        for h in handles:
+            h.close()
+
+
+def run_config(input_dir: str, work: str, fmt: str, partitioned: bool, args) -> dict:
+    temp_dir, out_dir = os.path.join(work, "temp"), os.path.join(work, "out")
+    argv = [
+        "--project", "bench", "--runner", "DirectRunner",
+        "--staging_location", os.path.join(work, "staging"), "--temp_location", temp_dir,
+        "--input_pattern", os.path.join(input_dir, "*.json"), "--bq_table", TABLE,
+        "--sink", "local", "--local_sink_dir", out_dir, "--temp_file_format", fmt,
+        "--partition_by_day" if partitioned else "--no-partition_by_day",
+        "--local_load_latency_ms", str(args.load_latency_ms), "--local_load_mb_per_sec", str(args.load_mb_per_sec),
+        "--direct_running_mode", "multi_threading", "--direct_num_workers", str(args.workers),
+    ]
+    t0 = time.perf_counter()
+    step45_backfill.run(argv)
+    elapsed = time.perf_counter() - t0
+
+    with open(os.path.join(out_dir, "_load_jobs.jsonl")) as f:
+        jobs = [json.loads(line) for line in f]
+    return {
+        "elapsed": elapsed,
+        "jobs": len(jobs),
+        "files": sum(j["files"] for j in jobs),
+        "rows": sum(j["rows"] for j in jobs),
+        "temp_bytes": sum(j["temp_bytes"] for j in jobs),
+        "max_job_sec": max(j["seconds"] for j in jobs),
+        "sum_job_sec": sum(j["seconds"] for j in jobs),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Step 45 백필 FILE_LOADS 벤치마크 (로컬 대용)")
+    ap.add_argument("--docs", type=int, default=50000)
+    ap.add_argument("--days", type=int, default=30)
+    ap.add_argument("--workers", type=int, default=4, help="DirectRunner 워커 스레드 수")
+    ap.add_argument("--load-latency-ms", type=float, default=500.0, help="적재 작업당 고정 비용")
+    ap.add_argument("--load-mb-per-sec", type=float, default=20.0, help="적재 작업 처리량")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_backfill_") as tmp:
+        input_dir = os.path.join(tmp, "export")
+        os.makedirs(input_dir)
+        write_export(input_dir, args.docs, args.days)
+        input_mb = sum(os.path.getsize(os.path.join(input_dir, n)) for n in os.listdir(input_dir)) / 1e6
+        print(f"입력: 문서 {args.docs}개, {args.days}일, {input_mb:.1f} MB")
+
+        print(f"{'format':>6} {'dest':>10} {'rows':>7} {'jobs':>5} {'files':>6} {'temp_MB':>8} "
+              f"{'B/row':>6} {'wall_s':>7} {'max_job_s':>9} {'sum_job_s':>9}")
+        for fmt in ("NEWLINE_DELIMITED_JSON", "AVRO"):
+            for partitioned in (False, True):
+                work = os.path.join(tmp, f"{fmt}-{partitioned}")
+                r = run_config(input_dir, work, fmt, partitioned, args)
+                shutil.rmtree(work, ignore_errors=True)
+                status = "" if r["rows"] == args.docs else f"  (행 수 불일치: {args.docs})"
+                print(
+                    f"{fmt[:6]:>6} {'day' if partitioned else 'single':>10} {r['rows']:>7} {r['jobs']:>5} {r['files']:>6} "
+                    f"{r['temp_bytes'] / 1e6:>8.2f} {r['temp_bytes'] / max(1, r['rows']):>6.0f} {r['elapsed']:>7.1f} "
+                    f"{r['max_job_sec']:>9.2f} {r['sum_job_sec']:>9.2f}{status}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Step 47/49: 콜드 스타트 벤치마크 (Cloud Run 0 → 1 스케일 흉내)
+새 프로세스에서 서비스마다
+- import 시간: `import app` (WARMUP=1이면 워밍업 포함)
+- ready: 프로세스 시작 → /health 200
+- 첫 요청 / 두 번째 요청 지연, 시작 → 첫 응답 합계
+를 설정별로 측정합니다.
+- step47: WAV(soundfile 경로) 요청, ffmpeg가 있으면 WebM/Opus(librosa 대체 디코딩 경로) 요청도 측정, 특징 캐시는 끔
+  numba 캐시: cold(빈 NUMBA_CACHE_DIR) / baked(이미지 빌드 때처럼 미리 채운 디렉터리)
+- step49: 합성 데이터로 학습한 GBDT 모델 파일로 /predict (예측 캐시 끔)
+
+사용법:
+    python perf/bench_cold_start.py --repeat 3
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+from bench_sweep import train_fixture_model
+from bench_workers import SERVICES, free_port, serve_audio
+
+
+def import_seconds(service: str, env: dict) -> float:
+    code = "import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=SERVICES[service], env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def cold_start(service: str, env: dict, requests_: list) -> dict:
+    """uvicorn 단일 프로세스를 띄워 ready 시간과 요청별 지연(ms) 측정"""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVICES[service], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"{service} 프로세스 종료 (exit {proc.returncode})")
+            try:
+                if requests.get(base + "/health", timeout=1).ok:
+                    break
+            except requests.RequestException:
+                pass
+            if time.perf_counter() - t0 > 120:
+                raise RuntimeError(f"{service} ready 시간 초과")
+            time.sleep(0.02)
+        result = {"ready_s": time.perf_counter() - t0}
+        for name, path, payload in requests_:
+            t1 = time.perf_counter()
+            requests.post(base + path, json=payload, timeout=120).raise_for_status()
+            result[name] = (time.perf_counter() - t1) * 1000
+        return result
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def webm_url(wav_url: str, tmp: str):
+    """ffmpeg로 WebM/Opus 파일을 만들어 로컬 HTTP 서버로 제공 (ffmpeg가 없으면 None)"""
+    if not shutil.which("ffmpeg"):
+        return None
+    path = os.path.join(tmp, "audio.webm")
+    subprocess.run(
+        ["ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", wav_url, "-t", "30", "-c:a", "libopus", path],
+        check=True,
+    )
+    port = free_port()
+    subprocess.Popen(
+        [sys.executable, "-m", "http.server", str(port), "--bind", "127.0.0.1"],
+        cwd=tmp, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    time.sleep(0.5)
+    return f"http://127.0.0.1:{port}/audio.webm"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Step 47/49 콜드 스타트 벤치마크")
+    ap.add_argument("--repeat", type=int, default=3, help="설정별 반복 횟수 (중앙값 출력)")
+    ap.add_argument("--services", nargs="+", default=["step47", "step49"])
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_cold_start_") as tmp:
+        wav = serve_audio(seconds=30)
+        webm = webm_url(wav, tmp)
+        model_path = os.path.join(tmp, "model.pkl")
+        train_fixture_model(model_path)
+        baked_cache = os.path.join(tmp, "numba_baked")
+
+        base_env = dict(os.environ, FEATURE_CACHE_MAX_MB="0", PREDICT_CACHE_SIZE="0", MODEL_PATH=model_path)
+        base_env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+        # 이미지 빌드 단계처럼 워밍업으로 numba 캐시를 미리 채움
+        import_seconds("step47", dict(base_env, NUMBA_CACHE_DIR=baked_cache, WARMUP="1"))
+
+        step47_requests = [("first_wav_ms", "/analyze", {"audio_url": wav}), ("second_wav_ms", "/analyze", {"audio_url": wav})]
+        if webm:
+            step47_requests.append(("first_webm_ms", "/analyze", {"audio_url": webm}))
+        predict = {"snr_db": 18.5, "speech_blocks_per_min": 120, "coverage": 0.93, "gaps": 3, "overlaps": 2}
+        configs = {
+            "step47": [
+                ("warmup=0 numba=cold", {"WARMUP": "0"}, None),
+                ("warmup=1 numba=cold", {"WARMUP": "1"}, None),
+                ("warmup=1 numba=baked", {"WARMUP": "1"}, baked_cache),
+            ],
+            "step49": [
+                ("warmup=0", {"WARMUP": "0"}, None),
+                ("warmup=1", {"WARMUP": "1"}, None),
+            ],
+        }
+        service_requests = {
+            "step47": step47_requests,
+            "step49": [("first_predict_ms", "/predict", predict), ("second_predict_ms", "/predict", predict)],
+        }
+
+        for service in args.services:
+            print(f"\n[{service}] (중앙값, {args.repeat}회)")
+            names = [name for name, _, _ in service_requests[service]]
+            print(f"{'config':>22} {'import_s':>9} {'ready_s':>8} " + " ".join(f"{n:>15}" for n in names)
+                  + f" {'start→1st_s':>12}")
+            for label, extra, numba_dir in configs[service]:
+                runs = []
+                for i in range(args.repeat):
+                    cache_dir = numba_dir or os.path.join(tmp, f"numba_cold_{service}_{label}_{i}".replace(" ", "_"))
+                    env = dict(base_env, NUMBA_CACHE_DIR=cache_dir, **extra)
+                    if numba_dir is None:
+                        shutil.rmtree(cache_dir, ignore_errors=True)
+                    imp = import_seconds(service, env)
+                    if numba_dir is None:
+                        shutil.rmtree(cache_dir, ignore_errors=True)
+                    runs.append({"import_s": imp, **cold_start(service, env, service_requests[service])})
+                med = {k: statistics.median(r[k] for r in runs) for k in runs[0]}
+                first = names[0]
+                print(
+                    f"{label:>22} {med['import_s']:>9.2f} {med['ready_s']:>8.2f} "
+                    + " ".join(f"{med[n]:>15.0f}" for n in names)
+                    + f" {med['ready_s'] + med[first] / 1000:>12.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
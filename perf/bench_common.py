@@ -0,0 +1,39 @@
+"""
+perf 벤치마크 공통 유틸
+"""
+
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SERVICE_APPS = {
+    "step47": os.path.join(ROOT, "step47-audio-features", "app.py"),
+    "step49": os.path.join(ROOT, "step49-quality-predictor", "app.py"),
+}
+
+
+def load_service(name: str, **env):
+    """
+    환경 변수를 지정하여 서비스 app 모듈을 새로 로드합니다.
+    같은 프로세스에서 여러 번 로드할 수 있도록 기본 Prometheus 레지스트리를 비웁니다.
+    모듈은 sys.modules에 "{name}_app"으로 등록하므로 프로세스 풀에 넘기는 함수(analyze_bytes 등)도 pickle됩니다.
+    공통 모듈(service-common/service_common.py)도 새로 import하므로 METRICS_ENABLED / PROFILE_TOKEN 등도 env를 따릅니다.
+    """
+    from prometheus_client import REGISTRY
+
+    for collector in list(REGISTRY._collector_to_names):
+        REGISTRY.unregister(collector)
+
+    os.environ.update({k: str(v) for k, v in env.items()})
+    sys.modules.pop("service_common", None)
+    spec = importlib.util.spec_from_file_location(f"{name}_app", SERVICE_APPS[name])
+    mod = importlib.util.module_from_spec(spec)
+    # exec 전에 등록해야 pickle이 모듈 이름으로 함수를 다시 찾을 수 있음 (importlib 권장 순서)
+    sys.modules[spec.name] = mod
+    try:
+        spec.loader.exec_module(mod)
+    except BaseException:
+        sys.modules.pop(spec.name, None)
+        raise
+    return mod
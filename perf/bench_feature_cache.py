@@ -0,0 +1,85 @@
+"""
+Step 47: 특징 캐시 벤치마크
+합성 WAV를 로컬 HTTP 서버(Last-Modified / If-Modified-Since 지원)로 제공하고
+- miss: 캐시가 빈 상태 (다운로드 + 디코딩 + 특징 추출)
+- hit (304): 같은 URL 재요청 → 조건부 요청으로 다운로드 생략
+- hit (content hash): 다른 URL의 같은 파일 → 다운로드 후 해시 적중, 디코딩 생략
+의 /analyze 지연 시간과 캐시 디스크 사용량을 비교
+
+사용법:
+    python perf/bench_feature_cache.py --files 30 --seconds 60
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from bench_analyze_batch import serve_dir
+from bench_common import load_service
+
+
+def write_corpus(directory: str, n: int, seconds: float, sr: int = 44100) -> list[str]:
+    import soundfile as sf
+
+    rng = np.random.default_rng(32)
+    names = []
+    for i in range(n):
+        t = np.arange(int(seconds * sr)) / sr
+        voiced = np.sin(2 * np.pi * rng.uniform(0.3, 0.6) * t) > 0
+        y = 0.3 * np.sin(2 * np.pi * rng.uniform(120, 260) * t) * voiced + 0.01 * rng.standard_normal(len(t))
+        name = f"report_{i:03d}.wav"
+        sf.write(os.path.join(directory, name), y.astype(np.float32), sr, subtype="PCM_16")
+        names.append(name)
+    return names
+
+
+def timed_pass(client: TestClient, urls: list[str], streaming: bool) -> list[float]:
+    latencies = []
+    for url in urls:
+        t0 = time.perf_counter()
+        client.post("/analyze", json={"audio_url": url, "streaming": streaming}).raise_for_status()
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return latencies
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Step 47 특징 캐시 벤치마크")
+    ap.add_argument("--files", type=int, default=30)
+    ap.add_argument("--seconds", type=float, default=60.0, help="파일당 길이 (초)")
+    ap.add_argument("--streaming", action="store_true", help="스트리밍 모드로 측정")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as audio_dir, tempfile.TemporaryDirectory() as cache_dir:
+        names = write_corpus(audio_dir, args.files, args.seconds)
+        port = serve_dir(audio_dir)
+        urls = [f"http://127.0.0.1:{port}/{name}" for name in names]
+        # 쿼리만 다른 URL: 서버는 같은 파일을 반환하지만 URL 메타가 없어 전체 다운로드
+        copies = [f"{url}?copy=1" for url in urls]
+
+        mod = load_service("step47", METRICS_ENABLED=0, FEATURE_CACHE_DIR=cache_dir)
+        client = TestClient(mod.app)
+        runs = {
+            "miss": timed_pass(client, urls, args.streaming),
+            "hit (304)": timed_pass(client, urls, args.streaming),
+            "hit (content hash)": timed_pass(client, copies, args.streaming),
+        }
+        stats = mod.feature_cache.stats()
+        audio_mb = sum(os.path.getsize(os.path.join(audio_dir, n)) for n in names) / 1e6
+
+    print(f"코퍼스: {args.files}개 x {args.seconds:g}초 (44.1 kHz WAV, 합계 {audio_mb:.0f} MB)")
+    print(f"{'case':>20} {'p50_ms':>9} {'mean_ms':>9}")
+    for name, lat in runs.items():
+        print(f"{name:>20} {statistics.median(lat):>9.2f} {statistics.mean(lat):>9.2f}")
+    print(
+        f"캐시: {stats['entries']}개 항목, {stats['disk_bytes'] / 1024:.1f} KB "
+        f"(항목당 {stats['disk_bytes'] / max(stats['entries'], 1):.0f} B), hit_rate {stats['hit_rate']:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
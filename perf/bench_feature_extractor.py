@@ -0,0 +1,85 @@
+"""
+Step 47: 단일 패스 특징 추출기 벤치마크
+librosa 개별 호출(rms / zero_crossing_rate / spectral_centroid)과 FrameFeatureExtractor(float64/float32)의
+오디오 1분당 CPU 시간과 librosa 기준 오차를 비교
+
+사용법:
+    python perf/bench_feature_extractor.py --minutes 1 5 15 --repeat 3
+    python perf/bench_feature_extractor.py --min-speedup 3   # 목표 미달 시 exit code 1
+"""
+
+import argparse
+import sys
+import time
+
+import librosa
+import numpy as np
+
+from bench_common import load_service
+
+SR = 16000
+
+
+def synth(minutes: float, seed: int = 30) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(minutes * 60 * SR)) / SR
+    voiced = np.sin(2 * np.pi * 0.4 * t) > 0
+    y = 0.3 * np.sin(2 * np.pi * 180 * t) * voiced + 0.3 * np.sin(2 * np.pi * 1250 * t) * voiced
+    return (y + 0.01 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def librosa_reference(y: np.ndarray):
+    rms = librosa.feature.rms(y=y, frame_length=2048, hop_length=512)[0]
+    zcr = librosa.feature.zero_crossing_rate(y, frame_length=2048, hop_length=512)[0]
+    sc = librosa.feature.spectral_centroid(y=y, sr=SR, hop_length=512)[0]
+    return rms, zcr, sc
+
+
+def cpu_time(fn, repeat: int):
+    """process_time 기준 최소 CPU 시간과 마지막 결과 반환"""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.process_time()
+        result = fn()
+        best = min(best, time.process_time() - t0)
+    return best, result
+
+
+def max_rel_err(ref: np.ndarray, got: np.ndarray) -> float:
+    return float(np.max(np.abs(got - ref) / np.maximum(np.abs(ref), 1e-6)))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Step 47 단일 패스 특징 추출기 벤치마크")
+    ap.add_argument("--minutes", type=float, nargs="+", default=[1, 5, 15])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--min-speedup", type=float, default=0.0, help="float32 경로의 최소 속도 향상 배수")
+    args = ap.parse_args()
+
+    mod = load_service("step47", METRICS_ENABLED=0)
+    ok = True
+
+    print(f"{'min':>5} {'impl':>10} {'cpu_s/min':>10} {'speedup':>8} {'rms_err':>9} {'zcr_err':>9} {'sc_err':>9}")
+    for minutes in args.minutes:
+        y = synth(minutes)
+        librosa_reference(y[: SR * 5])  # 워밍업 (numba JIT 등)
+        ref_t, ref = cpu_time(lambda: librosa_reference(y), args.repeat)
+        print(f"{minutes:>5g} {'librosa':>10} {ref_t / minutes:>10.3f} {1.0:>8.2f}")
+
+        for dtype in ("float64", "float32"):
+            extractor = mod.FrameFeatureExtractor(SR, dtype)
+            t, got = cpu_time(lambda: extractor.extract(y), args.repeat)
+            errs = [max_rel_err(r, g) for r, g in zip(ref, got)]
+            speedup = ref_t / t
+            print(
+                f"{minutes:>5g} {dtype:>10} {t / minutes:>10.3f} {speedup:>8.2f} "
+                f"{errs[0]:>9.1e} {errs[1]:>9.1e} {errs[2]:>9.1e}"
+            )
+            if dtype == "float32" and speedup < args.min_speedup:
+                ok = False
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Step 45 → 49: 온라인 특징 저장소 + /predict_for_team 종단 지연 벤치마크
+1) 합성 이벤트를 ingest → write_features(DirectRunner)로 흘려 SQLite 특징 저장소를 채우고 팀별 최신 값/건수 검증
+2) step49 서비스를 FEATURE_STORE_URL로 띄워 두 흐름의 지연 비교
+   - client: 호출자가 팀 지표를 먼저 조회(--client-lookup-ms, Firestore/BigQuery 왕복 가정값을 더함) + /predict
+   - store : /predict_for_team/{team_id} 한 번 (저장소 조회 + 예측이 서비스 안에서 끝남)
+   예측 캐시는 끄고(PREDICT_CACHE_SIZE=0) 튜닝 파라미터는 요청마다 무작위
+
+사용법:
+    python perf/bench_feature_store.py --events 50000 --teams 200 --requests 2000 --client-lookup-ms 50 1500
+    python perf/bench_feature_store.py --store-url redis://localhost:6379/0  # Redis로 비교 (서버 필요)
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from bench_common import ROOT, load_service
+
+sys.path.insert(0, os.path.join(ROOT, "dataflow"))
+
+import apache_beam as beam  # noqa: E402
+from apache_beam.options.pipeline_options import PipelineOptions  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import step45_stream  # noqa: E402
+from bench_fused_pipeline import read_messages, synth_messages  # noqa: E402
+from feature_store import open_feature_store  # noqa: E402
+
+
+def pct(values: list, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def expected_latest(messages: list) -> dict:
+    """team_id → (건수, 최신 이벤트 payload)"""
+    latest = {}
+    for data, _, _ in messages:
+        payload = json.loads(data)
+        count, prev = latest.get(payload["team_id"], (0, None))
+        if prev is None or payload["event_ts"] >= prev["event_ts"]:
+            prev = payload
+        latest[payload["team_id"]] = (count + 1, prev)
+    return latest
+
+
+def fill_store(messages: list, store_url: str) -> float:
+    opts = SimpleNamespace(feature_store=store_url, feature_ewma_alpha=0.1)
+    p = beam.Pipeline(options=PipelineOptions(flags=[], runner="DirectRunner"))
+    step45_stream.write_features(step45_stream.ingest(read_messages(p, messages)), opts)
+    t0 = time.perf_counter()
+    p.run().wait_until_finish()
+    return time.perf_counter() - t0
+
+
+def verify_store(store, expected: dict) -> int:
+    mismatches = 0
+    for team, (count, payload) in expected.items():
+        f = store.get(team)
+        if (
+            f is None or f["count"] != count or f["last_report_id"] != payload["report_id"]
+            or f["coverage"] != payload["coverage"] or f["gaps"] != payload["gaps"]
+        ):
+            mismatches += 1
+    return mismatches
+
+
+def timed(fn, n: int) -> list:
+    latencies = []
+    for i in range(n):
+        t0 = time.perf_counter()
+        fn(i)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return latencies
+
+
+def report(name: str, lat: list):
+    print(f"{name:>32} {statistics.mean(lat):>8.3f} {pct(lat, 0.5):>8.3f} {pct(lat, 0.95):>8.3f} {pct(lat, 0.99):>8.3f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="온라인 특징 저장소 + /predict_for_team 지연 벤치마크")
+    ap.add_argument("--events", type=int, default=50000)
+    ap.add_argument("--teams", type=int, default=200)
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--client-lookup-ms", type=float, nargs="*", default=[50, 1500],
+                    help="호출자 측 팀 지표 조회 지연 가정값 (Firestore 문서 읽기 / BigQuery 쿼리)")
+    ap.add_argument("--store-url", help="특징 저장소 URL (기본: 임시 디렉터리의 SQLite)")
+    args = ap.parse_args()
+
+    messages = synth_messages(args.events, args.teams, hours=6)
+    expected = expected_latest(messages)
+    teams = sorted(expected)
+
+    with tempfile.TemporaryDirectory(prefix="bench_feature_store_") as tmp:
+        store_url = args.store_url or f"sqlite:///{os.path.join(tmp, 'features.db')}"
+        elapsed = fill_store(messages, store_url)
+        store = open_feature_store(store_url)
+        mismatches = verify_store(store, expected)
+        print(f"이벤트 {args.events}건, 팀 {len(teams)}개 → {store_url.split(':')[0]} 저장소 채움 {elapsed:.1f}s, "
+              f"최신 값/건수 불일치 {mismatches}")
+
+        mod = load_service("step49", FEATURE_STORE_URL=store_url, PREDICT_CACHE_SIZE=0, METRICS_ENABLED=1)
+        client = TestClient(mod.app)
+        rng = random.Random(46)
+        params = [
+            {"vad_aggressiveness": rng.choice(["low", "medium", "high"]),
+             "noise_suppression": rng.choice(["weak", "normal", "strong"])}
+            for _ in range(args.requests)
+        ]
+        team_of = [rng.choice(teams) for _ in range(args.requests)]
+
+        def client_lookup(i):
+            """호출자가 조회해 오는 값과 같은 특징 (조회 지연은 결과에 가정값으로 더함)"""
+            f = store.get(team_of[i])
+            return {"snr_db": 15, "speech_blocks_per_min": 100, "coverage": f["coverage"],
+                    "gaps": f["gaps"], "overlaps": f["overlaps"], **params[i]}
+
+        payloads = [client_lookup(i) for i in range(args.requests)]
+        store_get = timed(lambda i: store.get(team_of[i]), args.requests)
+        predict = timed(lambda i: client.post("/predict", json=payloads[i]).raise_for_status(), args.requests)
+        for_team = timed(
+            lambda i: client.post(f"/predict_for_team/{team_of[i]}", json=params[i]).raise_for_status(), args.requests
+        )
+        same = sum(
+            client.post("/predict", json=payloads[i]).json()["predicted_score"]
+            == client.post(f"/predict_for_team/{team_of[i]}", json=params[i]).json()["predicted_score"]
+            for i in range(min(200, args.requests))
+        )
+
+    print(f"{'(ms)':>32} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    report("store.get", store_get)
+    report("/predict (features given)", predict)
+    report("/predict_for_team", for_team)
+    for lookup_ms in args.client_lookup_ms:
+        report(f"client lookup {lookup_ms:g}ms + /predict", [lookup_ms + x for x in predict])
+    print(f"같은 특징으로 /predict와 /predict_for_team 결과 일치: {same}/{min(200, args.requests)}")
+    sys.exit(0 if mismatches == 0 and same == min(200, args.requests) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Step 35: Firestore 일괄 읽기/쓰기 벤치마크 (Firestore 에뮬레이터 필요)
+리포트 문서 N개(기본 10,000)를 만들어 두고, 본문 읽기 + sentenceTimestamps 쓰기의 초당 문서 수를 비교
+- legacy: 리포트마다 get 1회 + 새 Client로 update 1회 (이전 방식, --legacy-sample개만 측정)
+- bulk  : get_all(--read-batch개씩) + BulkWriter (prefetch_contents / ResultWriter)
+
+사용법:
+    gcloud emulators firestore start --host-port=127.0.0.1:8080
+    FIRESTORE_EMULATOR_HOST=127.0.0.1:8080 python perf/bench_firestore_bulk.py --reports 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from bench_align import load_step35
+
+PROJECT = "bench-step35"
+
+
+def sentence_payload(n: int = 40) -> list[dict]:
+    """2시간 리포트 수준의 sentenceTimestamps (문장 n개)"""
+    return [
+        {"index": i, "text": f"문장 {i} 입니다.", "start": i * 3.0, "end": i * 3.0 + 2.5, "confidence": 0.9}
+        for i in range(n)
+    ]
+
+
+def seed(client, n: int):
+    writer = client.bulk_writer()
+    reports = client.collection("reports")
+    for i in range(n):
+        writer.set(reports.document(f"bench-{i:05d}"), {
+            "content": f"리포트 {i} 본문입니다. " * 20,
+            "audioUrl": f"https://example.invalid/{i}.mp3",
+        })
+    writer.close()
+
+
+def run_legacy(mod, client, jobs: list[dict], payload: list[dict]) -> float:
+    t0 = time.perf_counter()
+    for job in jobs:
+        mod.fetch_content(client, job["reportId"])
+        mod.firestore.Client(project=PROJECT).collection("reports").document(job["reportId"]).update(
+            {"sentenceTimestamps": payload}
+        )
+    return len(jobs) / (time.perf_counter() - t0)
+
+
+def run_bulk(mod, client, jobs: list[dict], payload: list[dict], read_batch: int, write_ops: int) -> float:
+    t0 = time.perf_counter()
+    errors = mod.prefetch_contents(client, jobs, read_batch)
+    writer = mod.ResultWriter(client, write_ops)
+    for job in jobs:
+        writer.update(job["reportId"], payload)
+    writer.close()
+    rate = len(jobs) / (time.perf_counter() - t0)
+    if errors or writer.failures:
+        raise SystemExit(f"실패: 읽기 {len(errors)}, 쓰기 {len(writer.failures)}")
+    return rate
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Step 35 Firestore 일괄 읽기/쓰기 벤치마크")
+    ap.add_argument("--reports", type=int, default=10000)
+    ap.add_argument("--legacy-sample", type=int, default=500, help="legacy 방식으로 측정할 리포트 수")
+    ap.add_argument("--read-batch", type=int, default=300)
+    ap.add_argument("--write-ops", type=int, default=500)
+    ap.add_argument("--skip-seed", action="store_true")
+    args = ap.parse_args()
+
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("FIRESTORE_EMULATOR_HOST가 필요합니다 (실제 프로젝트에 쓰지 않도록 에뮬레이터에서만 실행)")
+
+    mod = load_step35()
+    if not mod.FIRESTORE_AVAILABLE:
+        sys.exit("google-cloud-firestore가 필요합니다")
+    client = mod.get_firestore_client(PROJECT)
+    if not args.skip_seed:
+        t0 = time.perf_counter()
+        seed(client, args.reports)
+        print(f"시드: {args.reports}건 {time.perf_counter() - t0:.1f}초")
+
+    payload = sentence_payload()
+    jobs = [{"reportId": f"bench-{i:05d}", "audioUrl": ""} for i in range(args.reports)]
+
+    legacy = run_legacy(mod, client, jobs[:args.legacy_sample], payload)
+    bulk = run_bulk(mod, client, jobs, payload, args.read_batch, args.write_ops)
+    print(f"{'mode':>8} {'docs':>7} {'docs/s':>9} {'10k_eta_s':>10}")
+    print(f"{'legacy':>8} {args.legacy_sample:>7} {legacy:>9.1f} {10000 / legacy:>10.1f}")
+    print(f"{'bulk':>8} {args.reports:>7} {bulk:>9.1f} {10000 / bulk:>10.1f}")
+    print(f"speedup: {bulk / legacy:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Step 45/46: 분리 파이프라인 vs 통합 파이프라인(step45_46_fused) CPU 비교 (DirectRunner)
+- separate: 적재 파이프라인(step45_stream) + 이상 탐지 파이프라인(step46_anomaly)을 각각 실행, 입력을 두 번 읽고 두 번 파싱
+- fused: 입력을 한 번 읽고 파싱/검증/중복제거를 공유한 뒤 싱크와 이상 탐지로 분기
+Pub/Sub 대신 PubsubMessage(ReadFromPubSub(with_attributes=True)와 같은 형식)를 Create로 넣고 이벤트 시각을 타임스탬프로 지정, 싱크는 로컬 대용(at-least-once)
+결과는 이벤트 100만 건당 CPU 초(process_time, 모든 스레드 합)로 환산
+
+사용법:
+    python perf/bench_fused_pipeline.py --events 1000000 --teams 200
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from bench_common import ROOT
+
+sys.path.insert(0, os.path.join(ROOT, "dataflow"))
+
+import apache_beam as beam  # noqa: E402
+from apache_beam.io.gcp.pubsub import PubsubMessage  # noqa: E402
+from apache_beam.options.pipeline_options import PipelineOptions  # noqa: E402
+
+import step45_46_fused  # noqa: E402
+import step45_stream  # noqa: E402
+import step46_anomaly  # noqa: E402
+
+START_TS = 1717200000  # 2024-06-01T00:00:00Z
+
+
+def synth_messages(n: int, teams: int, hours: float, seed: int = 44) -> list:
+    """(data, attributes, 이벤트 시각) 목록"""
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        ts = START_TS + i * hours * 3600 / n
+        team = f"team-{rng.randrange(teams):04d}"
+        payload = {
+            "insert_id": f"{team}-{i}", "team_id": team, "report_id": f"report-{i:07d}",
+            "event_ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(ts)) + "Z",
+            "overallScore": min(1.0, max(0.0, rng.gauss(0.8, 0.08))), "coverage": rng.uniform(0.85, 1.0),
+            "gaps": rng.randrange(12), "overlaps": rng.randrange(9), "avgDur": rng.uniform(1, 4),
+        }
+        out.append((json.dumps(payload).encode("utf-8"), {}, ts))
+    return out
+
+
+def read_messages(p, messages):
+    """Pub/Sub 읽기 대용: PubsubMessage에 이벤트 시각 타임스탬프 부여"""
+    return (
+        p
+        | "Read" >> beam.Create(messages, reshuffle=False)
+        | "Timestamp" >> beam.Map(lambda m: beam.window.TimestampedValue(PubsubMessage(m[0], m[1]), m[2]))
+    )
+
+
+def run_pipeline(build) -> float:
+    """파이프라인 하나를 실행하고 CPU 초 반환"""
+    p = beam.Pipeline(options=PipelineOptions(flags=[], runner="DirectRunner"))
+    build(p)
+    t0 = time.process_time()
+    p.run().wait_until_finish()
+    return time.process_time() - t0
+
+
+def count_alerts(prefix: str) -> int:
+    return sum(1 for path in glob.glob(prefix + "*") for _ in open(path))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="분리 vs 통합 스트리밍 파이프라인 CPU 비교")
+    ap.add_argument("--events", type=int, default=1000000)
+    ap.add_argument("--teams", type=int, default=200)
+    ap.add_argument("--hours", type=float, default=6, help="이벤트 시각 범위")
+    args = ap.parse_args()
+
+    messages = synth_messages(args.events, args.teams, args.hours)
+    scale = 1e6 / args.events
+
+    with tempfile.TemporaryDirectory(prefix="bench_fused_") as tmp:
+        opts = SimpleNamespace(
+            bq_table="bench:yago_reports.quality_stream", temp_location=tmp, sink="local",
+            local_sink_dir=os.path.join(tmp, "sink"), local_append_latency_ms=0.0, triggering_frequency=5,
+            num_storage_api_streams=0, with_auto_sharding=False, use_at_least_once=True, dead_letter_topic=None,
+            rollup_table="bench:yago_reports.quality_rollup", rollup_granularities="", feature_store="",  # 비교 대상 아님
+            z_threshold=2.5, cov_min=0.9, gaps_max=10, overlaps_max=8, window_size=900, window_period=300,
+        )
+
+        def ingest_only(p):
+            step45_stream.write_rows(step45_stream.ingest(read_messages(p, messages)), opts)
+
+        def anomaly_only(p):
+            keyed = (
+                read_messages(p, messages)
+                | "Parse" >> beam.ParDo(step46_anomaly.ParseJson())
+                | "KeyByTeam" >> beam.ParDo(step46_anomaly.KeyByTeam())
+            )
+            step46_anomaly.detect_anomalies(keyed, opts) | beam.io.WriteToText(os.path.join(tmp, "alerts-separate"))
+
+        def fused(p):
+            step45_46_fused.build_pipeline(read_messages(p, messages), opts) | beam.io.WriteToText(
+                os.path.join(tmp, "alerts-fused")
+            )
+
+        cpu_ingest = run_pipeline(ingest_only)
+        cpu_anomaly = run_pipeline(anomaly_only)
+        cpu_fused = run_pipeline(fused)
+        separate = cpu_ingest + cpu_anomaly
+
+        print(f"이벤트 {args.events}건, 팀 {args.teams}개, {args.hours:g}시간 (CPU 초 / 100만 건)")
+        print(f"  separate: {separate * scale:8.1f}  (ingest {cpu_ingest * scale:.1f} + anomaly {cpu_anomaly * scale:.1f})")
+        print(f"  fused   : {cpu_fused * scale:8.1f}  ({(1 - cpu_fused / separate) * 100:.0f}% 절감)")
+        print(f"  alerts  : separate {count_alerts(os.path.join(tmp, 'alerts-separate'))}, "
+              f"fused {count_alerts(os.path.join(tmp, 'alerts-fused'))}")
+
+
+if __name__ == "__main__":
+    main()
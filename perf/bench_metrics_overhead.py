@@ -0,0 +1,138 @@
+"""
+Step 47/49: Prometheus 계측 오버헤드 검증
+METRICS_ENABLED=0/1 로 step49 서비스를 각각 uvicorn으로 띄우고 /predict 처리량을 비교하여,
+오버헤드가 임계치(기본 2%)를 넘으면 exit code 1로 실패
+
+가장 가벼운 핫패스(캐시 적중 /predict)를 기준으로 측정하므로 실제 오버헤드의 상한에 가깝습니다.
+--asgi 옵션은 HTTP 스택 없이 ASGI 앱을 직접 호출하여 요청당 순수 계측 비용을 보여줍니다 (참고용).
+
+사용법:
+    python perf/bench_metrics_overhead.py --requests 300 --rounds 31 --max-overhead 0.02
+    python perf/bench_metrics_overhead.py --asgi
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+from bench_common import ROOT, load_service
+
+PREDICT = {
+    "snr_db": 18.5, "speech_blocks_per_min": 120, "coverage": 0.93,
+    "gaps": 3, "overlaps": 1, "vad_aggressiveness": "medium", "noise_suppression": "normal",
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_uvicorn(metrics_enabled: bool) -> tuple[subprocess.Popen, str]:
+    port = free_port()
+    env = dict(os.environ, METRICS_ENABLED="1" if metrics_enabled else "0")
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.join(ROOT, "step49-quality-predictor"), env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base}/health", timeout=1).ok:
+                return proc, base
+        except requests.RequestException:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("uvicorn 시작 실패")
+
+
+def run_http(session: requests.Session, url: str, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        session.post(url, json=PREDICT).raise_for_status()
+    return n / (time.perf_counter() - t0)
+
+
+async def run_asgi(app, n: int) -> float:
+    """ASGI 앱에 /predict를 n번 직접 호출하고 req/s 반환"""
+    body = json.dumps(PREDICT).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/predict", "raw_path": b"/predict",
+        "root_path": "", "query_string": b"", "server": ("bench", 80), "client": ("bench", 1),
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    }
+    message = {"type": "http.request", "body": body, "more_body": False}
+
+    async def receive():
+        return message
+
+    async def send(_message):
+        pass
+
+    t0 = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), receive, send)
+    return n / (time.perf_counter() - t0)
+
+
+def round_order(items: dict, i: int) -> list:
+    """라운드마다 실행 순서를 뒤집어 순서 편향 제거"""
+    pairs = list(items.items())
+    return pairs if i % 2 == 0 else pairs[::-1]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Prometheus 계측 오버헤드 검증")
+    ap.add_argument("--requests", type=int, default=300, help="라운드당 요청 수")
+    ap.add_argument("--rounds", type=int, default=31)
+    ap.add_argument("--max-overhead", type=float, default=0.02)
+    ap.add_argument("--asgi", action="store_true", help="HTTP 스택 없이 ASGI 직접 호출")
+    args = ap.parse_args()
+
+    # 짧은 배치를 번갈아 실행하고 각 설정의 중앙값 처리량으로 비교 (노이즈 최소화)
+    samples = {"off": [], "on": []}
+    if args.asgi:
+        apps = {
+            "off": load_service("step49", METRICS_ENABLED=0).app,
+            "on": load_service("step49", METRICS_ENABLED=1).app,
+        }
+        for i in range(args.rounds):
+            for name, app in round_order(apps, i):
+                samples[name].append(asyncio.run(run_asgi(app, args.requests)))
+    else:
+        servers = {"off": start_uvicorn(False), "on": start_uvicorn(True)}
+        try:
+            sessions = {name: requests.Session() for name in servers}
+            for name, (_, base) in servers.items():
+                run_http(sessions[name], f"{base}/predict", 200)  # 워밍업
+            for i in range(args.rounds):
+                for name, (_, base) in round_order(servers, i):
+                    samples[name].append(run_http(sessions[name], f"{base}/predict", args.requests))
+        finally:
+            for proc, _ in servers.values():
+                proc.terminate()
+                proc.wait(timeout=10)
+
+    rps = {name: statistics.median(values) for name, values in samples.items()}
+    overhead = 1 - rps["on"] / rps["off"]
+    print(f"metrics off: {rps['off']:.0f} req/s")
+    print(f"metrics on : {rps['on']:.0f} req/s")
+    print(f"overhead   : {overhead * 100:.2f}% (max {args.max_overhead * 100:.1f}%)")
+    sys.exit(0 if overhead <= args.max_overhead else 1)
+
+
+if __name__ == "__main__":
+    main()
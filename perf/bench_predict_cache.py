@@ -0,0 +1,84 @@
+"""
+Step 49: /predict 예측 캐시 벤치마크
+디지털 트윈 UI 요청 패턴을 흉내낸 트레이스를 재생하여 캐시 적중률별 지연 시간 비교
+
+사용법:
+    python perf/bench_predict_cache.py --requests 5000 --hit-rates 0 0.5 0.8 0.95
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from fastapi.testclient import TestClient
+
+from bench_common import load_service
+
+
+def random_scenario(rng: random.Random) -> dict:
+    return {
+        "snr_db": round(rng.uniform(5, 30), 1),
+        "speech_blocks_per_min": round(rng.uniform(40, 180), 0),
+        "coverage": round(rng.uniform(0.7, 1.0), 2),
+        "gaps": rng.randint(0, 15),
+        "overlaps": rng.randint(0, 10),
+        "vad_aggressiveness": rng.choice(["low", "medium", "high"]),
+        "noise_suppression": rng.choice(["weak", "normal", "strong"]),
+    }
+
+
+def build_trace(n: int, hit_rate: float, seed: int = 49) -> list[dict]:
+    """hit_rate 비율만큼 이전 시나리오를 재요청하는 트레이스 생성"""
+    rng = random.Random(seed)
+    seen: list[dict] = []
+    trace = []
+    for _ in range(n):
+        if seen and rng.random() < hit_rate:
+            trace.append(rng.choice(seen))
+        else:
+            s = random_scenario(rng)
+            seen.append(s)
+            trace.append(s)
+    return trace
+
+
+def replay(client: TestClient, trace: list[dict]) -> list[float]:
+    latencies = []
+    for payload in trace:
+        t0 = time.perf_counter()
+        r = client.post("/predict", json=payload)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        r.raise_for_status()
+    return latencies
+
+
+def pct(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Step 49 예측 캐시 벤치마크")
+    ap.add_argument("--requests", type=int, default=5000)
+    ap.add_argument("--hit-rates", type=float, nargs="+", default=[0.0, 0.5, 0.8, 0.95])
+    ap.add_argument("--cache-size", type=int, default=4096)
+    args = ap.parse_args()
+
+    print(f"{'hit_rate':>8} {'cache':>6} {'mean_ms':>8} {'p50_ms':>7} {'p95_ms':>7} {'observed_hits':>13}")
+    for hit_rate in args.hit_rates:
+        trace = build_trace(args.requests, hit_rate)
+        for cache_size in (0, args.cache_size):
+            mod = load_service("step49", PREDICT_CACHE_SIZE=cache_size)
+            client = TestClient(mod.app)
+            lat = replay(client, trace)
+            stats = mod.predict_cache.stats()
+            print(
+                f"{hit_rate:>8.2f} {'on' if cache_size else 'off':>6} "
+                f"{statistics.mean(lat):>8.3f} {pct(lat, 0.5):>7.3f} {pct(lat, 0.95):>7.3f} "
+                f"{stats['hit_rate']:>13.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
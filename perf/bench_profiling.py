@@ -0,0 +1,131 @@
+"""
+Step 45/46/49: 프로파일링 훅 오버헤드
+- pipeline: 적재 + 이상 탐지 통합 파이프라인(step45_46_fused)을 --profile 없이 / 켜고 DirectRunner로 실행해 CPU 초와
+  단계별 wall/CPU 카운터 출력 (--profile이 없으면 DoFn을 감싸지 않으므로 꺼진 상태의 비용은 0)
+- service: step49 예측 함수(predict_uncached) 처리량을 /debug/profile 샘플러가 돌지 않을 때 / 도는 동안 비교
+
+사용법:
+    python perf/bench_profiling.py --events 100000 --teams 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+from bench_common import ROOT, load_service
+from bench_fused_pipeline import read_messages, run_pipeline, synth_messages
+
+sys.path.insert(0, os.path.join(ROOT, "dataflow"))
+
+import apache_beam as beam  # noqa: E402
+from apache_beam.options.pipeline_options import PipelineOptions  # noqa: E402
+
+import step45_46_fused  # noqa: E402
+
+
+def pipeline_opts(tmp: str, profile: bool) -> SimpleNamespace:
+    os.makedirs(tmp, exist_ok=True)
+    return SimpleNamespace(
+        bq_table="bench:yago_reports.quality_stream", temp_location=tmp, sink="local",
+        local_sink_dir=os.path.join(tmp, "sink"), local_append_latency_ms=0.0, triggering_frequency=5,
+        num_storage_api_streams=0, with_auto_sharding=False, use_at_least_once=True, dead_letter_topic=None,
+        rollup_table="bench:yago_reports.quality_rollup", rollup_granularities="minute", rollup_early_firing_sec=0,
+        rollup_allowed_lateness_sec=3600, feature_store="sqlite:///" + os.path.join(tmp, "features.db"),
+        feature_ewma_alpha=0.1, z_threshold=2.5, cov_min=0.9, gaps_max=10, overlaps_max=8, window_size=900,
+        window_period=300, profile=profile, profile_dir=os.path.join(tmp, "profile"), profile_dump_interval_sec=10.0,
+    )
+
+
+def stage_counters(messages: list, tmp: str) -> dict:
+    """--profile로 한 번 더 실행해 단계별 (건수, wall us, cpu us) 수집"""
+    p = beam.Pipeline(options=PipelineOptions(flags=[], runner="DirectRunner"))
+    step45_46_fused.build_pipeline(read_messages(p, messages), pipeline_opts(tmp, True))
+    result = p.run()
+    result.wait_until_finish()
+    stages = {}
+    for counter in result.metrics().query()["counters"]:
+        for kind in ("_elements", "_wall_us", "_cpu_us"):
+            if counter.key.metric.name.endswith(kind):
+                stage = counter.key.metric.name[: -len(kind)]
+                stages.setdefault(stage, {})[kind[1:]] = counter.committed
+    return stages
+
+
+def bench_pipeline(args):
+    messages = synth_messages(args.events, args.teams, args.hours)
+    scale = 1e6 / args.events
+    with tempfile.TemporaryDirectory(prefix="bench_profiling_") as tmp:
+        cpu = {}
+        for profile in (False, True):
+            work = os.path.join(tmp, f"profile-{profile}")
+            cpu[profile] = run_pipeline(
+                lambda p: step45_46_fused.build_pipeline(read_messages(p, messages), pipeline_opts(work, profile))
+            )
+        print(f"[pipeline] 이벤트 {args.events}건, 팀 {args.teams}개 (CPU 초 / 100만 건)")
+        print(f"  --profile 없음: {cpu[False] * scale:8.1f}")
+        print(f"  --profile     : {cpu[True] * scale:8.1f}  ({(cpu[True] / cpu[False] - 1) * 100:+.0f}%)")
+
+        stages = stage_counters(messages, os.path.join(tmp, "counters"))
+        print(f"  {'stage':>20} {'elements':>9} {'wall_us/el':>11} {'cpu_us/el':>10}")
+        for stage, c in sorted(stages.items(), key=lambda kv: -kv[1].get("cpu_us", 0)):
+            n = max(c.get("elements", 0), 1)
+            print(f"  {stage:>20} {c.get('elements', 0):>9} {c.get('wall_us', 0) / n:>11.1f} {c.get('cpu_us', 0) / n:>10.1f}")
+
+
+def bench_service(args):
+    app = load_service("step49", PROFILE_TOKEN="bench", WARMUP=0, PREDICT_CACHE_SIZE=0)
+    f = app.Features(snr_db=18.5, speech_blocks_per_min=120, coverage=0.93, gaps=3, overlaps=2)
+
+    def throughput() -> float:
+        n, t0 = 0, time.perf_counter()
+        while time.perf_counter() - t0 < args.seconds:
+            app.predict_uncached(f)
+            n += 1
+        return n / (time.perf_counter() - t0)
+
+    common = app.service_common
+
+    def sampling() -> float:
+        sampler = threading.Thread(
+            target=common.sample_stacks, args=(args.seconds + 0.5, common.PROFILE_INTERVAL_MS / 1000), daemon=True,
+        )
+        sampler.start()
+        try:
+            return throughput()
+        finally:
+            sampler.join()
+
+    throughput()  # 워밍업
+    runs = {"idle": [], "sampling": []}
+    for _ in range(args.rounds):
+        runs["idle"].append(throughput())
+        runs["sampling"].append(sampling())
+    idle, active = statistics.median(runs["idle"]), statistics.median(runs["sampling"])
+    print(f"[service] step49 predict_uncached (요청/초 중앙값, {args.rounds}회 교대, 샘플링 간격 {common.PROFILE_INTERVAL_MS:g}ms)")
+    print(f"  샘플러 없음 : {idle:10.0f}")
+    print(f"  샘플링 중   : {active:10.0f}  ({(active / idle - 1) * 100:+.1f}%)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="프로파일링 훅 오버헤드")
+    ap.add_argument("--events", type=int, default=100000)
+    ap.add_argument("--teams", type=int, default=200)
+    ap.add_argument("--hours", type=float, default=6, help="이벤트 시각 범위")
+    ap.add_argument("--seconds", type=float, default=1, help="service: 회당 측정 시간")
+    ap.add_argument("--rounds", type=int, default=7, help="service: 교대 측정 횟수")
+    ap.add_argument("--only", choices=["pipeline", "service"])
+    args = ap.parse_args()
+
+    if args.only != "service":
+        bench_pipeline(args)
+    if args.only != "pipeline":
+        bench_service(args)
+
+
+if __name__ == "__main__":
+    main()
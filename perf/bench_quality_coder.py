@@ -0,0 +1,121 @@
+"""
+Step 45/46: QualityRow 타입 + 스키마 행 코더 벤치마크
+- 코더: 요소당 직렬화 크기와 encode+decode CPU 시간 (dict + FastPrimitivesCoder vs QualityRow / QualityPoint RowCoder)
+- 셔플: step46 GroupByKey 입력 (team_id, 행)이 슬라이딩 윈도우 수만큼 복제될 때의 총 바이트
+- 파이프라인: DirectRunner로 Parse → KeyByTeam → SlidingWindows → GroupByKey 를 실행해 요소당 CPU 시간 비교
+  (legacy: dict 전체를 키에 붙여 셔플, typed: QualityPoint로 열을 줄인 뒤 셔플)
+
+사용법:
+    python perf/bench_quality_coder.py --events 20000 --teams 50
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from bench_common import ROOT
+
+sys.path.insert(0, os.path.join(ROOT, "dataflow"))
+
+import apache_beam as beam  # noqa: E402
+from apache_beam import coders  # noqa: E402
+
+import step46_anomaly  # noqa: E402
+from quality_row import QualityPoint, QualityRow  # noqa: E402
+
+WINDOW_SIZE, WINDOW_PERIOD = 900, 300
+
+
+def synth_payloads(n: int, teams: int, seed: int = 41) -> list[dict]:
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        team = f"team-{rng.randrange(teams):04d}"
+        report = f"report-{rng.randrange(10 ** 6):06d}"
+        out.append({
+            "insert_id": f"{team}-{report}-{1717000000 + i}", "team_id": team, "report_id": report,
+            "event_ts": f"2024-06-01T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}.123456Z",
+            "overallScore": rng.random(), "coverage": rng.uniform(0.8, 1.0), "gaps": rng.randrange(12),
+            "overlaps": rng.randrange(8), "avgDur": rng.uniform(1, 4), "source": "stream",
+            "load_ts": "2024-06-01T00:00:00.000001Z",
+        })
+    return out
+
+
+def coder_cost(coder, values: list, repeat: int = 3) -> tuple[float, float]:
+    """(요소당 평균 바이트, 요소당 encode+decode 최소 µs)"""
+    impl = coder.get_impl()
+    size = sum(len(impl.encode_nested(v)) for v in values) / len(values)
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.process_time()
+        for v in values:
+            impl.decode_nested(impl.encode_nested(v))
+        best = min(best, time.process_time() - t0)
+    return size, best / len(values) * 1e6
+
+
+def run_pipeline(payloads: list[dict], typed: bool) -> float:
+    """DirectRunner로 GroupByKey까지 실행하고 요소당 CPU µs 반환"""
+    messages = [
+        beam.window.TimestampedValue((json.dumps(d).encode(), {}), 1717000000 + i) for i, d in enumerate(payloads)
+    ]
+    t0 = time.process_time()
+    with beam.Pipeline() as p:
+        parsed = p | beam.Create(messages, reshuffle=False) | beam.ParDo(step46_anomaly.ParseJson())
+        if typed:
+            keyed = parsed | beam.ParDo(step46_anomaly.KeyByTeam())
+        else:
+            keyed = parsed | beam.Map(lambda d: (d.get("team_id", "unknown"), d))
+        (
+            keyed
+            | beam.WindowInto(beam.window.SlidingWindows(size=WINDOW_SIZE, period=WINDOW_PERIOD))
+            | beam.GroupByKey()
+            | beam.Map(lambda kv: sum(1 for _ in kv[1]))
+        )
+    return (time.process_time() - t0) / len(payloads) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser(description="QualityRow 코더 벤치마크")
+    ap.add_argument("--events", type=int, default=20000)
+    ap.add_argument("--teams", type=int, default=50)
+    ap.add_argument("--skip-pipeline", action="store_true")
+    args = ap.parse_args()
+
+    payloads = synth_payloads(args.events, args.teams)
+    rows = [QualityRow(**d) for d in payloads]
+    windows = WINDOW_SIZE // WINDOW_PERIOD
+    kv_dict = coders.TupleCoder([coders.StrUtf8Coder(), coders.FastPrimitivesCoder()])
+    kv_point = coders.registry.get_coder(beam.typehints.Tuple[str, QualityPoint])
+
+    print(f"이벤트 {args.events}, 팀 {args.teams}, 슬라이딩 윈도우 복제 x{windows}")
+    print(f"{'element':>28} {'bytes':>7} {'us/elem':>8}")
+    cases = [
+        ("row: dict (FastPrimitives)", coders.FastPrimitivesCoder(), payloads),
+        ("row: QualityRow", coders.registry.get_coder(QualityRow), rows),
+        ("gbk: (team, dict)", kv_dict, [(d["team_id"], d) for d in payloads]),
+        ("gbk: (team, QualityPoint)", kv_point, [(r.team_id, r.point()) for r in rows]),
+    ]
+    sizes = {}
+    for name, coder, values in cases:
+        size, us = coder_cost(coder, values)
+        sizes[name] = size
+        print(f"{name:>28} {size:>7.1f} {us:>8.2f}")
+
+    before = sizes["gbk: (team, dict)"] * args.events * windows
+    after = sizes["gbk: (team, QualityPoint)"] * args.events * windows
+    print(f"\nstep46 셔플 바이트: {before / 1e6:.2f} MB → {after / 1e6:.2f} MB ({after / before:.0%})")
+
+    if not args.skip_pipeline:
+        legacy = run_pipeline(payloads, typed=False)
+        typed = run_pipeline(payloads, typed=True)
+        print(f"DirectRunner Parse→GroupByKey CPU: legacy {legacy:.1f} us/elem, typed {typed:.1f} us/elem "
+              f"({legacy / typed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
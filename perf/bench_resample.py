@@ -0,0 +1,82 @@
+"""
+Step 47: 디코딩 / 리샘플 품질 단계 벤치마크
+44.1 / 48 kHz 스테레오 합성 WAV에 대해 기존 경로(librosa.load soxr_hq + 특징 추출)와
+soundfile float32 디코딩 + soxr 품질 단계(VHQ~QQ) / native_rate 조합의
+파일당 CPU 시간과 기존 경로 대비 특징 상대 오차를 비교
+
+사용법:
+    python perf/bench_resample.py --seconds 60 --repeat 3
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import librosa
+import numpy as np
+
+from bench_common import load_service
+
+FEATURES = ("rms_mean", "zcr_mean", "centroid_mean", "snr_db", "speech_blocks_per_min")
+
+
+def write_source(path: str, seconds: float, sr: int, seed: int):
+    """유성/무성이 번갈아 나오는 배음 + 광대역 잡음 스테레오 WAV"""
+    import soundfile as sf
+
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    voiced = np.sin(2 * np.pi * 0.4 * t) > 0
+    f0 = 180 + 20 * np.sin(2 * np.pi * 0.1 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    y = sum(0.3 / k * np.sin(k * phase) for k in range(1, 12)) * voiced
+    y = y + 0.01 * rng.standard_normal(len(t))
+    sf.write(path, np.stack([y, 0.9 * y], axis=1).astype(np.float32), sr, subtype="PCM_16")
+
+
+def cpu_time(fn, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.process_time()
+        result = fn()
+        best = min(best, time.process_time() - t0)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Step 47 리샘플 품질 단계 벤치마크")
+    ap.add_argument("--seconds", type=float, default=60.0)
+    ap.add_argument("--rates", type=int, nargs="+", default=[44100, 48000])
+    ap.add_argument("--target-sr", type=int, default=16000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    mod = load_service("step47", METRICS_ENABLED=0)
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, sr in enumerate(args.rates):
+            path = os.path.join(tmp, f"src_{sr}.wav")
+            write_source(path, args.seconds, sr, seed=33 + i)
+
+            def baseline():
+                y, _ = librosa.load(path, sr=args.target_sr, mono=True)
+                return mod.analyze_audio(y, args.target_sr)
+
+            base_t, ref = cpu_time(baseline, args.repeat)
+            print(f"\n원본 {sr} Hz 스테레오 {args.seconds:g}초 → {args.target_sr} Hz")
+            print(f"{'path':>18} {'cpu_ms':>8} {'speedup':>8} " + " ".join(f"{k[:12]:>12}" for k in FEATURES))
+            print(f"{'librosa.load':>18} {base_t * 1000:>8.1f} {1.0:>8.2f}")
+            for quality in mod.RESAMPLE_QUALITIES:
+                for native in (False, True):
+                    opts = mod.AnalysisOptions(args.target_sr, quality, native)
+                    t, got = cpu_time(lambda: mod.analyze_file(path, opts), args.repeat)
+                    errs = [abs(got[k] - ref[k]) / (abs(ref[k]) or 1) for k in FEATURES]
+                    name = quality + (" +native" if native else "")
+                    print(
+                        f"{name:>18} {t * 1000:>8.1f} {base_t / t:>8.2f} "
+                        + " ".join(f"{e:>12.1e}" for e in errs)
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Step 45: 팀별 분/시간 롤업 검증 + 읽기 행 수 비교 (DirectRunner, 로컬 대용 싱크)
+합성 이벤트를 이벤트 시각보다 늦은 게시 시각 타임스탬프로 ingest → write_rows / write_rollups에 흘려
+- 원본 행 vs 분/시간 롤업 행 수와 바이트 (팀별 대시보드 조회가 읽는 양의 비율)
+- 시간 롤업 값 검증: 건수/평균/최소/최대/합계는 정확히, p50/p90/p99는 1/SKETCH_BINS 이내
+를 출력
+
+사용법:
+    python perf/bench_rollups.py --events 200000 --teams 20 --hours 6
+"""
+
+import argparse
+import calendar
+import glob
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+from bench_common import ROOT
+
+sys.path.insert(0, os.path.join(ROOT, "dataflow"))
+
+import apache_beam as beam  # noqa: E402
+from apache_beam.options.pipeline_options import PipelineOptions  # noqa: E402
+
+import step45_stream  # noqa: E402
+from bench_fused_pipeline import read_messages, synth_messages  # noqa: E402
+from quality_rollup import SKETCH_BINS  # noqa: E402
+
+
+def read_table(sink_dir: str, table: str) -> tuple[list, int]:
+    rows, size = [], 0
+    for path in glob.glob(os.path.join(sink_dir, table.replace(":", "."), "stream-*.jsonl")):
+        size += os.path.getsize(path)
+        with open(path) as f:
+            rows.extend(json.loads(line) for line in f)
+    return rows, size
+
+
+def exact_quantile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+def expected_hourly(messages: list) -> dict:
+    """(team_id, 시간 시작 epoch) → 원본 값 목록"""
+    groups = defaultdict(list)
+    for data, _, _ in messages:
+        payload = json.loads(data)
+        ts = calendar.timegm(time.strptime(payload["event_ts"], "%Y-%m-%dT%H:%M:%SZ"))
+        groups[(payload["team_id"], ts // 3600 * 3600)].append(payload)
+    return groups
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Step 45 팀별 롤업 검증 / 읽기 행 수 비교")
+    ap.add_argument("--events", type=int, default=200000)
+    ap.add_argument("--teams", type=int, default=50)
+    ap.add_argument("--hours", type=float, default=24)
+    ap.add_argument("--publish-delay-sec", type=float, default=600,
+                    help="게시 시각 = 이벤트 시각 + 0~N초 (롤업 윈도우가 게시 시각이 아닌 event_ts 기준인지 검증)")
+    args = ap.parse_args()
+
+    rng = random.Random(45)
+    messages = [
+        (data, attrs, ts + rng.uniform(0, args.publish_delay_sec))
+        for data, attrs, ts in synth_messages(args.events, args.teams, args.hours)
+    ]
+    with tempfile.TemporaryDirectory(prefix="bench_rollups_") as tmp:
+        opts = SimpleNamespace(
+            bq_table="bench:yago_reports.quality_stream", temp_location=tmp, sink="local",
+            local_sink_dir=os.path.join(tmp, "sink"), local_append_latency_ms=0.0, triggering_frequency=5,
+            num_storage_api_streams=0, with_auto_sharding=False, use_at_least_once=True, dead_letter_topic=None,
+            rollup_table="bench:yago_reports.quality_rollup", rollup_granularities="minute,hour",
+            rollup_early_firing_sec=0, rollup_allowed_lateness_sec=3600,  # 배치 DirectRunner는 처리 시간 트리거 미지원
+        )
+        p = beam.Pipeline(options=PipelineOptions(flags=[], runner="DirectRunner"))
+        rows = step45_stream.ingest(read_messages(p, messages))
+        step45_stream.write_rows(rows, opts)
+        step45_stream.write_rollups(rows, opts)
+        p.run().wait_until_finish()
+
+        raw, raw_bytes = read_table(opts.local_sink_dir, opts.bq_table)
+        rollups, _ = read_table(opts.local_sink_dir, opts.rollup_table)
+
+    by_granularity = defaultdict(list)
+    for r in rollups:
+        by_granularity[r["granularity"]].append(r)
+    print(f"이벤트 {args.events}건, 팀 {args.teams}개, {args.hours:g}시간")
+    print(f"{'table':>8} {'rows':>8} {'rows/team':>10} {'MB':>7} {'rows vs raw':>12} {'bytes vs raw':>13}")
+    print(f"{'raw':>8} {len(raw):>8} {len(raw) / args.teams:>10.0f} {raw_bytes / 1e6:>7.2f}")
+    for granularity, rs in by_granularity.items():
+        size = sum(len(json.dumps(r)) + 1 for r in rs)
+        print(
+            f"{granularity:>8} {len(rs):>8} {len(rs) / args.teams:>10.0f} {size / 1e6:>7.2f} "
+            f"{len(raw) / len(rs):>11.0f}x {raw_bytes / size:>12.0f}x"
+        )
+
+    # 시간 롤업 값 검증 (배치 실행이므로 윈도우당 ON_TIME 페인 하나)
+    expected = expected_hourly(messages)
+    hourly = {}
+    for r in by_granularity["hour"]:
+        start = (r["window_start"][:19]).replace("T", " ")
+        hourly[(r["team_id"], start)] = r
+    max_err = {"mean": 0.0, "quantile": 0.0}
+    mismatches = 0
+    for (team, hour), payloads in expected.items():
+        key = (team, time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(hour)))
+        r = hourly.get(key)
+        scores = [x["overallScore"] for x in payloads]
+        gaps = sum(x["gaps"] for x in payloads)
+        if (
+            r is None or r["count"] != len(payloads) or r["gaps_sum"] != gaps
+            or r["score_min"] != min(scores) or r["score_max"] != max(scores)
+        ):
+            mismatches += 1
+            continue
+        max_err["mean"] = max(max_err["mean"], abs(r["score_mean"] - sum(scores) / len(scores)))
+        for q, col in ((0.5, "score_p50"), (0.9, "score_p90"), (0.99, "score_p99")):
+            max_err["quantile"] = max(max_err["quantile"], abs(r[col] - exact_quantile(scores, q)))
+    print(
+        f"시간 롤업 검증: 윈도우 {len(expected)}개, 불일치 {mismatches}, "
+        f"평균 최대 오차 {max_err['mean']:.1e}, 분위수 최대 오차 {max_err['quantile']:.4f} (허용 {1 / SKETCH_BINS})"
+    )
+    sys.exit(0 if mismatches == 0 and max_err["quantile"] <= 1 / SKETCH_BINS else 1)
+
+
+if __name__ == "__main__":
+    main()
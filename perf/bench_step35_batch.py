@@ -0,0 +1,95 @@
+"""
+Step 35: Forced Alignment 배치 모드 처리량 벤치마크
+같은 매니페스트를 (1) 리포트마다 프로세스를 새로 띄우는 기존 방식(매번 모델 로드)과
+(2) --manifest 배치 모드(모델 1회 로드, workers / cpu_threads 조합)로 처리하여 reports/hour 비교
+
+faster-whisper 모델(첫 실행 시 다운로드)과 ffmpeg가 필요하며, Firestore는 사용하지 않습니다.
+
+사용법:
+    python perf/bench_step35_batch.py --manifest reports.jsonl --limit 20 --model base \\
+        --configs 1x0 2x2 4x1
+    (configs: "workers x cpu_threads", cpu_threads 0은 CTranslate2 기본값)
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_common import ROOT
+
+SCRIPT = os.path.join(ROOT, "scripts", "Step35_ForcedAlignment.py")
+
+
+def run(cmd: list[str], cwd: str) -> float:
+    t0 = time.perf_counter()
+    subprocess.run(cmd, cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - t0
+
+
+def per_process_loop(jobs: list[dict], model: str, tmp: str) -> float:
+    """기존 방식: 리포트마다 단일 모드 프로세스 실행"""
+    elapsed = 0.0
+    for job in jobs:
+        content_file = job.get("contentFile")
+        if not content_file:
+            content_file = os.path.join(tmp, f"{job['reportId']}.txt")
+            with open(content_file, "w", encoding="utf-8") as f:
+                f.write(job["content"])
+        elapsed += run([
+            sys.executable, SCRIPT, "--report-id", job["reportId"], "--audio-url", job["audioUrl"],
+            "--content-file", content_file, "--model", model, "--no-transcript-cache",
+            "--out-json", os.path.join(tmp, f"{job['reportId']}.json"),
+        ], cwd=tmp)
+    return elapsed
+
+
+def batch(manifest: str, model: str, workers: int, cpu_threads: int, tmp: str) -> float:
+    out = os.path.join(tmp, f"batch_{workers}x{cpu_threads}.jsonl")
+    return run([
+        sys.executable, SCRIPT, "--manifest", manifest, "--model", model, "--no-transcript-cache",
+        "--workers", str(workers), "--cpu-threads", str(cpu_threads), "--out-jsonl", out,
+    ], cwd=tmp)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Step 35 배치 모드 처리량 벤치마크")
+    ap.add_argument("--manifest", required=True, help="JSONL ({reportId, audioUrl, content|contentFile})")
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--model", default="base")
+    ap.add_argument("--configs", nargs="+", default=["1x0", "2x2", "4x1"], help="workers x cpu_threads")
+    ap.add_argument("--skip-baseline", action="store_true")
+    args = ap.parse_args()
+
+    with open(args.manifest, encoding="utf-8") as f:
+        jobs = [json.loads(line) for line in f if line.strip()][: args.limit]
+    for job in jobs:
+        if job.get("contentFile"):
+            job["contentFile"] = os.path.abspath(job["contentFile"])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = os.path.join(tmp, "manifest.jsonl")
+        with open(manifest, "w", encoding="utf-8") as f:
+            for job in jobs:
+                f.write(json.dumps(job, ensure_ascii=False) + "\n")
+
+        print(f"리포트 {len(jobs)}개, 모델 {args.model}, CPU {os.cpu_count()}")
+        print(f"{'mode':>22} {'elapsed_s':>10} {'reports/h':>10} {'speedup':>8}")
+        base = None
+        if not args.skip_baseline:
+            elapsed = per_process_loop(jobs, args.model, tmp)
+            base = len(jobs) / elapsed * 3600
+            print(f"{'per-process':>22} {elapsed:>10.1f} {base:>10.1f} {1.0:>8.2f}")
+        for config in args.configs:
+            workers, cpu_threads = (int(v) for v in config.split("x"))
+            elapsed = batch(manifest, args.model, workers, cpu_threads, tmp)
+            rate = len(jobs) / elapsed * 3600
+            speedup = f"{rate / base:>8.2f}" if base else f"{'-':>8}"
+            print(f"{'batch ' + config:>22} {elapsed:>10.1f} {rate:>10.1f} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
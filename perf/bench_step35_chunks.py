@@ -0,0 +1,76 @@
+"""
+Step 35: 청크 병렬 인식 벤치마크
+같은 오디오를 (1) 전체 파일 순차 인식(cpu_threads = 코어 수)과 (2) 무음 지점 청크 분할 + N개 프로세스 병렬 인식
+(프로세스당 cpu_threads = 코어 수 / N)으로 처리하여 벽시계 시간, 속도 향상, 단어 타임스탬프 일치도를 비교
+
+일치도: 두 결과의 단어 토큰을 정렬(align_tokens)하여 정확히 일치하는 단어 비율과 시작 시각 차이
+faster-whisper 모델(첫 실행 시 다운로드)이 필요합니다.
+
+사용법:
+    python perf/bench_step35_chunks.py --audio long_report.wav --model base --processes 2 4 --chunk-sec 60
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import numpy as np
+
+from bench_align import load_step35
+
+
+def parity(mod, ref: list[dict], got: list[dict]) -> dict:
+    a = ["".join(mod.tokenize(w["word"])) for w in ref]
+    b = ["".join(mod.tokenize(w["word"])) for w in got]
+    mapping = mod.align_tokens(a, b)
+    exact = [(i, m[0]) for i, m in enumerate(mapping) if m is not None and m[1] == mod.ALIGN_MATCH]
+    diffs = [abs(ref[i]["start"] - got[j]["start"]) for i, j in exact]
+    return {
+        "word_match": len(exact) / max(len(ref), 1),
+        "mean_start_diff_s": statistics.mean(diffs) if diffs else float("nan"),
+        "p95_start_diff_s": float(np.percentile(diffs, 95)) if diffs else float("nan"),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Step 35 청크 병렬 인식 벤치마크")
+    ap.add_argument("--audio", required=True, help="로컬 오디오 파일 (실제 음성)")
+    ap.add_argument("--model", default="base")
+    ap.add_argument("--processes", type=int, nargs="+", default=[2, 4])
+    ap.add_argument("--chunk-sec", type=float, default=60.0)
+    ap.add_argument("--cores", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    mod = load_step35()
+    from faster_whisper.audio import decode_audio
+
+    duration = len(decode_audio(args.audio)) / 16000
+    print(f"오디오 {duration / 60:.1f}분, 코어 {args.cores}, 모델 {args.model}")
+
+    model = mod.load_whisper_model(args.model, cpu_threads=args.cores)
+    t0 = time.perf_counter()
+    ref = mod.transcribe_words(args.audio, model=model, progress=False)
+    base = time.perf_counter() - t0
+    del model
+    print(f"{'mode':>14} {'wall_s':>8} {'speedup':>8} {'words':>6} {'match':>7} {'mean_dt':>8} {'p95_dt':>7}")
+    print(f"{'sequential':>14} {base:>8.1f} {1.0:>8.2f} {len(ref):>6}")
+
+    for n in args.processes:
+        pool = mod.make_chunk_pool(args.model, n, max(1, args.cores // n))
+        # 모델 로드를 측정에서 제외하기 위해 프로세스마다 짧은 무음으로 워밍업
+        silence = np.zeros(16000, dtype=np.float32)
+        list(pool.map(mod._transcribe_chunk, [silence] * n, [0.0] * n, [0.0] * n, [1.0] * n))
+        t0 = time.perf_counter()
+        got = mod.transcribe_words_chunked(args.audio, pool, args.chunk_sec)
+        wall = time.perf_counter() - t0
+        pool.shutdown()
+        p = parity(mod, ref, got)
+        print(
+            f"{f'{n} procs':>14} {wall:>8.1f} {base / wall:>8.2f} {len(got):>6} "
+            f"{p['word_match']:>7.3f} {p['mean_start_diff_s']:>8.3f} {p['p95_start_diff_s']:>7.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
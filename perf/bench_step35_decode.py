@@ -0,0 +1,105 @@
+"""
+Step 35: 오디오 준비 단계 벤치마크 (다운로드 → transcribe 입력까지)
+- legacy: .mp3로 디스크 저장 → pydub로 WAV 재인코딩(디스크) → faster-whisper가 WAV를 다시 디코딩 (이전 방식)
+- memory: 메모리로 다운로드 → 16 kHz float32 배열로 바로 디코딩 (fetch_audio)
+- spool : 같은 경로에서 스풀 임계치 0 (항상 디스크 임시 파일)
+각 모드는 별도 프로세스에서 실행하여 벽시계 시간, 최대 RSS, /proc/self/io 쓰기량을 측정합니다.
+legacy 모드는 pydub + ffmpeg/ffprobe가 필요합니다.
+
+사용법:
+    python perf/bench_step35_decode.py --audio long_report.mp3
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_align import load_step35
+from bench_analyze_batch import serve_dir
+
+MODES = ("legacy", "memory", "spool")
+
+
+def proc_io() -> dict:
+    """rchar/wchar: read/write 시스템 콜 바이트, read_bytes/write_bytes: 실제 블록 장치 I/O"""
+    with open("/proc/self/io") as f:
+        return {k: int(v) for k, v in (line.split(": ") for line in f)}
+
+
+def legacy_prepare(url: str, workdir: str):
+    """이전 방식 재현: download_audio → ensure_wav → decode_audio(wav_path)"""
+    import requests
+    from faster_whisper.audio import decode_audio
+    from pydub import AudioSegment
+
+    audio_path = os.path.join(workdir, "report.mp3")
+    response = requests.get(url, stream=True)
+    response.raise_for_status()
+    with open(audio_path, "wb") as f:
+        for chunk in response.iter_content(chunk_size=8192):
+            f.write(chunk)
+    wav_path = audio_path.rsplit(".", 1)[0] + ".wav"
+    AudioSegment.from_file(audio_path).export(wav_path, format="wav")
+    audio = decode_audio(wav_path, sampling_rate=16000)
+    os.remove(wav_path)
+    os.remove(audio_path)
+    return audio
+
+
+def run_child(url: str, mode: str):
+    mod = load_step35()
+    with tempfile.TemporaryDirectory() as workdir:
+        io0 = proc_io()
+        t0 = time.perf_counter()
+        if mode == "legacy":
+            audio = legacy_prepare(url, workdir)
+        else:
+            audio = mod.fetch_audio(url, spool_max_mb=0 if mode == "spool" else 1024)
+        elapsed = time.perf_counter() - t0
+        io1 = proc_io()
+    print(json.dumps({
+        "elapsed_sec": elapsed,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "wchar_mb": (io1["wchar"] - io0["wchar"]) / 1e6,
+        "write_bytes_mb": (io1["write_bytes"] - io0["write_bytes"]) / 1e6,
+        "samples": len(audio),
+    }))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Step 35 오디오 준비 단계 벤치마크")
+    ap.add_argument("--audio", required=True, help="로컬 오디오 파일 (mp3 등)")
+    ap.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    ap.add_argument("--child", nargs=2, metavar=("URL", "MODE"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    directory, name = os.path.split(os.path.abspath(args.audio))
+    url = f"http://127.0.0.1:{serve_dir(directory)}/{name}"
+    print(f"입력: {name} ({os.path.getsize(args.audio) / 1e6:.1f} MB)")
+    print(f"{'mode':>8} {'wall_s':>8} {'peak_rss_mb':>12} {'wchar_mb':>9} {'disk_write_mb':>14} {'samples':>10}")
+    for mode in args.modes:
+        proc = subprocess.run(
+            [sys.executable, __file__, "--audio", args.audio, "--child", url, mode],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        if proc.returncode != 0:
+            print(f"{mode:>8} 실패: {proc.stderr.strip().splitlines()[-1]}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(
+            f"{mode:>8} {r['elapsed_sec']:>8.2f} {r['peak_rss_mb']:>12.0f} {r['wchar_mb']:>9.1f} "
+            f"{r['write_bytes_mb']:>14.1f} {r['samples']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
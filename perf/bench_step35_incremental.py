@@ -0,0 +1,116 @@
+"""
+Step 35: transcript 캐시 + 증분 재정렬 벤치마크
+합성 2시간 리포트의 단어 transcript를 TranscriptStore에 미리 넣어 두고 (ASR 1회 실행 후 상태),
+본문에서 문장 k개를 수정했을 때 process_report 재실행 시간과 결과를 전체 재정렬과 비교
+
+- 오디오는 로컬 HTTP 서버(Last-Modified / If-Modified-Since 지원)로 제공 → 재실행은 304로 다운로드 생략
+- Whisper 모델은 지연 로드되므로 transcript 캐시 적중 시 로드되지 않음 (로드되면 실패 처리)
+- diff_vs_full: 같은 본문을 전체 DP 정렬한 결과와의 문장 시작 시각 차이
+
+사용법:
+    python perf/bench_step35_incremental.py --minutes 120 --edits 1 10 100 --audio-mb 30
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import random
+import tempfile
+import time
+
+from bench_align import inject_errors, load_step35, synth_report
+from bench_analyze_batch import serve_dir
+
+
+def edit_sentences(sentences: list[str], vocab: list[str], k: int, rng: random.Random) -> list[str]:
+    """문장 k개에서 단어 하나씩 바꾸기 (오탈자/표현 수정)"""
+    edited = list(sentences)
+    for idx in rng.sample(range(len(sentences)), k):
+        toks = edited[idx].rstrip(".").split()
+        toks[rng.randrange(len(toks))] = rng.choice(vocab)
+        edited[idx] = " ".join(toks) + "."
+    return edited
+
+
+def run(mod, job: dict, args, store) -> tuple[float, dict]:
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        out = mod.process_report(job, args.model_obj, args, store=store)
+    return time.perf_counter() - t0, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Step 35 증분 재정렬 벤치마크")
+    ap.add_argument("--minutes", type=float, default=120)
+    ap.add_argument("--edits", type=int, nargs="+", default=[1, 10, 100])
+    ap.add_argument("--audio-mb", type=float, default=30, help="오디오 파일 크기 (다운로드 비용용 더미 바이트)")
+    ap.add_argument("--seed", type=int, default=40)
+    args = ap.parse_args()
+
+    mod = load_step35()
+    rng = random.Random(args.seed)
+    sentences, words, truth, vocab = synth_report(args.minutes, rng)
+    errors = argparse.Namespace(sub=0.08, dele=0.05, ins=0.03, soft=0.05, dropouts=5)
+    asr = inject_errors(words, vocab, rng, errors)
+
+    run_args = argparse.Namespace(
+        model="base", aligner="dp", spool_max_mb=64, workers=1, chunk_sec=60.0, update_firestore=False,
+    )
+    run_args.model_obj = mod.LazyWhisperModel(run_args.model)
+
+    with tempfile.TemporaryDirectory() as audio_dir, tempfile.TemporaryDirectory() as cache_dir:
+        blob = os.urandom(int(args.audio_mb * 1e6))
+        with open(os.path.join(audio_dir, "report.mp3"), "wb") as f:
+            f.write(blob)
+        url = f"http://127.0.0.1:{serve_dir(audio_dir)}/report.mp3"
+
+        store = mod.TranscriptStore(cache_dir)
+        t0 = time.perf_counter()
+        store.save_words(hashlib.sha256(blob).hexdigest(), run_args.model, asr)
+        save_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        loaded = store.load_words(hashlib.sha256(blob).hexdigest(), run_args.model)
+        load_s = time.perf_counter() - t0
+        npz_kb = sum(
+            os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(os.path.join(cache_dir, "transcripts")) for f in fs
+        ) / 1024
+        json_kb = len(json.dumps(asr, ensure_ascii=False).encode("utf-8")) / 1024
+        max_dt = max(abs(a["start"] - b["start"]) + abs(a["end"] - b["end"]) for a, b in zip(asr, loaded))
+        print(f"합성 리포트: {args.minutes:g}분, {len(sentences)} 문장, ASR 단어 {len(asr)}")
+        print(f"transcript: npz {npz_kb:.0f} KB (JSON {json_kb:.0f} KB), 저장 {save_s * 1000:.0f} ms, "
+              f"로드 {load_s * 1000:.0f} ms, 시각 오차 최대 {max_dt:.4f} s")
+
+        # 첫 실행: transcript 적중 (다운로드 + 해시), 이전 정렬 없음 → 전체 DP 정렬
+        job = {"reportId": "bench", "audioUrl": url, "content": " ".join(sentences)}
+        first_s, _ = run(mod, job, run_args, store)
+        print(f"\n{'edits':>6} {'rerun_s':>8} {'full_align_s':>13} {'realigned':>10} "
+              f"{'diff_vs_full_p95':>17} {'within_0.5s':>12}")
+        print(f"{'first':>6} {first_s:>8.2f}")
+
+        for k in args.edits:
+            edited = edit_sentences(sentences, vocab, k, random.Random(k))
+            job = {"reportId": "bench", "audioUrl": url, "content": " ".join(edited)}
+            rerun_s, out = run(mod, job, run_args, store)
+            inc = out["sentenceTimestamps"]
+            # 다음 측정을 위해 원본 본문 기준 정렬로 되돌림
+            run(mod, {**job, "content": " ".join(sentences)}, run_args, store)
+
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                full = mod.align_sentences(edited, loaded)
+            full_s = time.perf_counter() - t0
+            diffs = sorted(abs(a["start"] - b["start"]) for a, b in zip(inc, full))
+            within = sum(abs(r["start"] - t[0]) <= 0.5 for r, t in zip(inc, truth)) / len(truth)
+            realigned = sum(a["text"] != b for a, b in zip(inc, sentences))
+            print(f"{k:>6} {rerun_s:>8.2f} {full_s:>13.2f} {realigned:>10} "
+                  f"{diffs[int(len(diffs) * 0.95)]:>17.3f} {within:>12.3f}")
+
+        if run_args.model_obj._model is not None:
+            raise SystemExit("캐시 적중인데 Whisper 모델이 로드되었습니다")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Step 45: Storage Write 싱크 배치/샤딩 설정 벤치마크 (BigQuery 없이 로컬 대용 싱크 사용)
+ToBQRow → LocalStorageWrite를 DirectRunner로 실행하여 설정별 처리량, append 횟수, append당 평균 행 수 비교
+- exactly-once: 스트림 수(고정) / auto-sharding, append 1회마다 --latency-ms 지연
+- at-least-once: 셔플 없이 번들 단위로 기본 스트림에 append
+- 일부 행은 스키마 위반으로 만들어 failed_rows_with_errors 개수도 확인
+
+사용법:
+    python perf/bench_storage_write.py --events 20000 --streams 1 4 16 --latency-ms 20
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from bench_common import ROOT
+
+sys.path.insert(0, os.path.join(ROOT, "dataflow"))
+
+import apache_beam as beam  # noqa: E402
+from apache_beam.metrics.metric import MetricsFilter  # noqa: E402
+from apache_beam.options.pipeline_options import PipelineOptions  # noqa: E402
+
+from quality_row import QualityRow  # noqa: E402
+from step45_stream import SCHEMA, LocalStorageWrite  # noqa: E402
+
+TABLE = "bench:analytics.quality_events"
+
+
+def synth_rows(n: int, bad_ratio: float, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        row = QualityRow.from_payload({
+            "insert_id": f"team-{i % 50:04d}-{i}", "team_id": f"team-{i % 50:04d}", "report_id": f"r-{i}",
+            "event_ts": f"2024-06-01T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}Z",
+            "overallScore": rng.random(), "coverage": rng.uniform(0.8, 1.0),
+            "gaps": rng.randrange(12), "overlaps": rng.randrange(8), "avgDur": rng.uniform(1, 4),
+        })
+        if rng.random() < bad_ratio:
+            row = row._replace(event_ts="not-a-timestamp")
+        rows.append(row)
+    return rows
+
+
+def run_config(rows: list, out_dir: str, workers: int, **sink_kwargs) -> dict:
+    options = PipelineOptions(
+        flags=[], runner="DirectRunner", direct_running_mode="multi_threading", direct_num_workers=workers,
+    )
+    p = beam.Pipeline(options=options)
+    result = (
+        p
+        | beam.Create(rows)
+        | "ToBQRow" >> beam.Map(QualityRow.to_bq)
+        | "Write" >> LocalStorageWrite(TABLE, SCHEMA, out_dir, **sink_kwargs)
+    )
+    result.failed_rows_with_errors | "CountFailed" >> beam.Map(
+        lambda _: beam.metrics.Metrics.counter("bench", "failed").inc()
+    )
+    t0 = time.perf_counter()
+    res = p.run()
+    res.wait_until_finish()
+    elapsed = time.perf_counter() - t0
+
+    # append 수/행 수는 싱크의 append 기록에서 집계 (DirectRunner는 타이머 번들의 메트릭을 누락)
+    with open(os.path.join(out_dir, TABLE.replace(":", "."), "_appends.jsonl")) as f:
+        appends = [json.loads(line) for line in f]
+    failed = res.metrics().query(MetricsFilter().with_name("failed"))["counters"]
+    return {
+        "elapsed": elapsed, "appends": len(appends), "rows": sum(a["rows"] for a in appends),
+        "failed": sum(c.committed or 0 for c in failed),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Step 45 Storage Write 싱크 벤치마크 (로컬 대용 싱크)")
+    ap.add_argument("--events", type=int, default=20000)
+    ap.add_argument("--streams", type=int, nargs="+", default=[1, 4, 16])
+    ap.add_argument("--latency-ms", type=float, default=20.0, help="append 요청당 흉내낼 지연")
+    ap.add_argument("--workers", type=int, default=4, help="DirectRunner 워커 스레드 수")
+    ap.add_argument("--bad-ratio", type=float, default=0.01, help="스키마 위반 행 비율")
+    args = ap.parse_args()
+
+    rows = synth_rows(args.events, args.bad_ratio)
+    configs = [("exactly-once", {"num_streams": n}) for n in args.streams]
+    configs += [("exactly-once", {"auto_sharding": True}), ("at-least-once", {"at_least_once": True})]
+
+    print(f"{'mode':>14} {'streams':>8} {'rows/s':>9} {'appends':>8} {'rows/append':>12} {'failed':>7}")
+    for mode, kwargs in configs:
+        out_dir = tempfile.mkdtemp(prefix="bq_local_sink_")
+        try:
+            r = run_config(
+                rows, out_dir, args.workers, triggering_frequency=1, append_latency_ms=args.latency_ms, **kwargs
+            )
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+        streams = "auto" if kwargs.get("auto_sharding") else ("default" if mode == "at-least-once" else kwargs["num_streams"])
+        print(
+            f"{mode:>14} {streams:>8} {r['rows'] / r['elapsed']:>9.0f} {r['appends']:>8} "
+            f"{r['rows'] / max(1, r['appends']):>12.1f} {r['failed']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
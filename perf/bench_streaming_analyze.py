@@ -0,0 +1,101 @@
+"""
+Step 47: 스트리밍 분석 모드 벤치마크
+긴 합성 오디오(기본 60분)를 로컬 HTTP 서버로 제공하고, 기존 모드(임시 파일 + librosa.load)와
+스트리밍 모드(ffmpeg 파이프 + 블록 단위 누적)의 소요 시간, 최대 RSS, 결과 차이를 비교
+
+각 모드는 별도 프로세스에서 실행하여 최대 RSS(ru_maxrss)를 독립적으로 측정합니다.
+
+사용법:
+    python perf/bench_streaming_analyze.py --minutes 60 --sr 44100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from bench_common import load_service
+
+
+def write_long_wav(path: str, minutes: float, sr: int):
+    """발화/무음이 번갈아 나오는 합성 WAV를 1분 단위로 기록 (메모리 사용 최소화)"""
+    import soundfile as sf
+
+    rng = np.random.default_rng(47)
+    with sf.SoundFile(path, "w", samplerate=sr, channels=1, subtype="PCM_16") as f:
+        for m in range(int(np.ceil(minutes))):
+            n = int(sr * min(60, (minutes - m) * 60))
+            t = (np.arange(n) + m * 60 * sr) / sr
+            voiced = np.sin(2 * np.pi * 0.4 * t) > 0
+            y = 0.3 * np.sin(2 * np.pi * 180 * t) * voiced + 0.01 * rng.standard_normal(n)
+            f.write(y.astype(np.float32))
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve_dir(directory: str) -> int:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+
+
+def run_child(url: str, streaming: bool, target_sr: int):
+    """자식 프로세스: 한 번 분석하고 결과/시간/최대 RSS를 JSON으로 출력"""
+    mod = load_service("step47", METRICS_ENABLED=0)
+    req = mod.Req(audio_url=url, target_sr=target_sr, streaming=streaming)
+    t0 = time.perf_counter()
+    result = asyncio.run(mod.analyze(req))
+    elapsed = time.perf_counter() - t0
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"elapsed_sec": elapsed, "peak_rss_mb": peak_mb, "result": result}))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Step 47 스트리밍 분석 벤치마크")
+    ap.add_argument("--minutes", type=float, default=60)
+    ap.add_argument("--sr", type=int, default=44100, help="원본 샘플링 레이트")
+    ap.add_argument("--target-sr", type=int, default=16000)
+    ap.add_argument("--child", nargs=2, metavar=("URL", "MODE"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        run_child(args.child[0], args.child[1] == "streaming", args.target_sr)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "long.wav")
+        write_long_wav(path, args.minutes, args.sr)
+        port = serve_dir(tmp)
+        url = f"http://127.0.0.1:{port}/long.wav"
+        print(f"입력: {args.minutes:g}분, {args.sr} Hz, {os.path.getsize(path) / 1e6:.0f} MB")
+
+        runs = {}
+        for mode in ("file", "streaming"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--target-sr", str(args.target_sr), "--child", url, mode],
+                capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+            ).stdout
+            runs[mode] = json.loads(out.strip().splitlines()[-1])
+            print(f"{mode:>10}: {runs[mode]['elapsed_sec']:7.1f} s, peak RSS {runs[mode]['peak_rss_mb']:7.0f} MB")
+
+        print("결과 차이 (상대 오차):")
+        for key, ref in runs["file"]["result"].items():
+            got = runs["streaming"]["result"][key]
+            print(f"  {key:>22}: {ref:.6g} vs {got:.6g} ({abs(got - ref) / (abs(ref) or 1):.2e})")
+
+
+if __name__ == "__main__":
+    main()
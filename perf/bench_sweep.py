@@ -0,0 +1,133 @@
+"""
+Step 49: /sweep (서버 측 벡터화 파라미터 스윕) 벤치마크
+격자 크기 10^3 ~ 10^6에서
+- /sweep 한 번 (격자 생성 + 청크 단위 모델 호출 + top-k)
+- 조합마다 /predict 호출 (기존 UI 방식, --per-call-sample개만 재서 격자 크기로 환산)
+- 청크 크기별 최대 메모리 (tracemalloc, 청크 없이 한 번에 만든 경우와 비교)
+- coarse_to_fine이 같은 범위의 전체 격자 최고점에 얼마나 가까운지, 몇 점만 평가하는지
+를 비교합니다. 모델은 합성 데이터로 학습한 scikit-learn HistGradientBoostingRegressor(LightGBM과 같은 히스토그램 GBDT)와 선형 대체 모델
+
+사용법:
+    python perf/bench_sweep.py --sizes 1000 10000 100000 1000000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from bench_common import load_service
+
+
+def train_fixture_model(path: str, n: int = 20000, seed: int = 47):
+    """합성 품질 데이터로 GBDT 학습 후 joblib 저장 (열 순서는 app.score_matrix와 동일)"""
+    import joblib
+    from sklearn.ensemble import HistGradientBoostingRegressor
+
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([
+        rng.uniform(0, 35, n), rng.uniform(20, 220, n), rng.uniform(0.6, 1.0, n),
+        rng.integers(0, 20, n), rng.integers(0, 15, n), rng.integers(0, 3, n), rng.integers(0, 3, n),
+    ])
+    # SNR/커버리지는 포화, VAD×NS는 상호작용, 발화 속도는 중간값이 최적
+    y = (
+        0.35 * np.tanh(X[:, 0] / 15) + 0.4 * X[:, 2] - 0.01 * X[:, 3] - 0.012 * X[:, 4]
+        - 0.000015 * (X[:, 1] - 120) ** 2 + 0.03 * X[:, 5] * (2 - X[:, 6]) + rng.normal(0, 0.02, n)
+    )
+    model = HistGradientBoostingRegressor(max_leaf_nodes=16, max_iter=100, learning_rate=0.1).fit(X, y)
+    joblib.dump(model, path)
+
+
+def grid_request(size: int, **extra) -> dict:
+    """VAD 3 × NS 3 × 수치 축 3개(각 s단계) ≈ size"""
+    s = max(2, round((size / 9) ** (1 / 3)))
+    return {
+        "snr_db": {"min": 0, "max": 35, "steps": s},
+        "speech_blocks_per_min": {"min": 20, "max": 220, "steps": s},
+        "coverage": {"min": 0.6, "max": 1.0, "steps": s},
+        **extra,
+    }
+
+
+def per_call_payloads(req: dict, n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    axis = lambda r: r["min"] + (r["max"] - r["min"]) * rng.randrange(r["steps"]) / max(1, r["steps"] - 1)  # noqa: E731
+    return [
+        {"snr_db": axis(req["snr_db"]), "speech_blocks_per_min": axis(req["speech_blocks_per_min"]),
+         "coverage": axis(req["coverage"]), "gaps": 3, "overlaps": 2,
+         "vad_aggressiveness": rng.choice(["low", "medium", "high"]),
+         "noise_suppression": rng.choice(["weak", "normal", "strong"])}
+        for _ in range(n)
+    ]
+
+
+def peak_mb(mod, req: dict) -> float:
+    tracemalloc.start()
+    mod.sweep(mod.SweepRequest(**req))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Step 49 /sweep 벤치마크")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    ap.add_argument("--per-call-sample", type=int, default=500, help="/predict 반복 방식은 이만큼만 재서 환산")
+    ap.add_argument("--top-k", type=int, default=10)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_sweep_") as tmp:
+        model_path = os.path.join(tmp, "model.pkl")
+        train_fixture_model(model_path)
+
+        for label, path in (("gbdt", model_path), ("linear", os.path.join(tmp, "missing.pkl"))):
+            mod = load_service("step49", MODEL_PATH=path, PREDICT_CACHE_SIZE=0, SWEEP_MAX_POINTS=max(args.sizes) * 2)
+            client = TestClient(mod.app)
+            print(f"\n[{label}] model_used={'actual' if mod.USE_MODEL else 'linear'}")
+            print(f"{'points':>9} {'sweep_s':>8} {'us/pt':>7} {'/predict loop_s':>16} {'speedup':>8} {'peak_MB':>8}")
+            for size in args.sizes:
+                req = grid_request(size, top_k=args.top_k)
+                t0 = time.perf_counter()
+                r = client.post("/sweep", json=req)
+                sweep_s = time.perf_counter() - t0
+                r.raise_for_status()
+                points = r.json()["evaluated"]
+
+                payloads = per_call_payloads(req, args.per_call_sample)
+                t0 = time.perf_counter()
+                for p in payloads:
+                    client.post("/predict", json=p).raise_for_status()
+                loop_s = (time.perf_counter() - t0) / len(payloads) * points
+
+                print(
+                    f"{points:>9} {sweep_s:>8.3f} {sweep_s / points * 1e6:>7.2f} {loop_s:>16.1f} "
+                    f"{loop_s / sweep_s:>7.0f}x {peak_mb(mod, req):>8.1f}"
+                )
+
+            # 청크 없이 격자 전체를 한 번에 만들 때의 메모리 (SWEEP_CHUNK_ROWS를 격자보다 크게)
+            size = max(args.sizes)
+            req = grid_request(size, top_k=args.top_k)
+            chunked = peak_mb(mod, req)
+            mod.SWEEP_CHUNK_ROWS = size * 2
+            unchunked = peak_mb(mod, req)
+            mod.SWEEP_CHUNK_ROWS = 65536
+            print(f"최대 메모리 ({size}점): 청크 65536행 {chunked:.1f} MB vs 한 번에 {unchunked:.1f} MB")
+
+            # coarse_to_fine: 단계 수를 줄인 격자를 3라운드 좁혀 가며 전체 격자 최고점과 비교
+            full = client.post("/sweep", json=req).json()
+            fine = client.post("/sweep", json=grid_request(9 * 8 ** 3, top_k=1, search="coarse_to_fine",
+                                                           refine_rounds=3)).json()
+            print(
+                f"coarse_to_fine: 평가 {fine['evaluated']}점, 최고 {fine['best']['predicted_score']:.4f} vs "
+                f"전체 격자 {full['evaluated']}점 최고 {full['best']['predicted_score']:.4f} "
+                f"({fine['elapsed_ms']:.0f} ms vs {full['elapsed_ms']:.0f} ms)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Step 47/49: 멀티 프로세스 서빙 처리량 스케일링 벤치마크
+gunicorn 워커 수를 1 → N으로 늘리며 CPU 바운드 엔드포인트의 처리량(req/s)과 PSS 합계를 측정
+
+사용법:
+    python perf/bench_workers.py --service step49 --workers 1 2 4 --seconds 10
+    python perf/bench_workers.py --service step47 --workers 1 2 4 --seconds 20
+"""
+
+import argparse
+import io
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SERVICES = {
+    "step47": os.path.join(ROOT, "step47-audio-features"),
+    "step49": os.path.join(ROOT, "step49-quality-predictor"),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve_audio(seconds: float = 30.0, sr: int = 44100) -> str:
+    """합성 음성 WAV를 로컬 HTTP 서버로 제공하고 URL 반환"""
+    import soundfile as sf
+
+    t = np.arange(int(seconds * sr)) / sr
+    y = 0.3 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 0.5 * t) > 0) + 0.01 * np.random.randn(len(t))
+    buf = io.BytesIO()
+    sf.write(buf, y.astype(np.float32), sr, format="WAV")
+    body = buf.getvalue()
+
+    class Handler(SimpleHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/wav")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    port = free_port()
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{port}/audio.wav"
+
+
+def pss_mb(pid: int) -> float:
+    """프로세스 트리의 PSS 합계 (MB, 공유 페이지는 나눠서 계산, Linux /proc 기준)"""
+    total = 0
+    pids = [pid]
+    try:
+        out = subprocess.run(["pgrep", "-P", str(pid)], capture_output=True, text=True).stdout
+        pids += [int(p) for p in out.split()]
+    except FileNotFoundError:
+        pass
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/smaps_rollup") as f:
+                for line in f:
+                    if line.startswith("Pss:"):
+                        total += int(line.split()[1])
+        except OSError:
+            pass
+    return total / 1024
+
+
+def start_service(service: str, workers: int, port: int) -> subprocess.Popen:
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(port), PREDICT_CACHE_SIZE="0")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+        cwd=SERVICES[service], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/health", timeout=1).ok:
+                return proc
+        except requests.RequestException:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"{service} 서비스 시작 실패")
+
+
+def drive(url: str, payload: dict, concurrency: int, seconds: float) -> int:
+    """지정 시간 동안 concurrency개의 클라이언트로 요청하고 성공 수 반환"""
+    stop_at = time.time() + seconds
+    counts = [0] * concurrency
+
+    def client(i):
+        session = requests.Session()
+        while time.time() < stop_at:
+            if session.post(url, json=payload, timeout=120).ok:
+                counts[i] += 1
+
+    with ThreadPoolExecutor(concurrency) as ex:
+        list(ex.map(client, range(concurrency)))
+    return sum(counts)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="멀티 프로세스 서빙 스케일링 벤치마크")
+    ap.add_argument("--service", choices=list(SERVICES), default="step49")
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--seconds", type=float, default=10.0)
+    args = ap.parse_args()
+
+    if args.service == "step47":
+        path, payload = "/analyze", {"audio_url": serve_audio(), "target_sr": 16000}
+    else:
+        path, payload = "/predict", {
+            "snr_db": 18.5, "speech_blocks_per_min": 120, "coverage": 0.93,
+            "gaps": 3, "overlaps": 1, "vad_aggressiveness": "medium", "noise_suppression": "normal",
+        }
+
+    print(f"{'workers':>7} {'req/s':>9} {'speedup':>8} {'pss_mb':>8}")
+    base = None
+    for n in args.workers:
+        port = free_port()
+        proc = start_service(args.service, n, port)
+        try:
+            url = f"http://127.0.0.1:{port}{path}"
+            drive(url, payload, n * 2, 2.0)  # 워밍업
+            done = drive(url, payload, n * 4, args.seconds)
+            rps = done / args.seconds
+            base = base or rps
+            print(f"{n:>7} {rps:>9.1f} {rps / base:>8.2f} {pss_mb(proc.pid):>8.1f}")
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,455 @@
+"""
+Step 47/49: Python 서비스 부하 테스트 + 성능 기준선(JSON) 비교
+각 서비스를 gunicorn으로 띄우고 (fixture: 합성 데이터로 학습한 GBDT 모델, 로컬 오디오 파일 서버)
+실제 호출 비율에 가까운 요청 조합을 동시 사용자 수 단계별로 보내며
+
+- 엔드포인트별 p50 / p95 / p99 지연 (단계 시작 후 --ramp-seconds 이내에 시작한 요청은 제외, --repeat회 측정의 중앙값)
+- 처리량(성공 req/s), 오류율
+- 서비스 프로세스 트리(master + 워커 + 분석 프로세스 풀)의 RSS 합계 최대값
+
+을 기록합니다. --baseline을 주면 기준선과 비교하여 임계치를 넘는 회귀가 있으면 종료 코드 1.
+
+요청 조합
+- step49: /predict 70%, /predict_batch(10건) 25%, /sweep(약 10^3점) 5%, /reload-model은 --reload-every초마다 1회
+- step47: /analyze 60%, timeline 포함 15%, streaming 15%, /analyze_batch(4건) 10% (특징 캐시 끔)
+
+사용법:
+    python perf/loadtest.py --output loadtest.json
+    python perf/loadtest.py --baseline perf/baseline/loadtest.json                   # 비교만 (CI)
+    python perf/loadtest.py --baseline perf/baseline/loadtest.json --update-baseline # 회귀가 없으면 기준선 갱신 (로컬)
+
+perf/baseline은 CI 러너에서 측정해 커밋한 기준선 (CI는 비교만 하고 갱신하지 않음,
+갱신은 Launch Gates 워크플로를 update_baseline으로 수동 실행한 뒤 perf-baseline 아티팩트를 커밋)
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import requests
+
+from bench_common import ROOT
+from bench_sweep import train_fixture_model
+from bench_workers import SERVICES, free_port
+
+FORMAT_VERSION = 1
+
+
+# ===== fixture =====
+
+def write_fixture_audio(directory: str):
+    """합성 발화 WAV fixture (44.1kHz 스테레오 10초, 16kHz mono 30초)"""
+    import soundfile as sf
+
+    rng = np.random.default_rng(49)
+    for name, seconds, sr, channels in (("speech_44k_stereo.wav", 10, 44100, 2), ("speech_16k_mono.wav", 30, 16000, 1)):
+        t = np.arange(int(seconds * sr)) / sr
+        # 0.5초 단위로 켜졌다 꺼지는 220Hz 발화 + 배경 잡음
+        y = 0.3 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 0.5 * t) > 0) + 0.01 * rng.standard_normal(len(t))
+        sf.write(os.path.join(directory, name), np.tile(y[:, None], (1, channels)).astype(np.float32), sr)
+
+
+def serve_directory(directory: str) -> str:
+    """fixture 디렉터리를 로컬 HTTP 서버로 제공하고 base URL 반환"""
+
+    class Handler(SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    port = free_port()
+    server = ThreadingHTTPServer(("127.0.0.1", port), partial(Handler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{port}"
+
+
+# ===== 요청 조합 =====
+
+def random_features(rng: random.Random) -> dict:
+    return {
+        "snr_db": round(rng.uniform(0, 35), 2),
+        "speech_blocks_per_min": round(rng.uniform(20, 220), 1),
+        "coverage": round(rng.uniform(0.6, 1.0), 3),
+        "gaps": rng.randrange(20),
+        "overlaps": rng.randrange(15),
+        "vad_aggressiveness": rng.choice(["low", "medium", "high"]),
+        "noise_suppression": rng.choice(["weak", "normal", "strong"]),
+    }
+
+
+def step49_mix(fixture_url: str) -> tuple:
+    """(가중치 조합, 주기 요청) - 요청 생성 함수는 rng → (path, json)"""
+    sweep = {
+        "snr_db": {"min": 0, "max": 35, "steps": 5},
+        "speech_blocks_per_min": {"min": 20, "max": 220, "steps": 5},
+        "coverage": {"min": 0.6, "max": 1.0, "steps": 5},
+        "top_k": 5,
+    }
+    weighted = [
+        ("POST /predict", 0.70, lambda rng: ("/predict", random_features(rng))),
+        ("POST /predict_batch", 0.25, lambda rng: ("/predict_batch", [random_features(rng) for _ in range(10)])),
+        ("POST /sweep", 0.05, lambda rng: ("/sweep", sweep)),
+    ]
+    periodic = [
+        ("POST /reload-model", lambda rng: ("/reload-model", {"model_url": f"{fixture_url}/model.pkl"})),
+    ]
+    return weighted, periodic
+
+
+def step47_mix(fixture_url: str) -> tuple:
+    urls = [f"{fixture_url}/speech_44k_stereo.wav", f"{fixture_url}/speech_16k_mono.wav"]
+    weighted = [
+        ("POST /analyze", 0.60, lambda rng: ("/analyze", {"audio_url": rng.choice(urls)})),
+        ("POST /analyze (timeline)", 0.15,
+         lambda rng: ("/analyze", {"audio_url": rng.choice(urls), "timeline_sec": 1.0})),
+        ("POST /analyze (streaming)", 0.15,
+         lambda rng: ("/analyze", {"audio_url": rng.choice(urls), "streaming": True})),
+        ("POST /analyze_batch", 0.10, lambda rng: ("/analyze_batch", {"audio_urls": [rng.choice(urls) for _ in range(4)]})),
+    ]
+    return weighted, []
+
+
+MIXES = {"step47": step47_mix, "step49": step49_mix}
+
+
+# ===== 서비스 실행 / 측정 =====
+
+def start_service(service: str, workers: int, env: dict) -> tuple:
+    """gunicorn으로 서비스를 띄우고 /health가 200이 될 때까지 대기 → (프로세스, base URL)"""
+    port = free_port()
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(port), **env)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+        cwd=SERVICES[service], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{service} 서비스 종료 (exit {proc.returncode})")
+        try:
+            if requests.get(base + "/health", timeout=1).ok:
+                return proc, base
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"{service} 서비스 시작 실패")
+
+
+def stop_service(proc: subprocess.Popen):
+    """master 종료 후 남은 하위 프로세스(분석 프로세스 풀 등)까지 정리"""
+    pids = process_tree(proc.pid)
+    proc.terminate()
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+    for p in pids[1:]:
+        try:
+            os.kill(p, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def process_tree(pid: int) -> list:
+    pids, stack = [], [pid]
+    while stack:
+        p = stack.pop()
+        pids.append(p)
+        out = subprocess.run(["pgrep", "-P", str(p)], capture_output=True, text=True).stdout
+        stack += [int(c) for c in out.split()]
+    return pids
+
+
+def rss_mb(pid: int) -> float:
+    """프로세스 트리의 RSS 합계 (MB, Linux /proc 기준, 워커 간 공유 페이지는 중복 계산)"""
+    total = 0
+    for p in process_tree(pid):
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+        except OSError:
+            pass
+    return total / 1024
+
+
+def percentiles(latencies: list) -> dict:
+    ms = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99]) if len(ms) else (None, None, None)
+    return {
+        "count": len(ms),
+        "p50_ms": None if p50 is None else round(float(p50), 3),
+        "p95_ms": None if p95 is None else round(float(p95), 3),
+        "p99_ms": None if p99 is None else round(float(p99), 3),
+    }
+
+
+def run_step(base: str, pid: int, mix: tuple, concurrency: int, seconds: float, ramp: float,
+             reload_every: float, seed: int) -> dict:
+    """동시 사용자 concurrency명이 쉬지 않고 요청 (closed loop), ramp 이후 seconds 동안 기록"""
+    weighted, periodic = mix
+    names = [name for name, _, _ in weighted]
+    weights = [w for _, w, _ in weighted]
+    latencies = {name: [] for name in names + [name for name, _ in periodic]}
+    errors = {name: 0 for name in latencies}
+    t_start = time.perf_counter()
+    t_record = t_start + ramp
+    t_stop = t_record + seconds
+    lock = threading.Lock()
+
+    def record(name: str, t0: float, ok: bool):
+        if t0 < t_record:
+            return
+        with lock:
+            if ok:
+                latencies[name].append(time.perf_counter() - t0)
+            else:
+                errors[name] += 1
+
+    def send(session, name, build, rng):
+        path, payload = build(rng)
+        t0 = time.perf_counter()
+        try:
+            ok = session.post(base + path, json=payload, timeout=120).ok
+        except requests.RequestException:
+            ok = False
+        record(name, t0, ok)
+
+    def client(i: int):
+        rng = random.Random(seed * 1000 + i)
+        session = requests.Session()
+        while time.perf_counter() < t_stop:
+            k = rng.choices(range(len(weighted)), weights)[0]
+            send(session, names[k], weighted[k][2], rng)
+
+    def scheduler():
+        rng = random.Random(seed)
+        session = requests.Session()
+        next_at = time.perf_counter() + reload_every
+        while time.perf_counter() < t_stop:
+            if time.perf_counter() >= next_at:
+                for name, build in periodic:
+                    send(session, name, build, rng)
+                next_at += reload_every
+            time.sleep(0.05)
+
+    rss_peak = rss_mb(pid)
+    with ThreadPoolExecutor(concurrency + 1) as ex:
+        futures = [ex.submit(client, i) for i in range(concurrency)]
+        if periodic and reload_every > 0:
+            futures.append(ex.submit(scheduler))
+        while not all(f.done() for f in futures):
+            rss_peak = max(rss_peak, rss_mb(pid))
+            time.sleep(0.5)
+        for f in futures:
+            f.result()
+    elapsed = time.perf_counter() - t_record
+
+    ok_total = sum(len(v) for v in latencies.values())
+    err_total = sum(errors.values())
+    return {
+        "throughput_rps": round(ok_total / elapsed, 2),
+        "error_rate": round(err_total / max(1, ok_total + err_total), 5),
+        "rss_mb": round(rss_peak, 1),
+        "endpoints": {
+            name: {**percentiles(latencies[name]), "errors": errors[name]} for name in latencies
+        },
+    }
+
+
+def median_step(steps: list) -> dict:
+    """같은 단계를 반복 측정한 결과의 항목별 중앙값 (요청 수/오류 수는 합계)"""
+    if len(steps) == 1:
+        return steps[0]
+    med = lambda values: round(float(np.median(values)), 3)  # noqa: E731
+    endpoints = {}
+    for name in steps[0]["endpoints"]:
+        runs = [s["endpoints"][name] for s in steps]
+        measured = [r for r in runs if r["count"]]
+        endpoints[name] = {
+            "count": sum(r["count"] for r in runs),
+            **{key: med([r[key] for r in measured]) if measured else None for key in ("p50_ms", "p95_ms", "p99_ms")},
+            "errors": sum(r["errors"] for r in runs),
+        }
+    return {
+        "throughput_rps": med([s["throughput_rps"] for s in steps]),
+        "error_rate": med([s["error_rate"] for s in steps]),
+        "rss_mb": med([s["rss_mb"] for s in steps]),
+        "endpoints": endpoints,
+    }
+
+
+def run_service(service: str, args, fixture_dir: str, fixture_url: str) -> dict:
+    env = {
+        "MODEL_PATH": os.path.join(fixture_dir, "serving", "model.pkl"),
+        "PROMETHEUS_MULTIPROC_DIR": os.path.join(fixture_dir, f"prom_{service}"),
+        "FEATURE_CACHE_MAX_MB": "0",
+        "ANALYZE_WORKERS": str(args.workers),
+    }
+    proc, base = start_service(service, args.workers, env)
+    try:
+        mix = MIXES[service](fixture_url)
+        levels = {}
+        for concurrency in args.concurrency:
+            step = median_step([
+                run_step(base, proc.pid, mix, concurrency, args.seconds, args.ramp_seconds, args.reload_every, args.seed + i)
+                for i in range(args.repeat)
+            ])
+            levels[str(concurrency)] = step
+            print_step(service, concurrency, step)
+        return levels
+    finally:
+        stop_service(proc)
+
+
+def print_step(service: str, concurrency: int, step: dict):
+    print(f"\n[{service}] 동시 {concurrency}: {step['throughput_rps']} req/s, 오류율 {step['error_rate']:.2%}, "
+          f"RSS {step['rss_mb']} MB")
+    print(f"{'endpoint':>28} {'count':>7} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9} {'errors':>7}")
+    for name, e in step["endpoints"].items():
+        if e["count"] == 0 and e["errors"] == 0:
+            continue
+        fmt = lambda v: f"{v:>9.2f}" if v is not None else f"{'-':>9}"  # noqa: E731
+        print(f"{name:>28} {e['count']:>7} {fmt(e['p50_ms'])} {fmt(e['p95_ms'])} {fmt(e['p99_ms'])} {e['errors']:>7}")
+
+
+# ===== 기준선 비교 =====
+
+def compare(results: dict, baseline: dict, args) -> list:
+    """기준선 대비 회귀 목록 (서비스/동시 사용자 수/엔드포인트가 양쪽에 있는 항목만 비교)"""
+    regressions = []
+    for service, levels in results["results"].items():
+        for level, step in levels.items():
+            where = f"{service} 동시 {level}"
+            if step["error_rate"] > args.max_error_rate:
+                regressions.append(f"{where}: 오류율 {step['error_rate']:.2%} > {args.max_error_rate:.2%}")
+            base = baseline.get("results", {}).get(service, {}).get(level)
+            if base is None:
+                continue
+            if step["throughput_rps"] < base["throughput_rps"] * (1 - args.max_throughput_drop):
+                regressions.append(
+                    f"{where}: 처리량 {base['throughput_rps']} → {step['throughput_rps']} req/s "
+                    f"(-{1 - step['throughput_rps'] / base['throughput_rps']:.0%})"
+                )
+            if step["rss_mb"] > base["rss_mb"] * (1 + args.max_rss_growth):
+                regressions.append(
+                    f"{where}: RSS {base['rss_mb']} → {step['rss_mb']} MB (+{step['rss_mb'] / base['rss_mb'] - 1:.0%})"
+                )
+            for name, e in step["endpoints"].items():
+                b = base["endpoints"].get(name)
+                if b is None or min(e["count"], b["count"]) < args.min_samples:
+                    continue
+                for key in ("p50_ms", "p95_ms", "p99_ms"):
+                    limit = args.max_p99_regression if key == "p99_ms" else args.max_latency_regression
+                    if e[key] > b[key] * (1 + limit) and e[key] - b[key] > args.min_latency_delta_ms:
+                        regressions.append(
+                            f"{where} {name}: {key} {b[key]:.2f} → {e[key]:.2f} (+{e[key] / b[key] - 1:.0%})"
+                        )
+    return regressions
+
+
+def git_rev() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Step 47/49 부하 테스트 + 기준선 비교")
+    ap.add_argument("--services", nargs="+", choices=list(MIXES), default=["step49", "step47"])
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="동시 사용자 수 단계")
+    ap.add_argument("--seconds", type=float, default=10, help="단계별 측정 시간")
+    ap.add_argument("--ramp-seconds", type=float, default=2, help="단계 시작 후 기록하지 않는 시간")
+    ap.add_argument("--workers", type=int, default=2, help="gunicorn 워커 수 (WEB_CONCURRENCY)")
+    ap.add_argument("--repeat", type=int, default=1, help="단계별 반복 횟수 (항목별 중앙값 기록)")
+    ap.add_argument("--reload-every", type=float, default=5, help="/reload-model 주기 (초, 0이면 호출 안 함)")
+    ap.add_argument("--seed", type=int, default=49)
+    ap.add_argument("--output", help="결과 JSON 경로")
+    ap.add_argument("--baseline", help="비교할 기준선 JSON (없으면 비교 생략)")
+    ap.add_argument("--update-baseline", action="store_true", help="회귀가 없으면 결과를 --baseline에 기록")
+    ap.add_argument("--max-latency-regression", type=float, default=0.25, help="p50/p95 허용 증가율")
+    ap.add_argument("--max-p99-regression", type=float, default=0.50, help="p99 허용 증가율 (꼬리 지연은 변동이 커서 따로)")
+    ap.add_argument("--min-latency-delta-ms", type=float, default=1.0, help="이보다 작은 지연 증가는 비율과 무관하게 무시")
+    ap.add_argument("--max-throughput-drop", type=float, default=0.20, help="처리량 허용 감소율")
+    ap.add_argument("--max-rss-growth", type=float, default=0.20, help="RSS 허용 증가율")
+    ap.add_argument("--max-error-rate", type=float, default=0.01, help="허용 오류율 (기준선과 무관)")
+    ap.add_argument("--min-samples", type=int, default=50, help="지연 비교에 필요한 최소 요청 수")
+    args = ap.parse_args()
+    if args.update_baseline and not args.baseline:
+        ap.error("--update-baseline에는 --baseline이 필요합니다")
+
+    results = {
+        "format_version": FORMAT_VERSION,
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_rev": git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "settings": {
+                k: getattr(args, k)
+                for k in ("concurrency", "seconds", "ramp_seconds", "workers", "repeat", "reload_every", "seed")
+            },
+        },
+        "results": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="loadtest_") as fixture_dir:
+        # /reload-model이 서빙 중인 MODEL_PATH를 교체하므로 제공용 모델과 서빙용 모델을 분리
+        os.makedirs(os.path.join(fixture_dir, "serving"))
+        train_fixture_model(os.path.join(fixture_dir, "model.pkl"))
+        train_fixture_model(os.path.join(fixture_dir, "serving", "model.pkl"))
+        write_fixture_audio(fixture_dir)
+        fixture_url = serve_directory(fixture_dir)
+        for service in args.services:
+            results["results"][service] = run_service(service, args, fixture_dir, fixture_url)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    regressions = []
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("settings") != results["meta"]["settings"]:
+            print("\n⚠️ 기준선과 측정 설정이 다릅니다 (같은 단계/엔드포인트만 비교)")
+        regressions = compare(results, baseline, args)
+        print(f"\n기준선 {args.baseline} ({baseline['meta'].get('git_rev') or '?'}) 대비 회귀 {len(regressions)}건")
+        for r in regressions:
+            print(f"  ❌ {r}")
+    elif args.baseline:
+        print(f"\n기준선이 없습니다: {args.baseline}")
+        regressions = compare(results, {}, args)  # 오류율만 확인
+        for r in regressions:
+            print(f"  ❌ {r}")
+
+    if args.update_baseline and not regressions:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"기준선 갱신: {args.baseline}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
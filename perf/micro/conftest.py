@@ -0,0 +1,69 @@
+"""
+Step 47/49 마이크로 벤치마크 (pytest-benchmark) 공통 fixture
+서비스 app 모듈은 세션당 한 번 로드 (import 시 워밍업 포함), 입력 오디오/모델은 합성 fixture
+
+실행:
+    python -m pytest perf/micro --benchmark-only
+    python -m pytest perf/micro --benchmark-only --benchmark-storage=file://perf/baseline/micro \
+        --benchmark-compare --benchmark-compare-fail=min:20%   # 커밋된 기준선 대비 최솟값 20% 이상 느려지면 실패 (CI)
+    (기준선은 같은 머신 종류에서 --benchmark-save=baseline으로 기록, perf/loadtest.py 참고)
+"""
+
+import io
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_common import load_service  # noqa: E402
+from bench_sweep import train_fixture_model  # noqa: E402
+
+
+def speech_like(seconds: float, sr: int, seed: int = 47) -> np.ndarray:
+    """0.5초 단위로 켜졌다 꺼지는 220Hz 발화 + 배경 잡음 (float32 mono)"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    y = 0.3 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 0.5 * t) > 0) + 0.01 * rng.standard_normal(len(t))
+    return y.astype(np.float32)
+
+
+@pytest.fixture(scope="session")
+def step47():
+    return load_service("step47", FEATURE_CACHE_MAX_MB=0)
+
+
+@pytest.fixture(scope="session")
+def audio_16k():
+    """30초 16kHz mono (특징 추출 입력)"""
+    return speech_like(30, 16000)
+
+
+@pytest.fixture(scope="session")
+def wav_44k_stereo():
+    """10초 44.1kHz 스테레오 WAV 바이트 (디코딩/리샘플 포함 전체 경로 입력)"""
+    import soundfile as sf
+
+    y = speech_like(10, 44100)
+    buf = io.BytesIO()
+    sf.write(buf, np.column_stack([y, y]), 44100, format="WAV")
+    return buf.getvalue()
+
+
+@pytest.fixture(scope="session")
+def model_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("model") / "model.pkl")
+    train_fixture_model(path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def step49_linear(tmp_path_factory):
+    return load_service("step49", MODEL_PATH=str(tmp_path_factory.mktemp("nomodel") / "missing.pkl"), PREDICT_CACHE_SIZE=4096)
+
+
+@pytest.fixture(scope="session")
+def step49_gbdt(model_path):
+    return load_service("step49", MODEL_PATH=model_path, PREDICT_CACHE_SIZE=4096)
@@ -0,0 +1,59 @@
+"""
+Step 47 오디오 특징 추출 핫패스 마이크로 벤치마크
+"""
+
+import io
+
+
+def test_frame_features_30s(benchmark, step47, audio_16k):
+    rms, zcr, sc = benchmark(step47.FrameFeatureExtractor(16000).extract, audio_16k)
+    assert len(rms) == len(zcr) == len(sc) == 1 + len(audio_16k) // step47.HOP
+
+
+def test_streaming_features_30s(benchmark, step47, audio_16k):
+    def run():
+        features = step47.StreamingFeatures(16000)
+        for i in range(0, len(audio_16k), 160000):
+            features.feed(audio_16k[i:i + 160000])
+        return features.finish()
+
+    assert benchmark(run)["duration_sec"] == 30
+
+
+def test_summarize_with_timeline(benchmark, step47, audio_16k):
+    rms, zcr, sc = step47.FrameFeatureExtractor(16000).extract(audio_16k)
+
+    def run():
+        result = step47.summarize_features(16000, len(audio_16k), rms, zcr.mean(), sc.mean())
+        result["timeline"] = step47.feature_timeline(16000, len(audio_16k), rms, zcr, sc, 1.0)
+        return result
+
+    assert "timeline" in benchmark(run)
+
+
+def test_decode_wav_10s(benchmark, step47, wav_44k_stereo):
+    y, sr = benchmark(lambda: step47.decode_audio(io.BytesIO(wav_44k_stereo)))
+    assert sr == 44100 and len(y) == 441000
+
+
+def test_resample_44k_to_16k(benchmark, step47, wav_44k_stereo):
+    y, sr = step47.decode_audio(io.BytesIO(wav_44k_stereo))
+    out = benchmark(step47.resample, y, sr, 16000, "HQ")
+    assert len(out) == 160000
+
+
+def test_analyze_bytes_10s(benchmark, step47, wav_44k_stereo):
+    opts = step47.AnalysisOptions(16000, "HQ", False)
+    result = benchmark(step47.analyze_bytes, wav_44k_stereo, opts)
+    assert result["sr"] == 16000
+
+
+def test_analyze_bytes_in_process_pool_10s(benchmark, step47, wav_44k_stereo):
+    """/analyze_batch 경로: analyze_bytes와 입력을 pickle해 프로세스 풀 자식에서 분석 (IPC 비용 포함)"""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    opts = step47.AnalysisOptions(16000, "HQ", False)
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork")) as pool:
+        result = benchmark(lambda: pool.submit(step47.analyze_bytes, wav_44k_stereo, opts).result())
+    assert result["sr"] == 16000
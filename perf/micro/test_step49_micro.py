@@ -0,0 +1,60 @@
+"""
+Step 49 품질 예측 핫패스 마이크로 벤치마크 (선형 대체 모델 / 합성 데이터로 학습한 GBDT 모델)
+"""
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+FEATURES = {
+    "snr_db": 18.5, "speech_blocks_per_min": 120, "coverage": 0.93, "gaps": 3, "overlaps": 2,
+    "vad_aggressiveness": "high", "noise_suppression": "strong",
+}
+
+
+@pytest.fixture(params=["linear", "gbdt"])
+def step49(request):
+    return request.getfixturevalue(f"step49_{request.param}")
+
+
+def test_predict_uncached(benchmark, step49):
+    f = step49.Features(**FEATURES)
+    assert 0 <= benchmark(step49.predict_uncached, f)["predicted_score"] <= 1.5
+
+
+def test_predict_cached_hit(benchmark, step49):
+    f = step49.Features(**FEATURES)
+    expected = step49.predict_cached(f)
+    assert benchmark(step49.predict_cached, f) == expected
+
+
+def test_score_matrix_64k_rows(benchmark, step49):
+    rng = np.random.default_rng(49)
+    n = step49.SWEEP_CHUNK_ROWS
+    X = np.column_stack([
+        rng.uniform(0, 35, n), rng.uniform(20, 220, n), rng.uniform(0.6, 1.0, n),
+        rng.integers(0, 20, n), rng.integers(0, 15, n), rng.integers(0, 3, n), rng.integers(0, 3, n),
+    ])
+    assert benchmark(step49.score_matrix, X).shape == (n,)
+
+
+def test_sweep_10k_points(benchmark, step49):
+    req = step49.SweepRequest(
+        snr_db={"min": 0, "max": 35, "steps": 10},
+        speech_blocks_per_min={"min": 20, "max": 220, "steps": 10},
+        coverage={"min": 0.6, "max": 1.0, "steps": 11},
+    )
+    assert benchmark(step49.sweep, req)["evaluated"] == 9900
+
+
+def test_predict_http(benchmark, step49):
+    """HTTP 스택 포함 /predict (매번 다른 특징으로 예측 캐시 미스)"""
+    client = TestClient(step49.app)
+    counter = iter(range(10 ** 9))
+
+    def run():
+        r = client.post("/predict", json={**FEATURES, "snr_db": 10 + next(counter) * 1e-3})
+        r.raise_for_status()
+        return r
+
+    benchmark(run)
@@ -3,35 +3,75 @@
 Step 35: Forced Alignment - 문장 정밀 싱크 + Firestore 자동 갱신 파이프라인
 
 faster-whisper로 단어 단위 타임스탬프 추출
-리포트 본문 문장과 오디오 단어 스트림을 그리디 매칭해 각 문장의 [start,end] 자동 생성
+리포트 본문 토큰과 오디오 단어 토큰을 앵커 + 밴드 DP로 정렬해 각 문장의 [start,end]와 신뢰도 자동 생성
 결과를 Firestore의 reports/{id}.sentenceTimestamps로 바로 업데이트
+
+긴 오디오는 --parallel-chunks로 무음 지점에서 나눈 청크를 여러 프로세스에서 동시에 인식 후 이어 붙일 수 있습니다.
+배치 모드(--manifest / --manifest-firestore)는 Whisper 모델을 한 번만 로드하여
+여러 리포트를 --workers개 스레드로 병렬 처리하고, 끝나는 순서대로 결과를 JSONL로 기록합니다.
 """
 
 import argparse
+import difflib
+import hashlib
 import json
 import os
 import re
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 try:
     from faster_whisper import WhisperModel
-    from pydub import AudioSegment
     import requests
     from tqdm import tqdm
 except ImportError as e:
     print(f"❌ 필수 패키지가 설치되지 않았습니다: {e}")
-    print("pip install faster-whisper google-cloud-firestore pydub tqdm requests")
+    print("pip install faster-whisper google-cloud-firestore tqdm requests")
     sys.exit(1)
 
+# 정렬 점수 (정확 일치 / 접두 일치(조사 등) / 불일치 / 삽입·삭제)
+ALIGN_MATCH = 2
+ALIGN_SOFT = 1
+ALIGN_MISMATCH = -1
+ALIGN_GAP = -1
+# 밴드 DP 폭 (두 구간 길이 차이에 더하는 여유 폭)
+ALIGN_BAND = 16
+# 이 셀 수 이하의 구간은 앵커 탐색 없이 바로 DP
+ALIGN_DIRECT_CELLS = 4096
+ALIGN_MAX_DEPTH = 4
+
+# 다운로드 본문을 메모리에 두는 최대 크기 (MB), 넘으면 디스크 임시 파일로 넘김
+AUDIO_SPOOL_MAX_MB = float(os.getenv("STEP35_AUDIO_SPOOL_MAX_MB", "64"))
+
+# 단어 transcript(오디오 sha256 + 모델) / 리포트별 마지막 정렬 결과 저장 위치 (증분 재정렬용)
+TRANSCRIPT_CACHE_DIR = os.getenv("STEP35_TRANSCRIPT_CACHE_DIR", os.path.join(Path.home(), ".cache", "step35"))
+
+# 청크 병렬 인식: 청크 양쪽에 붙이는 문맥 여유 (초), 청크 분할 기준 최소 무음 길이 (ms)
+CHUNK_PAD_SEC = 0.5
+CHUNK_MIN_SILENCE_MS = 300
+
+# Firestore 일괄 처리: get_all 1회당 문서 수, BulkWriter 초당 쓰기 수 (500/50/5 규칙 시작값), 쓰기 최대 시도 횟수
+FIRESTORE_READ_BATCH = int(os.getenv("STEP35_FIRESTORE_READ_BATCH", "300"))
+FIRESTORE_WRITE_OPS_PER_SEC = int(os.getenv("STEP35_FIRESTORE_WRITE_OPS_PER_SEC", "500"))
+FIRESTORE_WRITE_MAX_ATTEMPTS = int(os.getenv("STEP35_FIRESTORE_WRITE_MAX_ATTEMPTS", "5"))
+
 # Google Cloud Firestore (선택적)
 try:
     from google.cloud import firestore
+    from google.cloud.firestore_v1.bulk_writer import BulkRetry, BulkWriterOptions, SendMode
     FIRESTORE_AVAILABLE = True
 except ImportError:
     FIRESTORE_AVAILABLE = False
     firestore = None
 
+# 프로젝트별 Firestore 클라이언트 (gRPC 채널/인증을 리포트마다 새로 만들지 않도록 재사용)
+_firestore_clients: dict = {}
+_firestore_lock = threading.Lock()
+
 
 def split_sentences(text: str) -> list[str]:
     """문장 분할"""
@@ -41,44 +81,102 @@ def split_sentences(text: str) -> list[str]:
     return sentences
 
 
-def download_audio(url: str, output_path: str) -> str:
-    """오디오 파일 다운로드"""
+def download_audio(url: str, spool_max_mb: float = AUDIO_SPOOL_MAX_MB, validators: dict | None = None):
+    """
+    오디오를 SpooledTemporaryFile로 다운로드하며 sha256 계산
+    메모리에 받고, spool_max_mb를 넘는 큰 파일만 디스크로 넘김 (0 이하면 항상 디스크)
+
+    validators(이전 응답의 {"etag", "lastModified"})를 넘기면 조건부 요청 → 변경 없음(304)이면 None
+    반환: (buf, sha256 hex, 이번 응답의 validators) — buf는 호출자가 닫음
+    """
     print(f"📥 오디오 다운로드 중: {url}")
-    response = requests.get(url, stream=True)
-    response.raise_for_status()
-    
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "wb") as f:
-        for chunk in response.iter_content(chunk_size=8192):
-            f.write(chunk)
-    
-    print(f"✅ 다운로드 완료: {output_path}")
-    return output_path
+    headers = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("lastModified"):
+            headers["If-Modified-Since"] = validators["lastModified"]
+    with requests.get(url, stream=True, timeout=60, headers=headers) as response:
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        # SpooledTemporaryFile은 max_size=0을 '무제한'으로 취급하므로 최소 1바이트로 보정
+        spool_bytes = max(1, int(spool_max_mb * 1024 * 1024))
+        buf = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+        digest = hashlib.sha256()
+        size = 0
+        for chunk in response.iter_content(chunk_size=256 * 1024):
+            buf.write(chunk)
+            digest.update(chunk)
+            size += len(chunk)
+        buf.seek(0)
 
+    where = "디스크 스풀" if size > spool_bytes else "메모리"
+    print(f"✅ 다운로드 완료: {size / 1e6:.1f} MB ({where})")
+    return buf, digest.hexdigest(), {
+        "etag": response.headers.get("ETag"), "lastModified": response.headers.get("Last-Modified"),
+    }
 
-def ensure_wav(audio_path: str) -> str:
-    """오디오를 WAV 형식으로 변환 (faster-whisper 호환)"""
-    if audio_path.lower().endswith('.wav'):
-        return audio_path
-    
-    print(f"🔄 오디오 변환 중: {audio_path}")
-    audio = AudioSegment.from_file(audio_path)
-    wav_path = audio_path.rsplit('.', 1)[0] + '.wav'
-    audio.export(wav_path, format="wav")
-    print(f"✅ 변환 완료: {wav_path}")
-    return wav_path
 
+def decode_buffer(buf):
+    """다운로드 버퍼를 16 kHz mono float32 배열로 디코딩 (임시 파일 / WAV 변환 없이 transcribe에 바로 전달)"""
+    from faster_whisper.audio import decode_audio
 
-def transcribe_words(wav_path: str, model_size: str = "base") -> list[dict]:
-    """faster-whisper로 단어 단위 타임스탬프 추출"""
+    audio = decode_audio(buf, sampling_rate=16000)
+    print(f"✅ 디코딩 완료: {len(audio) / 16000:.1f}초")
+    return audio
+
+
+def fetch_audio(url: str, spool_max_mb: float = AUDIO_SPOOL_MAX_MB):
+    """오디오를 다운로드하여 16 kHz mono float32 배열로 디코딩"""
+    buf, _, _ = download_audio(url, spool_max_mb)
+    with buf:
+        return decode_buffer(buf)
+
+
+def load_whisper_model(model_size: str = "base", cpu_threads: int = 0, num_workers: int = 1):
+    """
+    Whisper 모델 로드 (배치 모드에서는 한 번만 로드하여 모든 리포트에 재사용)
+    num_workers: 여러 스레드에서 동시에 transcribe()를 호출할 때의 병렬 처리 수
+    cpu_threads: 워커당 연산 스레드 수 (0이면 CTranslate2 기본값)
+    """
     print(f"🎤 Whisper 모델 로딩 중... (모델: {model_size})")
-    model = WhisperModel(model_size, device="cpu", compute_type="int8")
+    return WhisperModel(
+        model_size, device="cpu", compute_type="int8",
+        cpu_threads=cpu_threads, num_workers=num_workers,
+    )
+
+
+class LazyWhisperModel:
+    """첫 transcribe() 호출 때 한 번만 로드하는 WhisperModel (transcript 캐시 적중 시 모델 로드 생략)"""
+
+    def __init__(self, model_size: str = "base", cpu_threads: int = 0, num_workers: int = 1):
+        self.model_size = model_size
+        self.cpu_threads = cpu_threads
+        self.num_workers = num_workers
+        self._model = None
+        self._lock = threading.Lock()
+
+    def transcribe(self, *args, **kwargs):
+        with self._lock:
+            if self._model is None:
+                self._model = load_whisper_model(self.model_size, self.cpu_threads, self.num_workers)
+        return self._model.transcribe(*args, **kwargs)
+
+
+def transcribe_words(audio, model_size: str = "base", model=None, progress: bool = True) -> list[dict]:
+    """
+    faster-whisper로 단어 단위 타임스탬프 추출 (model이 없으면 새로 로드)
+    audio: 오디오 파일 경로 또는 16 kHz mono float32 배열
+    """
+    if model is None:
+        model = load_whisper_model(model_size)
     
     print("🔍 음성 인식 중...")
-    segments, info = model.transcribe(wav_path, word_timestamps=True, language="ko")
+    segments, info = model.transcribe(audio, word_timestamps=True, language="ko")
     
     words = []
-    for segment in tqdm(segments, desc="단어 추출"):
+    for segment in tqdm(segments, desc="단어 추출", disable=not progress):
         for word in segment.words:
             words.append({
                 "word": word.word.strip(),
@@ -90,8 +188,292 @@ def transcribe_words(wav_path: str, model_size: str = "base") -> list[dict]:
     return words
 
 
-def align_sentences(sentences: list[str], words: list[dict]) -> list[dict]:
-    """문장과 단어 스트림을 그리디 매칭하여 문장별 타임스탬프 생성"""
+def split_on_silence(audio, chunk_sec: float, sr: int = 16000) -> list[int]:
+    """
+    Silero VAD 발화 구간을 chunk_sec 안팎으로 묶고, 묶음 사이 무음의 가운데에서 자른 경계 샘플 목록 반환
+    (경계 [b0=0, b1, ..., len(audio)], 청크 i = [b_i, b_i+1))
+    """
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    speech = get_speech_timestamps(
+        audio, VadOptions(min_silence_duration_ms=CHUNK_MIN_SILENCE_MS, speech_pad_ms=0), sampling_rate=sr,
+    )
+    bounds = [0]
+    for prev, seg in zip(speech, speech[1:]):
+        # 다음 발화 구간까지 포함하면 chunk_sec를 넘을 때 그 앞 무음에서 자름
+        if seg["end"] - bounds[-1] > chunk_sec * sr:
+            bounds.append((prev["end"] + seg["start"]) // 2)
+    bounds.append(len(audio))
+    return bounds
+
+
+_chunk_model = None
+
+
+def _init_chunk_worker(model_size: str, cpu_threads: int):
+    """청크 인식 프로세스마다 모델을 한 번 로드"""
+    global _chunk_model
+    _chunk_model = WhisperModel(model_size, device="cpu", compute_type="int8", cpu_threads=cpu_threads)
+
+
+def _transcribe_chunk(audio, offset_sec: float, lo_sec: float, hi_sec: float) -> list[dict]:
+    """
+    (청크 프로세스) 청크 인식 후 전체 오디오 기준 시각으로 변환
+    문맥 여유 구간과 겹치는 단어는 중심 시각이 [lo_sec, hi_sec)인 것만 이 청크 몫으로 남김
+    """
+    segments, _ = _chunk_model.transcribe(audio, word_timestamps=True, language="ko")
+    words = []
+    for segment in segments:
+        for word in segment.words:
+            start, end = word.start + offset_sec, word.end + offset_sec
+            if lo_sec <= (start + end) / 2 < hi_sec:
+                words.append({
+                    "word": word.word.strip(),
+                    "start": start,
+                    "end": end,
+                    "probability": word.probability
+                })
+    return words
+
+
+def make_chunk_pool(model_size: str, processes: int, cpu_threads: int = 0):
+    """청크 병렬 인식용 프로세스 풀 (프로세스마다 모델 1개, spawn으로 부모의 모델 상태와 분리)"""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    print(f"🎤 청크 인식 프로세스 {processes}개 시작 (모델: {model_size}, cpu_threads={cpu_threads or '기본값'})")
+    return ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_chunk_worker,
+        initargs=(model_size, cpu_threads),
+    )
+
+
+def transcribe_words_chunked(audio, pool, chunk_sec: float = 60.0) -> list[dict]:
+    """
+    오디오를 무음 지점에서 청크로 나눠 프로세스 풀에서 병렬 인식 후 시각 순서대로 이어 붙임
+    audio: 오디오 파일 경로 또는 16 kHz mono float32 배열
+    """
+    from faster_whisper.audio import decode_audio
+
+    sr = 16000
+    if isinstance(audio, str):
+        audio = decode_audio(audio, sampling_rate=sr)
+    bounds = split_on_silence(audio, chunk_sec, sr)
+    pad = int(CHUNK_PAD_SEC * sr)
+    print(f"🔍 음성 인식 중... ({len(bounds) - 1}개 청크, 평균 {len(audio) / sr / (len(bounds) - 1):.0f}초)")
+
+    futures = []
+    for lo, hi in zip(bounds, bounds[1:]):
+        start = max(0, lo - pad)
+        futures.append(pool.submit(_transcribe_chunk, audio[start:min(len(audio), hi + pad)], start / sr, lo / sr, hi / sr))
+
+    words = []
+    for fut in futures:
+        words.extend(fut.result())
+    return words
+
+
+def tokenize(text: str) -> list[str]:
+    """정렬용 토큰 (소문자, 한글/영어/숫자 단어)"""
+    return re.findall(r'\b\w+\b', text.lower())
+
+
+def token_score(a: str, b: str) -> int:
+    """토큰 유사도: 정확 일치 / 한쪽이 다른 쪽의 접두어(조사·어미 차이) / 불일치"""
+    if a == b:
+        return ALIGN_MATCH
+    if len(a) >= 2 and len(b) >= 2 and (a.startswith(b) or b.startswith(a)):
+        return ALIGN_SOFT
+    return ALIGN_MISMATCH
+
+
+def find_anchors(a: list[str], b: list[str], a0: int, a1: int, b0: int, b1: int) -> list[tuple[int, int]]:
+    """
+    구간 안에서 양쪽에 정확히 한 번씩 나오는 토큰 쌍을 앵커 후보로 잡고,
+    b 위치의 최장 증가 부분열(LIS)로 단조 증가하는 앵커만 남김 (patience diff 방식)
+    """
+    count_a, count_b, pos_b = {}, {}, {}
+    for i in range(a0, a1):
+        count_a[a[i]] = count_a.get(a[i], 0) + 1
+    for j in range(b0, b1):
+        count_b[b[j]] = count_b.get(b[j], 0) + 1
+        pos_b[b[j]] = j
+    pairs = [
+        (i, pos_b[a[i]]) for i in range(a0, a1)
+        if count_a[a[i]] == 1 and count_b.get(a[i]) == 1
+    ]
+    if not pairs:
+        return []
+
+    # LIS (O(k log k)), tails[k]: 길이 k+1 증가 부분열의 마지막 pairs 인덱스
+    import bisect
+    tails, tail_js, prev = [], [], [-1] * len(pairs)
+    for idx, (_, j) in enumerate(pairs):
+        k = bisect.bisect_left(tail_js, j)
+        if k > 0:
+            prev[idx] = tails[k - 1]
+        if k == len(tails):
+            tails.append(idx)
+            tail_js.append(j)
+        else:
+            tails[k] = idx
+            tail_js[k] = j
+    anchors = []
+    idx = tails[-1]
+    while idx >= 0:
+        anchors.append(pairs[idx])
+        idx = prev[idx]
+    return anchors[::-1]
+
+
+def banded_align(a: list[str], b: list[str], a0: int, a1: int, b0: int, b1: int, out: list):
+    """
+    a[a0:a1]과 b[b0:b1]을 대각선 주변 밴드 안에서 Needleman-Wunsch로 정렬
+    out[i] = (j, 점수) (불일치도 위치 힌트로 기록)
+    """
+    n, m = a1 - a0, b1 - b0
+    if n == 0 or m == 0:
+        return
+    w = abs(n - m) + ALIGN_BAND
+    neg = float("-inf")
+
+    def band(i):
+        c = i * m // n
+        return max(0, c - w), min(m, c + w)
+
+    los, traces = [0], [bytearray([2]) * (min(m, w) + 1)]
+    prev = [ALIGN_GAP * j for j in range(min(m, w) + 1)]
+    prev_lo = 0
+    for i in range(1, n + 1):
+        lo, hi = band(i)
+        cur = [neg] * (hi - lo + 1)
+        tr = bytearray(hi - lo + 1)
+        ai = a[a0 + i - 1]
+        prev_hi = prev_lo + len(prev) - 1
+        for j in range(lo, hi + 1):
+            k = j - lo
+            best, t = neg, 1
+            if prev_lo <= j <= prev_hi:  # 위: a 토큰 누락 (ASR 삭제)
+                best = prev[j - prev_lo] + ALIGN_GAP
+            if j > 0:
+                if prev_lo <= j - 1 <= prev_hi:  # 대각선: 일치/불일치
+                    v = prev[j - 1 - prev_lo] + token_score(ai, b[b0 + j - 1])
+                    if v > best:
+                        best, t = v, 0
+                if k > 0:  # 왼쪽: b 토큰 추가 (ASR 삽입)
+                    v = cur[k - 1] + ALIGN_GAP
+                    if v > best:
+                        best, t = v, 2
+            cur[k] = best
+            tr[k] = t
+        los.append(lo)
+        traces.append(tr)
+        prev, prev_lo = cur, lo
+
+    i, j = n, m
+    while i > 0 and j > 0:
+        t = traces[i][j - los[i]]
+        if t == 0:
+            out[a0 + i - 1] = (b0 + j - 1, token_score(a[a0 + i - 1], b[b0 + j - 1]))
+            i, j = i - 1, j - 1
+        elif t == 1:
+            i -= 1
+        else:
+            j -= 1
+
+
+def align_tokens(a: list[str], b: list[str]) -> list:
+    """
+    토큰열 a(본문)를 b(ASR)에 단조 정렬, out[i] = (b 인덱스, 점수) 또는 None
+
+    유일 토큰 앵커로 구간을 재귀 분할하고 작은 구간만 밴드 DP로 정렬하여 전체적으로 거의 선형 시간
+    """
+    out = [None] * len(a)
+
+    def solve(a0, a1, b0, b1, depth):
+        if a0 >= a1 or b0 >= b1:
+            return
+        if (a1 - a0) * (b1 - b0) <= ALIGN_DIRECT_CELLS or depth >= ALIGN_MAX_DEPTH:
+            banded_align(a, b, a0, a1, b0, b1, out)
+            return
+        anchors = find_anchors(a, b, a0, a1, b0, b1)
+        if not anchors:
+            banded_align(a, b, a0, a1, b0, b1, out)
+            return
+        pi, pj = a0, b0
+        for i, j in anchors:
+            solve(pi, i, pj, j, depth + 1)
+            out[i] = (j, ALIGN_MATCH)
+            pi, pj = i + 1, j + 1
+        solve(pi, a1, pj, b1, depth + 1)
+
+    solve(0, len(a), 0, len(b), 0)
+    return out
+
+
+def align_sentences(sentences: list[str], words: list[dict], bounds: tuple[float, float] | None = None) -> list[dict]:
+    """
+    문장과 단어 스트림을 토큰 단위로 정렬하여 문장별 타임스탬프와 신뢰도 생성
+
+    - 신뢰도: (정확 일치 + 0.5 × 접두 일치) / 문장 토큰 수
+    - 일치 토큰이 없는 문장은 불일치 정렬 위치를, 그것도 없으면 앞뒤 문장 사이 구간을 사용 (신뢰도 0)
+    - bounds: 부분 구간만 정렬할 때의 (시작, 끝) 시각, 정렬 실패 문장의 구간 기본값으로 사용
+    """
+    lo, hi = bounds if bounds is not None else (0.0, None)
+    print(f"🔗 문장 정렬 중... ({len(sentences)} 문장, {len(words)} 단어)")
+
+    # 본문 토큰 (문장 번호 포함) / ASR 토큰 (단어 번호 포함)
+    sent_tokens = [tokenize(sentence) for sentence in sentences]
+    a = [tok for toks in sent_tokens for tok in toks]
+    b, b_word = [], []
+    for wi, word in enumerate(words):
+        for tok in tokenize(word["word"]):
+            b.append(tok)
+            b_word.append(wi)
+
+    mapping = align_tokens(a, b)
+
+    spans = []
+    pos = 0
+    for toks in sent_tokens:
+        hits = [m for m in mapping[pos:pos + len(toks)] if m is not None]
+        pos += len(toks)
+        matched = [m for m in hits if m[1] > 0] or hits
+        if not matched:
+            spans.append(None)
+            continue
+        score = sum(1.0 if m[1] == ALIGN_MATCH else 0.5 if m[1] == ALIGN_SOFT else 0.0 for m in hits)
+        first, last = b_word[matched[0][0]], b_word[matched[-1][0]]
+        spans.append((words[first]["start"], words[last]["end"], score / len(toks)))
+
+    sentence_ts = []
+    for sent_idx, sentence in enumerate(sentences):
+        span = spans[sent_idx]
+        if span is None:
+            # 정렬 실패: 이전 문장 끝 ~ 다음 정렬 문장 시작 사이
+            prev_end = sentence_ts[-1]["end"] if sentence_ts else lo
+            next_start = next((sp[0] for sp in spans[sent_idx + 1:] if sp is not None), prev_end if hi is None else hi)
+            span = (prev_end, max(prev_end, next_start), 0.0)
+        start, end, confidence = span
+        sentence_ts.append({
+            "text": sentence,
+            "start": round(start, 3),
+            "end": round(max(start, end), 3),
+            "confidence": round(confidence, 3)
+        })
+
+    low = sum(1 for s in sentence_ts if s["confidence"] < 0.5)
+    print(f"  정렬 완료: 신뢰도 0.5 미만 {low}/{len(sentence_ts)} 문장")
+    return sentence_ts
+
+
+def align_sentences_greedy(sentences: list[str], words: list[dict]) -> list[dict]:
+    """(이전 방식) 문장과 단어 스트림을 그리디 매칭하여 문장별 타임스탬프 생성
+
+    첫 단어를 못 찾으면 끝까지 재탐색하여 O(문장 × 단어), 한 번 어긋나면 이후 문장이 모두 밀림
+    """
     print(f"🔗 문장 정렬 중... ({len(sentences)} 문장, {len(words)} 단어)")
     
     sentence_ts = []
@@ -157,13 +539,129 @@ def align_sentences(sentences: list[str], words: list[dict]) -> list[dict]:
     return sentence_ts
 
 
-def update_firestore(project_id: str, report_id: str, sentence_ts: list[dict]):
-    """Firestore에 sentenceTimestamps 업데이트"""
+class TranscriptStore:
+    """
+    단어 transcript와 리포트별 마지막 정렬 결과를 디스크에 저장 (본문만 수정된 리포트의 재실행에서 ASR 생략)
+
+    - transcripts/{sha[:2]}/{sha}-{model}.npz: 오디오 sha256 + 모델 크기 키, 열 단위 저장
+      (단어 UTF-8 바이트 + 오프셋, 시작/끝 ms int32, 확률 float16)
+    - alignments/{reportId}.json: {audioUrl, validators, audioSha256, model, aligner, sentenceTimestamps}
+    """
+
+    def __init__(self, root: str = TRANSCRIPT_CACHE_DIR):
+        self.root = root
+
+    def _transcript_path(self, audio_sha: str, model_size: str) -> str:
+        return os.path.join(self.root, "transcripts", audio_sha[:2], f"{audio_sha}-{model_size}.npz")
+
+    def _alignment_path(self, report_id: str) -> str:
+        return os.path.join(self.root, "alignments", f"{report_id}.json")
+
+    @staticmethod
+    def _replace(path: str, write):
+        """임시 파일에 쓰고 교체 (동시 실행 중에도 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록)"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def load_words(self, audio_sha: str, model_size: str) -> list[dict] | None:
+        import numpy as np
+
+        try:
+            with np.load(self._transcript_path(audio_sha, model_size)) as z:
+                text, offsets = z["text"].tobytes(), z["offsets"]
+                start, end, prob = z["start_ms"] / 1000, z["end_ms"] / 1000, z["probability"].astype(float)
+        except (OSError, KeyError, ValueError):
+            return None
+        return [
+            {
+                "word": text[offsets[i]:offsets[i + 1]].decode("utf-8"),
+                "start": float(start[i]),
+                "end": float(end[i]),
+                "probability": float(prob[i]),
+            }
+            for i in range(len(start))
+        ]
+
+    def save_words(self, audio_sha: str, model_size: str, words: list[dict]):
+        import numpy as np
+
+        encoded = [w["word"].encode("utf-8") for w in words]
+        columns = {
+            "text": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            "offsets": np.cumsum([0] + [len(e) for e in encoded], dtype=np.int64),
+            "start_ms": np.round(np.array([w["start"] for w in words], dtype=np.float64) * 1000).astype(np.int32),
+            "end_ms": np.round(np.array([w["end"] for w in words], dtype=np.float64) * 1000).astype(np.int32),
+            "probability": np.array([w["probability"] for w in words], dtype=np.float16),
+        }
+        self._replace(self._transcript_path(audio_sha, model_size), lambda f: np.savez_compressed(f, **columns))
+
+    def load_alignment(self, report_id: str) -> dict | None:
+        try:
+            with open(self._alignment_path(report_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save_alignment(self, report_id: str, record: dict):
+        data = json.dumps(record, ensure_ascii=False).encode("utf-8")
+        self._replace(self._alignment_path(report_id), lambda f: f.write(data))
+
+
+def realign_incremental(sentences: list[str], words: list[dict], previous: list[dict]) -> tuple[list[dict], int]:
+    """
+    이전 정렬 결과(previous)와 문장 단위 diff를 구해 바뀐 문장만 다시 정렬
+    바뀐 구간은 앞뒤의 변경 없는 문장(이전 end ~ 다음 start) 사이 단어에만 정렬하고, 변경 없는 문장은 결과 재사용
+    반환: (sentence_ts, 다시 정렬한 문장 수)
+    """
+    matcher = difflib.SequenceMatcher(a=[s["text"] for s in previous], b=sentences, autojunk=False)
+    sentence_ts: list[dict | None] = [None] * len(sentences)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            sentence_ts[j1:j2] = [dict(s) for s in previous[i1:i2]]
+
+    audio_end = words[-1]["end"] if words else 0.0
+    realigned = 0
+    j = 0
+    while j < len(sentences):
+        if sentence_ts[j] is not None:
+            j += 1
+            continue
+        k = j
+        while k < len(sentences) and sentence_ts[k] is None:
+            k += 1
+        lo = sentence_ts[j - 1]["end"] if j > 0 else 0.0
+        hi = sentence_ts[k]["start"] if k < len(sentences) else audio_end
+        window = [w for w in words if lo <= (w["start"] + w["end"]) / 2 <= hi]
+        sentence_ts[j:k] = align_sentences(sentences[j:k], window, bounds=(lo, max(lo, hi)))
+        realigned += k - j
+        j = k
+    return sentence_ts, realigned
+
+
+def get_firestore_client(project_id: str):
+    """프로젝트별 Firestore 클라이언트 (프로세스 내 재사용, FIRESTORE_EMULATOR_HOST 설정 시 에뮬레이터 사용)"""
     if not FIRESTORE_AVAILABLE:
         raise SystemExit("google-cloud-firestore가 필요합니다. pip install google-cloud-firestore")
-    
+    if not project_id:
+        raise SystemExit("--project-id가 필요합니다")
+    with _firestore_lock:
+        client = _firestore_clients.get(project_id)
+        if client is None:
+            client = _firestore_clients[project_id] = firestore.Client(project=project_id)
+        return client
+
+
+def update_firestore(project_id: str, report_id: str, sentence_ts: list[dict], client=None):
+    """Firestore에 sentenceTimestamps 업데이트 (단일 모드, 배치 모드는 ResultWriter 사용)"""
     print(f"📝 Firestore 업데이트 중: reports/{report_id}")
-    client = firestore.Client(project=project_id)
+    client = client or get_firestore_client(project_id)
     doc_ref = client.collection("reports").document(report_id)
     
     doc_ref.update({
@@ -173,94 +671,386 @@ def update_firestore(project_id: str, report_id: str, sentence_ts: list[dict]):
     print(f"✅ Firestore 업데이트 완료: {len(sentence_ts)} 문장")
 
 
+def fetch_content(client, report_id: str) -> str:
+    """Firestore reports/{id}에서 본문(content 또는 summary) 가져오기"""
+    snap = client.collection("reports").document(report_id).get()
+    return snapshot_content(snap, report_id)
+
+
+def snapshot_content(snap, report_id: str) -> str:
+    """문서 스냅샷에서 본문(content 또는 summary) 추출"""
+    if not snap.exists:
+        raise ValueError(f"Firestore 문서가 없습니다: reports/{report_id}")
+    
+    data = snap.to_dict()
+    content = data.get("content", "") or data.get("summary", "")
+    
+    if not content:
+        raise ValueError("문서에 content 또는 summary 필드가 없습니다")
+    return content
+
+
+def prefetch_contents(client, jobs: list[dict], batch_size: int = FIRESTORE_READ_BATCH) -> dict:
+    """
+    본문이 없는 job들의 content를 get_all로 batch_size개씩 한 번에 읽어 채움 (리포트마다 get 1회 대신)
+    반환: {reportId: 오류 메시지} (문서/본문이 없는 리포트)
+    """
+    pending = [job for job in jobs if not job.get("content") and not job.get("contentFile")]
+    errors = {}
+    reports = client.collection("reports")
+    for i in range(0, len(pending), batch_size):
+        batch = {job["reportId"]: job for job in pending[i:i + batch_size]}
+        refs = [reports.document(report_id) for report_id in batch]
+        # get_all은 요청 순서대로 돌려주지 않으므로 문서 ID로 매칭
+        for snap in client.get_all(refs, field_paths=["content", "summary"]):
+            try:
+                batch[snap.id]["content"] = snapshot_content(snap, snap.id)
+            except ValueError as e:
+                errors[snap.id] = str(e)
+    print(f"📚 본문 일괄 조회: {len(pending)}건 ({-(-len(pending) // batch_size)}회 요청), 실패 {len(errors)}건")
+    return errors
+
+
+class ResultWriter:
+    """
+    sentenceTimestamps를 BulkWriter로 묶어서 쓰기 (배치 모드)
+    - 초당 쓰기 수를 ops_per_sec에서 시작해 점진적으로 올림 (Firestore 500/50/5 규칙)
+    - 실패한 쓰기는 지수 백오프로 max_attempts까지 재시도, 최종 실패는 failures에 기록
+    """
+
+    def __init__(self, client, ops_per_sec: int = FIRESTORE_WRITE_OPS_PER_SEC,
+                 max_attempts: int = FIRESTORE_WRITE_MAX_ATTEMPTS):
+        self.reports = client.collection("reports")
+        self.max_attempts = max_attempts
+        self.written = 0
+        self.failures: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._writer = client.bulk_writer(options=BulkWriterOptions(
+            initial_ops_per_second=ops_per_sec,
+            max_ops_per_second=ops_per_sec * 10,
+            mode=SendMode.parallel,
+            retry=BulkRetry.exponential,
+        ))
+        self._writer.on_write_result(self._on_result)
+        self._writer.on_write_error(self._on_error)
+
+    def _on_result(self, reference, result, bulk_writer):
+        with self._lock:
+            self.written += 1
+
+    def _on_error(self, error, bulk_writer) -> bool:
+        """True를 돌려주면 BulkWriter가 백오프 후 재시도"""
+        if error.attempts < self.max_attempts:
+            return True
+        with self._lock:
+            self.failures[error.operation.reference.id] = f"Firestore 쓰기 실패 ({error.code}): {error.message}"
+        return False
+
+    def update(self, report_id: str, sentence_ts: list[dict]):
+        with self._lock:
+            self._writer.update(self.reports.document(report_id), {"sentenceTimestamps": sentence_ts})
+
+    def close(self):
+        """남은 쓰기를 모두 보내고 완료될 때까지 대기"""
+        self._writer.close()
+        print(f"✅ Firestore 일괄 업데이트: 성공 {self.written}, 실패 {len(self.failures)}")
+
+
+def run_asr(audio, model, args, chunk_pool=None) -> list[dict]:
+    """단어 타임스탬프 추출 (chunk_pool이 있으면 청크 병렬 인식)"""
+    if chunk_pool is not None:
+        return transcribe_words_chunked(audio, chunk_pool, args.chunk_sec)
+    return transcribe_words(audio, model=model, progress=args.workers <= 1)
+
+
+def cached_words(url: str, model, args, store: TranscriptStore, previous: dict | None, chunk_pool=None):
+    """
+    transcript 캐시를 거쳐 단어 타임스탬프 가져오기
+    - 이전 실행과 같은 URL이면 ETag / Last-Modified 조건부 요청으로 변경 여부 확인 (304면 다운로드도 생략)
+    - 다운로드한 오디오의 sha256 + 모델 크기로 저장된 transcript가 있으면 디코딩/ASR 생략
+    반환: (words, audio_sha256, validators)
+    """
+    validators = previous.get("validators") if previous and previous.get("audioUrl") == url else None
+    download = download_audio(url, args.spool_max_mb, validators)
+    if download is None:
+        words = store.load_words(previous["audioSha256"], args.model)
+        if words is not None:
+            print(f"♻️  오디오 변경 없음 (304), 저장된 transcript 사용: {len(words)} 단어")
+            return words, previous["audioSha256"], validators
+        download = download_audio(url, args.spool_max_mb)
+
+    buf, audio_sha, validators = download
+    with buf:
+        words = store.load_words(audio_sha, args.model)
+        if words is not None:
+            print(f"♻️  저장된 transcript 사용 ({audio_sha[:12]}): {len(words)} 단어")
+            return words, audio_sha, validators
+        audio = decode_buffer(buf)
+    words = run_asr(audio, model, args, chunk_pool)
+    store.save_words(audio_sha, args.model, words)
+    return words, audio_sha, validators
+
+
+def process_report(job: dict, model, args, client=None, chunk_pool=None, writer=None, store=None) -> dict:
+    """
+    리포트 하나 처리: 본문 → 문장 분할 → 오디오 다운로드/디코딩 → ASR → 정렬 → (Firestore 반영)
+
+    job: {"reportId", "audioUrl", "content" 또는 "contentFile"(선택, 없으면 Firestore에서 가져옴)}
+    chunk_pool: 있으면 model 대신 청크 병렬 인식 사용
+    writer: 있으면 Firestore 업데이트를 ResultWriter에 넘겨 일괄 쓰기
+    store: 있으면 transcript를 재사용하고, 오디오가 같으면 바뀐 문장만 다시 정렬
+    """
+    report_id = job["reportId"]
+
+    # 본문 가져오기
+    if job.get("content"):
+        content = job["content"]
+    elif job.get("contentFile"):
+        with open(job["contentFile"], "r", encoding="utf-8") as f:
+            content = f.read()
+    elif client is not None:
+        content = fetch_content(client, report_id)
+    else:
+        raise ValueError(f"본문이 없습니다 (content / contentFile / --pull-firestore): {report_id}")
+
+    # 문장 분할
+    sentences = split_sentences(content)
+    print(f"📄 [{report_id}] 문장 수: {len(sentences)}")
+    aligner = align_sentences_greedy if args.aligner == "greedy" else align_sentences
+
+    if store is None:
+        # 오디오 다운로드 + 디코딩 (16 kHz float32 배열) → ASR
+        audio = fetch_audio(job["audioUrl"], args.spool_max_mb)
+        words = run_asr(audio, model, args, chunk_pool)
+        del audio
+        print(f"✅ [{report_id}] 단어 수: {len(words)}")
+        sentence_ts = aligner(sentences, words)
+    else:
+        previous = store.load_alignment(report_id)
+        words, audio_sha, validators = cached_words(job["audioUrl"], model, args, store, previous, chunk_pool)
+        print(f"✅ [{report_id}] 단어 수: {len(words)}")
+
+        # 같은 오디오/모델을 DP 정렬한 이전 결과가 있으면 바뀐 문장만 다시 정렬
+        if (
+            previous and args.aligner == "dp" and previous.get("aligner") == "dp"
+            and previous.get("audioSha256") == audio_sha and previous.get("model") == args.model
+        ):
+            sentence_ts, realigned = realign_incremental(sentences, words, previous["sentenceTimestamps"])
+            print(f"🔁 [{report_id}] 증분 재정렬: {realigned}/{len(sentences)} 문장")
+        else:
+            sentence_ts = aligner(sentences, words)
+        store.save_alignment(report_id, {
+            "audioUrl": job["audioUrl"], "validators": validators, "audioSha256": audio_sha,
+            "model": args.model, "aligner": args.aligner, "sentenceTimestamps": sentence_ts,
+        })
+
+    # Firestore 반영
+    if writer is not None:
+        writer.update(report_id, sentence_ts)
+    elif args.update_firestore:
+        update_firestore(args.project_id, report_id, sentence_ts, client=client)
+
+    return {
+        "reportId": report_id,
+        "sentenceTimestamps": sentence_ts
+    }
+
+
+def load_manifest(path: str) -> list[dict]:
+    """JSONL 매니페스트 읽기 (한 줄에 {"reportId", "audioUrl", "content" | "contentFile"})"""
+    jobs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            job = json.loads(line)
+            if not job.get("reportId") or not job.get("audioUrl"):
+                raise SystemExit(f"매니페스트 {line_no}행: reportId와 audioUrl이 필요합니다")
+            jobs.append(job)
+    return jobs
+
+
+def query_manifest(client, limit: int, only_missing: bool) -> list[dict]:
+    """Firestore에서 audioUrl이 있는 리포트 목록 조회 (only_missing이면 sentenceTimestamps 없는 것만)"""
+    jobs = []
+    query = client.collection("reports").where("audioUrl", ">", "")
+    for snap in query.stream():
+        data = snap.to_dict()
+        if only_missing and data.get("sentenceTimestamps"):
+            continue
+        content = data.get("content", "") or data.get("summary", "")
+        if not content:
+            continue
+        jobs.append({"reportId": snap.id, "audioUrl": data["audioUrl"], "content": content})
+        if limit and len(jobs) >= limit:
+            break
+    return jobs
+
+
+def run_batch(args):
+    """배치 모드: 모델 1회 로드, --workers개 스레드로 병렬 처리, 끝나는 순서대로 JSONL 기록"""
+    client = None
+    if args.manifest_firestore or args.pull_firestore or args.update_firestore:
+        client = get_firestore_client(args.project_id)
+
+    if args.manifest:
+        jobs = load_manifest(args.manifest)
+    else:
+        jobs = query_manifest(client, args.limit, args.only_missing)
+    if args.limit:
+        jobs = jobs[:args.limit]
+    print(f"📋 배치 리포트 수: {len(jobs)} (workers={args.workers}, cpu_threads={args.cpu_threads})")
+
+    # 본문 일괄 조회 (문서/본문이 없는 리포트는 바로 실패 처리)
+    fetch_errors = {}
+    if args.pull_firestore:
+        fetch_errors = prefetch_contents(client, jobs, args.firestore_read_batch)
+    writer = None
+    if args.update_firestore:
+        writer = ResultWriter(client, args.firestore_write_ops, args.firestore_write_attempts)
+
+    store = None if args.no_transcript_cache else TranscriptStore(args.transcript_cache)
+    model = chunk_pool = None
+    if args.parallel_chunks > 1:
+        chunk_pool = make_chunk_pool(args.model, args.parallel_chunks, args.cpu_threads)
+    else:
+        model = LazyWhisperModel(args.model, cpu_threads=args.cpu_threads, num_workers=args.workers)
+
+    t0 = time.time()
+    ok = failed = 0
+    with open(args.out_jsonl, "a", encoding="utf-8") as out, ThreadPoolExecutor(args.workers) as ex:
+
+        def write_error(report_id: str, error: str):
+            out.write(json.dumps({"reportId": report_id, "status": "error", "error": error}, ensure_ascii=False) + "\n")
+            out.flush()
+            print(f"❌ [{report_id}] 실패: {error}")
+
+        for report_id, error in fetch_errors.items():
+            write_error(report_id, error)
+        failed += len(fetch_errors)
+        jobs = [job for job in jobs if job["reportId"] not in fetch_errors]
+
+        futures = {ex.submit(process_report, job, model, args, client, chunk_pool, writer, store): job for job in jobs}
+        for fut in as_completed(futures):
+            job = futures[fut]
+            try:
+                record = {**fut.result(), "status": "ok"}
+                ok += 1
+            except Exception as e:
+                write_error(job["reportId"], str(e))
+                failed += 1
+                continue
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+
+        # 남은 Firestore 쓰기 완료 대기, 최종 실패한 리포트는 오류 레코드를 추가로 기록
+        if writer is not None:
+            writer.close()
+            for report_id, error in writer.failures.items():
+                write_error(report_id, error)
+            ok -= len(writer.failures)
+            failed += len(writer.failures)
+
+    if chunk_pool is not None:
+        chunk_pool.shutdown()
+    elapsed = time.time() - t0
+    rate = (ok + failed) / elapsed * 3600 if elapsed > 0 else 0.0
+    print(f"\n✅ 배치 완료: 성공 {ok}, 실패 {failed}, {elapsed:.1f}초 ({rate:.1f} reports/hour)")
+    print(f"✅ 결과 저장: {args.out_jsonl}")
+    if failed:
+        sys.exit(1)
+
+
 def main():
     ap = argparse.ArgumentParser(description="Step 35: Forced Alignment - 문장 정밀 싱크")
-    ap.add_argument("--report-id", required=True, help="리포트 문서 ID")
-    ap.add_argument("--audio-url", required=True, help="오디오 파일 URL")
+    ap.add_argument("--report-id", help="리포트 문서 ID (단일 모드 필수)")
+    ap.add_argument("--audio-url", help="오디오 파일 URL (단일 모드 필수)")
     ap.add_argument("--content-file", help="리포트 본문 파일 경로 (--pull-firestore 미사용 시 필수)")
     ap.add_argument("--pull-firestore", action="store_true", help="Firestore에서 본문 가져오기")
     ap.add_argument("--project-id", help="Firebase 프로젝트 ID (--pull-firestore 또는 --update-firestore 사용 시 필수)")
     ap.add_argument("--update-firestore", action="store_true", help="결과를 Firestore에 업데이트")
     ap.add_argument("--out-json", default="alignment_result.json", help="출력 JSON 파일 경로")
+    ap.add_argument("--spool-max-mb", type=float, default=AUDIO_SPOOL_MAX_MB,
+                    help="다운로드 본문을 메모리에 두는 최대 크기 MB (넘으면 디스크 임시 파일)")
+    ap.add_argument("--aligner", default="dp", choices=["dp", "greedy"],
+                    help="문장 정렬 방식 (dp: 앵커 + 밴드 DP, greedy: 이전 방식)")
     ap.add_argument("--model", default="base", choices=["tiny", "base", "small", "medium", "large"], 
                     help="Whisper 모델 크기 (기본: base)")
+    # 배치 모드
+    ap.add_argument("--manifest", help="배치 모드: JSONL 매니페스트 ({reportId, audioUrl, content|contentFile})")
+    ap.add_argument("--manifest-firestore", action="store_true",
+                    help="배치 모드: Firestore에서 audioUrl이 있는 리포트를 조회")
+    ap.add_argument("--only-missing", action="store_true", help="--manifest-firestore: sentenceTimestamps 없는 리포트만")
+    ap.add_argument("--limit", type=int, default=0, help="배치 최대 리포트 수 (0: 제한 없음)")
+    ap.add_argument("--workers", type=int, default=1, help="배치 병렬 처리 수 (모델 1개 공유)")
+    ap.add_argument("--cpu-threads", type=int, default=0, help="워커당 Whisper 연산 스레드 수 (0: 기본값)")
+    # 청크 병렬 인식
+    ap.add_argument("--parallel-chunks", type=int, default=0,
+                    help="무음 지점에서 나눈 청크를 N개 프로세스로 병렬 인식 (0/1: 사용 안 함)")
+    ap.add_argument("--chunk-sec", type=float, default=60.0, help="청크 목표 길이 (초)")
+    ap.add_argument("--out-jsonl", default="alignment_results.jsonl", help="배치 결과 JSONL (끝나는 순서대로 추가)")
+    # transcript 캐시 / 증분 재정렬
+    ap.add_argument("--transcript-cache", default=TRANSCRIPT_CACHE_DIR,
+                    help="단어 transcript와 마지막 정렬 결과 저장 위치 (오디오가 같으면 ASR 생략, 바뀐 문장만 재정렬)")
+    ap.add_argument("--no-transcript-cache", action="store_true", help="transcript 캐시 / 증분 재정렬 사용 안 함")
+    # Firestore 일괄 읽기/쓰기 (배치 모드)
+    ap.add_argument("--firestore-read-batch", type=int, default=FIRESTORE_READ_BATCH,
+                    help="--pull-firestore: get_all 1회당 문서 수")
+    ap.add_argument("--firestore-write-ops", type=int, default=FIRESTORE_WRITE_OPS_PER_SEC,
+                    help="--update-firestore: BulkWriter 시작 초당 쓰기 수 (최대 10배까지 점진 증가)")
+    ap.add_argument("--firestore-write-attempts", type=int, default=FIRESTORE_WRITE_MAX_ATTEMPTS,
+                    help="--update-firestore: 쓰기당 최대 시도 횟수 (지수 백오프)")
     
     args = ap.parse_args()
 
+    if args.manifest or args.manifest_firestore:
+        run_batch(args)
+        return
+
+    if not args.report_id or not args.audio_url:
+        raise SystemExit("--report-id와 --audio-url이 필요합니다 (또는 --manifest 배치 모드)")
+
     # 본문 가져오기
+    client = None
     if args.pull_firestore:
-        if not FIRESTORE_AVAILABLE:
-            raise SystemExit("google-cloud-firestore가 필요합니다. pip install google-cloud-firestore")
-        
-        if not args.project_id:
-            raise SystemExit("--project-id가 필요합니다")
-        
-        client = firestore.Client(project=args.project_id)
-        snap = client.collection("reports").document(args.report_id).get()
-        
-        if not snap.exists:
-            raise SystemExit(f"Firestore 문서가 없습니다: reports/{args.report_id}")
-        
-        content = snap.to_dict().get("content", "") or snap.to_dict().get("summary", "")
-        
-        if not content:
-            raise SystemExit("문서에 content 또는 summary 필드가 없습니다")
+        client = get_firestore_client(args.project_id)
     else:
         if not args.content_file or not os.path.exists(args.content_file):
             raise SystemExit(f"--content-file 경로가 유효하지 않습니다: {args.content_file}")
-        
-        with open(args.content_file, "r", encoding="utf-8") as f:
-            content = f.read()
-
-    # 문장 분할
-    sentences = split_sentences(content)
-    print(f"📄 문장 수: {len(sentences)}")
 
-    # 오디오 다운로드 및 변환
-    os.makedirs("./.tmp", exist_ok=True)
-    audio_path = download_audio(args.audio_url, f"./.tmp/{args.report_id}.mp3")
-    wav_path = ensure_wav(audio_path)
+    if args.update_firestore and not args.project_id:
+        raise SystemExit("--project-id가 필요합니다")
 
-    # ASR (단어 타임스탬프)
-    print("🎤 Whisper 추출 중...")
-    words = transcribe_words(wav_path, model_size=args.model)
-    print(f"✅ 단어 수: {len(words)}")
+    job = {"reportId": args.report_id, "audioUrl": args.audio_url}
+    if not args.pull_firestore:
+        job["contentFile"] = args.content_file
 
-    # 문장 정렬
-    sentence_ts = align_sentences(sentences, words)
+    store = None if args.no_transcript_cache else TranscriptStore(args.transcript_cache)
+    chunk_pool = None
+    if args.parallel_chunks > 1:
+        chunk_pool = make_chunk_pool(args.model, args.parallel_chunks, args.cpu_threads)
+        model = None
+    else:
+        model = LazyWhisperModel(args.model, cpu_threads=args.cpu_threads)
+    try:
+        out = process_report(job, model, args, client, chunk_pool, store=store)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    finally:
+        if chunk_pool is not None:
+            chunk_pool.shutdown()
+    sentence_ts = out["sentenceTimestamps"]
     
     print("\n📊 정렬 결과 (상위 5개):")
     for i, s in enumerate(sentence_ts[:5]):
         print(f"  {i+1:03d}: {s['start']:.2f}~{s['end']:.2f}s | {s['text'][:80]}")
 
     # 저장
-    out = {
-        "reportId": args.report_id,
-        "sentenceTimestamps": sentence_ts
-    }
-    
     with open(args.out_json, "w", encoding="utf-8") as f:
         json.dump(out, f, ensure_ascii=False, indent=2)
     print(f"\n✅ 정렬 결과 저장: {args.out_json}")
 
-    # Firestore 반영
-    if args.update_firestore:
-        if not args.project_id:
-            raise SystemExit("--project-id가 필요합니다")
-        
-        update_firestore(args.project_id, args.report_id, sentence_ts)
-
-    # 임시 파일 정리
-    try:
-        if os.path.exists(wav_path) and wav_path != audio_path:
-            os.remove(wav_path)
-        if os.path.exists(audio_path):
-            os.remove(audio_path)
-        print("🧹 임시 파일 정리 완료")
-    except Exception as e:
-        print(f"⚠️ 임시 파일 정리 실패: {e}")
-
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,80 @@
+-- Step 45: 팀별 분/시간 롤업 테이블 생성 (step45_stream --rollup_table)
+
+-- 롤업 테이블 생성
+-- 조기 발화 트리거(누적 모드)로 같은 윈도우가 여러 번 기록됨: pane_index가 가장 큰 행이 최신 값
+CREATE TABLE IF NOT EXISTS `yago_reports.quality_rollup` (
+  team_id        STRING    NOT NULL,
+  granularity    STRING    NOT NULL,  -- "minute" / "hour"
+  window_start   TIMESTAMP NOT NULL,
+  window_end     TIMESTAMP NOT NULL,
+  pane_timing    STRING,              -- "EARLY" / "ON_TIME" / "LATE"
+  pane_index     INT64,
+  count          INT64     NOT NULL,
+  score_mean     FLOAT64,
+  score_min      FLOAT64,
+  score_max      FLOAT64,
+  score_p50      FLOAT64,
+  score_p90      FLOAT64,
+  score_p99      FLOAT64,
+  coverage_mean  FLOAT64,
+  coverage_min   FLOAT64,
+  coverage_max   FLOAT64,
+  coverage_p50   FLOAT64,
+  coverage_p90   FLOAT64,
+  coverage_p99   FLOAT64,
+  gaps_sum       INT64,
+  overlaps_sum   INT64,
+  avg_dur_mean   FLOAT64,
+  score_hist     ARRAY<STRUCT<bin INT64, n INT64>>,  -- [0, 1]을 100구간으로 나눈 히스토그램 (분위수 스케치, 빈 구간 생략)
+  coverage_hist  ARRAY<STRUCT<bin INT64, n INT64>>,
+  emitted_ts     TIMESTAMP
+) PARTITION BY DATE(window_start)
+CLUSTER BY team_id, granularity
+OPTIONS(
+  description="팀별 분/시간 품질 롤업 (스트리밍 조기 발화)"
+);
+
+-- 뷰 생성 (윈도우별 최신 페인만)
+CREATE OR REPLACE VIEW `yago_reports.quality_rollup_latest` AS
+SELECT * EXCEPT(rn)
+FROM (
+  SELECT
+    *,
+    ROW_NUMBER() OVER (PARTITION BY team_id, granularity, window_start ORDER BY pane_index DESC) AS rn
+  FROM `yago_reports.quality_rollup`
+)
+WHERE rn = 1;
+
+-- 뷰 생성 (팀별 일 집계, quality_stream_team_summary와 같은 열을 시간 롤업에서 계산)
+-- 원본 행 대신 팀당 하루 최대 24행만 읽음
+CREATE OR REPLACE VIEW `yago_reports.quality_rollup_team_summary` AS
+SELECT
+  team_id,
+  DATE(window_start) as date,
+  SUM(count) as count,
+  SUM(score_mean * count) / SUM(count) as avg_score,
+  SUM(coverage_mean * count) / SUM(count) as avg_coverage,
+  SUM(gaps_sum) as total_gaps,
+  SUM(overlaps_sum) as total_overlaps,
+  SUM(avg_dur_mean * count) / SUM(count) as avg_duration
+FROM `yago_reports.quality_rollup_latest`
+WHERE granularity = 'hour'
+  AND window_start >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 7 DAY)
+GROUP BY team_id, DATE(window_start)
+ORDER BY team_id, date DESC;
+
+-- 예: 팀별 일 단위 p90 점수 (시간 히스토그램을 구간별로 합친 뒤 분위수 계산)
+-- WITH daily AS (
+--   SELECT team_id, DATE(window_start) AS date, h.bin AS i, SUM(h.n) AS n
+--   FROM `yago_reports.quality_rollup_latest`, UNNEST(score_hist) AS h
+--   WHERE granularity = 'hour'
+--   GROUP BY team_id, date, i
+-- )
+-- SELECT team_id, date,
+--   MIN(IF(cum >= 0.9 * total, (i + 1) / 100, NULL)) AS score_p90
+-- FROM (
+--   SELECT *, SUM(n) OVER (PARTITION BY team_id, date ORDER BY i) AS cum,
+--          SUM(n) OVER (PARTITION BY team_id, date) AS total
+--   FROM daily
+-- )
+-- GROUP BY team_id, date;
@@ -13,11 +13,11 @@ echo "Region: $REGION"
 
 # 1. Cloud Run 서비스 배포
 echo "📦 Cloud Run 서비스 배포 중..."
-cd step47-audio-features
 
-# Docker 이미지 빌드
+# Docker 이미지 빌드 (저장소 루트 컨텍스트: 공통 모듈 service-common/service_common.py를 함께 복사)
 echo "🔨 Docker 이미지 빌드 중..."
-gcloud builds submit --tag gcr.io/$PROJECT_ID/step47-audio-features:latest
+gcloud builds submit --config step47-audio-features/cloudbuild.yaml --ignore-file service-common/.gcloudignore \
+  --substitutions _IMAGE=gcr.io/$PROJECT_ID/step47-audio-features:latest .
 
 # Cloud Run에 배포
 echo "🚀 Cloud Run에 배포 중..."
@@ -38,8 +38,6 @@ SERVICE_URL=$(gcloud run services describe step47-audio-features \
 
 echo "✅ Cloud Run 서비스 배포 완료: $SERVICE_URL"
 
-cd ..
-
 # 2. Functions 환경 변수 설정
 echo "⚙️ Functions 환경 변수 설정 중..."
 echo "AUDIO_FEATURES_URL=$SERVICE_URL/analyze"
@@ -0,0 +1,700 @@
+"""
+Step35_ForcedAlignment 단위 테스트 (모델/네트워크/Firestore 없이)
+
+실행 (scripts 디렉터리에서):
+    cd scripts && python -m pytest -q test_Step35_ForcedAlignment.py
+"""
+
+import hashlib
+import io
+import random
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import Step35_ForcedAlignment as fa
+
+
+def make_words(tokens: list[str], step: float = 0.5) -> list[dict]:
+    """토큰마다 step초 간격의 ASR 단어 (길이 0.4초)"""
+    return [{"word": f" {t}", "start": i * step, "end": i * step + 0.4} for i, t in enumerate(tokens)]
+
+
+def vocab(n: int, prefix: str = "w") -> list[str]:
+    return [f"{prefix}{i}" for i in range(n)]
+
+
+# ----- find_anchors -----
+
+def test_find_anchors_keeps_unique_monotonic_pairs():
+    a = ["x", "a", "b", "c", "x", "d"]
+    b = ["a", "c", "b", "x", "d"]
+    # x는 a에 두 번 나와 제외, b/c는 순서가 뒤바뀌어 LIS로 하나만 남음
+    anchors = fa.find_anchors(a, b, 0, len(a), 0, len(b))
+    assert anchors in ([(1, 0), (2, 2), (5, 4)], [(1, 0), (3, 1), (5, 4)])
+    assert all(i1 < i2 and j1 < j2 for (i1, j1), (i2, j2) in zip(anchors, anchors[1:]))
+
+
+def test_find_anchors_respects_range_and_no_common_tokens():
+    a = ["a", "b", "c", "d"]
+    b = ["a", "b", "c", "d"]
+    assert fa.find_anchors(a, b, 1, 3, 1, 3) == [(1, 1), (2, 2)]
+    assert fa.find_anchors(["a", "b"], ["c", "d"], 0, 2, 0, 2) == []
+
+
+# ----- banded_align -----
+
+def test_banded_align_exact_match():
+    a = vocab(30)
+    out = [None] * len(a)
+    fa.banded_align(a, a, 0, len(a), 0, len(a), out)
+    assert out == [(i, fa.ALIGN_MATCH) for i in range(len(a))]
+
+
+def test_banded_align_writes_only_its_range():
+    a = vocab(10)
+    out = [None] * len(a)
+    fa.banded_align(a, a, 3, 7, 3, 7, out)
+    assert out[:3] == [None] * 3 and out[7:] == [None] * 3
+    assert out[3:7] == [(i, fa.ALIGN_MATCH) for i in range(3, 7)]
+    fa.banded_align(a, a, 3, 3, 0, 10, out)  # 빈 구간은 아무것도 하지 않음
+
+
+# ----- align_tokens -----
+
+def test_align_tokens_exact_match():
+    a = vocab(500)
+    assert fa.align_tokens(a, a) == [(i, fa.ALIGN_MATCH) for i in range(len(a))]
+
+
+def test_align_tokens_insertion():
+    a = vocab(100)
+    b = a[:40] + ["uh", "um", "uh"] + a[40:]  # ASR에만 있는 토큰
+    out = fa.align_tokens(a, b)
+    assert out[:40] == [(i, fa.ALIGN_MATCH) for i in range(40)]
+    assert out[40:] == [(i + 3, fa.ALIGN_MATCH) for i in range(40, 100)]
+
+
+def test_align_tokens_deletion():
+    a = vocab(100)
+    b = a[:40] + a[45:]  # ASR이 놓친 토큰 5개
+    out = fa.align_tokens(a, b)
+    assert out[40:45] == [None] * 5
+    assert out[:40] == [(i, fa.ALIGN_MATCH) for i in range(40)]
+    assert out[45:] == [(i - 5, fa.ALIGN_MATCH) for i in range(45, 100)]
+
+
+def test_align_tokens_substitution_and_soft_match():
+    a = vocab(60)
+    b = list(a)
+    b[10] = "zzz"  # 오인식: 불일치도 위치 힌트로 기록
+    a[20], b[20] = "학교에서", "학교"  # 조사 차이: 접두 일치
+    out = fa.align_tokens(a, b)
+    assert out[10] == (10, fa.ALIGN_MISMATCH)
+    assert out[20] == (20, fa.ALIGN_SOFT)
+    assert all(out[i] == (i, fa.ALIGN_MATCH) for i in range(60) if i not in (10, 20))
+
+
+def test_align_tokens_long_dropout_outside_band():
+    """밴드 폭(ALIGN_BAND)보다 훨씬 긴 누락도 앵커로 나눈 뒤 정렬"""
+    n, gap = 400, 10 * fa.ALIGN_BAND
+    a = vocab(n)
+    b = a[:150] + a[150 + gap:]
+    out = fa.align_tokens(a, b)
+    assert out[:150] == [(i, fa.ALIGN_MATCH) for i in range(150)]
+    assert out[150:150 + gap] == [None] * gap
+    assert out[150 + gap:] == [(i - gap, fa.ALIGN_MATCH) for i in range(150 + gap, n)]
+
+    # ASR 쪽에만 긴 구간(잡담 등)이 끼어든 경우
+    b = a[:200] + vocab(gap, "noise") + a[200:]
+    out = fa.align_tokens(a, b)
+    assert out == [(i if i < 200 else i + gap, fa.ALIGN_MATCH) for i in range(n)]
+
+
+def test_align_tokens_is_monotonic_with_noise():
+    rng = random.Random(36)
+    a = [rng.choice(vocab(40)) for _ in range(800)]  # 반복 토큰이 많아 앵커가 적음
+    b = [t for t in a if rng.random() > 0.1]
+    for _ in range(50):
+        b.insert(rng.randrange(len(b)), "noise")
+    out = fa.align_tokens(a, b)
+    js = [m[0] for m in out if m is not None]
+    assert js == sorted(js) and len(set(js)) == len(js)
+    assert all(0 <= j < len(b) for j in js)
+    assert sum(m is not None and m[1] == fa.ALIGN_MATCH for m in out) > 0.8 * len(a)
+
+
+def test_align_tokens_empty_inputs():
+    assert fa.align_tokens([], vocab(5)) == []
+    assert fa.align_tokens(vocab(5), []) == [None] * 5
+
+
+# ----- align_sentences -----
+
+def test_align_sentences_exact():
+    sentences = ["w0 w1 w2.", "w3 w4.", "w5 w6 w7 w8."]
+    words = make_words(vocab(9))
+    ts = fa.align_sentences(sentences, words)
+    assert [(s["start"], s["end"], s["confidence"]) for s in ts] == [
+        (0.0, 1.4, 1.0), (1.5, 2.4, 1.0), (2.5, 4.4, 1.0),
+    ]
+    assert [s["text"] for s in ts] == sentences
+
+
+def test_align_sentences_single_sentence():
+    ts = fa.align_sentences(["w0 w1 w2 w3"], make_words(["w0", "w1", "zz", "w3"]))
+    assert len(ts) == 1
+    assert ts[0]["start"] == 0.0 and ts[0]["end"] == 1.9
+    assert ts[0]["confidence"] == 0.75
+
+
+def test_align_sentences_empty_transcript():
+    sentences = ["w0 w1.", "w2 w3."]
+    ts = fa.align_sentences(sentences, [])
+    assert [(s["start"], s["end"], s["confidence"]) for s in ts] == [(0.0, 0.0, 0.0), (0.0, 0.0, 0.0)]
+
+    # bounds가 있으면 구간 안에서 대체
+    ts = fa.align_sentences(sentences, [], bounds=(10.0, 20.0))
+    assert ts[0]["start"] == 10.0 and ts[0]["end"] == 20.0
+    assert all(s["confidence"] == 0.0 for s in ts)
+
+
+def test_align_sentences_unmatched_sentence_falls_between_neighbours():
+    sentences = ["w0 w1.", "nothing here.", "w2 w3."]
+    ts = fa.align_sentences(sentences, make_words(vocab(4)))
+    assert ts[1]["confidence"] == 0.0
+    assert ts[0]["end"] <= ts[1]["start"] <= ts[1]["end"] <= ts[2]["start"]
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_align_sentences_monotonic_and_confidence_range(seed):
+    rng = random.Random(seed)
+    tokens = vocab(300)
+    sentences, i = [], 0
+    while i < len(tokens):
+        n = rng.randint(1, 12)
+        sentences.append(" ".join(tokens[i:i + n]) + ".")
+        i += n
+    # ASR: 누락 / 삽입 / 오인식 섞기
+    asr = []
+    for t in tokens:
+        r = rng.random()
+        if r < 0.05:
+            continue
+        asr.append("xx" if r < 0.1 else t)
+        if rng.random() < 0.05:
+            asr.append("noise")
+    ts = fa.align_sentences(sentences, make_words(asr))
+
+    assert len(ts) == len(sentences)
+    starts = [s["start"] for s in ts]
+    assert starts == sorted(starts)
+    assert all(s["start"] <= s["end"] for s in ts)
+    assert all(0.0 <= s["confidence"] <= 1.0 for s in ts)
+    assert sum(s["confidence"] for s in ts) / len(ts) > 0.7
+
+
+# ----- TranscriptStore -----
+
+def test_transcript_store_words_round_trip(tmp_path):
+    store = fa.TranscriptStore(str(tmp_path))
+    words = [
+        {"word": " 안녕하세요", "start": 0.0, "end": 0.4204, "probability": 0.91},
+        {"word": " w1,", "start": 0.5, "end": 1.2996, "probability": 0.5},
+        {"word": "", "start": 1.3, "end": 1.3, "probability": 0.0},
+    ]
+    assert store.load_words("ab" * 32, "base") is None
+    store.save_words("ab" * 32, "base", words)
+
+    loaded = store.load_words("ab" * 32, "base")
+    assert [w["word"] for w in loaded] == [w["word"] for w in words]
+    # 시각은 ms 단위로 반올림, 확률은 float16
+    assert [(w["start"], w["end"]) for w in loaded] == [(0.0, 0.42), (0.5, 1.3), (1.3, 1.3)]
+    assert [w["probability"] for w in loaded] == pytest.approx([0.91, 0.5, 0.0], abs=1e-3)
+    assert store.load_words("ab" * 32, "small") is None  # 모델 크기가 다르면 다른 키
+
+    store.save_words("cd" * 32, "base", [])
+    assert store.load_words("cd" * 32, "base") == []
+    assert list(tmp_path.rglob("*.tmp")) == []
+
+
+def test_transcript_store_ignores_corrupt_files(tmp_path):
+    store = fa.TranscriptStore(str(tmp_path))
+    path = Path(store._transcript_path("ef" * 32, "base"))
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b"not an npz")
+    assert store.load_words("ef" * 32, "base") is None
+
+    Path(store._alignment_path("r1")).parent.mkdir(parents=True)
+    Path(store._alignment_path("r1")).write_text("{", encoding="utf-8")
+    assert store.load_alignment("r1") is None
+    assert store.load_alignment("missing") is None
+
+
+def test_transcript_store_alignment_round_trip_and_failed_write(tmp_path):
+    store = fa.TranscriptStore(str(tmp_path))
+    record = {"audioUrl": "https://example.com/a.mp3", "audioSha256": "ab" * 32, "model": "base",
+              "sentenceTimestamps": [{"text": "첫 문장.", "start": 0.0, "end": 1.4, "confidence": 1.0}]}
+    store.save_alignment("r1", record)
+    assert store.load_alignment("r1") == record
+
+    def fail(f):
+        f.write(b"{partial")
+        raise OSError("disk full")
+
+    # 쓰기 실패 시 임시 파일을 지우고 기존 파일은 그대로
+    with pytest.raises(OSError):
+        store._replace(store._alignment_path("r1"), fail)
+    assert store.load_alignment("r1") == record
+    assert list(tmp_path.rglob("*.tmp")) == []
+
+
+# ----- realign_incremental -----
+
+SENTENCES = ["w0 w1 w2.", "w3 w4.", "w5 w6 w7.", "w8 w9.", "w10 w11 w12."]
+
+
+def incremental(sentences: list[str], previous_sentences: list[str] = SENTENCES):
+    words = make_words(vocab(13))
+    previous = fa.align_sentences(previous_sentences, words)
+    ts, realigned = fa.realign_incremental(sentences, words, previous)
+    return ts, realigned, previous, fa.align_sentences(sentences, words)
+
+
+def test_realign_incremental_unchanged():
+    ts, realigned, previous, _ = incremental(SENTENCES)
+    assert realigned == 0
+    assert ts == previous
+    assert all(a is not b for a, b in zip(ts, previous))  # 이전 결과를 복사해서 재사용
+
+
+@pytest.mark.parametrize("index", [0, 2, 4])  # 처음 / 가운데 / 끝 문장 수정
+def test_realign_incremental_edit(index):
+    previous_sentences = list(SENTENCES)
+    previous_sentences[index] = previous_sentences[index].replace("w", "x", 1)  # 오타가 있던 본문
+    ts, realigned, previous, full = incremental(SENTENCES, previous_sentences)
+
+    assert realigned == 1
+    assert previous[index]["confidence"] < 1.0
+    assert ts[index] == full[index] and ts[index]["confidence"] == 1.0
+    # 수정하지 않은 문장의 타임스탬프는 이전 결과 그대로
+    assert [s for i, s in enumerate(ts) if i != index] == [s for i, s in enumerate(previous) if i != index]
+
+
+@pytest.mark.parametrize("index", [0, 2, 4])
+def test_realign_incremental_insert(index):
+    previous_sentences = SENTENCES[:index] + SENTENCES[index + 1:]  # 본문에 없던 문장 추가
+    ts, realigned, previous, full = incremental(SENTENCES, previous_sentences)
+
+    assert realigned == 1
+    assert ts[index] == full[index]
+    assert ts[:index] + ts[index + 1:] == previous
+
+
+@pytest.mark.parametrize("index", [0, 2, 4])
+def test_realign_incremental_delete(index):
+    sentences = SENTENCES[:index] + SENTENCES[index + 1:]
+    ts, realigned, previous, _ = incremental(sentences)
+
+    assert realigned == 0
+    assert ts == previous[:index] + previous[index + 1:]
+
+
+def test_realign_incremental_uses_only_words_between_unchanged_neighbours():
+    sentences = list(SENTENCES)
+    sentences[2] = "w0 w1 w2."  # 앞 문장과 같은 토큰: 전체 정렬이면 앞쪽 단어에 맞지만 구간 밖
+    ts, realigned, previous, _ = incremental(sentences)
+
+    assert realigned == 1
+    assert ts[1]["end"] <= ts[2]["start"] <= ts[2]["end"] <= ts[3]["start"]
+    assert ts[2]["confidence"] == 0.0
+    assert [s for i, s in enumerate(ts) if i != 2] == [s for i, s in enumerate(previous) if i != 2]
+
+
+def test_realign_incremental_from_empty_previous():
+    ts, realigned, _, full = incremental(SENTENCES, [])
+    assert realigned == len(SENTENCES)
+    assert ts == full
+
+
+# ----- LazyWhisperModel -----
+
+class FakeWhisperModel:
+    def __init__(self, *args):
+        self.args = args
+
+    def transcribe(self, audio, **kwargs):
+        return audio, kwargs
+
+
+def test_lazy_whisper_model_loads_once_on_first_transcribe(monkeypatch):
+    loads = []
+
+    def load(*args):
+        loads.append(args)
+        return FakeWhisperModel(*args)
+
+    monkeypatch.setattr(fa, "load_whisper_model", load)
+    model = fa.LazyWhisperModel("small", cpu_threads=2, num_workers=4)
+    assert loads == []  # transcript 캐시만 쓰는 실행은 모델을 로드하지 않음
+
+    results = []
+    start = threading.Barrier(8)
+
+    def call(i):
+        start.wait()
+        results.append(model.transcribe(i, word_timestamps=True))
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert loads == [("small", 2, 4)]
+    assert sorted(results) == [(i, {"word_timestamps": True}) for i in range(8)]
+
+
+def test_lazy_whisper_model_retries_failed_load(monkeypatch):
+    calls = []
+
+    def load(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise RuntimeError("download failed")
+        return FakeWhisperModel(*args)
+
+    monkeypatch.setattr(fa, "load_whisper_model", load)
+    model = fa.LazyWhisperModel()
+    with pytest.raises(RuntimeError):
+        model.transcribe("a.wav")
+    assert model.transcribe("a.wav") == ("a.wav", {})
+    assert len(calls) == 2
+
+
+# ----- 청크 병렬 인식 (split_on_silence / _transcribe_chunk / transcribe_words_chunked / make_chunk_pool) -----
+
+SR = 16000
+
+
+@pytest.fixture
+def fake_vad(monkeypatch):
+    """Silero VAD 대신 주어진 발화 구간(초)을 샘플 단위로 돌려줌"""
+    import faster_whisper.vad
+
+    calls = []
+
+    def set_speech(segments_sec):
+        def get_speech_timestamps(audio, options, sampling_rate):
+            calls.append((options.min_silence_duration_ms, options.speech_pad_ms, sampling_rate))
+            return [{"start": int(a * SR), "end": int(b * SR)} for a, b in segments_sec]
+        monkeypatch.setattr(faster_whisper.vad, "get_speech_timestamps", get_speech_timestamps)
+
+    set_speech.calls = calls
+    return set_speech
+
+
+def test_split_on_silence_cuts_in_the_middle_of_silences(fake_vad):
+    fake_vad([(i * 10, i * 10 + 8) for i in range(5)])  # 8초 발화 + 2초 무음
+    audio = np.zeros(50 * SR, dtype=np.float32)
+    # 다음 발화까지 넣으면 25초를 넘는 지점: 18~20초, 38~40초 무음의 가운데
+    assert fa.split_on_silence(audio, 25.0) == [0, 19 * SR, 39 * SR, len(audio)]
+    assert fake_vad.calls == [(fa.CHUNK_MIN_SILENCE_MS, 0, SR)]
+    # chunk_sec가 발화 하나보다 짧으면 모든 무음에서 자름
+    assert fa.split_on_silence(audio, 5.0) == [0, 9 * SR, 19 * SR, 29 * SR, 39 * SR, len(audio)]
+
+
+def test_split_on_silence_without_cut_points(fake_vad):
+    audio = np.zeros(100 * SR, dtype=np.float32)
+    fake_vad([])
+    assert fa.split_on_silence(audio, 10.0) == [0, len(audio)]
+    fake_vad([(1, 95)])  # 무음 없이 긴 발화는 자르지 않음
+    assert fa.split_on_silence(audio, 10.0) == [0, len(audio)]
+
+
+class GridModel:
+    """
+    청크 오디오 값이 전체 오디오의 샘플 번호인 합성 입력에서, 0.5초마다 시작하는 0.3초 단어 중
+    청크 안에 완전히 들어가는 것을 청크 기준 시각으로 인식 (문맥 여유 구간의 단어도 인식됨)
+    """
+
+    def transcribe(self, audio, **kwargs):
+        assert kwargs == {"word_timestamps": True, "language": "ko"}
+        first, last = int(audio[0]), int(audio[-1]) + 1
+        words = []
+        for k in range(-(-first * 2 // SR), last * 2 // SR + 1):
+            start, end = k * 0.5, k * 0.5 + 0.3
+            if first / SR <= start and end <= last / SR:
+                words.append(SimpleNamespace(word=f" w{k}", start=start - first / SR, end=end - first / SR, probability=0.9))
+        return [SimpleNamespace(words=words)], None
+
+
+def test_transcribe_chunk_keeps_words_centred_in_its_range(monkeypatch):
+    monkeypatch.setattr(fa, "_chunk_model", GridModel())
+    audio = np.arange(int(9.5 * SR), int(20.5 * SR), dtype=np.float32)  # 청크 [10, 20) + 양쪽 여유 0.5초
+    words = fa._transcribe_chunk(audio, 9.5, 10.0, 20.0)
+    # w19: [9.5, 9.8] (여유 구간) 제외, w39: [19.5, 19.8] 중심 19.65 < 20 포함
+    assert [w["word"] for w in words] == [f"w{k}" for k in range(20, 40)]
+    assert words[0]["start"] == pytest.approx(10.0) and words[0]["end"] == pytest.approx(10.3)
+    assert all(w["probability"] == 0.9 for w in words)
+
+    # 중심 시각이 정확히 hi인 단어는 다음 청크 몫 (반열린 구간)
+    words = fa._transcribe_chunk(audio, 9.5, 10.0, 19.65)
+    assert words[-1]["word"] == "w38"
+
+
+def test_transcribe_words_chunked_merges_chunks_in_order(monkeypatch, fake_vad):
+    fake_vad([(i * 10, i * 10 + 8) for i in range(5)])
+    monkeypatch.setattr(fa, "_chunk_model", GridModel())
+    audio = np.arange(50 * SR, dtype=np.float32)
+    with ThreadPoolExecutor(3) as pool:
+        words = fa.transcribe_words_chunked(audio, pool, chunk_sec=25.0)
+
+    # 청크 경계(19초, 39초) 양쪽 여유 구간에서 두 번 인식된 단어도 한 번씩만, 시각 순서대로
+    full = fa._transcribe_chunk(audio, 0.0, 0.0, 50.0)  # 나누지 않고 한 번에 인식한 결과
+    assert [w["word"] for w in words] == [w["word"] for w in full] == [f"w{k}" for k in range(100)]
+    assert [w["start"] for w in words] == pytest.approx([w["start"] for w in full])
+
+
+def test_make_chunk_pool_uses_spawned_workers_with_one_model_each(monkeypatch):
+    import concurrent.futures
+
+    created = {}
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", lambda **kwargs: created.update(kwargs) or "pool")
+    assert fa.make_chunk_pool("small", 3, cpu_threads=2) == "pool"
+    assert created["max_workers"] == 3
+    assert created["mp_context"].get_start_method() == "spawn"
+    assert created["initializer"] is fa._init_chunk_worker and created["initargs"] == ("small", 2)
+
+    monkeypatch.setattr(fa, "WhisperModel", lambda *args, **kwargs: (args, kwargs))
+    monkeypatch.setattr(fa, "_chunk_model", None)
+    fa._init_chunk_worker("small", 2)
+    assert fa._chunk_model == (("small",), {"device": "cpu", "compute_type": "int8", "cpu_threads": 2})
+
+
+# ----- 다운로드 / 메모리 디코딩 -----
+
+class FakeAudioResponse:
+    def __init__(self, body: bytes, status_code: int = 200, headers: dict | None = None):
+        self.body = body
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise fa.requests.HTTPError(str(self.status_code))
+
+    def iter_content(self, chunk_size: int):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+
+def wav_bytes(sr: int = 44100, seconds: float = 1.5, channels: int = 2) -> bytes:
+    import soundfile as sf
+
+    t = np.arange(int(sr * seconds)) / sr
+    tone = 0.3 * np.sin(2 * np.pi * 440 * t)
+    buf = io.BytesIO()
+    sf.write(buf, np.column_stack([tone] * channels), sr, format="WAV", subtype="PCM_16")
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("spool_max_mb, rolled", [(64, False), (0.1, True), (0, True)])
+def test_download_audio_spools_and_hashes(monkeypatch, spool_max_mb, rolled):
+    body = wav_bytes()  # 약 0.5 MB
+    requests_made = []
+
+    def get(url, **kwargs):
+        requests_made.append((url, kwargs))
+        return FakeAudioResponse(body, headers={"ETag": '"v1"', "Last-Modified": "Mon, 03 Jun 2024 00:00:00 GMT"})
+
+    monkeypatch.setattr(fa.requests, "get", get)
+    buf, sha, validators = fa.download_audio("https://example.com/a.wav", spool_max_mb)
+    with buf:
+        assert buf._rolled is rolled  # 큰 파일만 디스크로
+        assert buf.read() == body
+    assert sha == hashlib.sha256(body).hexdigest()
+    assert validators == {"etag": '"v1"', "lastModified": "Mon, 03 Jun 2024 00:00:00 GMT"}
+    assert requests_made[0][1]["headers"] == {} and requests_made[0][1]["stream"] is True
+
+
+def test_download_audio_conditional_request(monkeypatch):
+    requests_made = []
+
+    def get(url, **kwargs):
+        requests_made.append(kwargs["headers"])
+        return FakeAudioResponse(b"", status_code=304)
+
+    monkeypatch.setattr(fa.requests, "get", get)
+    assert fa.download_audio("https://example.com/a.wav", validators={"etag": '"v1"', "lastModified": None}) is None
+    assert requests_made == [{"If-None-Match": '"v1"'}]
+
+    monkeypatch.setattr(fa.requests, "get", lambda url, **kwargs: FakeAudioResponse(b"", status_code=404))
+    with pytest.raises(fa.requests.HTTPError):
+        fa.download_audio("https://example.com/missing.wav")
+
+
+@pytest.mark.parametrize("max_size", [10 * 1024 * 1024, 1])  # 메모리 / 디스크 스풀
+def test_decode_buffer_matches_file_decode(tmp_path, max_size):
+    from faster_whisper.audio import decode_audio
+
+    body = wav_bytes(sr=44100, seconds=1.5, channels=2)
+    path = tmp_path / "a.wav"
+    path.write_bytes(body)
+    with tempfile.SpooledTemporaryFile(max_size=max_size) as buf:
+        buf.write(body)
+        buf.seek(0)
+        audio = fa.decode_buffer(buf)
+
+    assert audio.dtype == np.float32 and audio.ndim == 1
+    assert abs(len(audio) - 1.5 * 16000) <= 16
+    np.testing.assert_array_equal(audio, decode_audio(str(path), sampling_rate=16000))
+
+
+# ----- Firestore 일괄 읽기 / 쓰기 (가짜 클라이언트) -----
+
+class FakeSnapshot:
+    def __init__(self, report_id: str, data: dict | None):
+        self.id = report_id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeCollection:
+    def document(self, report_id: str):
+        return SimpleNamespace(id=report_id)
+
+
+class FakeBulkWriter:
+    """update는 모아 두고 close()에서 전송, fail_times[reportId]번 실패 후 성공 (on_write_error가 False면 포기)"""
+
+    def __init__(self, options, fail_times: dict):
+        self.options = options
+        self.fail_times = fail_times
+        self.pending = []
+        self.closed = False
+
+    def on_write_result(self, callback):
+        self._on_result = callback
+
+    def on_write_error(self, callback):
+        self._on_error = callback
+
+    def update(self, reference, data):
+        assert not self.closed
+        self.pending.append((reference, data))
+
+    def close(self):
+        for reference, _ in self.pending:
+            attempts = 1
+            while attempts <= self.fail_times.get(reference.id, 0):
+                error = SimpleNamespace(attempts=attempts, code=14, message="unavailable",
+                                        operation=SimpleNamespace(reference=reference))
+                if not self._on_error(error, self):
+                    break
+                attempts += 1
+            else:
+                self._on_result(reference, SimpleNamespace(update_time=None), self)
+        self.closed = True
+
+
+class FakeFirestore:
+    def __init__(self, docs: dict | None = None, fail_times: dict | None = None):
+        self.docs = docs or {}
+        self.fail_times = fail_times or {}
+        self.get_all_calls = []
+        self.writer = None
+
+    def collection(self, name: str):
+        assert name == "reports"
+        return FakeCollection()
+
+    def get_all(self, refs, field_paths=None):
+        self.get_all_calls.append(([r.id for r in refs], field_paths))
+        # 실제 get_all처럼 요청 순서와 다르게 반환
+        return [FakeSnapshot(r.id, self.docs.get(r.id)) for r in reversed(refs)]
+
+    def bulk_writer(self, options=None):
+        self.writer = FakeBulkWriter(options, self.fail_times)
+        return self.writer
+
+
+def test_prefetch_contents_batches_reads():
+    docs = {f"r{i}": {"content": f"본문 {i}."} for i in range(7)}
+    docs["r2"] = {"content": "", "summary": "요약."}
+    docs["r3"] = {"content": ""}
+    del docs["r4"]
+    client = FakeFirestore(docs)
+    jobs = [{"reportId": f"r{i}"} for i in range(7)]
+    jobs.append({"reportId": "local", "contentFile": "a.txt"})  # 본문이 있는 job은 읽지 않음
+    jobs.append({"reportId": "inline", "content": "이미 있음."})
+
+    errors = fa.prefetch_contents(client, jobs, batch_size=3)
+
+    assert client.get_all_calls == [
+        (["r0", "r1", "r2"], ["content", "summary"]),
+        (["r3", "r4", "r5"], ["content", "summary"]),
+        (["r6"], ["content", "summary"]),
+    ]
+    assert [job.get("content") for job in jobs[:7]] == ["본문 0.", "본문 1.", "요약.", None, None, "본문 5.", "본문 6."]
+    assert set(errors) == {"r3", "r4"}
+    assert "문서가 없습니다" in errors["r4"]
+    assert jobs[8]["content"] == "이미 있음." and "content" not in jobs[7]
+
+
+def test_prefetch_contents_without_pending_jobs():
+    client = FakeFirestore()
+    assert fa.prefetch_contents(client, [{"reportId": "a", "content": "x"}]) == {}
+    assert client.get_all_calls == []
+
+
+requires_firestore = pytest.mark.skipif(not fa.FIRESTORE_AVAILABLE, reason="google-cloud-firestore 필요")
+
+
+@requires_firestore
+def test_result_writer_flushes_on_close():
+    client = FakeFirestore()
+    writer = fa.ResultWriter(client, ops_per_sec=50, max_attempts=3)
+    options = client.writer.options
+    assert (options.initial_ops_per_second, options.max_ops_per_second) == (50, 500)
+    assert options.mode == fa.SendMode.parallel and options.retry == fa.BulkRetry.exponential
+
+    ts = [{"text": "w0.", "start": 0.0, "end": 0.4, "confidence": 1.0}]
+    threads = [threading.Thread(target=writer.update, args=(f"r{i}", ts)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert writer.written == 0  # close() 전에는 전송하지 않음
+
+    writer.close()
+    assert client.writer.closed
+    assert sorted(ref.id for ref, _ in client.writer.pending) == sorted(f"r{i}" for i in range(20))
+    assert all(data == {"sentenceTimestamps": ts} for _, data in client.writer.pending)
+    assert writer.written == 20 and writer.failures == {}
+
+
+@requires_firestore
+def test_result_writer_retries_then_records_failures():
+    client = FakeFirestore(fail_times={"flaky": 2, "broken": 10})
+    writer = fa.ResultWriter(client, max_attempts=3)
+    for report_id in ("ok", "flaky", "broken"):
+        writer.update(report_id, [])
+    writer.close()
+
+    # flaky: 2번 실패 후 3번째 시도에서 성공, broken: max_attempts번 실패 후 포기
+    assert writer.written == 2
+    assert writer.failures == {"broken": "Firestore 쓰기 실패 (14): unavailable"}
@@ -0,0 +1,203 @@
+"""
+step47 / step49 서비스 공통 모듈: Prometheus 메트릭, /debug/profile 샘플링 프로파일러, 워밍업 상태
+서비스 이미지에는 app.py 옆에 복사되고(각 Dockerfile), 저장소에서 실행할 때는 app.py가 이 디렉터리를 sys.path에 추가해 import
+
+    app = FastAPI()
+    service_common.install(app)  # MetricsMiddleware(METRICS_ENABLED일 때) + /metrics + /debug/profile
+"""
+
+import hmac
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Gauge, Histogram, generate_latest, multiprocess,
+)
+
+# ===== Prometheus 메트릭 =====
+# gunicorn 멀티 워커에서는 PROMETHEUS_MULTIPROC_DIR(gunicorn.conf.py에서 설정)로 워커 간 집계
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "라우트별 요청 지연 시간", ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "처리 중인 요청 수", multiprocess_mode="livesum",
+)
+STAGE_LATENCY = Histogram(
+    "stage_duration_seconds", "처리 단계별 소요 시간", ["stage"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+
+# 핫패스에서 label 조회를 피하기 위해 child를 미리 생성
+_stage_children = {}
+_request_children = {}
+
+
+@contextmanager
+def stage(name: str):
+    """처리 단계 소요 시간을 stage_duration_seconds에 기록"""
+    child = _stage_children.get(name)
+    if child is None:
+        child = _stage_children[name] = STAGE_LATENCY.labels(name)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        child.observe(time.perf_counter() - t0)
+
+
+class MetricsMiddleware:
+    """라우트 템플릿 기준 지연 시간 히스토그램 + in-flight 게이지 (순수 ASGI, 오버헤드 최소화)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - t0
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            key = (scope["method"], route.path if route is not None else "unmatched", status)
+            child = _request_children.get(key)
+            if child is None:
+                child = _request_children[key] = REQUEST_LATENCY.labels(key[0], key[1], str(status))
+            child.observe(elapsed)
+
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def metrics():
+    """Prometheus 텍스트 포맷 메트릭"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        data = generate_latest(registry)
+    else:
+        data = generate_latest()
+    return Response(content=data, media_type=CONTENT_TYPE_LATEST)
+
+
+# ===== 프로파일링 =====
+# PROFILE_TOKEN을 지정한 경우에만 /debug/profile 활성화 (X-Profile-Token 헤더가 같아야 함, 지정하지 않으면 404)
+# 요청이 오면 샘플링 스레드가 sys._current_frames()로 이 워커 프로세스의 다른 스레드 스택을 주기적으로 수집하고,
+# 요청이 없을 때는 아무것도 실행하지 않음
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+# 일을 기다리는 스레드의 맨 위 프레임 (idle=true가 아니면 샘플에서 제외)
+PROFILE_IDLE_FRAMES = {
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"), ("selectors.py", "select"),
+    ("thread.py", "_worker"), ("queue.py", "get"), ("socket.py", "accept"),
+}
+
+_profile_lock = threading.Lock()
+
+
+def sample_stacks(seconds: float, interval: float, include_idle: bool = False) -> tuple[dict, int]:
+    """seconds 동안 interval마다 다른 스레드의 스택 수집 → (folded 스택별 샘플 수, 샘플링 횟수)"""
+    me = threading.get_ident()
+    labels = {}
+    stacks = {}
+    samples = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        samples += 1
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            leaf = frame.f_code
+            if not include_idle and (os.path.basename(leaf.co_filename), leaf.co_name) in PROFILE_IDLE_FRAMES:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                names.append(label)
+                frame = frame.f_back
+            stack = ";".join(reversed(names))
+            stacks[stack] = stacks.get(stack, 0) + 1
+        time.sleep(interval)
+    return stacks, samples
+
+
+@router.get("/debug/profile")
+async def debug_profile(seconds: float = 10, idle: bool = False, x_profile_token: Optional[str] = Header(None)):
+    """
+    이 워커 프로세스를 seconds초 동안 샘플링한 스택 (folded 형식: 한 줄에 "바깥;...;안쪽 프레임 샘플 수")
+    flamegraph.pl / speedscope / inferno에 그대로 입력. gunicorn 워커가 여럿이면 요청을 받은 워커만 측정 (X-Profile-Pid)
+    """
+    if not PROFILE_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_profile_token is None or not hmac.compare_digest(x_profile_token.encode(), PROFILE_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="프로파일링 토큰이 올바르지 않습니다")
+    if not 0 < seconds <= PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds는 0보다 크고 {PROFILE_MAX_SECONDS:g} 이하여야 합니다")
+    if not _profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="이미 프로파일링 중입니다")
+    try:
+        stacks, samples = await run_in_threadpool(sample_stacks, seconds, PROFILE_INTERVAL_MS / 1000, idle)
+    finally:
+        _profile_lock.release()
+    return PlainTextResponse(
+        "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items(), key=lambda kv: -kv[1])),
+        headers={"X-Profile-Samples": str(samples), "X-Profile-Pid": str(os.getpid())},
+    )
+
+
+# ===== 워밍업 상태 =====
+warmup_state = {"done": False, "elapsed_ms": None, "error": None}
+
+
+def run_warmup(fn):
+    """fn을 한 번 실행해 warmup_state에 소요 시간 / 오류 기록 (실패해도 import는 계속되고 /health가 503)"""
+    t0 = time.perf_counter()
+    try:
+        fn()
+    except Exception as e:
+        warmup_state["error"] = f"{type(e).__name__}: {e}"
+    warmup_state["done"] = True
+    warmup_state["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+
+def health_response(body: dict):
+    """/health 응답: 워밍업이 실패한 인스턴스는 503 (readiness/startup probe에서 트래픽을 받지 않도록)"""
+    body["warmup"] = warmup_state
+    if warmup_state["error"]:
+        body["status"] = "warmup_failed"
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+
+def install(app):
+    """서비스 app에 메트릭 미들웨어(METRICS_ENABLED일 때)와 /metrics, /debug/profile 라우트 등록"""
+    if METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+    app.include_router(router)
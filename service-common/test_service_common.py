@@ -0,0 +1,103 @@
+"""
+service_common 테스트: /debug/profile 가드, 메트릭, 워밍업 상태 (최소 FastAPI 앱에 install)
+
+실행:
+    cd service-common && python -m pytest -q
+"""
+
+import os
+
+# import 전에 설정 (모듈 상수)
+os.environ.update(METRICS_ENABLED="1")
+os.environ.pop("PROFILE_TOKEN", None)
+os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+
+import pytest  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import service_common  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    service_common.install(app)
+
+    @app.get("/items/{item_id}")
+    def item(item_id: str):
+        with service_common.stage("lookup"):
+            return {"id": item_id}
+
+    @app.get("/health")
+    def health():
+        return service_common.health_response({"status": "ok"})
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def profile_token(monkeypatch):
+    monkeypatch.setattr(service_common, "PROFILE_TOKEN", "secret")
+    return {"X-Profile-Token": "secret"}
+
+
+def test_metrics_use_route_template_and_stage(client):
+    assert client.get("/items/a").status_code == 200
+    assert client.get("/items/b").status_code == 200
+    text = client.get("/metrics").text
+    assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}",status="200"} 2.0' in text
+    assert 'stage_duration_seconds_count{stage="lookup"} 2.0' in text
+    assert "http_requests_in_flight" in text
+
+
+def test_health_is_503_after_failed_warmup(client, monkeypatch):
+    for key in service_common.warmup_state:
+        monkeypatch.setitem(service_common.warmup_state, key, service_common.warmup_state[key])
+    service_common.run_warmup(lambda: None)
+    assert service_common.warmup_state["done"] and service_common.warmup_state["error"] is None
+    assert client.get("/health").json()["status"] == "ok"
+
+    def broken():
+        raise RuntimeError("boom")
+
+    service_common.run_warmup(broken)
+    r = client.get("/health")
+    assert r.status_code == 503
+    assert r.json()["status"] == "warmup_failed"
+    assert r.json()["warmup"]["error"] == "RuntimeError: boom"
+
+
+def test_profile_endpoint_is_hidden_without_token_config(client):
+    assert service_common.PROFILE_TOKEN == ""
+    assert client.get("/debug/profile", headers={"X-Profile-Token": ""}).status_code == 404
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Profile-Token": "wrong"}])
+def test_profile_requires_matching_token(client, profile_token, headers):
+    assert client.get("/debug/profile", params={"seconds": 0.01}, headers=headers).status_code == 403
+
+
+@pytest.mark.parametrize("seconds", [0, -1, 10**6])
+def test_profile_duration_is_bounded(client, profile_token, seconds):
+    assert client.get("/debug/profile", params={"seconds": seconds}, headers=profile_token).status_code == 400
+
+
+def test_profile_allows_one_session_at_a_time(client, profile_token):
+    assert service_common._profile_lock.acquire(blocking=False)
+    try:
+        r = client.get("/debug/profile", params={"seconds": 0.01}, headers=profile_token)
+        assert r.status_code == 409
+    finally:
+        service_common._profile_lock.release()
+
+
+def test_profile_returns_folded_stacks(client, profile_token):
+    r = client.get("/debug/profile", params={"seconds": 0.1, "idle": True}, headers=profile_token)
+    assert r.status_code == 200
+    assert int(r.headers["X-Profile-Samples"]) > 0
+    assert r.headers["X-Profile-Pid"] == str(os.getpid())
+    stack, count = r.text.splitlines()[0].rsplit(" ", 1)
+    assert ";" in stack or ":" in stack
+    assert int(count) > 0
+    assert not service_common._profile_lock.locked()
@@ -4,34 +4,1135 @@ Step 47: 오디오 특징 추출 API
 """
 
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
 import uvicorn
+import asyncio
+import base64
+import hashlib
+import io
+import json
 import tempfile
 import os
 import math
-import librosa
+import sys
+import threading
+import time
 import numpy as np
+import scipy.fft
 import soundfile as sf
 import requests
-from typing import Optional
+import uuid
+from contextlib import asynccontextmanager
+from typing import NamedTuple, Optional
 
-app = FastAPI()
+from prometheus_client import Counter
+
+# 공통 모듈 (메트릭 / 프로파일링 / 워밍업 상태): 이미지에서는 app.py 옆에 복사, 저장소에서는 ../service-common
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "service-common"))
+import service_common  # noqa: E402
+from service_common import health_response, run_warmup, stage, warmup_state  # noqa: E402,F401
+
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # 프로세스 풀을 먼저 만든 뒤 백그라운드 스레드 시작
+    await start_process_pool()
+    feature_cache.start_scan()
+    yield
+    await shutdown_batch_resources()
+
+
+app = FastAPI(lifespan=lifespan)
+service_common.install(app)
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_error_handler(request, exc: RequestValidationError):
+    """
+    422 응답에서 입력 값(input)을 뺌
+    기본 핸들러는 input을 그대로 JSON으로 돌려주는데, timeline_sec: NaN / Infinity처럼 표준 JSON이 아닌
+    값은 직렬화에 실패해 422 대신 500이 됨
+    """
+    errors = [{k: v for k, v in e.items() if k not in ("input", "ctx", "url")} for e in exc.errors()]
+    return JSONResponse(status_code=422, content={"detail": errors})
+
+
+# 서비스별 메트릭 (캐시 결과 child는 핫패스에서 label 조회를 피하기 위해 미리 생성)
+FEATURE_CACHE_REQUESTS = Counter("feature_cache_requests_total", "특징 캐시 조회 수", ["result"])
+_CACHE_HIT = FEATURE_CACHE_REQUESTS.labels("hit")
+_CACHE_MISS = FEATURE_CACHE_REQUESTS.labels("miss")
+
+
+# 프레임 파라미터
+FRAME_LEN = 2048
+HOP = 512
+
+# 스트리밍 분석 블록 크기 (초)
+STREAM_BLOCK_SEC = float(os.getenv("STREAM_BLOCK_SEC", "10"))
+
+# 특징 추출 FFT 정밀도 (float32: librosa STFT와 같은 단정밀도, float64: 배정밀도)
+FEATURE_DTYPE = np.dtype(os.getenv("FEATURE_DTYPE", "float32"))
+# 한 번에 FFT하는 최대 프레임 수 (메모리 상한)
+FEATURE_CHUNK_FRAMES = int(os.getenv("FEATURE_CHUNK_FRAMES", "2048"))
+# 리샘플 품질 (soxr 프리셋, HQ = librosa.load 기본 soxr_hq와 동일한 결과)
+# SNR/RMS/ZCR은 낮은 품질에도 오차가 작음 - perf/bench_resample.py로 품질별 오차 확인
+RESAMPLE_QUALITIES = ("VHQ", "HQ", "MQ", "LQ", "QQ")
+RESAMPLE_QUALITY = os.getenv("RESAMPLE_QUALITY", "HQ").upper()
+# 1이면 RMS 기반 특징(rms_mean / SNR / 말속도)을 리샘플 전 원본 레이트에서 계산 (파일/배치 모드)
+FEATURE_NATIVE_RATE = os.getenv("FEATURE_NATIVE_RATE", "0") == "1"
+
+# 구간별 특징 시계열의 최소 구간 길이 (초)
+TIMELINE_MIN_SEC = 0.5
+
+# 특징 계산 방식이 바뀌면 올려서 기존 캐시 무효화
+FEATURE_VERSION = f"1-{FEATURE_DTYPE.name}-{FRAME_LEN}-{HOP}"
+
+# 특징 캐시 (디스크, 크기 제한 LRU / 0이면 비활성화)
+# Cloud Run의 /tmp는 인메모리 파일 시스템이므로 기본 위치에서는 FEATURE_CACHE_MAX_MB만큼 인스턴스 메모리를 씀
+FEATURE_CACHE_DIR = os.getenv("FEATURE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "feature_cache"))
+FEATURE_CACHE_MAX_MB = float(os.getenv("FEATURE_CACHE_MAX_MB", "256"))
 
 
 class Req(BaseModel):
     audio_url: str
     target_sr: int = 16000
+    streaming: bool = False  # True면 임시 파일 없이 블록 단위 디코딩/분석 (메모리 일정)
+    resample_quality: Optional[str] = None  # VHQ / HQ / MQ / LQ / QQ (기본 RESAMPLE_QUALITY)
+    native_rate: Optional[bool] = None  # 기본 FEATURE_NATIVE_RATE (스트리밍 모드에서는 무시)
+    # 지정 시 N초 구간별 특징 시계열(timeline)도 반환 (TIMELINE_MIN_SEC 미만 / NaN / inf는 422)
+    timeline_sec: Optional[float] = Field(None, ge=TIMELINE_MIN_SEC, allow_inf_nan=False)
+
+
+class AnalysisOptions(NamedTuple):
+    target_sr: int
+    quality: str
+    native_rate: bool
+    timeline_sec: Optional[float] = None
+
+    @property
+    def cache_params(self) -> str:
+        """특징 캐시 키에 들어가는 분석 옵션"""
+        return (
+            f"{self.target_sr}|{self.quality}|{'native' if self.native_rate else 'resampled'}"
+            f"|{self.timeline_sec or 0:g}"
+        )
+
+
+def analysis_options(req) -> AnalysisOptions:
+    quality = (req.resample_quality or RESAMPLE_QUALITY).upper()
+    if quality not in RESAMPLE_QUALITIES:
+        raise HTTPException(status_code=400, detail=f"resample_quality는 {', '.join(RESAMPLE_QUALITIES)} 중 하나여야 합니다")
+    native = FEATURE_NATIVE_RATE if req.native_rate is None else req.native_rate
+    return AnalysisOptions(
+        req.target_sr, quality, bool(native) and not getattr(req, "streaming", False), req.timeline_sec,
+    )
+
+
+def downmix(y: np.ndarray) -> np.ndarray:
+    """(samples, channels) → mono 평균 (채널 열을 차례로 더함, 작은 축에 대한 np.mean보다 10배 이상 빠름)"""
+    channels = y.shape[1]
+    if channels == 1:
+        return y[:, 0]
+    out = y[:, 0].copy()
+    for c in range(1, channels):
+        out += y[:, c]
+    out /= channels
+    return out
+
+
+def decode_audio(path) -> tuple[np.ndarray, int]:
+    """
+    원본 레이트 mono float32로 디코딩 (경로 또는 file-like)
+    soundfile이 읽을 수 있으면 float32로 바로 읽고, 아니면 librosa(audioread)로 디코딩
+    (file-like는 librosa로 넘기지 않고 sf.SoundFileError를 그대로 전달)
+    """
+    try:
+        y, sr = sf.read(path, dtype="float32", always_2d=True)
+        return downmix(y), sr
+    except sf.SoundFileError:
+        if not isinstance(path, str):
+            raise
+    import librosa  # webm/mp3 등에서만 필요 (import + numba JIT 비용은 워밍업에서 미리 지불)
+    y, sr = librosa.load(path, sr=None, mono=True)
+    return y, sr
+
+
+def resample(y: np.ndarray, sr: int, target_sr: int, quality: str) -> np.ndarray:
+    if sr == target_sr:
+        return y
+    import soxr
+    return soxr.resample(y, sr, target_sr, quality=quality)
+
+
+def native_rate_rms(y: np.ndarray, sr: int, target_sr: int) -> np.ndarray:
+    """target_sr의 FRAME_LEN/HOP와 같은 시간 길이의 프레임으로 원본 레이트 RMS 계산 (center=True)"""
+    scale = sr / target_sr
+    frame_len = int(round(FRAME_LEN * scale))
+    hop = int(round(HOP * scale))
+    y_pad = np.pad(y, frame_len // 2)
+    sq = np.empty(len(y_pad) + 1)
+    sq[0] = 0.0
+    np.cumsum(np.square(y_pad, dtype=np.float64), out=sq[1:])
+    starts = np.arange(1 + len(y) // hop) * hop
+    ends = np.minimum(starts + frame_len, len(y_pad))
+    return np.sqrt(np.maximum(sq[ends] - sq[starts], 0.0) / frame_len)
+
+
+def energy_snr_db(energy: np.ndarray) -> float:
+    """
+    SNR (Signal-to-Noise Ratio) 계산
+    간이 방법: 신호 에너지 대비 저에너지 프레임(노이즈) 추정
+    """
+    thr = np.percentile(energy, 20)  # 하위 20%를 노이즈로 추정
+    noise = energy[energy <= thr].mean() if np.any(energy <= thr) else energy.mean() * 0.2
+    signal = energy.mean()
+    return 10 * np.log10(max(signal, 1e-9) / max(noise, 1e-9))
+
+
+def summarize_features(sr: int, n_samples: int, rms: np.ndarray, zcr_mean: float, centroid_mean: float) -> dict:
+    """프레임별 RMS와 평균 ZCR/센트로이드로 SNR, 말속도를 계산하여 응답 생성"""
+    # 오디오 길이
+    duration_sec = n_samples / sr
+
+    energy = rms ** 2
+    snr_db = energy_snr_db(energy)
+
+    # 말속도 추정 (대략)
+    # 무성구간을 공백으로 보고 유성/무성 전이로 발화 블록 수 추정
+    # 분당 블록수 ≈ WPM 근사
+    voiced = energy > (energy.mean() * 0.3)
+    transitions = np.where(np.diff(voiced.astype(int)) == 1)[0]  # 시작점
+    blocks_per_min = (len(transitions) / (duration_sec / 60)) if duration_sec > 0 else 0
+
+    return {
+        "sr": int(sr),
+        "duration_sec": float(duration_sec),
+        "rms_mean": float(rms.mean()),
+        "zcr_mean": float(zcr_mean),
+        "centroid_mean": float(centroid_mean),
+        "snr_db": float(snr_db),
+        "speech_blocks_per_min": float(blocks_per_min),
+    }
+
+
+def pack_float32(values) -> str:
+    """float32 little-endian 바이트열의 base64 (JSON 리스트보다 작고 파싱이 빠름)"""
+    return base64.b64encode(np.asarray(values, dtype="<f4").tobytes()).decode("ascii")
+
+
+def feature_timeline(
+    sr: int, n_samples: int, rms: np.ndarray, zcr: np.ndarray, centroid: np.ndarray, chunk_sec: float,
+) -> dict:
+    """
+    프레임별 특징을 chunk_sec 구간으로 묶어 구간별 RMS/ZCR/센트로이드 평균, SNR, 말속도 계산
+    (프레임 i는 시각 i * HOP / sr에 속함, 끝의 center 패딩 프레임은 마지막 구간에 포함,
+    유성 임계치는 파일 전체 기준으로 전체 결과와 일관)
+
+    Returns:
+        {"chunk_sec", "n_chunks", "encoding": "float32-le-base64", "rms_mean": "<base64>", ...}
+    """
+    n = min(len(rms), len(zcr), len(centroid))  # native_rate에서는 RMS 프레임 수가 1 차이 날 수 있음
+    energy = rms[:n] ** 2
+    n_chunks = max(1, math.ceil(n_samples / (chunk_sec * sr)))
+    chunk_idx = np.minimum((np.arange(n) * HOP / (chunk_sec * sr)).astype(np.int64), n_chunks - 1)
+    bounds = np.flatnonzero(np.diff(chunk_idx, prepend=-1))  # 구간별 첫 프레임
+    counts = np.diff(np.append(bounds, n))
+
+    # 말속도: 유성 시작 프레임이 속한 구간에 집계
+    voiced = energy > (energy.mean() * 0.3)
+    onsets = np.zeros(n, dtype=np.int64)
+    onsets[1:] = voiced[1:] & ~voiced[:-1]
+    minutes = counts * HOP / sr / 60
+
+    return {
+        "chunk_sec": chunk_sec,
+        "n_chunks": n_chunks,
+        "encoding": "float32-le-base64",
+        "rms_mean": pack_float32(np.add.reduceat(rms[:n], bounds) / counts),
+        "zcr_mean": pack_float32(np.add.reduceat(zcr[:n], bounds) / counts),
+        "centroid_mean": pack_float32(np.add.reduceat(centroid[:n], bounds) / counts),
+        "snr_db": pack_float32([energy_snr_db(e) for e in np.split(energy, bounds[1:])]),
+        "speech_blocks_per_min": pack_float32(np.add.reduceat(onsets, bounds) / minutes),
+    }
+
+
+class FrameFeatureExtractor:
+    """
+    RMS / ZCR / Spectral Centroid를 한 번의 프레이밍으로 함께 계산합니다.
+    librosa.feature.rms / zero_crossing_rate / spectral_centroid(center=True, hann, n_fft=2048)와
+    같은 프레임 정의를 사용하며,
+
+    - RMS: 제곱 누적합의 차분 (프레임 겹침만큼 반복 계산하지 않음)
+    - ZCR: 샘플 단위 부호 변화 누적합의 차분 (edge 패딩 구간은 교차 없음으로 처리)
+    - Centroid: strided view + 배치 rfft 1회
+    """
+
+    def __init__(self, sr: int, dtype=FEATURE_DTYPE):
+        self.sr = sr
+        self.dtype = np.dtype(dtype)
+        # librosa.filters.get_window("hann", fftbins=True) / librosa.fft_frequencies와 같은 값
+        # (librosa를 import하면 scipy.signal + numba 로딩으로 첫 요청이 1초 이상 늦어짐)
+        self.window = (0.5 + 0.5 * np.cos(np.linspace(-np.pi, np.pi, FRAME_LEN + 1)[:-1])).astype(self.dtype)
+        self.freqs = np.fft.rfftfreq(FRAME_LEN, 1.0 / sr).astype(self.dtype)
+
+    def frames(self, buf: np.ndarray, pos0: int, n: int, n_samples: int, with_rms: bool = True):
+        """
+        buf[0]이 절대 샘플 위치 pos0(음수면 앞쪽 0 패딩)인 버퍼에서 HOP 간격 프레임 n개의 특징 계산.
+        n_samples 이후 위치는 뒤쪽 0 패딩으로 간주합니다. with_rms=False이면 rms는 None.
+        """
+        length = (n - 1) * HOP + FRAME_LEN
+        buf = buf[:length]
+        starts = np.arange(n) * HOP
+
+        # RMS
+        rms = None
+        if with_rms:
+            sq = np.empty(length + 1)
+            sq[0] = 0.0
+            np.cumsum(np.square(buf, dtype=np.float64), out=sq[1:])
+            rms = np.sqrt(np.maximum(sq[starts + FRAME_LEN] - sq[starts], 0.0) / FRAME_LEN)
+
+        # ZCR (librosa.zero_crossings: |x| <= 1e-10은 0, signbit 기준, 프레임 길이로 평균)
+        sign = np.signbit(buf) & (np.abs(buf) > 1e-10)
+        crossings = sign[1:] != sign[:-1]  # crossings[k]: 샘플 쌍 (k, k+1)
+        lo = max(0, -pos0)  # 두 번째 샘플 위치가 1 미만인 쌍 제외 (앞쪽 패딩)
+        hi = max(0, n_samples - pos0 - 1)  # 두 번째 샘플 위치가 n_samples 이상인 쌍 제외 (뒤쪽 패딩)
+        crossings[:lo] = False
+        crossings[hi:] = False
+        cc = np.empty(length, dtype=np.int64)
+        cc[0] = 0
+        np.cumsum(crossings, out=cc[1:])
+        zcr = (cc[starts + FRAME_LEN - 1] - cc[starts]) / FRAME_LEN
+
+        # Spectral Centroid (|STFT| 가중 평균 주파수)
+        framed = np.lib.stride_tricks.sliding_window_view(buf.astype(self.dtype, copy=False), FRAME_LEN)[::HOP]
+        S = np.abs(scipy.fft.rfft(framed * self.window, axis=1))
+        norm = S.sum(axis=1)
+        norm[norm < np.finfo(S.dtype).tiny] = 1.0
+        centroid = (S @ self.freqs) / norm
+
+        return rms, zcr, centroid
+
+    def extract(self, y: np.ndarray, with_rms: bool = True):
+        """
+        전체 신호에서 프레임별 (rms, zcr, centroid) 계산 (FEATURE_CHUNK_FRAMES 단위로 FFT)
+        with_rms=False이면 RMS 열을 건너뛰고 rms는 None (native_rate에서 원본 레이트 RMS를 따로 계산할 때)
+        """
+        pad = FRAME_LEN // 2
+        y_pad = np.pad(y, pad)
+        n_frames = 1 + len(y) // HOP
+        out = []
+        for t0 in range(0, n_frames, FEATURE_CHUNK_FRAMES):
+            n = min(FEATURE_CHUNK_FRAMES, n_frames - t0)
+            out.append(self.frames(y_pad[t0 * HOP:], t0 * HOP - pad, n, len(y), with_rms))
+        rms, zcr, centroid = (None if parts[0] is None else np.concatenate(parts) for parts in zip(*out))
+        return rms, zcr, centroid
+
+
+class StreamingFeatures:
+    """
+    블록 단위로 입력되는 오디오에서 FrameFeatureExtractor로 특징을 누적 계산합니다.
+
+    오디오 샘플은 한 프레임 길이만큼만 버퍼링하고, 프레임당 RMS 값(hop 512 샘플당 float 1개)만
+    보관합니다 (SNR 백분위수/유성 구간 임계치가 전체 에너지 분포에 의존하기 때문).
+    timeline_sec를 지정하면 구간별 집계를 위해 프레임별 ZCR/센트로이드도 보관합니다.
+    """
+
+    def __init__(self, sr: int, timeline_sec: Optional[float] = None):
+        self.sr = sr
+        self.timeline_sec = timeline_sec
+        self.n_samples = 0
+        self._extractor = FrameFeatureExtractor(sr)
+        # librosa center=True: 앞뒤로 FRAME_LEN // 2 패딩
+        self._buf = np.zeros(FRAME_LEN // 2, dtype=np.float32)
+        self._buf_pos = -(FRAME_LEN // 2)  # _buf[0]의 절대 샘플 위치
+        self._next_frame = 0
+        self._rms = []
+        self._zcr = []
+        self._centroid = []
+        self._zcr_sum = 0.0
+        self._centroid_sum = 0.0
+
+    def feed(self, block: np.ndarray):
+        if len(block) == 0:
+            return
+        self.n_samples += len(block)
+        self._buf = np.concatenate([self._buf, block.astype(np.float32, copy=False)])
+        self._process(final=False)
+
+    def _process(self, final: bool):
+        offset = self._next_frame * HOP - FRAME_LEN // 2 - self._buf_pos
+        avail = len(self._buf) - offset
+        n = (avail - FRAME_LEN) // HOP + 1 if avail >= FRAME_LEN else 0
+        if final:
+            n = min(n, 1 + self.n_samples // HOP - self._next_frame)
+
+        while n > 0:
+            chunk = min(n, FEATURE_CHUNK_FRAMES)
+            rms, zcr, centroid = self._extractor.frames(
+                self._buf[offset:], self._buf_pos + offset, chunk, self.n_samples,
+            )
+            self._rms.append(rms)
+            if self.timeline_sec:
+                self._zcr.append(zcr)
+                self._centroid.append(centroid)
+            self._zcr_sum += float(zcr.sum())
+            self._centroid_sum += float(centroid.sum())
+            self._next_frame += chunk
+            offset += chunk * HOP
+            n -= chunk
+
+        # 다음 프레임 시작 이전 샘플은 버림
+        self._buf = self._buf[offset:]
+        self._buf_pos += offset
+
+    def finish(self) -> dict:
+        if self.n_samples == 0:
+            raise ValueError("오디오 샘플이 없습니다")
+        self._buf = np.concatenate([self._buf, np.zeros(FRAME_LEN // 2, dtype=np.float32)])
+        self._process(final=True)
+        rms = np.concatenate(self._rms)
+        n_frames = len(rms)
+        result = summarize_features(
+            self.sr, self.n_samples, rms, self._zcr_sum / n_frames, self._centroid_sum / n_frames,
+        )
+        if self.timeline_sec:
+            result["timeline"] = feature_timeline(
+                self.sr, self.n_samples, rms, np.concatenate(self._zcr), np.concatenate(self._centroid), self.timeline_sec,
+            )
+        return result
+
+
+def _read_wav_header(stream) -> tuple[int, int]:
+    """ffmpeg가 파이프로 내보내는 WAV(pcm_f32le) 헤더를 읽고 (sr, channels) 반환"""
+    riff = stream.read(12)
+    if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+        raise ValueError("WAV 헤더를 읽을 수 없습니다")
+    sr = channels = None
+    while True:
+        header = stream.read(8)
+        if len(header) < 8:
+            raise ValueError("WAV data 청크가 없습니다")
+        chunk_id, size = header[:4], int.from_bytes(header[4:], "little")
+        if chunk_id == b"data":
+            break
+        body = stream.read(size + (size & 1))
+        if chunk_id == b"fmt ":
+            channels = int.from_bytes(body[2:4], "little")
+            sr = int.from_bytes(body[4:8], "little")
+    if not sr or not channels:
+        raise ValueError("WAV fmt 청크가 없습니다")
+    return sr, channels
+
+
+def iter_audio_blocks(response, target_sr: int, block_sec: float = STREAM_BLOCK_SEC, quality: str = "HQ"):
+    """
+    HTTP 응답 본문을 ffmpeg 파이프로 디코딩하여 target_sr의 mono float32 블록을 순서대로 반환
+    (원본 레이트로 디코딩 → 채널 평균 → soxr 스트리밍 리샘플, librosa.load와 동일한 순서)
+    """
+    import subprocess
+    import soxr
+
+    proc = subprocess.Popen(
+        [
+            "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+            "-i", "pipe:0", "-map_metadata", "-1", "-f", "wav", "-c:a", "pcm_f32le", "pipe:1",
+        ],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+
+    def pump():
+        try:
+            for chunk in response.iter_content(1024 * 256):
+                if chunk:
+                    proc.stdin.write(chunk)
+        except (BrokenPipeError, ValueError):
+            pass
+        finally:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+
+    writer = threading.Thread(target=pump, daemon=True)
+    writer.start()
+    try:
+        sr, channels = _read_wav_header(proc.stdout)
+        resampler = soxr.ResampleStream(sr, target_sr, 1, dtype="float32", quality=quality) if sr != target_sr else None
+        frame_bytes = 4 * channels
+        block_bytes = max(1, int(block_sec * sr)) * frame_bytes
+        while True:
+            raw = proc.stdout.read(block_bytes)
+            last = len(raw) < block_bytes
+            raw = raw[: len(raw) - len(raw) % frame_bytes]
+            y = np.frombuffer(raw, dtype=np.float32)
+            if channels > 1:
+                y = downmix(y.reshape(-1, channels))
+            if resampler is not None:
+                y = resampler.resample_chunk(y, last=last)
+            yield target_sr, y
+            if last:
+                break
+    finally:
+        proc.stdout.close()
+        writer.join(timeout=5)
+        returncode = proc.wait()
+        stderr = proc.stderr.read().decode("utf-8", "replace")
+        proc.stderr.close()
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg 디코딩 실패: {stderr.strip()}")
+
+
+# ===== 특징 캐시 =====
+class FeatureCache:
+    """
+    디스크 기반 특징 캐시 (크기 제한 LRU)
+
+    - 항목 하나가 JSON 파일 하나이며 mtime을 최근 사용 시각으로 사용 (적중 시 갱신)
+    - 키: 콘텐츠 식별자 + 분석 옵션(target_sr / 리샘플 품질 / native_rate) + FEATURE_VERSION
+    - 콘텐츠 식별자: ETag + Content-Length, 없으면 본문 sha256
+    - URL별로 마지막 식별자와 ETag/Last-Modified를 기록하여 조건부 요청(304)으로 다운로드 생략
+    - 같은 인스턴스의 gunicorn 워커들이 디렉터리를 공유
+    - 항목 수 / 사용량은 워커별 근사 카운터 (워커 시작 시 백그라운드 스레드와 축출할 때만 디렉터리를 스캔하고
+      그 사이에는 쓰기마다 갱신, 다른 워커의 쓰기는 다음 스캔 때 반영)
+    - /health(stats)는 스캔하지 않음: 첫 스캔이 끝나기 전에는 entries / disk_bytes가 None
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._bytes = None  # 대략적인 디스크 사용량과 항목 수 (start_scan 또는 첫 쓰기에서 한 번 스캔)
+        self._entries = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def _read(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)  # LRU 갱신
+        except OSError:
+            pass
+        return value
+
+    def _write(self, key: str, value: dict):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps(value).encode("utf-8")
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        try:
+            replaced = os.stat(path).st_size
+        except OSError:
+            replaced = None
+        os.replace(tmp, path)
+
+        with self._lock:
+            if not self._count_locked():  # 방금 스캔했다면 이 파일까지 반영됨
+                self._bytes += len(data) - (replaced or 0)
+                self._entries += replaced is None
+            over = self._bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def _count_locked(self) -> bool:
+        """카운터가 비어 있으면 디렉터리를 스캔해 채움 (_lock 안에서 호출, 스캔했으면 True)"""
+        if self._bytes is not None:
+            return False
+        entries = self._scan()
+        self._bytes = sum(size for _, size, _ in entries)
+        self._entries = len(entries)
+        return True
+
+    def start_scan(self):
+        """카운터 초기화 스캔을 요청 경로 밖(데몬 스레드)에서 시작"""
+        if self.enabled:
+            threading.Thread(target=self._init_counters, name="feature-cache-scan", daemon=True).start()
+
+    def _init_counters(self):
+        entries = self._scan()
+        with self._lock:
+            if self._bytes is None:  # 그 사이 첫 쓰기가 직접 스캔했다면 그대로 둠
+                self._bytes = sum(size for _, size, _ in entries)
+                self._entries = len(entries)
+
+    def _scan(self) -> list:
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def evict(self):
+        """오래 사용하지 않은 항목부터 삭제하여 max_bytes의 90% 이하로 축소"""
+        entries = sorted(self._scan())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        with self._lock:
+            self._bytes = total
+            self._entries = len(entries) - removed
+            self.evictions += removed
+
+    @staticmethod
+    def _features_key(identity: str, params: str) -> str:
+        return hashlib.sha256(f"{identity}|{params}|{FEATURE_VERSION}".encode()).hexdigest()
+
+    @staticmethod
+    def _url_key(url: str) -> str:
+        return "u" + hashlib.sha256(url.encode()).hexdigest()
+
+    def get_features(self, identity: str, params: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        result = self._read(self._features_key(identity, params))
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        (_CACHE_MISS if result is None else _CACHE_HIT).inc()
+        return result
+
+    def put_features(self, identity: str, params: str, result: dict):
+        if self.enabled:
+            self._write(self._features_key(identity, params), result)
+
+    def get_url(self, url: str) -> Optional[dict]:
+        return self._read(self._url_key(url)) if self.enabled else None
+
+    def put_url(self, url: str, identity: str, headers, meta: Optional[dict] = None):
+        """URL → 콘텐츠 식별자와 검증자(ETag/Last-Modified) 기록 (변경이 없으면 쓰지 않음)"""
+        if not self.enabled:
+            return
+        value = {
+            "identity": identity,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+        }
+        if value != meta:
+            self._write(self._url_key(url), value)
+
+    def stats(self) -> dict:
+        """요청 경로에서 호출되므로 스캔하지 않음 (카운터 초기화 전에는 entries / disk_bytes가 None)"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": self._entries,
+                "disk_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+
+feature_cache = FeatureCache(FEATURE_CACHE_DIR, int(FEATURE_CACHE_MAX_MB * 1024 * 1024))
+
+
+def conditional_headers(meta: Optional[dict]) -> dict:
+    """이전 응답의 검증자로 조건부 요청 헤더 생성"""
+    headers = {}
+    if meta:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+def response_identity(headers) -> Optional[str]:
+    """ETag가 있으면 본문을 받지 않고도 콘텐츠 식별 가능"""
+    etag = headers.get("ETag")
+    return f"etag:{etag}:{headers.get('Content-Length', '')}" if etag else None
+
+
+def open_audio(url: str, params: str):
+    """
+    조건부 요청으로 오디오를 열고 캐시를 먼저 확인
+    Returns: (캐시된 결과 또는 None, 응답 또는 None, 식별자 또는 None, URL 메타)
+    """
+    meta = feature_cache.get_url(url)
+    r = requests.get(url, stream=True, timeout=60, headers=conditional_headers(meta))
+    if r.status_code == 304:
+        # 원본 변경 없음 → 다운로드 생략
+        r.close()
+        cached = feature_cache.get_features(meta["identity"], params)
+        if cached is not None:
+            return cached, None, meta["identity"], meta
+        r = requests.get(url, stream=True, timeout=60)  # 캐시 항목이 축출됨 → 다시 받기
+
+    r.raise_for_status()
+    identity = response_identity(r.headers)
+    if identity is not None:
+        cached = feature_cache.get_features(identity, params)
+        if cached is not None:
+            r.close()
+            feature_cache.put_url(url, identity, r.headers, meta)
+            return cached, None, identity, meta
+    return None, r, identity, meta
+
+
+class HashingResponse:
+    """iter_content로 읽는 본문의 sha256을 함께 계산 (ETag 없는 원본의 콘텐츠 식별자)"""
+
+    def __init__(self, response):
+        self.response = response
+        self.digest = hashlib.sha256()
+
+    def iter_content(self, chunk_size: int):
+        for chunk in self.response.iter_content(chunk_size):
+            self.digest.update(chunk)
+            yield chunk
+
+
+def analyze_streaming(req: Req, opts: AnalysisOptions) -> dict:
+    """임시 파일 없이 다운로드 → 디코딩 → 리샘플 → 특징 누적을 블록 단위로 수행"""
+    with stage("stream_analyze"):
+        cached, r, identity, meta = open_audio(req.audio_url, opts.cache_params)
+        if cached is not None:
+            return cached
+
+        with r:
+            body = HashingResponse(r)
+            features = StreamingFeatures(req.target_sr, opts.timeline_sec)
+            for _, y in iter_audio_blocks(body, req.target_sr, quality=opts.quality):
+                features.feed(y)
+        result = features.finish()
+
+    identity = identity or "sha256:" + body.digest.hexdigest()
+    feature_cache.put_features(identity, opts.cache_params, result)
+    feature_cache.put_url(req.audio_url, identity, r.headers, meta)
+    return result
+
+
+# ===== 배치 분석 / 작업 큐 =====
+# CPU 작업(디코딩 + DSP)은 프로세스 풀에서, 다운로드는 커넥션 풀을 공유하는 비동기 HTTP 클라이언트로 처리
+
+
+def _cpu_count() -> int:
+    """컨테이너에 할당된 CPU 수 (affinity 기준, gunicorn.conf.py와 같은 기준)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# 프로세스 풀은 gunicorn 워커마다 하나씩 생기므로 CPU를 워커 수로 나눔 (워커 수 × 풀 크기 ≈ CPU 수)
+# WEB_CONCURRENCY는 gunicorn.conf.py가 설정 (uvicorn 단독 실행이면 1)
+WEB_WORKERS = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+ANALYZE_WORKERS = int(os.getenv("ANALYZE_WORKERS", str(max(1, _cpu_count() // WEB_WORKERS))))
+_BATCH_MAX = int(os.getenv("ANALYZE_BATCH_MAX", "100"))
+# 초과 시 429 (기본값은 배치 하나는 받을 수 있도록 ANALYZE_BATCH_MAX 이상)
+ANALYZE_MAX_PENDING = int(os.getenv("ANALYZE_MAX_PENDING", str(max(ANALYZE_WORKERS * 8, _BATCH_MAX))))
+# 대기열보다 큰 배치는 한가할 때도 reserve_slots에서 429가 되어 재시도해도 받을 수 없으므로 대기열 크기로 제한 (초과 시 400)
+ANALYZE_BATCH_MAX = min(_BATCH_MAX, ANALYZE_MAX_PENDING)
+ANALYZE_DOWNLOAD_CONCURRENCY = int(os.getenv("ANALYZE_DOWNLOAD_CONCURRENCY", str(ANALYZE_WORKERS * 2)))
+ANALYZE_JOBS_DIR = os.getenv("ANALYZE_JOBS_DIR", os.path.join(tempfile.gettempdir(), "analyze_jobs"))
+# 마지막 상태 기록 후 이 시간이 지난 작업 파일은 조회 시 404, 작업 등록 시 정리 (0이면 삭제하지 않음)
+ANALYZE_JOB_TTL_SEC = float(os.getenv("ANALYZE_JOB_TTL_SEC", "3600"))
+
+_process_pool = None
+_http_client = None
+_download_slots = None
+_pending = 0
+_job_tasks = set()
+_next_job_sweep = 0.0
+
+
+class BatchReq(BaseModel):
+    audio_urls: list[str]
+    target_sr: int = 16000
+    resample_quality: Optional[str] = None
+    native_rate: Optional[bool] = None
+    timeline_sec: Optional[float] = Field(None, ge=TIMELINE_MIN_SEC, allow_inf_nan=False)
+
+
+def analyze_audio(
+    y: np.ndarray, sr: int, rms: Optional[np.ndarray] = None, timeline_sec: Optional[float] = None,
+) -> dict:
+    """
+    디코딩된 mono 신호에서 특징 추출
+    rms: 미리 계산한 프레임별 RMS (native_rate: 원본 레이트에서 계산), 있으면 extractor는 RMS 열을 건너뜀
+    timeline_sec: 지정 시 같은 프레임 특징으로 구간별 시계열(timeline)도 계산
+    """
+    # RMS / ZCR / Spectral Centroid - 단일 프레이밍 패스
+    with stage("features"):
+        frame_rms, zcr, sc = FrameFeatureExtractor(sr).extract(y, with_rms=rms is None)
+        if rms is None:
+            rms = frame_rms
+
+    # SNR / 말속도
+    with stage("energy_stats"):
+        result = summarize_features(sr, len(y), rms, zcr.mean(), sc.mean())
+        if timeline_sec:
+            result["timeline"] = feature_timeline(sr, len(y), rms, zcr, sc, timeline_sec)
+        return result
+
+
+def analyze_file(path, opts: AnalysisOptions, decode=decode_audio) -> dict:
+    """
+    오디오 파일(경로 또는 file-like)을 디코딩/리샘플 후 분석
+    native_rate이면 RMS를 먼저 원본 신호에서 계산하고, 리샘플 신호로는 ZCR/센트로이드만 계산
+    """
+    with stage("decode"):
+        y_native, sr_native = decode(path)
+    rms = None
+    if opts.native_rate:
+        with stage("features"):
+            rms = native_rate_rms(y_native, sr_native, opts.target_sr)
+    with stage("resample"):
+        y = resample(y_native, sr_native, opts.target_sr, opts.quality)
+    del y_native  # 원본 레이트 신호는 더 필요 없음 (특징 추출 중 메모리 절약)
+    return analyze_audio(y, opts.target_sr, rms, opts.timeline_sec)
+
+
+def decode_bytes(data: bytes) -> tuple[np.ndarray, int]:
+    """메모리의 오디오 바이트 디코딩, soundfile이 못 읽는 포맷(webm/mp3 등)만 임시 파일로 librosa 디코딩"""
+    try:
+        return decode_audio(io.BytesIO(data))
+    except sf.SoundFileError:
+        pass
+
+    with tempfile.NamedTemporaryFile(suffix=".tmp") as f:
+        f.write(data)
+        f.flush()
+        return decode_audio(f.name)
+
+
+def analyze_bytes(data: bytes, opts: AnalysisOptions) -> dict:
+    """(프로세스 풀 워커) 메모리의 오디오 바이트를 분석 (분석 중 오류는 디코딩 폴백 없이 그대로 전달)"""
+    return analyze_file(data, opts, decode=decode_bytes)
+
+
+def analyze_url(req: Req, opts: AnalysisOptions) -> dict:
+    """오디오를 임시 파일로 다운로드 후 분석 (특징 캐시 적중 시 다운로드/디코딩 생략)"""
+    temp_path = None
+    try:
+        # 오디오 다운로드
+        with stage("download"):
+            cached, r, identity, meta = open_audio(req.audio_url, opts.cache_params)
+            if cached is not None:
+                return cached
+
+            digest = hashlib.sha256()
+            with r, tempfile.NamedTemporaryFile(delete=False, suffix=".tmp") as f:
+                temp_path = f.name
+                for chunk in r.iter_content(1024 * 256):
+                    if chunk:
+                        f.write(chunk)
+                        digest.update(chunk)
+
+        if identity is None:
+            # ETag가 없는 원본: 본문 해시로 식별 (다른 URL의 같은 파일도 적중)
+            identity = "sha256:" + digest.hexdigest()
+            cached = feature_cache.get_features(identity, opts.cache_params)
+            if cached is not None:
+                feature_cache.put_url(req.audio_url, identity, r.headers, meta)
+                return cached
+
+        result = analyze_file(temp_path, opts)
+        feature_cache.put_features(identity, opts.cache_params, result)
+        feature_cache.put_url(req.audio_url, identity, r.headers, meta)
+        return result
+    finally:
+        # 임시 파일 삭제
+        if temp_path and os.path.exists(temp_path):
+            try:
+                os.unlink(temp_path)
+            except:
+                pass
+
+
+def get_process_pool():
+    """
+    워커 프로세스마다 처음 사용할 때 생성 (gunicorn preload 시 master에서 만들지 않도록 지연 생성)
+    forkserver 컨텍스트: 자식은 이 모듈을 미리 import(워밍업 포함)한 단일 스레드 forkserver에서 fork되므로
+    자식끼리 import된 librosa/numpy를 공유하고, 워커에 스레드나 ffmpeg 파이프가 열려 있는 요청 처리 중에
+    풀을 다시 만들어도 안전합니다 (fork 컨텍스트는 스트리밍 분석의 ffmpeg stdin 쓰기 쪽이 자식에게 복제되어
+    ffmpeg가 EOF를 받지 못하고 멈춤).
+    """
+    global _process_pool
+    if _process_pool is None:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload([__name__])
+        _process_pool = ProcessPoolExecutor(max_workers=ANALYZE_WORKERS, mp_context=ctx)
+    return _process_pool
+
+
+async def run_in_process_pool(fn, *args):
+    """
+    프로세스 풀에서 fn 실행
+    자식이 비정상 종료(OOM 등)해 풀이 깨졌으면 BrokenProcessPool을 그대로 올리고 다음 요청부터 새 풀을 사용
+    """
+    from concurrent.futures.process import BrokenProcessPool
+
+    global _process_pool
+    pool = get_process_pool()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        if _process_pool is pool:  # 같은 풀에서 함께 실패한 다른 요청이 이미 교체했으면 그대로 둠
+            _process_pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+        raise
+
+
+def get_http_client():
+    """
+    keep-alive 커넥션 풀을 공유하는 비동기 클라이언트 (이벤트 루프 안에서 지연 생성)
+    동시 다운로드 수는 ANALYZE_DOWNLOAD_CONCURRENCY로 제한 (한 번에 수십 개를 열면 오히려 느려지고 메모리도 증가)
+    """
+    global _http_client, _download_slots
+    if _http_client is None:
+        import httpx
+        _http_client = httpx.AsyncClient(
+            timeout=60,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=ANALYZE_DOWNLOAD_CONCURRENCY,
+                max_keepalive_connections=ANALYZE_DOWNLOAD_CONCURRENCY,
+            ),
+        )
+        _download_slots = asyncio.Semaphore(ANALYZE_DOWNLOAD_CONCURRENCY)
+    return _http_client
+
+
+async def start_process_pool():
+    """
+    워커 시작 시 forkserver와 풀 자식들을 미리 생성 (첫 배치 요청이 모듈 import / 워밍업 시간을 기다리지 않도록)
+    forkserver 컨텍스트 풀은 유휴 자식이 없을 때 submit마다 하나씩 만들므로 max_workers개를 동시에 제출
+    """
+    if ANALYZE_WORKERS > 0:
+        await asyncio.gather(*(run_in_process_pool(os.getpid) for _ in range(ANALYZE_WORKERS)))
+
+
+async def shutdown_batch_resources():
+    global _http_client, _process_pool
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+def reserve_slots(n: int):
+    """처리 대기 항목 수가 ANALYZE_MAX_PENDING을 넘으면 429로 거절 (backpressure)"""
+    global _pending
+    if _pending + n > ANALYZE_MAX_PENDING:
+        raise HTTPException(
+            status_code=429,
+            detail=f"분석 대기열이 가득 찼습니다 ({_pending}/{ANALYZE_MAX_PENDING})",
+            headers={"Retry-After": "1"},
+        )
+    _pending += n
+
+
+def release_slots(n: int):
+    global _pending
+    _pending -= n
+
+
+async def analyze_one(audio_url: str, opts: AnalysisOptions) -> dict:
+    """한 항목 다운로드(비동기) → 분석(프로세스 풀), 실패는 항목별 error로 반환"""
+    import httpx
+
+    try:
+        client = get_http_client()
+        meta = feature_cache.get_url(audio_url)
+        async with _download_slots:
+            with stage("download"):
+                r = await client.get(audio_url, headers=conditional_headers(meta))
+                if r.status_code == 304:
+                    cached = feature_cache.get_features(meta["identity"], opts.cache_params)
+                    if cached is not None:
+                        return {"audio_url": audio_url, "result": cached}
+                    r = await client.get(audio_url)
+                r.raise_for_status()
+                data = r.content
+
+        identity = response_identity(r.headers) or "sha256:" + hashlib.sha256(data).hexdigest()
+        result = feature_cache.get_features(identity, opts.cache_params)
+        if result is None:
+            result = await run_in_process_pool(analyze_bytes, data, opts)
+            feature_cache.put_features(identity, opts.cache_params, result)
+        feature_cache.put_url(audio_url, identity, r.headers, meta)
+        return {"audio_url": audio_url, "result": result}
+    except httpx.HTTPError as e:
+        return {"audio_url": audio_url, "error": f"오디오 다운로드 실패: {str(e)}"}
+    except Exception as e:
+        return {"audio_url": audio_url, "error": f"오디오 분석 실패: {str(e)}"}
+
+
+def validate_batch(req: BatchReq):
+    if not req.audio_urls:
+        raise HTTPException(status_code=400, detail="audio_urls가 비어 있습니다")
+    if len(req.audio_urls) > ANALYZE_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {ANALYZE_BATCH_MAX}개까지 분석할 수 있습니다")
+
+
+def _job_path(job_id: str) -> str:
+    return os.path.join(ANALYZE_JOBS_DIR, f"{job_id}.json")
+
+
+def _write_job(job_id: str, job: dict):
+    """작업 상태를 파일로 원자적 기록 (같은 인스턴스의 다른 워커에서도 조회 가능)"""
+    os.makedirs(ANALYZE_JOBS_DIR, exist_ok=True)
+    tmp = _job_path(job_id) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(job, f, ensure_ascii=False)
+    os.replace(tmp, _job_path(job_id))
+
+
+def _job_expired(mtime: float, now: float) -> bool:
+    return ANALYZE_JOB_TTL_SEC > 0 and now - mtime > ANALYZE_JOB_TTL_SEC
+
+
+def sweep_jobs(now: Optional[float] = None) -> int:
+    """TTL이 지난 작업 파일(중단된 기록의 .tmp 포함) 삭제, 삭제한 파일 수 반환"""
+    now = time.time() if now is None else now
+    removed = 0
+    try:
+        entries = list(os.scandir(ANALYZE_JOBS_DIR))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_file() and _job_expired(entry.stat().st_mtime, now):
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass  # 다른 워커가 먼저 지움
+    return removed
+
+
+def maybe_sweep_jobs():
+    """작업 등록 시 호출, 디렉터리 스캔은 TTL의 1/10 (최대 60초)에 한 번만"""
+    global _next_job_sweep
+    if ANALYZE_JOB_TTL_SEC <= 0:
+        return
+    now = time.time()
+    if now < _next_job_sweep:
+        return
+    _next_job_sweep = now + min(ANALYZE_JOB_TTL_SEC / 10, 60.0)
+    sweep_jobs(now)
+
+
+async def run_job(job_id: str, req: BatchReq, opts: AnalysisOptions):
+    n = len(req.audio_urls)
+    job = {"job_id": job_id, "status": "running", "total": n, "done": 0, "results": [None] * n}
+    flush_every = max(1, n // 20)
+
+    async def run(i: int, url: str):
+        job["results"][i] = await analyze_one(url, opts)
+        job["done"] += 1
+        if job["done"] % flush_every == 0 and job["done"] < n:
+            _write_job(job_id, job)
+
+    try:
+        await asyncio.gather(*(run(i, url) for i, url in enumerate(req.audio_urls)))
+        job["status"] = "done"
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+    finally:
+        release_slots(n)
+        _write_job(job_id, job)
+
+
+# ===== 워밍업 =====
+# 콜드 스타트 직후 첫 요청이 모듈 로딩/numba JIT 비용을 떠안지 않도록 import 시점에 분석 경로를 한 번 실행
+# (gunicorn preload_app이면 fork 전 master에서 한 번만 실행되고 워커/프로세스 풀이 그대로 물려받음)
+WARMUP = os.getenv("WARMUP", "1") != "0"
+# soundfile이 못 읽는 포맷(webm/mp3 등)의 librosa 디코딩 경로까지 미리 로딩 (numba 캐시가 없으면 수십 초)
+WARMUP_DECODE_FALLBACK = os.getenv("WARMUP_DECODE_FALLBACK", "1") != "0"
+
+
+def warmup():
+    """
+    합성 WAV로 디코딩 → 리샘플 → 특징 추출(일괄/스트리밍) → 요약까지 실행
+    stage()를 거치지 않으므로 stage_duration_seconds 메트릭에는 남지 않습니다.
+    """
+    sr = 44100
+    t = np.arange(sr * 2) / sr
+    tone = (0.1 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 2 * t) > 0)).astype(np.float32)
+    buf = io.BytesIO()
+    sf.write(buf, np.column_stack([tone, tone]), sr, format="WAV")
+    data = buf.getvalue()
+
+    y_native, sr_native = decode_audio(io.BytesIO(data))
+    y = resample(y_native, sr_native, 16000, RESAMPLE_QUALITY)
+    rms, zcr, sc = FrameFeatureExtractor(16000).extract(y)
+    summarize_features(16000, len(y), rms, zcr.mean(), sc.mean())
+    feature_timeline(16000, len(y), rms, zcr, sc, 1.0)
+    native_rate_rms(y_native, sr_native, 16000)
+
+    features = StreamingFeatures(16000, 1.0)
+    features.feed(y)
+    features.finish()
+
+    if WARMUP_DECODE_FALLBACK:
+        import librosa
+        librosa.load(io.BytesIO(data), sr=None, mono=True)
+
+
+if WARMUP:
+    run_warmup(warmup)
 
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    """서비스 상태 (워밍업이 실패한 인스턴스는 503, health_response 참고)"""
+    body = {
+        "status": "ok", "feature_version": FEATURE_VERSION, "feature_cache": feature_cache.stats(),
+    }
+    return health_response(body)
 
 
 @app.post("/analyze")
 async def analyze(req: Req):
     """
     오디오 URL을 분석하여 특징을 추출합니다.
+    (블로킹 다운로드/DSP는 스레드 풀에서 실행하여 이벤트 루프를 막지 않음)
     
     Returns:
         {
@@ -41,78 +1142,72 @@ async def analyze(req: Req):
             "zcr_mean": ZCR 평균,
             "centroid_mean": 스펙트럼 센트로이드 평균,
             "snr_db": SNR (dB),
-            "speech_blocks_per_min": 발화 블록 수 (분당)
+            "speech_blocks_per_min": 발화 블록 수 (분당),
+            "timeline": timeline_sec 지정 시 구간별 위 특징 (float32 little-endian base64)
         }
     """
-    temp_path = None
+    opts = analysis_options(req)
     try:
-        # 오디오 다운로드
-        r = requests.get(req.audio_url, stream=True, timeout=60)
-        r.raise_for_status()
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".tmp") as f:
-            for chunk in r.iter_content(1024 * 256):
-                if chunk:
-                    f.write(chunk)
-            temp_path = f.name
-        
-        # 오디오 로드 (librosa가 포맷 자동 인식)
-        y, sr = librosa.load(temp_path, sr=req.target_sr, mono=True)
-        
-        # 오디오 길이
-        duration_sec = len(y) / sr
-        
-        # 프레임 파라미터
-        frame_len = 2048
-        hop = 512
-        
-        # RMS (Root Mean Square) - 신호 강도
-        rms = librosa.feature.rms(y=y, frame_length=frame_len, hop_length=hop)[0]
-        
-        # ZCR (Zero Crossing Rate) - 주파수 변화율
-        zcr = librosa.feature.zero_crossing_rate(y, frame_length=frame_len, hop_length=hop)[0]
-        
-        # Spectral Centroid - 스펙트럼 중심 주파수
-        sc = librosa.feature.spectral_centroid(y=y, sr=sr, hop_length=hop)[0]
-        
-        # SNR (Signal-to-Noise Ratio) 계산
-        # 간이 방법: 신호 에너지 대비 저에너지 프레임(노이즈) 추정
-        energy = rms ** 2
-        thr = np.percentile(energy, 20)  # 하위 20%를 노이즈로 추정
-        noise = energy[energy <= thr].mean() if np.any(energy <= thr) else energy.mean() * 0.2
-        signal = energy.mean()
-        snr_db = 10 * np.log10(max(signal, 1e-9) / max(noise, 1e-9))
-        
-        # 말속도 추정 (대략)
-        # 무성구간을 공백으로 보고 유성/무성 전이로 발화 블록 수 추정
-        # 분당 블록수 ≈ WPM 근사
-        voiced = energy > (energy.mean() * 0.3)
-        transitions = np.where(np.diff(voiced.astype(int)) == 1)[0]  # 시작점
-        blocks_per_min = (len(transitions) / (duration_sec / 60)) if duration_sec > 0 else 0
-        
-        return {
-            "sr": int(sr),
-            "duration_sec": float(duration_sec),
-            "rms_mean": float(rms.mean()),
-            "zcr_mean": float(zcr.mean()),
-            "centroid_mean": float(sc.mean()),
-            "snr_db": float(snr_db),
-            "speech_blocks_per_min": float(blocks_per_min),
-        }
+        if req.streaming:
+            return await run_in_threadpool(analyze_streaming, req, opts)
+        return await run_in_threadpool(analyze_url, req, opts)
         
     except requests.RequestException as e:
         raise HTTPException(status_code=400, detail=f"오디오 다운로드 실패: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"오디오 분석 실패: {str(e)}")
+
+
+@app.post("/analyze_batch")
+async def analyze_batch(req: BatchReq):
+    """
+    여러 오디오 URL을 한 번에 분석합니다.
+    대기 항목이 ANALYZE_MAX_PENDING을 넘으면 429 (Retry-After)를 반환합니다.
+    
+    Returns:
+        {"results": [{"audio_url": ..., "result": {...}} 또는 {"audio_url": ..., "error": "..."}]}
+    """
+    validate_batch(req)
+    opts = analysis_options(req)
+    reserve_slots(len(req.audio_urls))
+    try:
+        results = await asyncio.gather(*(analyze_one(url, opts) for url in req.audio_urls))
     finally:
-        # 임시 파일 삭제
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
+        release_slots(len(req.audio_urls))
+    return {"results": results}
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(req: BatchReq):
+    """
+    배치 분석을 백그라운드 작업으로 등록합니다. 결과는 GET /jobs/{job_id}로 조회합니다.
+    """
+    validate_batch(req)
+    opts = analysis_options(req)
+    reserve_slots(len(req.audio_urls))
+    maybe_sweep_jobs()
+    job_id = uuid.uuid4().hex
+    _write_job(job_id, {"job_id": job_id, "status": "running", "total": len(req.audio_urls), "done": 0})
+    task = asyncio.create_task(run_job(job_id, req, opts))
+    _job_tasks.add(task)
+    task.add_done_callback(_job_tasks.discard)
+    return {"job_id": job_id, "status": "running"}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    if not job_id.isalnum():
+        raise HTTPException(status_code=400, detail="잘못된 job_id")
+    path = _job_path(job_id)
+    try:
+        if _job_expired(os.path.getmtime(path), time.time()):
+            os.remove(path)
+            raise FileNotFoundError(path)
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"작업이 없습니다: {job_id}")
 
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8080)
-
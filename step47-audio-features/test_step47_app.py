@@ -0,0 +1,246 @@
+"""
+step47 API 테스트 (FastAPI TestClient, 네트워크/오디오 없이 요청 검증 경로만)
+
+실행 (서비스 디렉터리에서, app 모듈을 직접 import하므로 step49 테스트와 따로 실행):
+    cd step47-audio-features && python -m pytest -q
+"""
+
+import asyncio
+import os
+import time
+
+# app import 전에 설정 (모듈 상수)
+os.environ.update(WARMUP="0", FEATURE_CACHE_MAX_MB="0", ANALYZE_WORKERS="1", ANALYZE_MAX_PENDING="4")
+os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import app  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    # with 블록 없이 사용: lifespan(프로세스 풀 생성)을 실행하지 않음
+    return TestClient(app.app)
+
+
+def test_batch_max_is_capped_by_pending_limit():
+    assert app.ANALYZE_BATCH_MAX == app.ANALYZE_MAX_PENDING == 4
+
+
+@pytest.mark.parametrize("path", ["/analyze_batch", "/jobs"])
+def test_batch_larger_than_queue_is_rejected_with_400(client, path):
+    """대기열보다 큰 배치는 429(Retry-After)가 아니라 400: 재시도해도 받을 수 없는 요청"""
+    urls = [f"http://127.0.0.1:9/{i}.wav" for i in range(app.ANALYZE_MAX_PENDING + 1)]
+    r = client.post(path, json={"audio_urls": urls})
+    assert r.status_code == 400
+    assert "Retry-After" not in r.headers
+    assert app._pending == 0
+
+
+def test_batch_rejected_with_429_only_when_queue_is_busy(client, monkeypatch):
+    monkeypatch.setattr(app, "_pending", app.ANALYZE_MAX_PENDING - 1)
+    r = client.post("/analyze_batch", json={"audio_urls": ["http://127.0.0.1:9/a.wav", "http://127.0.0.1:9/b.wav"]})
+    assert r.status_code == 429
+    assert r.headers["Retry-After"] == "1"
+
+
+def test_empty_batch_is_rejected(client):
+    assert client.post("/analyze_batch", json={"audio_urls": []}).status_code == 400
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/analyze", '"audio_url": "http://127.0.0.1:9/a.wav"'),
+    ("/analyze_batch", '"audio_urls": ["http://127.0.0.1:9/a.wav"]'),
+    ("/jobs", '"audio_urls": ["http://127.0.0.1:9/a.wav"]'),
+])
+@pytest.mark.parametrize("timeline_sec", ["NaN", "Infinity", "-Infinity", "0.1", "-1"])
+def test_invalid_timeline_sec_is_rejected(client, path, body, timeline_sec):
+    """NaN/inf는 JSON 파서를 통과하므로 모델에서 거절 (구간 수 계산 전에 422)"""
+    r = client.post(
+        path, content=f'{{{body}, "timeline_sec": {timeline_sec}}}', headers={"Content-Type": "application/json"},
+    )
+    assert r.status_code == 422
+    assert r.json()["detail"][0]["loc"][-1] == "timeline_sec"
+    assert app._pending == 0
+
+
+def _import_constants(**env) -> dict:
+    """새 프로세스에서 app을 import해 풀 크기 관련 상수 조회 (모듈 상수는 import 시점에 정해짐)"""
+    import json
+    import subprocess
+    import sys
+
+    base = {k: v for k, v in os.environ.items() if not k.startswith(("ANALYZE_", "WEB_CONCURRENCY"))}
+    code = "import app, json; print(json.dumps([app.ANALYZE_WORKERS, app.ANALYZE_MAX_PENDING, app.ANALYZE_BATCH_MAX]))"
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)), env=dict(base, **env),
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return dict(zip(["workers", "max_pending", "batch_max"], json.loads(out.strip().splitlines()[-1])))
+
+
+def test_process_pool_is_split_across_gunicorn_workers():
+    """gunicorn 워커마다 풀이 생기므로 워커 수 × 풀 크기가 CPU 수를 넘지 않음"""
+    cpus = app._cpu_count()
+    assert _import_constants()["workers"] == cpus  # uvicorn 단독 실행
+    assert _import_constants(WEB_CONCURRENCY=str(cpus))["workers"] == 1
+    assert _import_constants(WEB_CONCURRENCY=str(cpus * 4))["workers"] == 1
+
+
+def test_default_pending_limit_admits_one_full_batch():
+    constants = _import_constants(WEB_CONCURRENCY="64")
+    assert constants["batch_max"] == 100 <= constants["max_pending"]
+
+
+def test_analyze_bytes_falls_back_only_on_decode_errors(monkeypatch):
+    decoded = []
+
+    def fake_decode(path):
+        decoded.append(path)
+        if not isinstance(path, str):
+            raise app.sf.SoundFileError("Format not recognised")
+        return np.zeros(16000, dtype=np.float32), 16000
+
+    monkeypatch.setattr(app, "decode_audio", fake_decode)
+    opts = app.AnalysisOptions(16000, "HQ", False)
+    assert app.analyze_bytes(b"webm", opts)["duration_sec"] == 1.0
+    assert len(decoded) == 2 and isinstance(decoded[1], str)  # file-like 실패 후 임시 파일로 한 번 더
+
+    # 디코딩 이후 분석 단계의 RuntimeError는 임시 파일로 다시 디코딩하지 않고 그대로 전달
+    def broken(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    decoded.clear()
+    monkeypatch.setattr(app, "decode_audio", lambda path: decoded.append(path) or (np.zeros(16000, np.float32), 16000))
+    monkeypatch.setattr(app, "analyze_audio", broken)
+    with pytest.raises(RuntimeError, match="boom"):
+        app.analyze_bytes(b"wav", opts)
+    assert len(decoded) == 1
+
+
+def test_broken_process_pool_is_replaced():
+    from concurrent.futures.process import BrokenProcessPool
+
+    async def run():
+        first = app.get_process_pool()
+        with pytest.raises(BrokenProcessPool):
+            await app.run_in_process_pool(os._exit, 1)  # 자식 비정상 종료
+        assert app._process_pool is None
+        pid = await app.run_in_process_pool(os.getpid)
+        assert app._process_pool is not first and pid != os.getpid()
+
+    try:
+        asyncio.run(run())
+    finally:
+        if app._process_pool is not None:
+            app._process_pool.shutdown(cancel_futures=True)
+            app._process_pool = None
+
+
+def test_lifespan_starts_and_stops_process_pool():
+    with TestClient(app.app) as client:
+        pool = app._process_pool
+        assert pool is not None and len(pool._processes) == app.ANALYZE_WORKERS
+        assert client.get("/health").status_code == 200
+    assert app._process_pool is None and pool._shutdown_thread
+
+
+@pytest.fixture
+def jobs_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "ANALYZE_JOBS_DIR", str(tmp_path))
+    monkeypatch.setattr(app, "ANALYZE_JOB_TTL_SEC", 60.0)
+    return tmp_path
+
+
+def _write_aged_job(job_id: str, age_sec: float) -> str:
+    app._write_job(job_id, {"job_id": job_id, "status": "done"})
+    path = app._job_path(job_id)
+    mtime = time.time() - age_sec
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_sweep_removes_only_expired_job_files(jobs_dir):
+    old, fresh = _write_aged_job("old", 120), _write_aged_job("fresh", 10)
+    stale_tmp = jobs_dir / "crashed.json.tmp"
+    stale_tmp.write_text("{}")
+    os.utime(stale_tmp, (time.time() - 120,) * 2)
+
+    assert app.sweep_jobs() == 2
+    assert not os.path.exists(old) and not stale_tmp.exists()
+    assert os.path.exists(fresh)
+
+
+def test_sweep_is_disabled_with_zero_ttl(jobs_dir, monkeypatch):
+    monkeypatch.setattr(app, "ANALYZE_JOB_TTL_SEC", 0.0)
+    path = _write_aged_job("old", 10**6)
+    assert app.sweep_jobs() == 0
+    assert os.path.exists(path)
+
+
+def test_expired_job_lookup_returns_404(client, jobs_dir):
+    _write_aged_job("fresh", 10)
+    path = _write_aged_job("old", 120)
+    assert client.get("/jobs/fresh").json()["status"] == "done"
+    assert client.get("/jobs/old").status_code == 404
+    assert not os.path.exists(path)
+
+
+def test_cache_stats_use_counters_instead_of_rescanning(tmp_path, monkeypatch):
+    cache = app.FeatureCache(str(tmp_path), max_bytes=10**6)
+    cache.put_features("sha256:a", "p", {"x": 1})
+    cache.put_features("sha256:a", "p", {"x": 2})  # 덮어쓰기는 항목 수를 늘리지 않음
+    cache.put_features("sha256:b", "p", {"x": 3})
+    scanned = sorted(cache._scan())
+
+    def no_scan():
+        raise AssertionError("stats()가 디렉터리를 스캔함")
+
+    monkeypatch.setattr(cache, "_scan", no_scan)
+    stats = cache.stats()
+    assert stats["entries"] == len(scanned) == 2
+    assert stats["disk_bytes"] == sum(size for _, size, _ in scanned)
+
+
+def test_cache_stats_report_none_until_background_scan(tmp_path, monkeypatch):
+    app.FeatureCache(str(tmp_path), max_bytes=10**6).put_features("sha256:a", "p", {"x": 1})
+    cache = app.FeatureCache(str(tmp_path), max_bytes=10**6)  # 새 워커: 카운터 비어 있음
+    scan = cache._scan
+
+    def no_scan():
+        raise AssertionError("stats()가 디렉터리를 스캔함")
+
+    monkeypatch.setattr(cache, "_scan", no_scan)
+    stats = cache.stats()
+    assert stats["entries"] is None and stats["disk_bytes"] is None
+
+    monkeypatch.setattr(cache, "_scan", scan)
+    cache.start_scan()
+    deadline = time.monotonic() + 5
+    while cache.stats()["entries"] is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["disk_bytes"] == sum(size for _, size, _ in scan())
+
+
+def test_cache_counters_follow_eviction(tmp_path):
+    cache = app.FeatureCache(str(tmp_path), max_bytes=10**6)
+    for i in range(10):
+        cache.put_features(f"sha256:{i}", "p", {"x": "y" * 100})
+    cache.max_bytes = cache.stats()["disk_bytes"] // 2
+    cache.evict()
+    stats = cache.stats()
+    scanned = cache._scan()
+    assert 0 < stats["entries"] == len(scanned) < 10
+    assert stats["disk_bytes"] == sum(size for _, size, _ in scanned) <= cache.max_bytes
+
+
+def test_health_is_503_when_warmup_failed(client, monkeypatch):
+    assert client.get("/health").json()["status"] == "ok"
+    monkeypatch.setitem(app.warmup_state, "error", "RuntimeError: boom")
+    r = client.get("/health")
+    assert r.status_code == 503 and r.json()["status"] == "warmup_failed"
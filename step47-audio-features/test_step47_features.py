@@ -0,0 +1,254 @@
+"""
+step47 특징 추출 수치 테스트 (합성 신호, 네트워크 없음)
+
+- FrameFeatureExtractor ↔ librosa.feature.rms / zero_crossing_rate / spectral_centroid
+- native_rate(원본 레이트 RMS) ↔ 리샘플 후 RMS
+- 스트리밍(StreamingFeatures / iter_audio_blocks) ↔ 파일 모드(analyze_file)
+
+실행 (서비스 디렉터리에서, test_step47_app.py와 같은 세션):
+    cd step47-audio-features && python -m pytest -q
+"""
+
+import os
+
+# app import 전에 설정 (모듈 상수, test_step47_app.py와 같은 값)
+os.environ.update(WARMUP="0", FEATURE_CACHE_MAX_MB="0", ANALYZE_WORKERS="1", ANALYZE_MAX_PENDING="4")
+os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+
+import base64  # noqa: E402
+import io  # noqa: E402
+import shutil  # noqa: E402
+
+import librosa  # noqa: E402
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+import soundfile as sf  # noqa: E402
+
+import app  # noqa: E402
+
+# 허용 오차
+# - RMS: librosa.feature.rms는 입력 dtype과 무관하게 float32로 반환 → float32 반올림 수준
+# - ZCR: 정수 교차 수 / FRAME_LEN이므로 정확히 같아야 함
+# - 센트로이드: FFT를 extractor dtype으로 계산 (float32는 complex64 rfft, librosa도 complex64 STFT)
+RMS_TOL = dict(rtol=1e-6, atol=1e-7)
+ZCR_TOL = dict(rtol=0, atol=1e-12)
+CENTROID_TOL = {
+    np.float32: dict(rtol=1e-5, atol=1e-2),  # Hz
+    np.float64: dict(rtol=1e-10, atol=1e-8),
+}
+
+
+def synth(n: int, sr: int, dtype, seed: int = 30) -> np.ndarray:
+    """사인파 + 처프 + 잡음, 중간에 완전 무음 구간 (ZCR 0 / 센트로이드 0 프레임 포함)"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / sr
+    y = 0.4 * np.sin(2 * np.pi * 220 * t) + 0.2 * np.sin(2 * np.pi * (300 + 2000 * t) * t)
+    y += 0.05 * rng.standard_normal(n)
+    y[n // 3: n // 3 + min(n // 4, 3 * app.FRAME_LEN)] = 0.0
+    return y.astype(dtype)
+
+
+def reference(y: np.ndarray, sr: int):
+    kw = dict(frame_length=app.FRAME_LEN, hop_length=app.HOP, center=True)
+    rms = librosa.feature.rms(y=y, **kw)[0]
+    zcr = librosa.feature.zero_crossing_rate(y, **kw)[0]
+    centroid = librosa.feature.spectral_centroid(
+        y=y, sr=sr, n_fft=app.FRAME_LEN, hop_length=app.HOP, center=True, window="hann",
+    )[0]
+    return rms, zcr, centroid
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+@pytest.mark.parametrize("n", [
+    100,  # FRAME_LEN // 2보다 짧음 (프레임 1개, 전부 패딩)
+    app.FRAME_LEN - 1,
+    16000 + 333,  # 홀수 길이, HOP의 배수 아님
+    app.HOP * app.FEATURE_CHUNK_FRAMES + 777,  # FEATURE_CHUNK_FRAMES 경계를 넘는 길이
+])
+def test_extractor_matches_librosa(dtype, n):
+    sr = 16000
+    y = synth(n, sr, dtype)
+    rms, zcr, centroid = app.FrameFeatureExtractor(sr, dtype=dtype).extract(y)
+    ref_rms, ref_zcr, ref_centroid = reference(y, sr)
+
+    assert len(rms) == len(zcr) == len(centroid) == len(ref_rms) == 1 + n // app.HOP
+    np.testing.assert_allclose(rms, ref_rms, **RMS_TOL)
+    np.testing.assert_allclose(zcr, ref_zcr, **ZCR_TOL)
+    np.testing.assert_allclose(centroid, ref_centroid, **CENTROID_TOL[dtype])
+
+
+def test_extractor_matches_librosa_at_other_rate():
+    sr = 44100
+    y = synth(sr // 2 + 1, sr, np.float64)
+    rms, zcr, centroid = app.FrameFeatureExtractor(sr, dtype=np.float64).extract(y)
+    ref_rms, ref_zcr, ref_centroid = reference(y, sr)
+    np.testing.assert_allclose(rms, ref_rms, **RMS_TOL)
+    np.testing.assert_allclose(zcr, ref_zcr, **ZCR_TOL)
+    np.testing.assert_allclose(centroid, ref_centroid, **CENTROID_TOL[np.float64])
+
+
+def test_silence_has_zero_features():
+    y = np.zeros(5000, dtype=np.float32)
+    rms, zcr, centroid = app.FrameFeatureExtractor(16000).extract(y)
+    ref_rms, ref_zcr, ref_centroid = reference(y, 16000)
+    assert not rms.any() and not zcr.any() and not centroid.any()
+    assert not ref_rms.any() and not ref_zcr.any() and not ref_centroid.any()
+
+
+def test_extractor_can_skip_rms():
+    y = synth(16000 + 333, 16000, np.float32)
+    rms, zcr, centroid = app.FrameFeatureExtractor(16000).extract(y, with_rms=False)
+    _, ref_zcr, ref_centroid = app.FrameFeatureExtractor(16000).extract(y)
+    assert rms is None
+    np.testing.assert_array_equal(zcr, ref_zcr)
+    np.testing.assert_array_equal(centroid, ref_centroid)
+
+
+def timeline_values(result: dict, key: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(result["timeline"][key]), dtype="<f4")
+
+
+@pytest.mark.parametrize("sr", [44100, 48000])
+def test_native_rate_matches_resampled(sr):
+    """대역 제한 신호(< target_sr / 2)에서는 원본 레이트 RMS와 리샘플 후 RMS가 같아야 함"""
+    t = np.arange(3 * sr + 123) / sr
+    y = (0.3 * np.sin(2 * np.pi * 220 * t) + 0.1 * np.sin(2 * np.pi * 1500 * t)) * (np.sin(2 * np.pi * 1.5 * t) > 0)
+    buf = io.BytesIO()
+    sf.write(buf, y.astype(np.float32), sr, format="WAV", subtype="FLOAT")
+
+    results = {}
+    for native in (False, True):
+        buf.seek(0)
+        results[native] = app.analyze_file(buf, app.AnalysisOptions(16000, "HQ", native, 1.0))
+    resampled, native = results[False], results[True]
+
+    # ZCR / 센트로이드는 두 모드 모두 리샘플 신호에서 계산
+    for key in ("sr", "duration_sec", "zcr_mean", "centroid_mean", "speech_blocks_per_min"):
+        assert native[key] == resampled[key], key
+    np.testing.assert_allclose(native["rms_mean"], resampled["rms_mean"], rtol=1e-3)
+    np.testing.assert_allclose(native["snr_db"], resampled["snr_db"], rtol=1e-3)
+    assert native["timeline"]["n_chunks"] == resampled["timeline"]["n_chunks"] == 4
+    np.testing.assert_allclose(timeline_values(native, "rms_mean"), timeline_values(resampled, "rms_mean"), rtol=1e-3)
+
+
+# ----- 스트리밍 ↔ 파일 모드 -----
+
+# 블록 경계에서 잘린 프레임도 같은 값이어야 함 (RMS는 누적합 시작 위치만 달라 float64 반올림 수준)
+STREAM_RMS_TOL = dict(rtol=1e-9, atol=1e-12)
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg 필요")
+
+
+class FakeResponse:
+    """iter_audio_blocks에 넘길 응답 (본문을 chunk_size보다 작은 조각으로 나눠 전달)"""
+
+    def __init__(self, data: bytes, piece: int = 10007):
+        self.data = data
+        self.piece = piece
+
+    def iter_content(self, chunk_size: int):
+        for i in range(0, len(self.data), min(chunk_size, self.piece)):
+            yield self.data[i:i + min(chunk_size, self.piece)]
+
+
+def wav_bytes(y: np.ndarray, sr: int) -> bytes:
+    buf = io.BytesIO()
+    sf.write(buf, y, sr, format="WAV", subtype="FLOAT")
+    return buf.getvalue()
+
+
+def stream(blocks, sr: int, timeline_sec=None) -> tuple[dict, app.StreamingFeatures]:
+    features = app.StreamingFeatures(sr, timeline_sec)
+    for block in blocks:
+        features.feed(block)
+    return features.finish(), features
+
+
+def assert_same_result(streamed: dict, expected: dict, rtol: float):
+    assert streamed.keys() == expected.keys()
+    for key in ("sr", "duration_sec", "speech_blocks_per_min"):
+        assert streamed[key] == expected[key], key
+    for key in ("rms_mean", "zcr_mean", "centroid_mean", "snr_db"):
+        np.testing.assert_allclose(streamed[key], expected[key], rtol=rtol, err_msg=key)
+    if "timeline" in expected:
+        assert streamed["timeline"]["n_chunks"] == expected["timeline"]["n_chunks"]
+        for key in ("rms_mean", "zcr_mean", "centroid_mean", "snr_db", "speech_blocks_per_min"):
+            np.testing.assert_allclose(
+                timeline_values(streamed, key), timeline_values(expected, key), rtol=rtol, atol=1e-6, err_msg=key,
+            )
+
+
+@pytest.mark.parametrize("block", [
+    1,
+    app.HOP - 1,
+    app.HOP,
+    app.FRAME_LEN // 2,  # 첫 블록이 앞쪽 패딩과 합쳐 정확히 한 프레임
+    app.FRAME_LEN + 1,
+    app.HOP * app.FEATURE_CHUNK_FRAMES + 3,  # 한 블록에서 FEATURE_CHUNK_FRAMES보다 많은 프레임
+])
+@pytest.mark.parametrize("n", [
+    app.FRAME_LEN // 2 - 1,  # 프레임 하나가 앞뒤 패딩에 걸침
+    16000 * 3 + 333,  # 마지막 블록이 블록 크기보다 짧음
+    app.HOP * 40,  # HOP의 배수 (끝 프레임이 전부 뒤쪽 패딩)
+])
+def test_streaming_matches_extractor_across_block_boundaries(block, n):
+    sr = 16000
+    y = synth(n, sr, np.float32)
+    if block == 1 and n > 20000:
+        block = 997  # 1샘플 블록은 짧은 신호에서만 (한 번에 한 샘플씩이면 느림)
+    streamed, features = stream((y[i:i + block] for i in range(0, n, block)), sr, timeline_sec=1.0)
+
+    rms, zcr, centroid = app.FrameFeatureExtractor(sr).extract(y)
+    assert len(np.concatenate(features._rms)) == len(rms) == 1 + n // app.HOP
+    np.testing.assert_allclose(np.concatenate(features._rms), rms, **STREAM_RMS_TOL)
+    np.testing.assert_array_equal(np.concatenate(features._zcr), zcr)
+    np.testing.assert_allclose(np.concatenate(features._centroid), centroid, rtol=1e-5, atol=1e-2)
+    assert_same_result(streamed, app.analyze_audio(y, sr, timeline_sec=1.0), rtol=1e-5)
+
+
+def test_streaming_ignores_empty_blocks_and_rejects_empty_input():
+    y = synth(5000, 16000, np.float32)
+    empty = np.zeros(0, dtype=np.float32)
+    streamed, _ = stream([empty, y[:1000], empty, y[1000:], empty], 16000)
+    assert_same_result(streamed, app.analyze_audio(y, 16000), rtol=1e-5)
+    with pytest.raises(ValueError):
+        stream([empty], 16000)
+
+
+@requires_ffmpeg
+@pytest.mark.parametrize("sr, channels", [(16000, 1), (44100, 2), (48000, 1)])
+def test_iter_audio_blocks_matches_resample(sr, channels):
+    """블록별 스트리밍 리샘플 + 마지막 블록 flush ↔ 파일 전체 한 번에 리샘플 (길이 동일, 값은 soxr 오차 수준)"""
+    n = int(2.3 * sr) + 17  # 블록 0.25초 → 마지막 블록이 짧음
+    y = synth(n * channels, sr, np.float32).reshape(n, channels)
+    blocks = list(app.iter_audio_blocks(FakeResponse(wav_bytes(y, sr)), 16000, block_sec=0.25, quality="HQ"))
+
+    assert all(block_sr == 16000 for block_sr, _ in blocks)
+    assert len(blocks) == int(2.3 / 0.25) + 1
+    streamed = np.concatenate([b for _, b in blocks])
+    expected = app.resample(app.downmix(y), sr, 16000, "HQ")
+    assert streamed.dtype == np.float32
+    assert len(streamed) == len(expected)  # 리샘플러 지연분이 마지막 블록에서 모두 나옴
+    if sr == 16000:
+        np.testing.assert_array_equal(streamed, expected)
+    else:
+        np.testing.assert_allclose(streamed, expected, atol=1e-5)
+
+
+@requires_ffmpeg
+def test_iter_audio_blocks_reports_decode_errors():
+    with pytest.raises(ValueError):
+        list(app.iter_audio_blocks(FakeResponse(b"not audio" * 100), 16000))
+
+
+@requires_ffmpeg
+@pytest.mark.parametrize("sr", [16000, 44100])
+def test_streaming_analysis_matches_file_mode(sr):
+    n = int(3.1 * sr) + 5
+    t = np.arange(n) / sr
+    y = ((0.3 * np.sin(2 * np.pi * 220 * t) + 0.1 * np.sin(2 * np.pi * 1500 * t)) * (np.sin(2 * np.pi * 1.5 * t) > 0))
+    data = wav_bytes(np.column_stack([y, 0.5 * y]).astype(np.float32), sr)
+
+    expected = app.analyze_file(io.BytesIO(data), app.AnalysisOptions(16000, "HQ", False, 1.0))
+    blocks = app.iter_audio_blocks(FakeResponse(data), 16000, block_sec=0.7, quality="HQ")
+    streamed, _ = stream((b for _, b in blocks), 16000, timeline_sec=1.0)
+    assert_same_result(streamed, expected, rtol=1e-4)
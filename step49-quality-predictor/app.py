@@ -4,27 +4,228 @@ ML 모델을 사용하여 튜닝 파라미터의 효과를 예측
 """
 
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, conint
 import uvicorn
 import numpy as np
+import json
+import math
 import os
+import sys
+import threading
+import time
+from collections import OrderedDict
 from typing import Optional
 
+from prometheus_client import Counter, Gauge
+
+# 공통 모듈 (메트릭 / 프로파일링 / 워밍업 상태): 이미지에서는 app.py 옆에 복사, 저장소에서는 ../service-common
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "service-common"))
+import service_common  # noqa: E402
+from service_common import health_response, run_warmup, stage, warmup_state  # noqa: E402,F401
+
 app = FastAPI()
+service_common.install(app)
+
+
+# 서비스별 메트릭 (캐시 결과 child는 핫패스에서 label 조회를 피하기 위해 미리 생성)
+PREDICT_CACHE_REQUESTS = Counter("predict_cache_requests_total", "예측 캐시 조회 수", ["result"])
+_CACHE_HIT = PREDICT_CACHE_REQUESTS.labels("hit")
+_CACHE_MISS = PREDICT_CACHE_REQUESTS.labels("miss")
+MODEL_VERSION_INFO = Gauge("model_version", "로드된 모델 버전 (워커별)", multiprocess_mode="liveall")
+MODEL_LOADED = Gauge("model_loaded", "실제 모델 사용 여부", multiprocess_mode="liveall")
+
+
+# 모델 상태 (버전은 로드할 때마다 증가, 예측 캐시 키에 포함)
+MODEL_PATH = os.getenv("MODEL_PATH", "model_quality_predictor.pkl")
+MODEL_MMAP = os.getenv("MODEL_MMAP", "1") != "0"  # 워커 간 읽기 전용 mmap 공유
+MODEL_CHECK_INTERVAL_SEC = float(os.getenv("MODEL_CHECK_INTERVAL_SEC", "5"))
+model = None
+USE_MODEL = False
+MODEL_VERSION = 0
+MODEL_MTIME = None
+_last_model_check = 0.0
+
+# 예측 캐시 설정
+PREDICT_CACHE_SIZE = int(os.getenv("PREDICT_CACHE_SIZE", "4096"))  # 0이면 비활성화
+PREDICT_CACHE_TTL_SEC = float(os.getenv("PREDICT_CACHE_TTL_SEC", "300"))
+PREDICT_CACHE_QUANT = float(os.getenv("PREDICT_CACHE_QUANT", "0.001"))  # 연속값 양자화 단위
+
+# 범주형 인코딩
+VAD_MAP = {"low": 0, "medium": 1, "high": 2}
+NS_MAP = {"weak": 0, "normal": 1, "strong": 2}
+VAD_NAMES = {v: k for k, v in VAD_MAP.items()}
+NS_NAMES = {v: k for k, v in NS_MAP.items()}
+
+# 파라미터 스윕 설정
+SWEEP_MAX_POINTS = int(os.getenv("SWEEP_MAX_POINTS", "1000000"))  # 격자(라운드당) 최대 점 수
+SWEEP_CHUNK_ROWS = int(os.getenv("SWEEP_CHUNK_ROWS", "65536"))  # 모델 호출 한 번에 넣는 행 수 (메모리 상한)
+SWEEP_MAX_TOP_K = int(os.getenv("SWEEP_MAX_TOP_K", "1000"))
+
+
+class PredictionCache:
+    """LRU + TTL 예측 결과 캐시 (양자화된 특징 벡터 + 모델 버전 키)"""
+
+    def __init__(self, max_size: int, ttl_sec: float):
+        self.max_size = max_size
+        self.ttl_sec = ttl_sec
+        self._data = OrderedDict()  # key -> (expires_at, result)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        if self.max_size <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, result = entry
+            if expires_at < now:
+                # TTL 만료
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_sec, result)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_sec": self.ttl_sec,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+
+predict_cache = PredictionCache(PREDICT_CACHE_SIZE, PREDICT_CACHE_TTL_SEC)
+
+# 온라인 특징 저장소 (dataflow/step45_stream.py --feature_store가 팀별 특징을 기록)
+# sqlite:///경로 (같은 호스트/볼륨) 또는 redis://호스트:포트/DB, 비어 있으면 /predict_for_team 비활성화
+# sqlite는 파이프라인과 서비스가 같은 호스트일 때만 (로컬 개발용), Dataflow + Cloud Run 운영 환경은 redis://
+FEATURE_STORE_URL = os.getenv("FEATURE_STORE_URL", "")
+FEATURE_KEY_PREFIX = "team_features:"
+# 저장소에 없는 오디오 특징의 기본값 (functions/src/step49.digitalTwin.ts와 동일)
+DEFAULT_SNR_DB = float(os.getenv("DEFAULT_SNR_DB", "15"))
+DEFAULT_SPEECH_BLOCKS_PER_MIN = float(os.getenv("DEFAULT_SPEECH_BLOCKS_PER_MIN", "100"))
+
+
+class TeamFeatureStore:
+    """
+    팀별 특징 읽기 전용 클라이언트 (형식은 dataflow/feature_store.py 참고)
+    연결은 첫 조회 때 엽니다 (파이프라인이 SQLite 파일을 아직 만들지 않았어도 서비스는 뜰 수 있도록).
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self._sqlite = None
+        self._redis = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self.url.startswith("sqlite:///"):
+            import sqlite3
+            path = self.url[len("sqlite:///"):]
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"특징 저장소 파일이 없습니다: {path}")
+            self._sqlite = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        elif self.url.startswith(("redis://", "rediss://")):
+            import redis
+            self._redis = redis.Redis.from_url(self.url)
+        else:
+            raise ValueError(f"지원하지 않는 특징 저장소 URL: {self.url}")
+
+    def get(self, team_id: str) -> Optional[dict]:
+        if self._sqlite is None and self._redis is None:
+            self._connect()
+        if self._redis is not None:
+            value = self._redis.get(FEATURE_KEY_PREFIX + team_id)
+        else:
+            with self._lock:
+                row = self._sqlite.execute(
+                    "SELECT features FROM team_features WHERE team_id = ?", (team_id,)
+                ).fetchone()
+            value = row[0] if row else None
+        return json.loads(value) if value is not None else None
+
+
+feature_store = TeamFeatureStore(FEATURE_STORE_URL) if FEATURE_STORE_URL else None
+
+
+def load_model_file(path: str):
+    """
+    모델 파일을 로드합니다.
+    numpy 배열은 mmap_mode="r"로 매핑되어 멀티 워커에서도 페이지 캐시를 공유합니다.
+    """
+    global model, USE_MODEL, MODEL_VERSION, MODEL_MTIME
 
-# 모델 로드 (실제 모델 파일이 없으면 간단한 선형 회귀 사용)
-try:
     import joblib
-    MODEL_PATH = os.getenv("MODEL_PATH", "model_quality_predictor.pkl")
-    if os.path.exists(MODEL_PATH):
-        model = joblib.load(MODEL_PATH)
-        USE_MODEL = True
-    else:
-        USE_MODEL = False
-        print(f"⚠️ 모델 파일이 없습니다: {MODEL_PATH}. 간단한 선형 회귀를 사용합니다.")
-except ImportError:
-    USE_MODEL = False
-    print("⚠️ joblib이 없습니다. 간단한 선형 회귀를 사용합니다.")
+    with stage("model_load"):
+        mtime = os.stat(path).st_mtime_ns
+        model = joblib.load(path, mmap_mode="r" if MODEL_MMAP else None)
+    USE_MODEL = True
+    MODEL_MTIME = mtime
+
+    # 모델 버전 갱신 + 예측 캐시 무효화
+    MODEL_VERSION += 1
+    predict_cache.clear()
+    MODEL_VERSION_INFO.set(MODEL_VERSION)
+    MODEL_LOADED.set(1)
+
+
+def refresh_model_if_changed():
+    """다른 워커가 /reload-model로 MODEL_PATH를 교체했으면 다시 로드"""
+    global _last_model_check
+
+    now = time.monotonic()
+    if now - _last_model_check < MODEL_CHECK_INTERVAL_SEC:
+        return
+    _last_model_check = now
+
+    try:
+        mtime = os.stat(MODEL_PATH).st_mtime_ns
+    except OSError:
+        return
+    if mtime != MODEL_MTIME:
+        load_model_file(MODEL_PATH)
+
+
+# 모델 로드 (실제 모델 파일이 없으면 간단한 선형 회귀 사용)
+# gunicorn preload_app 모드에서는 fork 전에 한 번만 실행됩니다.
+# joblib(+ 모델이 쓰는 sklearn 등)은 모델 파일이 있을 때만 import (선형 회귀만 쓰는 인스턴스의 시작 시간 단축)
+if os.path.exists(MODEL_PATH):
+    try:
+        load_model_file(MODEL_PATH)
+    except ImportError:
+        print("⚠️ joblib이 없습니다. 간단한 선형 회귀를 사용합니다.")
+else:
+    print(f"⚠️ 모델 파일이 없습니다: {MODEL_PATH}. 간단한 선형 회귀를 사용합니다.")
 
 
 class Features(BaseModel):
@@ -37,12 +238,70 @@ class Features(BaseModel):
     noise_suppression: str = "normal"
 
 
+class TeamPredictRequest(BaseModel):
+    """/predict_for_team 입력: 튜닝 파라미터 + (선택) 저장소 특징 덮어쓰기"""
+    vad_aggressiveness: str = "medium"
+    noise_suppression: str = "normal"
+    feature_source: str = "latest"  # "latest": 최신 리포트 값, "ewma": 지수 이동 평균
+    snr_db: Optional[float] = None
+    speech_blocks_per_min: Optional[float] = None
+    coverage: Optional[float] = None
+    gaps: Optional[int] = None
+    overlaps: Optional[int] = None
+
+
+class SweepRange(BaseModel):
+    """스윕 축: min~max를 steps개 등간격으로, 또는 values 목록 그대로"""
+    min: Optional[float] = None
+    max: Optional[float] = None
+    steps: conint(ge=1, le=SWEEP_MAX_POINTS) = 10  # 범위 밖이면 격자를 만들기 전에 422
+    values: Optional[list[float]] = None
+
+
+class SweepRequest(BaseModel):
+    """
+    /sweep 입력: 축별 범위(지정하지 않은 수치 축은 팀 특징 또는 기본값 하나로 고정) + 범주형 후보 목록
+    search: "grid" (전체 격자) 또는 "coarse_to_fine" (최고점 주변으로 범위를 좁혀 refine_rounds번 반복)
+    """
+    snr_db: Optional[SweepRange] = None
+    speech_blocks_per_min: Optional[SweepRange] = None
+    coverage: Optional[SweepRange] = None
+    gaps: Optional[SweepRange] = None
+    overlaps: Optional[SweepRange] = None
+    vad_aggressiveness: list[str] = list(VAD_MAP)
+    noise_suppression: list[str] = list(NS_MAP)
+    team_id: Optional[str] = None
+    feature_source: str = "latest"
+    top_k: int = 10
+    search: str = "grid"
+    refine_rounds: int = 3
+
+
 @app.get("/health")
 async def health():
-    return {
+    """서비스 상태 (워밍업이 실패한 인스턴스는 503, health_response 참고)"""
+    body = {
         "status": "ok",
         "model_loaded": USE_MODEL,
+        "model_version": MODEL_VERSION,
+        "predict_cache": predict_cache.stats(),
     }
+    return health_response(body)
+
+
+def cache_key(f: Features) -> tuple:
+    """양자화/정규화된 특징 튜플 + 모델 버전으로 캐시 키 생성"""
+    q = PREDICT_CACHE_QUANT
+    return (
+        MODEL_VERSION,
+        round(f.snr_db / q),
+        round(f.speech_blocks_per_min / q),
+        round(f.coverage / q),
+        f.gaps,
+        f.overlaps,
+        VAD_MAP.get(f.vad_aggressiveness, 1),
+        NS_MAP.get(f.noise_suppression, 1),
+    )
 
 
 @app.post("/predict")
@@ -60,55 +319,165 @@ async def predict(f: Features):
         }
     """
     try:
-        # 범주형 인코딩
-        vad_map = {"low": 0, "medium": 1, "high": 2}
-        ns_map = {"weak": 0, "normal": 1, "strong": 2}
-
-        # 입력 특징 벡터 구성
-        X = np.array([[
-            f.snr_db,
-            f.speech_blocks_per_min,
-            f.coverage,
-            f.gaps,
-            f.overlaps,
-            vad_map.get(f.vad_aggressiveness, 1),
-            ns_map.get(f.noise_suppression, 1),
-        ]])
-
-        if USE_MODEL:
-            # 실제 모델 사용
-            y_pred = model.predict(X)[0]
-            # 예측 신뢰도 (간단히 표준편차 사용, 실제로는 모델에 따라 다름)
-            confidence = 0.85  # 기본값
-        else:
-            # 간단한 선형 회귀 (실제 모델이 없을 때)
-            # 가중치: SNR(0.3), Coverage(0.4), Gaps(-0.1), Overlaps(-0.1), VAD(0.1), NS(0.1)
-            weights = np.array([0.3, 0.0, 0.4, -0.1, -0.1, 0.1, 0.1])
-            
-            # 정규화 (SNR: 0-30, speech_blocks: 0-200, coverage: 0-1, gaps: 0-20, overlaps: 0-20)
-            normalized = np.array([
-                f.snr_db / 30.0,
-                f.speech_blocks_per_min / 200.0,
-                f.coverage,
-                max(0, 1 - f.gaps / 20.0),
-                max(0, 1 - f.overlaps / 20.0),
-                vad_map.get(f.vad_aggressiveness, 1) / 2.0,
-                ns_map.get(f.noise_suppression, 1) / 2.0,
-            ])
-            
-            y_pred = np.dot(weights, normalized) + 0.5  # 기본값 0.5
-            y_pred = np.clip(y_pred, 0.0, 1.0)  # 0-1 범위로 제한
-            confidence = 0.7  # 간단한 모델이므로 낮은 신뢰도
+        return predict_cached(f)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"예측 실패: {str(e)}")
 
-        return {
-            "predicted_score": float(y_pred),
-            "confidence": confidence,
-            "model_used": "actual" if USE_MODEL else "linear",
-        }
 
+def predict_cached(f: Features) -> dict:
+    """예측 캐시를 거쳐 예측 (캐시 미스면 모델 호출 후 저장)"""
+    refresh_model_if_changed()
+
+    key = cache_key(f)
+    cached = predict_cache.get(key)
+    if cached is not None:
+        _CACHE_HIT.inc()
+        return dict(cached)
+    _CACHE_MISS.inc()
+
+    with stage("model_predict"):
+        result = predict_uncached(f)
+    predict_cache.put(key, result)
+    return dict(result)
+
+
+def stored_number(stored: dict, name: str, value=None) -> float:
+    """
+    저장소 특징 값 검증: 없으면 503 (파이프라인이 아직 기록하지 않음, 재시도 가능),
+    숫자가 아니면 422 (저장된 값으로 예측할 수 없음)
+    """
+    if value is None:
+        value = stored.get(name)
+    if value is None:
+        raise HTTPException(status_code=503, detail=f"팀 특징이 아직 준비되지 않았습니다: {name}")
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise HTTPException(status_code=422, detail=f"저장소 특징 값이 올바르지 않습니다: {name}={value!r}")
+    return value
+
+
+def team_features(stored: dict, req: TeamPredictRequest) -> Features:
+    """
+    저장소 특징 + 요청 튜닝 파라미터 → Features (요청에 값이 있으면 저장소 값보다 우선)
+    coverage / gaps / overlaps는 요청이나 저장소에 있어야 하며, 없거나 숫자가 아니면 stored_number가 503 / 422
+    """
+    suffix = "_ewma" if req.feature_source == "ewma" else ""
+
+    def pick(name: str, default=None):
+        value = getattr(req, name)
+        if value is not None:
+            return value
+        return stored_number(stored, name, stored.get(name + suffix, stored.get(name, default)))
+
+    return Features(
+        snr_db=pick("snr_db", DEFAULT_SNR_DB),
+        speech_blocks_per_min=pick("speech_blocks_per_min", DEFAULT_SPEECH_BLOCKS_PER_MIN),
+        coverage=pick("coverage"),
+        gaps=round(pick("gaps")),
+        overlaps=round(pick("overlaps")),
+        vad_aggressiveness=req.vad_aggressiveness,
+        noise_suppression=req.noise_suppression,
+    )
+
+
+def lookup_team_features(team_id: str) -> dict:
+    """특징 저장소에서 팀 특징 조회 (저장소 없음/조회 실패 503, 팀 없음 404)"""
+    if feature_store is None:
+        raise HTTPException(status_code=503, detail="특징 저장소가 설정되지 않았습니다 (FEATURE_STORE_URL)")
+    try:
+        with stage("feature_lookup"):
+            stored = feature_store.get(team_id)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"특징 저장소 조회 실패: {str(e)}")
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"팀 특징이 없습니다: {team_id}")
+    if not isinstance(stored, dict):
+        raise HTTPException(status_code=422, detail=f"팀 특징 형식이 올바르지 않습니다: {team_id}")
+    return stored
+
+
+@app.post("/predict_for_team/{team_id}")
+def predict_for_team(team_id: str, req: TeamPredictRequest):
+    """
+    온라인 특징 저장소의 팀 특징과 요청한 튜닝 파라미터를 합쳐 품질 점수를 예측합니다.
+    클라이언트가 BigQuery/Firestore에서 팀 지표를 먼저 조회해 /predict에 보내는 왕복을 없앱니다.
+    (저장소 조회(SQLite / Redis)와 모델 파일 확인이 블로킹 I/O이므로 async가 아닌 일반 함수로 두어 스레드 풀에서 실행)
+
+    Args:
+        team_id: 팀 ID
+        req: TeamPredictRequest (VAD, 노이즈 억제, 특징 종류, 선택적 덮어쓰기)
+
+    Returns:
+        /predict 결과 + {"team_id", "features": 사용한 특징, "feature_age_sec": 저장소 값의 나이(초), "feature_count"}
+    """
+    if req.feature_source not in ("latest", "ewma"):
+        raise HTTPException(status_code=400, detail="feature_source는 latest 또는 ewma여야 합니다")
+    stored = lookup_team_features(team_id)
+    # 저장소 값 검증은 예측 전에 (503 / 422, 아래 except에서 500으로 바뀌지 않도록)
+    f = team_features(stored, req)
+    updated_ts = stored_number(stored, "updated_ts")
+
+    try:
+        result = predict_cached(f)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"예측 실패: {str(e)}")
 
+    result.update({
+        "team_id": team_id,
+        "features": f.model_dump(),
+        "feature_age_sec": time.time() - updated_ts,
+        "feature_count": stored.get("count"),
+    })
+    return result
+
+
+def predict_uncached(f: Features) -> dict:
+    """캐시를 거치지 않고 모델(또는 선형 회귀)로 예측"""
+    # 입력 특징 벡터 구성
+    X = np.array([[
+        f.snr_db,
+        f.speech_blocks_per_min,
+        f.coverage,
+        f.gaps,
+        f.overlaps,
+        VAD_MAP.get(f.vad_aggressiveness, 1),
+        NS_MAP.get(f.noise_suppression, 1),
+    ]])
+    y_pred = score_matrix(X)[0]
+
+    return {
+        "predicted_score": float(y_pred),
+        "confidence": model_confidence(),
+        "model_used": "actual" if USE_MODEL else "linear",
+    }
+
+
+# 간단한 선형 회귀 (실제 모델이 없을 때)
+# 가중치: SNR(0.3), Coverage(0.4), Gaps(-0.1), Overlaps(-0.1), VAD(0.1), NS(0.1)
+LINEAR_WEIGHTS = np.array([0.3, 0.0, 0.4, -0.1, -0.1, 0.1, 0.1])
+# 정규화 (SNR: 0-30, speech_blocks: 0-200, coverage: 0-1, gaps: 0-20, overlaps: 0-20, VAD/NS: 0-2)
+LINEAR_SCALE = np.array([30.0, 200.0, 1.0, 20.0, 20.0, 2.0, 2.0])
+
+
+def score_matrix(X: np.ndarray) -> np.ndarray:
+    """
+    특징 행렬 (n, 7) → 예측 점수 (n,)
+    열 순서: snr_db, speech_blocks_per_min, coverage, gaps, overlaps, VAD 코드, NS 코드
+    """
+    if USE_MODEL:
+        # 실제 모델 사용
+        return np.asarray(model.predict(X), dtype=np.float64)
+
+    normalized = X / LINEAR_SCALE
+    # gaps / overlaps는 적을수록 1에 가까움
+    normalized[:, 3:5] = np.maximum(0.0, 1.0 - normalized[:, 3:5])
+    y_pred = normalized @ LINEAR_WEIGHTS + 0.5  # 기본값 0.5
+    return np.clip(y_pred, 0.0, 1.0)  # 0-1 범위로 제한
+
+
+def model_confidence() -> float:
+    """예측 신뢰도 (간단히 모델 종류별 고정값, 실제로는 모델에 따라 다름)"""
+    return 0.85 if USE_MODEL else 0.7  # 선형 회귀는 간단한 모델이므로 낮은 신뢰도
+
 
 @app.post("/predict_batch")
 async def predict_batch(features_list: list[Features]):
@@ -126,18 +495,193 @@ async def predict_batch(features_list: list[Features]):
         try:
             result = await predict(f)
             results.append({
-                "features": f.dict(),
+                "features": f.model_dump(),
                 "predicted_score": result["predicted_score"],
                 "confidence": result["confidence"],
             })
         except Exception as e:
             results.append({
-                "features": f.dict(),
+                "features": f.model_dump(),
                 "error": str(e),
             })
     return {"results": results}
 
 
+# 스윕 격자 열 순서 (score_matrix 입력과 동일)
+SWEEP_NUMERIC_AXES = ("snr_db", "speech_blocks_per_min", "coverage", "gaps", "overlaps")
+SWEEP_INT_AXES = ("gaps", "overlaps")
+# 팀을 지정하지 않았을 때 고정 축 기본값 (functions/src/step49.digitalTwin.ts와 동일)
+SWEEP_BASE = {"coverage": 0.95, "gaps": 3, "overlaps": 2}
+
+
+def sweep_axis(name: str, r: SweepRange, lo: float = None, hi: float = None, center: float = None) -> np.ndarray:
+    """
+    축 값 배열 (정수 축은 반올림 후 중복 제거)
+    coarse_to_fine에서는 lo/hi가 min/max를 대신하고, 이전 라운드 최고점(center)을 항상 포함
+    """
+    if r.values:
+        if len(r.values) > SWEEP_MAX_POINTS:
+            raise ValueError(f"{name}: values는 최대 {SWEEP_MAX_POINTS}개입니다")
+        values = np.asarray(r.values, dtype=np.float64)
+    else:
+        if r.min is None or r.max is None or r.min > r.max:
+            raise ValueError(f"{name}: min <= max 또는 values가 필요합니다")
+        if not 1 <= r.steps <= SWEEP_MAX_POINTS:
+            raise ValueError(f"{name}: steps는 1~{SWEEP_MAX_POINTS}이어야 합니다")
+        values = np.linspace(r.min if lo is None else lo, r.max if hi is None else hi, r.steps)
+        if center is not None:
+            values = np.append(values, center)
+    if name in SWEEP_INT_AXES:
+        values = np.round(values)
+    return np.unique(values)
+
+
+def sweep_axis_size(r: SweepRange, refine: bool) -> int:
+    """sweep_axis가 만들 값 개수의 상한 (배열을 만들기 전에 격자 크기를 검증하기 위해, refine이면 이전 최고점 1개 추가)"""
+    return len(r.values) if r.values else r.steps + refine
+
+
+def check_grid_size(sizes) -> int:
+    """축별 값 개수의 곱(격자 점 수)이 SWEEP_MAX_POINTS 이하인지 검증 (Python 정수 곱이라 넘침 없음)"""
+    n = math.prod(sizes)
+    if not all(sizes) or n > SWEEP_MAX_POINTS:
+        raise ValueError(f"격자 점 수 {n}가 1~{SWEEP_MAX_POINTS} 범위를 벗어납니다 (축별 {list(sizes)})")
+    return n
+
+
+def sweep_grid(axes: list, top_k: int) -> tuple:
+    """
+    축 값 배열들의 데카르트 곱을 SWEEP_CHUNK_ROWS행씩 만들어 score_matrix로 점수 계산 (격자 전체를 한 번에 만들지 않음)
+    Returns: (상위 top_k 격자 인덱스, 점수) 점수 내림차순
+    """
+    shape = tuple(len(a) for a in axes)
+    n = check_grid_size(shape)
+    top_idx = np.empty(0, dtype=np.int64)
+    top_scores = np.empty(0, dtype=np.float64)
+    for start in range(0, n, SWEEP_CHUNK_ROWS):
+        idx = np.arange(start, min(n, start + SWEEP_CHUNK_ROWS), dtype=np.int64)
+        coords = np.unravel_index(idx, shape)
+        X = np.column_stack([a[c] for a, c in zip(axes, coords)])
+        scores = score_matrix(X)
+
+        # 이전 상위 후보 + 이번 청크에서 top_k만 유지
+        idx = np.concatenate([top_idx, idx])
+        scores = np.concatenate([top_scores, scores])
+        if len(scores) > top_k:
+            keep = np.argpartition(-scores, top_k - 1)[:top_k]
+            idx, scores = idx[keep], scores[keep]
+        top_idx, top_scores = idx, scores
+
+    order = np.lexsort((top_idx, -top_scores))  # 점수 내림차순, 같으면 격자 순서
+    return top_idx[order], top_scores[order]
+
+
+def sweep_point(axes: list, index: int) -> dict:
+    """격자 인덱스 → 특징 dict"""
+    coords = np.unravel_index(index, tuple(len(a) for a in axes))
+    values = [float(a[c]) for a, c in zip(axes, coords)]
+    point = dict(zip(SWEEP_NUMERIC_AXES, values[:5]))
+    for name in SWEEP_INT_AXES:
+        point[name] = int(point[name])
+    point["vad_aggressiveness"] = VAD_NAMES[int(values[5])]
+    point["noise_suppression"] = NS_NAMES[int(values[6])]
+    return point
+
+
+@app.post("/sweep")
+def sweep(req: SweepRequest):
+    """
+    튜닝 파라미터 격자를 서버에서 만들어 한 번에 예측하고 상위 top_k 조합을 반환합니다.
+    디지털 트윈 UI가 조합마다 /predict를 호출하는 대신 사용합니다.
+    (CPU 작업이므로 async가 아닌 일반 함수로 두어 스레드 풀에서 실행, 이벤트 루프를 막지 않음)
+
+    Args:
+        req: SweepRequest (축별 범위, 범주형 후보, team_id, top_k, search)
+
+    Returns:
+        {
+            "search", "grid_size": 라운드당 격자 점 수, "evaluated": 예측한 총 점 수, "rounds",
+            "top": [{"features", "predicted_score"}, ...] (점수 내림차순), "best": top[0],
+            "model_used", "confidence", "elapsed_ms"
+        }
+    """
+    t0 = time.perf_counter()
+    if req.search not in ("grid", "coarse_to_fine"):
+        raise HTTPException(status_code=400, detail="search는 grid 또는 coarse_to_fine이어야 합니다")
+    if not 1 <= req.top_k <= SWEEP_MAX_TOP_K:
+        raise HTTPException(status_code=400, detail=f"top_k는 1~{SWEEP_MAX_TOP_K}이어야 합니다")
+    if not 1 <= req.refine_rounds <= 10:
+        raise HTTPException(status_code=400, detail="refine_rounds는 1~10이어야 합니다")
+    unknown = [v for v in req.vad_aggressiveness if v not in VAD_MAP] + \
+        [v for v in req.noise_suppression if v not in NS_MAP]
+    if unknown or not req.vad_aggressiveness or not req.noise_suppression:
+        raise HTTPException(status_code=400, detail=f"알 수 없거나 빈 범주형 값: {unknown}")
+
+    # 고정 축 값: 팀 특징 → 기본값
+    base = {"snr_db": DEFAULT_SNR_DB, "speech_blocks_per_min": DEFAULT_SPEECH_BLOCKS_PER_MIN, **SWEEP_BASE}
+    if req.team_id:
+        stored = lookup_team_features(req.team_id)
+        suffix = "_ewma" if req.feature_source == "ewma" else ""
+        for name in SWEEP_NUMERIC_AXES:
+            base[name] = stored_number(stored, name, stored.get(name + suffix, stored.get(name, base[name])))
+
+    ranges = {name: getattr(req, name) for name in SWEEP_NUMERIC_AXES}
+    categorical = [
+        np.array(sorted({VAD_MAP[v] for v in req.vad_aggressiveness}), dtype=np.float64),
+        np.array(sorted({NS_MAP[v] for v in req.noise_suppression}), dtype=np.float64),
+    ]
+    bounds = {name: (r.min, r.max, None) for name, r in ranges.items() if r is not None and not r.values}
+    rounds = req.refine_rounds if req.search == "coarse_to_fine" and bounds else 1
+
+    try:
+        # 축 배열을 만들기 전에 축별 개수로 격자 크기 검증 (모든 라운드의 상한)
+        check_grid_size([
+            sweep_axis_size(ranges[name], rounds > 1) if ranges[name] is not None else 1
+            for name in SWEEP_NUMERIC_AXES
+        ] + [len(a) for a in categorical])
+        refresh_model_if_changed()
+        evaluated = 0
+        for round_index in range(rounds):
+            axes = [
+                sweep_axis(name, ranges[name], *bounds.get(name, (None, None, None))) if ranges[name] is not None
+                else np.array([round(base[name]) if name in SWEEP_INT_AXES else base[name]], dtype=np.float64)
+                for name in SWEEP_NUMERIC_AXES
+            ] + categorical
+            grid_size = check_grid_size([len(a) for a in axes])
+            with stage("sweep_round"):
+                top_idx, top_scores = sweep_grid(axes, req.top_k)
+            evaluated += grid_size
+
+            # coarse_to_fine: 최고점 주변 ±1 격자 간격으로 범위를 좁힘 (원래 범위 밖으로는 나가지 않음)
+            best = sweep_point(axes, int(top_idx[0]))
+            for name, (lo, hi, _) in list(bounds.items()):
+                r = ranges[name]
+                width = (hi - lo) / max(1, r.steps - 1)
+                bounds[name] = (max(r.min, best[name] - width), min(r.max, best[name] + width), best[name])
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"스윕 실패: {str(e)}")
+
+    top = [
+        {"features": sweep_point(axes, int(i)), "predicted_score": float(score)}
+        for i, score in zip(top_idx, top_scores)
+    ]
+    return {
+        "search": req.search,
+        "grid_size": grid_size,
+        "evaluated": evaluated,
+        "rounds": rounds,
+        "top": top,
+        "best": top[0],
+        "model_used": "actual" if USE_MODEL else "linear",
+        "confidence": model_confidence(),
+        "elapsed_ms": (time.perf_counter() - t0) * 1000,
+    }
+
+
 @app.post("/reload-model")
 async def reload_model(req: dict):
     """
@@ -149,8 +693,6 @@ async def reload_model(req: dict):
     Returns:
         {"status": "ok", "model_loaded": "model_url"}
     """
-    global model, USE_MODEL
-    
     try:
         model_url = req.get("model_url")
         if not model_url:
@@ -170,35 +712,60 @@ async def reload_model(req: dict):
             http_url = model_url
         
         # 모델 다운로드
-        response = requests.get(http_url, timeout=60)
-        response.raise_for_status()
+        with stage("model_download"):
+            response = requests.get(http_url, timeout=60)
+            response.raise_for_status()
         
-        # 임시 파일에 저장
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pkl") as f:
+        # MODEL_PATH와 같은 디렉터리의 임시 파일에 저장 후 원자적으로 교체
+        # (다른 워커는 refresh_model_if_changed에서 mtime 변경을 감지해 다시 로드)
+        model_dir = os.path.dirname(os.path.abspath(MODEL_PATH))
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pkl", dir=model_dir) as f:
             f.write(response.content)
             temp_path = f.name
         
-        # 모델 로드
-        import joblib
-        model = joblib.load(temp_path)
-        USE_MODEL = True
-        
-        # 임시 파일 삭제
+        # 모델 로드 (검증 후 교체, rename은 inode를 유지하므로 mmap/mtime이 그대로 유효)
         try:
-            os.unlink(temp_path)
-        except:
-            pass
+            load_model_file(temp_path)
+            os.replace(temp_path, MODEL_PATH)
+        except Exception:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
         
         return {
             "status": "ok",
             "model_loaded": model_url,
-            "model_path": temp_path if os.path.exists(temp_path) else "loaded",
+            "model_path": MODEL_PATH,
+            "model_version": MODEL_VERSION,
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"모델 로드 실패: {str(e)}")
 
 
+# ===== 워밍업 =====
+# 모델의 첫 predict 호출(입력 검증/지연 import 등)을 첫 요청 대신 import 시점에 한 번 실행
+# (gunicorn preload_app이면 fork 전 master에서 한 번, 캐시/메트릭에는 남기지 않음)
+WARMUP = os.getenv("WARMUP", "1") != "0"
+
+
+def warmup():
+    """기본 특징으로 단건 예측 + 스윕과 같은 다건 score_matrix 호출"""
+    f = Features(
+        snr_db=DEFAULT_SNR_DB, speech_blocks_per_min=DEFAULT_SPEECH_BLOCKS_PER_MIN, **SWEEP_BASE,
+    )
+    predict_uncached(f)
+    X = np.tile(np.array([[f.snr_db, f.speech_blocks_per_min, f.coverage, f.gaps, f.overlaps, 1, 1]]), (64, 1))
+    X[:, 5] = np.arange(64) % 3
+    score_matrix(X)
+
+
+if WARMUP:
+    run_warmup(warmup)
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8080)
 
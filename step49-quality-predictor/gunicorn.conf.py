@@ -0,0 +1,44 @@
+"""
+gunicorn 설정 (멀티 프로세스 서빙 모드)
+- preload_app: fork 전에 앱/모델을 한 번 로드하여 워커 간 메모리(CoW/mmap) 공유
+- max_requests: 일정 요청 수마다 워커를 graceful하게 재시작 (메모리 누수 방지)
+
+실행: gunicorn -c gunicorn.conf.py app:app
+"""
+
+import os
+import shutil
+
+# Prometheus 멀티 프로세스 모드: 워커별 메트릭 파일을 /metrics에서 합산
+# (app import 전에 설정되어야 하므로 설정 파일 로드 시점에 디렉터리를 초기화)
+PROMETHEUS_MULTIPROC_DIR = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
+shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+
+
+def _cpu_count() -> int:
+    """컨테이너에 할당된 CPU 수 (affinity 기준)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+workers = int(os.getenv("WEB_CONCURRENCY", str(_cpu_count())))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+# 워커 재활용
+max_requests = int(os.getenv("MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "1000"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+keepalive = 5
+
+
+def child_exit(server, worker):
+    """종료된 워커의 live 게이지 파일 정리"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,137 @@
+"""
+step49 API 테스트 (FastAPI TestClient, 모델 파일 없이 선형 회귀 경로)
+
+실행 (서비스 디렉터리에서, app 모듈을 직접 import하므로 step47 테스트와 따로 실행):
+    cd step49-quality-predictor && python -m pytest -q
+"""
+
+import os
+import time
+
+# app import 전에 설정 (모듈 상수)
+os.environ.update(WARMUP="0", PREDICT_CACHE_SIZE="0", FEATURE_STORE_URL="")
+os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import app  # noqa: E402
+
+
+class FakeStore:
+    def __init__(self, teams: dict):
+        self.teams = teams
+
+    def get(self, team_id: str):
+        return self.teams.get(team_id)
+
+
+@pytest.fixture
+def client():
+    return TestClient(app.app)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = FakeStore({})
+    monkeypatch.setattr(app, "feature_store", store)
+    return store
+
+
+def team(**overrides) -> dict:
+    features = {"coverage": 0.93, "gaps": 3.4, "overlaps": 2.0, "count": 12, "updated_ts": time.time() - 5}
+    features.update(overrides)
+    return {k: v for k, v in features.items() if v is not None}
+
+
+def test_predict_for_team_uses_stored_features(client, store):
+    store.teams["t1"] = team()
+    r = client.post("/predict_for_team/t1", json={})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["features"]["gaps"] == 3 and body["feature_count"] == 12
+    assert 0 <= body["feature_age_sec"] < 60
+
+
+@pytest.mark.parametrize("missing", ["coverage", "gaps", "overlaps", "updated_ts"])
+def test_missing_stored_feature_is_not_ready(client, store, missing):
+    store.teams["t1"] = team(**{missing: None})
+    r = client.post("/predict_for_team/t1", json={})
+    assert r.status_code == 503
+    assert missing in r.json()["detail"]
+
+
+def test_request_value_fills_missing_stored_feature(client, store):
+    store.teams["t1"] = team(coverage=None)
+    r = client.post("/predict_for_team/t1", json={"coverage": 0.9})
+    assert r.status_code == 200
+    assert r.json()["features"]["coverage"] == 0.9
+
+
+@pytest.mark.parametrize("field,value", [("gaps", "many"), ("coverage", True), ("updated_ts", "yesterday")])
+def test_non_numeric_stored_feature_is_rejected(client, store, field, value):
+    store.teams["t1"] = team(**{field: value})
+    r = client.post("/predict_for_team/t1", json={})
+    assert r.status_code == 422
+    assert field in r.json()["detail"]
+
+
+def test_non_object_stored_features_are_rejected(client, store):
+    store.teams["t1"] = [1, 2, 3]
+    assert client.post("/predict_for_team/t1", json={}).status_code == 422
+
+
+def test_unknown_team_and_missing_store(client, store, monkeypatch):
+    assert client.post("/predict_for_team/nobody", json={}).status_code == 404
+    monkeypatch.setattr(app, "feature_store", None)
+    assert client.post("/predict_for_team/t1", json={}).status_code == 503
+
+
+def test_sweep_rejects_non_numeric_team_feature(client, store):
+    store.teams["t1"] = team(overlaps="n/a")
+    r = client.post("/sweep", json={"team_id": "t1", "coverage": {"min": 0.8, "max": 1.0, "steps": 3}})
+    assert r.status_code == 422
+
+
+def test_sweep_steps_are_validated_by_the_model(client, monkeypatch):
+    def no_grid(*args, **kwargs):
+        raise AssertionError("검증 전에 격자를 만듦")
+
+    monkeypatch.setattr(app.np, "linspace", no_grid)
+    for steps in (0, app.SWEEP_MAX_POINTS + 1, 10**12):
+        r = client.post("/sweep", json={"coverage": {"min": 0.8, "max": 1.0, "steps": steps}})
+        assert r.status_code == 422, steps
+
+
+def test_sweep_grid_size_is_checked_before_building_axes(client, monkeypatch):
+    def no_axis(*args, **kwargs):
+        raise AssertionError("검증 전에 축 배열을 만듦")
+
+    monkeypatch.setattr(app, "sweep_axis", no_axis)
+    steps = app.SWEEP_MAX_POINTS
+    r = client.post("/sweep", json={
+        "coverage": {"min": 0.8, "max": 1.0, "steps": steps},
+        "gaps": {"min": 0, "max": 10, "steps": steps},
+        "overlaps": {"min": 0, "max": 10, "steps": steps},
+    })
+    assert r.status_code == 400
+    assert "격자 점 수" in r.json()["detail"]
+
+
+def test_sweep_grid_rejects_oversized_shapes_without_overflow():
+    # np.prod는 int64로 넘쳐 음수/작은 값이 될 수 있는 크기
+    axes = [np.zeros(1), np.zeros(1)]
+    big = type("Huge", (), {"__len__": lambda self: 2**40})()
+    with pytest.raises(ValueError):
+        app.sweep_grid(axes + [big, big], top_k=1)
+
+
+def test_sweep_small_grid_still_works(client):
+    r = client.post("/sweep", json={
+        "coverage": {"min": 0.8, "max": 1.0, "steps": 5}, "gaps": {"values": [0, 5, 10]},
+        "search": "coarse_to_fine", "top_k": 3,
+    })
+    assert r.status_code == 200
+    body = r.json()
+    assert len(body["top"]) == 3 and body["rounds"] == 3
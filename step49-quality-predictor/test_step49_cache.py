@@ -0,0 +1,148 @@
+"""
+step49 예측 캐시 테스트: PredictionCache LRU / TTL / 비활성화, 모델 버전 변경(재로드) 시 무효화
+
+실행 (서비스 디렉터리에서, test_step49_app.py와 같은 세션):
+    cd step49-quality-predictor && python -m pytest -q
+"""
+
+import os
+
+# app import 전에 설정 (모듈 상수, test_step49_app.py와 같은 값 / 캐시는 테스트마다 새로 만들어 교체)
+os.environ.update(WARMUP="0", PREDICT_CACHE_SIZE="0", FEATURE_STORE_URL="")
+os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+
+import joblib  # noqa: E402
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+from sklearn.dummy import DummyRegressor  # noqa: E402
+
+import app  # noqa: E402
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """PredictionCache가 쓰는 time.monotonic을 수동으로 진행하는 시계로 교체"""
+    now = [1000.0]
+    monkeypatch.setattr(app.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = app.PredictionCache(max_size=16, ttl_sec=60)
+    monkeypatch.setattr(app, "predict_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def model_state(monkeypatch, tmp_path):
+    """모델 관련 전역 상태를 테스트 후 복원하고 MODEL_PATH를 임시 경로로"""
+    for name in ("model", "USE_MODEL", "MODEL_VERSION", "MODEL_MTIME", "_last_model_check"):
+        monkeypatch.setattr(app, name, getattr(app, name))
+    monkeypatch.setattr(app, "MODEL_PATH", str(tmp_path / "model.pkl"))
+    monkeypatch.setattr(app, "MODEL_CHECK_INTERVAL_SEC", 0.0)
+    return tmp_path
+
+
+def write_model(path: str, score: float, mtime_ns: int):
+    model = DummyRegressor(strategy="constant", constant=score).fit(np.zeros((1, 7)), [score])
+    joblib.dump(model, path)
+    os.utime(path, ns=(mtime_ns, mtime_ns))  # 같은 초 안에 다시 써도 mtime 변경이 보이도록
+
+
+def features(**overrides) -> app.Features:
+    f = {"snr_db": 20.0, "speech_blocks_per_min": 80.0, "coverage": 0.9, "gaps": 2, "overlaps": 1}
+    f.update(overrides)
+    return app.Features(**f)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = app.PredictionCache(max_size=2, ttl_sec=60)
+    cache.put("a", {"v": 1})
+    cache.put("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}  # a가 최근 사용
+    cache.put("c", {"v": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1} and cache.get("c") == {"v": 3}
+
+    # 기존 키를 다시 넣으면 크기는 그대로, 최근 사용으로 이동
+    cache.put("a", {"v": 4})
+    cache.put("d", {"v": 5})
+    assert cache.get("c") is None and cache.get("a") == {"v": 4}
+    stats = cache.stats()
+    assert stats["size"] == 2 and stats["evictions"] == 2
+    assert (stats["hits"], stats["misses"]) == (4, 2)
+
+
+def test_ttl_expiry(clock):
+    cache = app.PredictionCache(max_size=4, ttl_sec=10)
+    cache.put("a", {"v": 1})
+    clock[0] += 10
+    assert cache.get("a") == {"v": 1}  # 만료 시각까지는 유효
+    clock[0] += 0.001
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["size"] == 0 and stats["expirations"] == 1 and stats["misses"] == 1
+
+    # 다시 넣으면 새 TTL (적중해도 만료 시각은 연장되지 않음)
+    cache.put("a", {"v": 2})
+    clock[0] += 5
+    assert cache.get("a") == {"v": 2}
+    clock[0] += 5.001
+    assert cache.get("a") is None
+
+
+def test_size_zero_disables_cache():
+    cache = app.PredictionCache(max_size=0, ttl_sec=60)
+    cache.put("a", {"v": 1})
+    assert cache.get("a") is None
+    assert cache.stats() == {
+        "size": 0, "max_size": 0, "ttl_sec": 60, "hits": 0, "misses": 0, "evictions": 0, "expirations": 0,
+        "hit_rate": 0.0,
+    }
+
+
+def test_cached_result_is_a_copy(cache):
+    first = app.predict_cached(features())
+    first["predicted_score"] = -1.0  # 응답 dict를 고쳐도 캐시 값은 그대로
+    assert app.predict_cached(features())["predicted_score"] != -1.0
+    assert cache.stats()["hits"] == 1
+
+
+def test_quantized_features_share_an_entry(cache):
+    q = app.PREDICT_CACHE_QUANT
+    app.predict_cached(features(snr_db=20.0))
+    app.predict_cached(features(snr_db=20.0 + q / 4))
+    assert cache.stats()["hits"] == 1
+    app.predict_cached(features(snr_db=20.0 + q * 2))
+    assert cache.stats()["misses"] == 2
+
+
+def test_model_load_invalidates_cache(cache, model_state):
+    path = app.MODEL_PATH
+    write_model(path, 0.25, 10**18)
+    app.load_model_file(path)
+    version = app.MODEL_VERSION
+    assert app.predict_cached(features())["predicted_score"] == 0.25
+    assert app.predict_cached(features())["predicted_score"] == 0.25
+    assert cache.stats()["size"] == 1 and cache.stats()["hits"] == 1
+
+    # /reload-model과 같은 경로: 새 모델 로드 → 버전 증가 + 캐시 비움
+    write_model(path, 0.75, 10**18 + 1)
+    app.load_model_file(path)
+    assert app.MODEL_VERSION == version + 1
+    assert cache.stats()["size"] == 0
+    assert app.predict_cached(features())["predicted_score"] == 0.75
+
+
+def test_model_file_change_from_another_worker_invalidates_cache(cache, model_state):
+    """다른 워커가 MODEL_PATH를 교체하면 다음 예측에서 mtime 변경을 감지해 다시 로드 (이전 모델 결과를 주지 않음)"""
+    path = app.MODEL_PATH
+    write_model(path, 0.25, 10**18)
+    app.load_model_file(path)
+    assert app.predict_cached(features())["predicted_score"] == 0.25
+
+    write_model(path, 0.75, 10**18 + 1)
+    result = app.predict_cached(features())
+    assert result["predicted_score"] == 0.75 and result["model_used"] == "actual"
+    assert cache.stats()["hits"] == 0